@@ -0,0 +1,30 @@
+"""add (report_id, created_at) index to completions
+
+Revision ID: n9o0p1q2r3s4
+Revises: m8n9o0p1q2r3
+Create Date: 2026-10-17 12:00:00.000000
+
+Supports tail-only reads of a report's conversation
+(ORDER BY created_at DESC LIMIT n) in MessageContextBuilder.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n9o0p1q2r3s4'
+down_revision: Union[str, None] = 'm8n9o0p1q2r3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('completions', schema=None) as batch_op:
+        batch_op.create_index('ix_completions_report_created_at', ['report_id', 'created_at'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('completions', schema=None) as batch_op:
+        batch_op.drop_index('ix_completions_report_created_at')
@@ -0,0 +1,29 @@
+"""add query_cache_ttl_seconds to data_sources
+
+Revision ID: o0p1q2r3s4t5
+Revises: n9o0p1q2r3s4
+Create Date: 2026-10-17 14:00:00.000000
+
+Opt-in TTL for the per-process query result cache; null disables caching.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o0p1q2r3s4t5'
+down_revision: Union[str, None] = 'n9o0p1q2r3s4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('data_sources', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('query_cache_ttl_seconds', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('data_sources', schema=None) as batch_op:
+        batch_op.drop_column('query_cache_ttl_seconds')
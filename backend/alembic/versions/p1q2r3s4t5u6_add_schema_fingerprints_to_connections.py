@@ -0,0 +1,30 @@
+"""add schema_fingerprints to connections
+
+Revision ID: p1q2r3s4t5u6
+Revises: o0p1q2r3s4t5
+Create Date: 2026-10-17 16:00:00.000000
+
+Per-schema catalog fingerprints from the last refresh, so later refreshes
+only re-introspect schemas that changed. Null forces a full refresh.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p1q2r3s4t5u6'
+down_revision: Union[str, None] = 'o0p1q2r3s4t5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('connections', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('schema_fingerprints', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('connections', schema=None) as batch_op:
+        batch_op.drop_column('schema_fingerprints')
@@ -0,0 +1,30 @@
+"""add query_cache_epoch to data_sources
+
+Revision ID: q2r3s4t5u6v7
+Revises: p1q2r3s4t5u6
+Create Date: 2026-10-17 18:00:00.000000
+
+Query cache keys include this counter. Bumping it on invalidation or data
+source updates makes every process miss entries cached under the old value.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'q2r3s4t5u6v7'
+down_revision: Union[str, None] = 'p1q2r3s4t5u6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('data_sources', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('query_cache_epoch', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('data_sources', schema=None) as batch_op:
+        batch_op.drop_column('query_cache_epoch')
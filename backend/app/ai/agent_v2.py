@@ -30,7 +30,7 @@ from app.models.tool_execution import ToolExecution
 from app.models.agent_execution import AgentExecution
 from app.ai.agents.judge.judge import Judge
 from app.ai.agents.suggest_instructions import SuggestInstructions, InstructionTriggerEvaluator
-from app.settings.database import create_async_session_factory
+from app.settings.database import create_async_session_factory, BACKGROUND_POOL
 from app.dependencies import async_session_maker
 from app.core.telemetry import telemetry
 from app.ai.utils.token_counter import count_tokens
@@ -43,7 +43,7 @@ class AgentV2:
     """Enhanced orchestrator with intelligent research/action flow."""
 
     def __init__(self, db=None, organization=None, organization_settings=None, report=None,
-                 model=None, small_model=None, mode=None, messages=[], head_completion=None, system_completion=None, widget=None, step=None, event_queue=None, clients=None, build_id=None):
+                 model=None, small_model=None, mode=None, messages=[], head_completion=None, system_completion=None, widget=None, step=None, event_queue=None, clients=None, build_id=None, static_context=None):
         self.db = db
         self.build_id = build_id
         self.organization = organization
@@ -110,7 +110,8 @@ class AgentV2:
             head_completion=self.head_completion,
             widget=self.widget,
             organization_settings=self.organization_settings,
-            build_id=build_id
+            build_id=build_id,
+            shared_static=static_context,
         )
         # Enhanced registry with metadata-driven filtering
         self.registry = ToolRegistry()
@@ -183,7 +184,7 @@ class AgentV2:
     async def _run_early_scoring_background(self, planner_input: PlannerInput):
         """Run instructions/context scoring in a fresh DB session to avoid concurrency conflicts."""
         try:
-            SessionLocal = create_async_session_factory()
+            SessionLocal = create_async_session_factory(BACKGROUND_POOL)
             async with SessionLocal() as session:
                 try:
                     # Use a new Judge instance (stateless) and score from the same planner input
@@ -205,7 +206,7 @@ class AgentV2:
     async def _run_late_scoring_background(self, messages_context: str, observation_data: dict):
         """Run response scoring in a fresh DB session to avoid concurrency conflicts."""
         try:
-            SessionLocal = create_async_session_factory()
+            SessionLocal = create_async_session_factory(BACKGROUND_POOL)
             async with SessionLocal() as session:
                 try:
                     if self.organization_settings.get_config("enable_llm_judgement") and self.organization_settings.get_config("enable_llm_judgement").value and self.report_type == 'regular':
@@ -363,7 +364,7 @@ class AgentV2:
         import logging
         logger = logging.getLogger(__name__)
         try:
-            SessionLocal = create_async_session_factory()
+            SessionLocal = create_async_session_factory(BACKGROUND_POOL)
             async with SessionLocal() as session:
                 try:
                     title = await self.reporter.generate_report_title(messages_context, plan_info)
@@ -419,7 +420,7 @@ class AgentV2:
     async def _save_context_snapshot_background(self, kind: str, context_view_json: dict, prompt_text: str = ""):
         """Save context snapshot in background to avoid blocking main execution flow."""
         try:
-            SessionLocal = create_async_session_factory()
+            SessionLocal = create_async_session_factory(BACKGROUND_POOL)
             async with SessionLocal() as session:
                 try:
                     # Re-fetch agent execution in this session
@@ -442,7 +443,7 @@ class AgentV2:
         if not instruction_items:
             return
         try:
-            SessionLocal = create_async_session_factory()
+            SessionLocal = create_async_session_factory(BACKGROUND_POOL)
             async with SessionLocal() as session:
                 try:
                     service = InstructionUsageService()
@@ -510,8 +511,7 @@ class AgentV2:
                 block.reasoning = reasoning_text
                 updated = True
             if updated:
-                self.db.add(block)
-                await self.db.commit()
+                await self.project_manager._persist_trace(self.db, block)
         except Exception:
             # Best-effort; ignore persistence failures
             pass
@@ -546,6 +546,8 @@ class AgentV2:
                 report_id=str(self.report.id) if self.report else None,
                 build_id=self.build_id,
             )
+            # Batch decision/tool/block trace writes instead of committing each one
+            self.project_manager.begin_trace_journal(self.db)
 
             # Telemetry in background (non-blocking)
             asyncio.create_task(self._capture_telemetry_background(
@@ -800,7 +802,12 @@ class AgentV2:
                         block_id=current_block_id,
                     )
                 
-                async for evt in self.planner.execute(planner_input, self.sigkill_event):
+                planner_events = self.planner.execute(planner_input, self.sigkill_event)
+                journal = self.project_manager.trace_journal
+                if journal is not None and journal.accepts(self.db):
+                    # The session is idle while waiting on the LLM; let pending trace rows flush on time
+                    planner_events = journal.idle_iter(planner_events)
+                async for evt in planner_events:
                     if self.sigkill_event.is_set():
                         break
 
@@ -1529,6 +1536,11 @@ class AgentV2:
                 pass
             raise
         finally:
+            # Final flush of trace rows (also covers cancellation and early returns)
+            try:
+                await self.project_manager.close_trace_journal()
+            except Exception:
+                pass
             # Cleanup
             try:
                 websocket_manager.remove_handler(self._handle_completion_update)
@@ -260,7 +260,7 @@ class Coder:
            - After each query or DataFrame creation, print its info using: print("df Info:", df.info())
            {data_preview_instruction}
            - For SQL data sources, "SOME QUERY" should be SQL code that matches the schema column names exactly.
-           - For Excel files, use `pd.read_excel(excel_files[INDEX].path, sheet_name=SHEET_INDEX, header=None)` to read data.
+           - For Excel files, use `excel_files[INDEX].read_sheet(SHEET_INDEX)` (same result as `pd.read_excel(excel_files[INDEX].path, sheet_name=SHEET_INDEX, header=None)`, served from a cache) to read data.
              * Decide the correct INDEX and SHEET_INDEX based on prompt and data model.
              * Print the dict/df preview to help the LLM ensure indices and positions are correct.
            - After ANY operation that changes DataFrame columns (merge, join, add/remove columns), print: print("df Preview:", {data_preview_instruction})
@@ -310,7 +310,7 @@ class Coder:
         Now produce ONLY the Python function code as described. Do not output anything else besides the function python code. No markdown, no comments, no triple backticks, no triple quotes, no triple anything, no text, no anything.
         """
 
-        result = self.llm.inference(text)
+        result = await self.llm.ainference(text)
 
         # Remove markdown code fence (with optional language tag) if present
         result = re.sub(r'^\s*```(?:[A-Za-z0-9_\-]+)?\s*\r?\n', '', result.strip(), flags=re.IGNORECASE)
@@ -471,7 +471,7 @@ class Coder:
                - After each query or DataFrame creation, print its info using: print("df Info:", df.info())
                {data_preview_instruction}
                - For SQL data sources, "SOME QUERY" should be SQL code that matches the schema column names exactly.
-               - For Excel files, use `pd.read_excel(excel_files[INDEX].path, sheet_name=SHEET_INDEX, header=None)`.
+               - For Excel files, use `excel_files[INDEX].read_sheet(SHEET_INDEX)` (same result as `pd.read_excel(excel_files[INDEX].path, sheet_name=SHEET_INDEX, header=None)`, served from a cache).
                  * Decide the correct INDEX and SHEET_INDEX based on prompt and schemas.
                  * Use prints to help validate indices and positions.
                - After ANY operation that changes DataFrame columns (merge, join, add/remove columns), print: print("df Info:", df.info())
@@ -509,7 +509,7 @@ class Coder:
 
             Now produce ONLY the Python function code as described. No markdown or extra text.
             """
-            result = self.llm.inference(text)
+            result = await self.llm.ainference(text)
             result = re.sub(r'^\s*```(?:[A-Za-z0-9_\-]+)?\s*\r?\n', '', result.strip(), flags=re.IGNORECASE)
             result = re.sub(r'(?m)^\s*```\s*$', '', result)
             result = re.sub(r'^\s*(?:json|python)\s*\r?\n', '', result, flags=re.IGNORECASE)
@@ -730,7 +730,7 @@ class Coder:
            - After each query or DataFrame creation, print its info using: print("df Info:", df.info())
            {data_preview_instruction}
            - For SQL data sources, "SOME QUERY" should be SQL code that matches the schema column names exactly.
-           - For Excel files, use `pd.read_excel(excel_files[INDEX].path, sheet_name=SHEET_INDEX, header=None)` to read data.
+           - For Excel files, use `excel_files[INDEX].read_sheet(SHEET_INDEX)` (same result as `pd.read_excel(excel_files[INDEX].path, sheet_name=SHEET_INDEX, header=None)`, served from a cache) to read data.
              * Decide the correct INDEX and SHEET_INDEX based on prompt and schemas.
              * Use prints to help validate indices and positions.
            - After ANY operation that changes DataFrame columns (merge, join, add/remove columns), print: print("df Info:", df.info())
@@ -774,7 +774,7 @@ class Coder:
         Now produce ONLY the Python function code as described. Do not output anything else besides the function python code. No markdown, no comments, no triple backticks, no triple quotes, no triple anything, no text, no anything.
         """
 
-        result = self.llm.inference(text)
+        result = await self.llm.ainference(text)
 
         # Remove markdown code fence (with optional language tag) if present
         result = re.sub(r'^\s*```(?:[A-Za-z0-9_\-]+)?\s*\r?\n', '', result.strip(), flags=re.IGNORECASE)
@@ -859,9 +859,9 @@ class Coder:
         - Excel Files (available via `excel_files` list):
         {excel_files_section}
         
-        **Excel File Access**: Use `pd.read_excel(excel_files[INDEX].path, sheet_name=0)` to read Excel files.
+        **Excel File Access**: Use `excel_files[INDEX].read_sheet(0, header=0)` to read Excel files (same as `pd.read_excel(excel_files[INDEX].path, sheet_name=0)`, served from a cache).
         - `excel_files` is a list of File objects with `.path` attribute (NOT a dict, use `.path` not `['path']`)
-        - Example: `df = pd.read_excel(excel_files[0].path, sheet_name=0)`
+        - Example: `df = excel_files[0].read_sheet(0, header=0)`
 
         **CRITICAL CONSTRAINTS**:
         1. **MAX 2-3 QUERIES TOTAL** - This is a quick validation, not a full analysis.
@@ -888,7 +888,7 @@ class Coder:
         Now produce ONLY the Python function code. No markdown. Keep it SHORT.
         """
 
-        result = self.llm.inference(text)
+        result = await self.llm.ainference(text)
         
         # Clean up code fences
         result = re.sub(r'^\s*```(?:[A-Za-z0-9_\-]+)?\s*\r?\n', '', result.strip(), flags=re.IGNORECASE)
@@ -16,7 +16,7 @@ class DataSourceAgent:
         self.llm = LLM(model)
         self.schema = schema
 
-    def generate_summary(self):
+    async def generate_summary(self):
         prompt = f"""
 Given this data source:
 {self.data_source.name}
@@ -37,10 +37,10 @@ Guidelines:
 
 Respond only markdown text (with newlines), no json or any other formatting.
 """
-        response = self.llm.inference(prompt)
+        response = await self.llm.ainference(prompt)
         return response
 
-    def generate_conversation_starters(self):
+    async def generate_conversation_starters(self):
         prompt = f"""
 Given this data source:
 {self.data_source.name}
@@ -77,7 +77,7 @@ Important: Return only the JSON array with no additional text, formatting, or ex
 Do not add prefix ``` or markdown or anything. just the list of conversation starters.
 """
 
-        response = self.llm.inference(prompt)
+        response = await self.llm.ainference(prompt)
         # Strip any potential whitespace or extra characters
         response = response.strip()
         json_response = json.loads(response)
@@ -90,7 +90,7 @@ Do not add prefix ``` or markdown or anything. just the list of conversation sta
         pass
 
 
-    def generate_description(self):
+    async def generate_description(self):
         prompt = f"""
 Given this data source:
 {self.data_source.name}
@@ -115,5 +115,5 @@ Examples:
 - "Google Analytics data that provides information about website traffic, user behavior, and marketing effectiveness."
 - "Jira data that provides information about engineering projects, tasks, and team performance."
 """
-        response = self.llm.inference(prompt)
+        response = await self.llm.ainference(prompt)
         return response
\ No newline at end of file
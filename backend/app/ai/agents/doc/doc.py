@@ -38,7 +38,7 @@ class DocAgent:
         return html_content
 
 
-    def get_tags_from_text(self, html_content, previous_tags):
+    async def get_tags_from_text(self, html_content, previous_tags):
 
         prompt = f"""
 
@@ -80,7 +80,7 @@ class DocAgent:
 
         """
 
-        tags = self.llm.inference(prompt)
+        tags = await self.llm.ainference(prompt)
 
         tags = json.loads(tags)
 
@@ -21,7 +21,7 @@ class ExcelAgent:
 
     
 
-    def get_schema(self, index):
+    async def get_schema(self, index):
 
         file_path = self.excel_file.path
 
@@ -65,7 +65,7 @@ class ExcelAgent:
         and no markdown formatting.
         """
 
-        schema = self.llm.inference(prompt)
+        schema = await self.llm.ainference(prompt)
 
         schema = json.loads(schema)
 
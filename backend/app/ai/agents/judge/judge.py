@@ -5,7 +5,6 @@ import tiktoken
 import json
 from partialjson.json_parser import JSONParser
 from app.schemas.ai.planner import PlannerInput
-import asyncio
 
 class Judge:
 
@@ -35,7 +34,7 @@ class Judge:
         }}
         """
 
-        response = await asyncio.to_thread(self.llm.inference, judge_prompt)
+        response = await self.llm.ainference(judge_prompt)
         try:
             result = json.loads(response)
             passed = result["passed"]
@@ -93,7 +92,7 @@ class Judge:
             """
 
             # Offload potentially blocking LLM call to a thread to avoid blocking the event loop
-            response = await asyncio.to_thread(self.llm.inference, scoring_prompt)
+            response = await self.llm.ainference(scoring_prompt)
             try:
                 scores = json.loads(response)
                 instructions_score = max(1, min(5, int(scores.get("instructions_score", 3))))
@@ -165,7 +164,7 @@ class Judge:
             """
 
             # Offload potentially blocking LLM call to a thread to avoid blocking the event loop
-            response = await asyncio.to_thread(self.llm.inference, scoring_prompt)
+            response = await self.llm.ainference(scoring_prompt)
             
             try:
                 score_data = json.loads(response)
@@ -39,4 +39,4 @@ class Reporter:
         "Reconcile inventory between our system and our warehouse" -> Inventory Reconciliation
         """
 
-        return self.llm.inference(text)
+        return await self.llm.ainference(text)
@@ -1,3 +1,4 @@
+import asyncio
 import io
 import sys
 import ast
@@ -7,13 +8,16 @@ import numpy as np
 import datetime
 import json
 import uuid
-from contextlib import redirect_stdout
 from typing import Dict, Any, Tuple, List, Optional, Callable, Coroutine
 from app.schemas.organization_settings_schema import OrganizationSettingsConfig
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from app.ai.context.builders.code_context_builder import CodeContextBuilder
 from app.ai.schemas.codegen import CodeGenContext, CodeGenRequest
+from app.ai.code_execution.execution_pool import CodeExecutionCancelled, captured_print, code_execution_pool
+from app.ai.code_execution import widget_payload
+from app.ai.code_execution.df_profiler import profile_dataframe, profiler_settings
+from app.services.step_result_store import DEFAULT_INLINE_ROWS, step_result_store
 
 
 # =============================================================================
@@ -223,19 +227,20 @@ class CodeExecutionManager:
         executor = StreamingCodeExecutor(organization_settings=self.organization_settings, logger=self.logger)
         return executor.execute_code(code=code, ds_clients=db_clients, excel_files=excel_files)
 
-    def format_df_for_widget(self, df: pd.DataFrame, max_rows: int = 1000) -> Dict:
+    def format_df_for_widget(self, df: pd.DataFrame, max_rows: int = 1000, persist_result: bool = False) -> Dict:
         executor = StreamingCodeExecutor(organization_settings=self.organization_settings, logger=self.logger)
-        return executor.format_df_for_widget(df=df, max_rows=max_rows)
+        return executor.format_df_for_widget(df=df, max_rows=max_rows, persist_result=persist_result)
 
 
 class StreamingCodeExecutor:
     """
     Pure, tool-first streaming executor with retries. No project_manager/DB side-effects.
     """
-    def __init__(self, organization_settings: OrganizationSettingsConfig = None, logger=None, context_hub=None):
+    def __init__(self, organization_settings: OrganizationSettingsConfig = None, logger=None, context_hub=None, organization_id: Optional[str] = None):
         self.organization_settings = organization_settings
         self.logger = logger
         self.context_hub = context_hub
+        self.organization_id = organization_id
 
     def execute_code(self, *, code: str, ds_clients: Dict, excel_files: List) -> Tuple[pd.DataFrame, str]:
         """Execute Python code and return the resulting DataFrame and captured stdout log.
@@ -252,139 +257,69 @@ class StreamingCodeExecutor:
         validate_python_code(code)
 
         output_log = ""
-        local_namespace = {
-            'pd': pd,
-            'np': np,
-            'db_clients': ds_clients,
-            'excel_files': excel_files,
-        }
-        if self.logger:
-            self.logger.debug(f"Executing code:\n{code}")
         with io.StringIO() as stdout_capture:
-            with redirect_stdout(stdout_capture):
-                exec(code, local_namespace)
-                generate_df = local_namespace.get('generate_df')
-                if not generate_df:
-                    raise Exception("No generate_df function found in code")
-                df = generate_df(ds_clients, excel_files)
+            local_namespace = {
+                'pd': pd,
+                'np': np,
+                'db_clients': ds_clients,
+                'excel_files': excel_files,
+                # Prints from generated code go to this execution's log
+                'print': captured_print(stdout_capture),
+            }
+            if self.logger:
+                self.logger.debug(f"Executing code:\n{code}")
+            exec(code, local_namespace)
+            generate_df = local_namespace.get('generate_df')
+            if not generate_df:
+                raise Exception("No generate_df function found in code")
+            df = generate_df(ds_clients, excel_files)
             output_log = stdout_capture.getvalue()
         return df, output_log
 
+    async def aexecute_code(self, *, code: str, ds_clients: Dict, excel_files: List, sigkill_event=None) -> Tuple[pd.DataFrame, str]:
+        """Run execute_code on the shared execution pool instead of the event loop.
+
+        Raises:
+            CodeExecutionCancelled: If sigkill_event fires while queued or running
+        """
+        return await code_execution_pool.submit(
+            self.execute_code,
+            code=code,
+            ds_clients=ds_clients,
+            excel_files=excel_files,
+            organization_id=self.organization_id,
+            sigkill_event=sigkill_event,
+        )
+
     def get_df_info(self, df: pd.DataFrame) -> Dict:
-        """Extract comprehensive information from a DataFrame."""
-        def convert_to_native(obj):
-            if isinstance(obj, (np.int64, np.int32, np.int16, np.int8)):
-                return int(obj)
-            if isinstance(obj, (np.float64, np.float32, np.float16)):
-                return float(obj)
-            if isinstance(obj, np.bool_):
-                return bool(obj)
-            if isinstance(obj, (np.datetime64, datetime.datetime, datetime.date)):
-                return pd.Timestamp(obj).isoformat()
-            if isinstance(obj, pd.Timestamp):
-                return obj.isoformat()
-            if isinstance(obj, datetime.time):
-                return obj.isoformat()
-            if isinstance(obj, (datetime.timedelta, pd.Timedelta)):
-                return str(obj)
-            if isinstance(obj, np.ndarray):
-                return obj.tolist()
-            if isinstance(obj, uuid.UUID):
-                return str(obj)
-            # Fallback for any other non-JSON-serializable types
-            try:
-                json.dumps(obj)
-                return obj
-            except (TypeError, ValueError):
-                return str(obj)
-        def make_hashable(value: Any) -> Any:
-            """
-            Convert potentially unhashable values (dict, list, set, ndarray, Timestamp)
-            into a hashable representation so nunique/value_counts won't crash.
-            """
-            try:
-                # Fast path: already hashable
-                hash(value)
-                return value
-            except Exception:
-                pass
-            # Normalize common container types
-            if isinstance(value, (pd.Timestamp, datetime.date)):
-                return pd.Timestamp(value).isoformat()
-            if isinstance(value, np.ndarray):
-                return tuple(value.tolist())
-            if isinstance(value, (list, tuple)):
-                try:
-                    return tuple(make_hashable(v) for v in value)
-                except Exception:
-                    return tuple(str(v) for v in value)
-            if isinstance(value, set):
-                try:
-                    return tuple(sorted(make_hashable(v) for v in value))
-                except Exception:
-                    return tuple(sorted(str(v) for v in value))
-            if isinstance(value, dict):
-                try:
-                    # Stable, readable representation
-                    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
-                except Exception:
-                    # Fallback to tuple of items
-                    try:
-                        return tuple(sorted((str(k), str(v)) for k, v in value.items()))
-                    except Exception:
-                        return str(value)
-            # Final fallback
-            try:
-                return str(value)
-            except Exception:
-                return None
-
-        info_dict = {
-            "total_rows": int(len(df)),
-            "total_columns": int(len(df.columns)),
-            "column_info": {},
-            "memory_usage": int(df.memory_usage(deep=True).sum()),
-            "dtypes_count": {str(k): int(v) for k, v in df.dtypes.value_counts().items()},
-        }
-        # describe(include='all') may fail on unhashable objects (e.g., dict cells). Guard it.
-        try:
-            desc_dict = df.describe(include='all').to_dict()
-        except Exception:
-            desc_dict = {}
-        for column in df.columns:
-            column_info = {
-                "dtype": str(df[column].dtype),
-                "non_null_count": int(df[column].count()),
-                "memory_usage": int(df[column].memory_usage(deep=True)),
-                "null_count": int(df[column].isna().sum()),
-                # nunique may fail for unhashable objects; fall back to a hashable projection
-                "unique_count": 0,
-            }
-            try:
-                column_info["unique_count"] = int(df[column].nunique(dropna=True))
-            except Exception:
-                try:
-                    projected = df[column].map(make_hashable)
-                    column_info["unique_count"] = int(projected.nunique(dropna=True))
-                except Exception:
-                    column_info["unique_count"] = 0
-            if column in desc_dict:
-                try:
-                    stats = {stat: convert_to_native(value) for stat, value in desc_dict[column].items() if pd.notna(value)}
-                    column_info.update(stats)
-                except Exception:
-                    # Best-effort; skip stats if conversion fails
-                    pass
-            info_dict["column_info"][column] = column_info
-        return info_dict
-
-    def format_df_for_widget(self, df: pd.DataFrame, max_rows: int = 1000) -> Dict:
+        """Extract column statistics from a DataFrame.
+
+        Large frames are sampled; estimated stats are listed per column under
+        ``estimated`` (see ``df_profiler``).
+        """
+        return profile_dataframe(df, **profiler_settings())
+
+    def format_df_for_widget(self, df: pd.DataFrame, max_rows: int = 1000, persist_result: bool = False) -> Dict:
         """Format a DataFrame into a widget-compatible structure.
         
-        Uses pandas' native JSON serialization which handles datetime, time,
-        timedelta, numpy types, NaN/NaT, and other edge cases robustly.
+        Values are converted per column by ``widget_payload.column_values``
+        keeping the format of the previous ``to_json(date_format='iso')`` rows.
+
+        With ``persist_result``, a result longer than ``max_rows`` is written
+        to the step result store and referenced as ``result_ref``; the inline
+        rows then shrink to ``step_results.inline_rows`` since tables page and
+        export from the stored result.
         """
         columns = [{"headerName": str(col), "field": str(col)} for col in df.columns]
+        result_ref = None
+        if persist_result and len(df) > max_rows:
+            try:
+                result_ref = step_result_store.put_dataframe(df)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warning(f"Failed to store full step result ({len(df)} rows): {e}")
+            if result_ref:
+                max_rows = min(max_rows, int(step_result_store.config.get("inline_rows", DEFAULT_INLINE_ROWS)))
         if df.empty:
             rows = []
             df_info = {
@@ -401,19 +336,30 @@ class StreamingCodeExecutor:
                 "dtypes_count": {str(k): int(v) for k, v in df.dtypes.value_counts().items()},
             }
         else:
-            # Use pandas' native JSON serialization for robust type handling:
-            # - date_format='iso' handles datetime, date, time, Timestamp
-            # - default_handler=str catches anything else (UUID, Decimal, etc.)
-            rows = json.loads(
-                df.head(max_rows).to_json(orient='records', date_format='iso', default_handler=str)
-            )
+            # Convert column by column (no JSON text round-trip), then zip into rows
+            preview = widget_payload.columnar(df.head(max_rows))
+            rows = widget_payload.records([c["field"] for c in columns], preview["values"])
             df_info = self.get_df_info(df)
-        return {
+        data = {
             "rows": rows,
             "columns": columns,
             "loadingColumn": False,
             "info": df_info,
         }
+        if result_ref:
+            data["result_ref"] = result_ref
+        return data
+
+    async def aformat_df_for_widget(self, df: pd.DataFrame, max_rows: int = 1000, persist_result: bool = False) -> Dict:
+        """``format_df_for_widget`` off the event loop.
+
+        Profiling and, with ``persist_result``, the compressed Arrow write of up
+        to ``step_results.max_rows`` rows are CPU/disk bound; async callers use
+        this so they don't stall every other request on the worker.
+        """
+        return await asyncio.to_thread(
+            self.format_df_for_widget, df, max_rows=max_rows, persist_result=persist_result
+        )
 
     async def generate_and_execute_stream(
         self,
@@ -479,9 +425,11 @@ class StreamingCodeExecutor:
                 # Cancellation before executing user code
                 if sigkill_event and hasattr(sigkill_event, 'is_set') and sigkill_event.is_set():
                     break
-                exec_df, execution_log = self.execute_code(code=final_code, ds_clients=ds_clients, excel_files=excel_files)
+                exec_df, execution_log = await self.aexecute_code(code=final_code, ds_clients=ds_clients, excel_files=excel_files, sigkill_event=sigkill_event)
                 executed_successfully = True
                 break
+            except CodeExecutionCancelled:
+                break
             except Exception as e:
                 import traceback
                 trace = traceback.format_exc()
@@ -594,9 +542,11 @@ class StreamingCodeExecutor:
             try:
                 if sigkill_event and hasattr(sigkill_event, 'is_set') and sigkill_event.is_set():
                     break
-                exec_df, execution_log = self.execute_code(code=final_code, ds_clients=ds_clients, excel_files=excel_files)
+                exec_df, execution_log = await self.aexecute_code(code=final_code, ds_clients=ds_clients, excel_files=excel_files, sigkill_event=sigkill_event)
                 executed_successfully = True
                 break
+            except CodeExecutionCancelled:
+                break
             except Exception as e:
                 import traceback
                 trace = traceback.format_exc()
@@ -682,7 +632,7 @@ class StreamingCodeExecutor:
         # Check if the DataFrame has columns, which indicates success even if empty
         if len(df.columns) > 0:
             # Format the data for widget display
-            widget_data = self.format_df_for_widget(df)
+            widget_data = await self.aformat_df_for_widget(df, persist_result=True)
             
             # Update step with data
             try:
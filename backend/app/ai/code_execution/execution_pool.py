@@ -0,0 +1,298 @@
+"""
+Bounded, off-event-loop execution pool for generated pandas code.
+
+Generated code (``generate_df``) runs warehouse queries and heavy DataFrame
+transformations. Running it inline on the asyncio loop freezes every SSE
+stream, websocket and HTTP request served by the worker, so all execution is
+submitted here instead.
+
+The pool is thread-based: data source clients and report file objects are
+live, unpicklable objects, and the resulting DataFrames would otherwise have
+to be serialized back across a process boundary. Network I/O and most
+pandas/numpy kernels release the GIL, which keeps the loop responsive.
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_PER_ORGANIZATION_LIMIT = 2
+
+
+class CodeExecutionCancelled(Exception):
+    """Raised when a submitted execution is abandoned because of a sigkill."""
+    pass
+
+
+# =============================================================================
+# Per-execution stdout capture
+# =============================================================================
+
+def captured_print(buffer) -> Callable[..., None]:
+    """``print`` for an execution's globals that writes to ``buffer``.
+
+    Executions run concurrently in worker threads, so ``sys.stdout`` (process
+    wide) is left alone; generated code resolves ``print`` from its globals.
+    An explicit ``file=`` is honoured.
+    """
+    def _print(*args, file=None, **kwargs):
+        print(*args, file=buffer if file is None else file, **kwargs)
+    return _print
+
+
+# =============================================================================
+# Execution pool
+# =============================================================================
+
+class CodeExecutionPool:
+    """Bounded worker pool with per-organization concurrency limits.
+
+    - ``max_workers`` bounds how many executions run at once in the process.
+    - ``per_organization_limit`` keeps a single org from occupying every worker.
+    - Cancellation is cooperative: a queued execution is dropped when the
+      ``sigkill_event`` fires, and a running one is abandoned (the caller gets
+      ``CodeExecutionCancelled`` immediately). Python threads can't be killed,
+      so an abandoned worker keeps running until its query or transform
+      returns, and keeps its organization slot until then. So that it doesn't
+      also hold one of ``max_workers``, the executor is replaced: new work
+      goes to a fresh executor while the old one winds down. At most
+      ``max_workers`` abandoned workers are carried this way (``abandoned``
+      in ``stats``); past that, new work waits for pool slots as usual.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, per_organization_limit: Optional[int] = None):
+        self._max_workers = max_workers
+        self._per_organization_limit = per_organization_limit
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # asyncio primitives are bound to a loop; keep one set per running loop
+        self._org_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+        self._stats: Dict[str, Any] = {
+            "submitted": 0,
+            "waiting_for_org_slot": 0,
+            "queued": 0,
+            "running": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "total_queue_wait_ms": 0.0,
+            "total_run_ms": 0.0,
+            "abandoned": 0,
+            "executors_replaced": 0,
+        }
+        self._org_active: Dict[str, int] = {}
+
+    # ----- configuration -----
+
+    def _resolve_limits(self):
+        if self._max_workers is not None and self._per_organization_limit is not None:
+            return
+        max_workers = DEFAULT_MAX_WORKERS
+        per_org = DEFAULT_PER_ORGANIZATION_LIMIT
+        try:
+            from app.settings.config import settings
+            cfg = getattr(settings.bow_config, "code_execution", None)
+            if cfg is not None:
+                max_workers = int(cfg.max_workers)
+                per_org = int(cfg.per_organization_limit)
+        except Exception:
+            pass
+        if self._max_workers is None:
+            self._max_workers = max(1, max_workers)
+        if self._per_organization_limit is None:
+            self._per_organization_limit = max(1, per_org)
+
+    @property
+    def max_workers(self) -> int:
+        self._resolve_limits()
+        return self._max_workers
+
+    @property
+    def per_organization_limit(self) -> int:
+        self._resolve_limits()
+        return self._per_organization_limit
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="code-exec",
+                )
+            return self._executor
+
+    def _abandon(self, cf_future) -> None:
+        """Count a running, abandoned execution and move new work off its executor."""
+        retired = None
+        with self._lock:
+            self._stats["abandoned"] += 1
+            if self._stats["abandoned"] <= self.max_workers and self._executor is not None:
+                retired, self._executor = self._executor, None
+                self._stats["executors_replaced"] += 1
+        cf_future.add_done_callback(lambda _f: self._bump("abandoned", -1))
+        if retired is not None:
+            # Already queued work still runs there; its threads exit once idle
+            retired.shutdown(wait=False)
+
+    def _get_org_semaphore(self, organization_id: Optional[str]) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        per_loop = self._org_semaphores.get(loop)
+        if per_loop is None:
+            per_loop = {}
+            self._org_semaphores[loop] = per_loop
+        key = str(organization_id or "__global__")
+        sem = per_loop.get(key)
+        if sem is None:
+            sem = asyncio.Semaphore(self.per_organization_limit)
+            per_loop[key] = sem
+        return sem
+
+    # ----- metrics -----
+
+    def _bump(self, key: str, delta=1):
+        with self._lock:
+            self._stats[key] += delta
+
+    def _bump_org(self, org_key: str, delta: int):
+        with self._lock:
+            value = self._org_active.get(org_key, 0) + delta
+            if value <= 0:
+                self._org_active.pop(org_key, None)
+            else:
+                self._org_active[org_key] = value
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and execution counters."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["active_by_organization"] = dict(self._org_active)
+        snapshot["max_workers"] = self.max_workers
+        snapshot["per_organization_limit"] = self.per_organization_limit
+        finished = snapshot["completed"] + snapshot["failed"]
+        snapshot["avg_run_ms"] = (snapshot["total_run_ms"] / finished) if finished else 0.0
+        return snapshot
+
+    # ----- execution -----
+
+    async def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        organization_id: Optional[str] = None,
+        sigkill_event=None,
+        **kwargs,
+    ) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the pool and await its result.
+
+        Raises:
+            CodeExecutionCancelled: If ``sigkill_event`` is set before or while
+                the execution runs.
+        """
+        org_key = str(organization_id or "__global__")
+        self._bump("submitted")
+
+        if _is_set(sigkill_event):
+            self._bump("cancelled")
+            raise CodeExecutionCancelled("Execution cancelled before start")
+
+        org_semaphore = self._get_org_semaphore(organization_id)
+        self._bump("waiting_for_org_slot")
+        try:
+            await _wait_or_cancel(org_semaphore.acquire(), sigkill_event)
+        except CodeExecutionCancelled:
+            self._bump("cancelled")
+            raise
+        finally:
+            self._bump("waiting_for_org_slot", -1)
+
+        loop = asyncio.get_running_loop()
+        enqueued_at = time.monotonic()
+        self._bump("queued")
+        self._bump_org(org_key, 1)
+        started = threading.Event()
+
+        def _release():
+            self._bump_org(org_key, -1)
+            try:
+                loop.call_soon_threadsafe(org_semaphore.release)
+            except RuntimeError:
+                # An abandoned worker can outlive its loop; the semaphore went with it
+                pass
+
+        def _run():
+            self._bump("queued", -1)
+            self._bump("running")
+            self._bump("total_queue_wait_ms", (time.monotonic() - enqueued_at) * 1000.0)
+            started.set()
+            run_started_at = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+                self._bump("completed")
+                return result
+            except BaseException:
+                self._bump("failed")
+                raise
+            finally:
+                self._bump("running", -1)
+                self._bump("total_run_ms", (time.monotonic() - run_started_at) * 1000.0)
+
+        try:
+            cf_future = self._get_executor().submit(_run)
+        except Exception:
+            self._bump("queued", -1)
+            _release()
+            raise
+        cf_future.add_done_callback(lambda _f: _release())
+
+        try:
+            return await _wait_or_cancel(asyncio.wrap_future(cf_future), sigkill_event)
+        except CodeExecutionCancelled:
+            # Drop it if it never started; otherwise it runs to completion unattended
+            if cf_future.cancel() and not started.is_set():
+                self._bump("queued", -1)
+            elif not cf_future.done():
+                self._abandon(cf_future)
+            self._bump("cancelled")
+            logger.info("Code execution abandoned after sigkill", extra={"organization_id": org_key})
+            raise
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _is_set(event) -> bool:
+    return bool(event is not None and hasattr(event, "is_set") and event.is_set())
+
+
+async def _wait_or_cancel(awaitable, sigkill_event):
+    """Await ``awaitable`` unless ``sigkill_event`` fires first."""
+    task = asyncio.ensure_future(awaitable)
+    if sigkill_event is None or not hasattr(sigkill_event, "wait"):
+        return await task
+    kill_task = asyncio.ensure_future(sigkill_event.wait())
+    try:
+        await asyncio.wait({task, kill_task}, return_when=asyncio.FIRST_COMPLETED)
+    except BaseException:
+        task.cancel()
+        raise
+    finally:
+        kill_task.cancel()
+    # Prefer the result when both finished together so acquired slots aren't leaked
+    if task.done() and not task.cancelled():
+        return task.result()
+    task.cancel()
+    raise CodeExecutionCancelled("Execution cancelled by sigkill")
+
+
+code_execution_pool = CodeExecutionPool()
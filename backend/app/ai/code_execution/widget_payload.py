@@ -0,0 +1,170 @@
+"""
+Widget Payload
+
+Column-oriented encoding of result DataFrames for widgets.
+
+``format_df_for_widget`` used to serialize the preview with
+``df.to_json(orient='records')`` and parse it straight back with
+``json.loads``, which meant one full encode/decode round-trip through JSON
+text before the rows were even stored. Values are now converted column by
+column with vectorized operations (``column_values``), and the legacy
+row-record list is built from those columns once (``records``). Values keep
+the format ``to_json(orient='records', date_format='iso')`` produced, so
+stored rows read the same as before: dates and datetimes as millisecond ISO
+timestamps (tz-aware ones in UTC with a ``Z``), NaN/NaT/inf as null and numpy
+scalars as plain numbers.
+
+Consumers that can work with columns fetch the compact payload instead:
+
+    {"format": "columnar", "version": 1,
+     "columns": [{"field": "a", "headerName": "a", "dtype": "int64"}, ...],
+     "values": [[...column a...], [...column b...]],
+     "row_count": 1000, "total_rows": 250000}
+
+``encode_payload`` produces it as bytes in one orjson pass, so it goes to
+the response without being re-serialized.
+"""
+import datetime
+import decimal
+import math
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+PAYLOAD_FORMAT = "columnar"
+PAYLOAD_VERSION = 1
+
+
+def _iso_timestamp(value: Any) -> Optional[str]:
+    """Timestamp in pandas' ``to_json(date_format='iso')`` form: ms precision, UTC with ``Z`` when tz-aware."""
+    ts = pd.Timestamp(value)
+    if ts is pd.NaT:
+        return None
+    if ts.tzinfo is not None:
+        return ts.tz_convert("UTC").tz_localize(None).isoformat(timespec="milliseconds") + "Z"
+    return ts.isoformat(timespec="milliseconds")
+
+
+def _native(value: Any) -> Any:
+    """JSON-friendly value for a single object-column cell."""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return None if math.isnan(value) or math.isinf(value) else value
+    if isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, datetime.time):
+        return value.isoformat()
+    # Dates too, as the previous to_json serialization did ("2024-01-05T00:00:00.000")
+    if isinstance(value, (pd.Timestamp, datetime.date, np.datetime64)):
+        return _iso_timestamp(value)
+    if isinstance(value, (pd.Timedelta, datetime.timedelta, np.timedelta64)):
+        delta = pd.Timedelta(value)
+        return None if delta is pd.NaT else delta.isoformat()
+    if isinstance(value, np.generic):
+        return _native(value.item())
+    if isinstance(value, decimal.Decimal):
+        return float(value) if value.is_finite() else None
+    if isinstance(value, dict):
+        return {str(k): _native(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, np.ndarray)):
+        return [_native(v) for v in value]
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return str(value)
+
+
+def column_values(series: pd.Series) -> List[Any]:
+    """Convert one column to a list of JSON-friendly Python values."""
+    dtype = series.dtype
+    if ptypes.is_bool_dtype(dtype) and not ptypes.is_extension_array_dtype(dtype):
+        return series.tolist()
+    if ptypes.is_integer_dtype(dtype) and not ptypes.is_extension_array_dtype(dtype):
+        return series.tolist()
+    if ptypes.is_float_dtype(dtype) and not ptypes.is_extension_array_dtype(dtype):
+        values = series.to_numpy()
+        finite = np.isfinite(values)
+        if finite.all():
+            return values.tolist()
+        return np.where(finite, values, None).tolist()
+    if ptypes.is_datetime64_any_dtype(dtype):
+        missing = series.isna().to_numpy()
+        if getattr(dtype, "tz", None) is not None:
+            naive = series.dt.tz_convert("UTC").dt.tz_localize(None)
+            strings = np.char.add(np.datetime_as_string(naive.to_numpy(), unit="ms"), "Z")
+        else:
+            strings = np.datetime_as_string(series.to_numpy(), unit="ms")
+        if missing.any():
+            return np.where(missing, None, strings).tolist()
+        return strings.tolist()
+    if ptypes.is_timedelta64_dtype(dtype):
+        return [None if pd.isna(v) else pd.Timedelta(v).isoformat() for v in series.tolist()]
+
+    # Extension (nullable) dtypes, categoricals and object columns
+    values = series.astype(object) if not ptypes.is_object_dtype(dtype) else series
+    if ptypes.infer_dtype(values, skipna=True) in ("string", "empty"):
+        return values.where(values.notna(), None).tolist()
+    return [_native(v) for v in values.tolist()]
+
+
+def columnar(df: pd.DataFrame) -> Dict[str, Any]:
+    """Column metadata and value arrays for ``df`` (positional, so duplicate names survive)."""
+    return {
+        "columns": [
+            {"field": str(col), "headerName": str(col), "dtype": str(df.dtypes.iloc[i])}
+            for i, col in enumerate(df.columns)
+        ],
+        "values": [column_values(df.iloc[:, i]) for i in range(len(df.columns))],
+    }
+
+
+def records(fields: List[str], values: List[List[Any]]) -> List[Dict[str, Any]]:
+    """Materialize row records for consumers that need the legacy row shape."""
+    if not fields:
+        return []
+    return [dict(zip(fields, row)) for row in zip(*values)]
+
+
+def payload_from_step_data(data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Columnar payload for a stored step's inline rows."""
+    data = data or {}
+    columns = [c for c in data.get("columns") or [] if isinstance(c, dict) and "field" in c]
+    rows = data.get("rows") or []
+    column_info = (data.get("info") or {}).get("column_info") or {}
+    return {
+        "format": PAYLOAD_FORMAT,
+        "version": PAYLOAD_VERSION,
+        "columns": [
+            {
+                "field": c["field"],
+                "headerName": c.get("headerName", c["field"]),
+                "dtype": (column_info.get(c["field"]) or {}).get("dtype"),
+            }
+            for c in columns
+        ],
+        "values": [[row.get(c["field"]) for row in rows] for c in columns],
+        "row_count": len(rows),
+        "total_rows": (data.get("info") or {}).get("total_rows", len(rows)),
+    }
+
+
+def _json_default(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def encode_payload(payload: Dict[str, Any]) -> bytes:
+    """Encode a payload once, for returning as a raw response body."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    import json
+    return json.dumps(payload, default=_json_default, separators=(",", ":")).encode("utf-8")
@@ -15,6 +15,7 @@ from app.models.organization import Organization
 from app.models.user import User
 
 from app.ai.context.sections.instructions_section import InstructionsSection, InstructionItem, InstructionLabelItem
+from app.ai.context.instruction_index import InstructionSearchIndex, instruction_index_cache
 
 logger = logging.getLogger(__name__)
 
@@ -161,8 +162,10 @@ class InstructionContextBuilder:
         """
         Search instructions with load_mode='intelligent' by keyword relevance.
         
-        If query is empty, returns all intelligent instructions (up to limit)
-        with score 0, allowing them to fill remaining capacity.
+        Ranking uses the cached BM25 index (see app.ai.context.instruction_index).
+        If query is empty (or has no keywords left after stopword removal),
+        returns all intelligent instructions (up to limit) with score 0,
+        allowing them to fill remaining capacity.
         
         Parameters
         ----------
@@ -180,41 +183,37 @@ class InstructionContextBuilder:
         List[Tuple[Instruction, float]]
             List of (instruction, score) tuples, sorted by relevance.
         """
-        # Extract keywords from query
+        # Extract keywords from query; a query of only stopwords ranks like no query
         keywords = self._extract_keywords(query) if query else set()
-        
-        # Load all intelligent instructions
-        stmt = (
-            select(Instruction)
-            .where(
-                and_(
-                    Instruction.status == "published",
-                    Instruction.organization_id == self.organization.id,
-                    Instruction.deleted_at.is_(None),
-                    Instruction.load_mode == "intelligent",
+
+        index = await self._get_org_index()
+        predicate = (lambda meta: meta.get("category") == category) if category is not None else None
+
+        # Walk the ranking in pages; re-check live state since the index may lag a write
+        scored: List[Tuple[Instruction, float]] = []
+        ranked = index.search(keywords, predicate=predicate)
+        page_size = max(limit, 1) * 2
+        for offset in range(0, len(ranked), page_size):
+            page = ranked[offset:offset + page_size]
+            result = await self.db.execute(
+                select(Instruction).where(
+                    and_(
+                        Instruction.id.in_([doc_id for doc_id, _ in page]),
+                        Instruction.status == "published",
+                        Instruction.organization_id == self.organization.id,
+                        Instruction.deleted_at.is_(None),
+                        Instruction.load_mode == "intelligent",
+                    )
                 )
             )
-        )
-        
-        if category is not None:
-            stmt = stmt.where(Instruction.category == category)
-        
-        result = await self.db.execute(stmt)
-        all_instructions = result.scalars().all()
-        
-        # Score and filter by keyword match (or include all if no keywords)
-        scored: List[Tuple[Instruction, float]] = []
-        for instruction in all_instructions:
-            if keywords:
-                score = self._score_instruction(instruction, keywords)
-                if score > 0:
-                    scored.append((instruction, score))
-            else:
-                # No query - include all with score 0
-                scored.append((instruction, 0.0))
-        
-        # Sort by score descending and limit
-        scored.sort(key=lambda x: x[1], reverse=True)
+            by_id = {str(inst.id): inst for inst in result.scalars().all()}
+            for doc_id, score in page:
+                inst = by_id.get(doc_id)
+                if inst is not None:
+                    scored.append((inst, score))
+            if len(scored) >= limit:
+                break
+
         return scored[:limit]
     
     async def build(
@@ -321,46 +320,61 @@ class InstructionContextBuilder:
         if not build:
             return None  # No build available, fallback to legacy
         
-        # Load build contents with versions
-        contents_result = await self.db.execute(
-            select(BuildContent)
-            .options(
-                selectinload(BuildContent.instruction),
-                selectinload(BuildContent.instruction_version),
+        index_key = ("build", str(build.id))
+        index_version = instruction_index_cache.version(str(self.organization.id))
+        index = instruction_index_cache.get(index_key, str(self.organization.id))
+
+        if index is None:
+            # Cold path: load every content once, index the intelligent ones
+            contents = await self._load_build_contents(build.id)
+            if not contents:
+                return []  # Build exists but is empty
+            always_contents, intelligent_contents = self._split_build_contents(contents)
+            index = InstructionSearchIndex(
+                (
+                    (str(instruction.id), self._build_version_searchable_text(version), {})
+                    for _, instruction, version in intelligent_contents
+                ),
+                self.STOPWORDS,
             )
-            .where(BuildContent.build_id == build.id)
-        )
-        contents = contents_result.scalars().all()
-        
-        if not contents:
-            return []  # Build exists but is empty
-        
-        # Separate by load_mode
-        always_contents: List[Tuple[BuildContent, Instruction, InstructionVersion]] = []
-        intelligent_contents: List[Tuple[BuildContent, Instruction, InstructionVersion]] = []
+            instruction_index_cache.put(index_key, index, version=index_version)
+            intelligent_by_id = {str(instruction.id): (content, instruction, version) for content, instruction, version in intelligent_contents}
+        else:
+            # Warm path: only 'always' contents are loaded eagerly
+            contents = await self._load_build_contents(build.id, always_only=True)
+            always_contents, _ = self._split_build_contents(contents)
+            intelligent_by_id = None
         
-        for content in contents:
-            instruction = content.instruction
-            version = content.instruction_version
-            
-            if not instruction or not version:
-                continue
-            
-            # Skip unpublished and disabled
-            if instruction.status != "published":
-                continue
-            if version.load_mode == "disabled":
-                continue
-            
-            # Categorize by load_mode
-            if version.load_mode == "intelligent":
-                intelligent_contents.append((content, instruction, version))
-            else:
-                # 'always' or None (treat NULL as always for backwards compat)
-                always_contents.append((content, instruction, version))
+        # Calculate remaining slots for intelligent instructions
+        remaining_slots = max_instructions - len(always_contents)
         
-        # Batch load usage counts for all candidates
-        all_instruction_ids = [str(c.instruction_id) for c in contents]
+        # Rank intelligent instructions (score > 0, or all of them when there is no query)
+        selected: List[Tuple[Tuple[BuildContent, Instruction, InstructionVersion], float]] = []
+        if remaining_slots > 0 and len(index) > 0:
+            keywords = self._extract_keywords(query) if query else set()
+            ranked = index.search(keywords) if (keywords or not query) else []
+            page_size = remaining_slots * 2
+            for offset in range(0, len(ranked), page_size):
+                page = ranked[offset:offset + page_size]
+                if intelligent_by_id is None:
+                    page_contents = await self._load_build_contents(
+                        build.id, instruction_ids=[doc_id for doc_id, _ in page]
+                    )
+                    _, page_intelligent = self._split_build_contents(page_contents)
+                    by_id = {str(instruction.id): (content, instruction, version) for content, instruction, version in page_intelligent}
+                else:
+                    by_id = intelligent_by_id
+                for doc_id, score in page:
+                    entry = by_id.get(doc_id)
+                    if entry is not None:
+                        selected.append((entry, score))
+                if len(selected) >= remaining_slots:
+                    break
+            selected = selected[:remaining_slots]
+        
+        # Batch load usage counts for the loaded instructions
+        all_instruction_ids = [str(instruction.id) for _, instruction, _ in always_contents]
+        all_instruction_ids.extend(str(instruction.id) for (_, instruction, _), _ in selected)
         usage_counts = await self._batch_load_usage_counts(all_instruction_ids)
         
         # Build items for 'always' instructions (they all get loaded)
@@ -384,42 +398,25 @@ class InstructionContextBuilder:
                 build_number=build.build_number,
             ))
         
-        # Calculate remaining slots for intelligent instructions
-        remaining_slots = max_instructions - len(always_items)
         intelligent_items: List[InstructionItem] = []
-        
-        if remaining_slots > 0 and intelligent_contents:
-            # Extract keywords from query for scoring
-            keywords = self._extract_keywords(query) if query else set()
-            
-            # Score and rank intelligent instructions
-            scored: List[Tuple[InstructionItem, float]] = []
-            for content, instruction, version in intelligent_contents:
-                score = self._score_instruction_version(version, keywords)
-                # Include if score > 0 OR if we have no query (load all intelligent)
-                if score > 0 or not query:
-                    inst_id = str(instruction.id)
-                    item = InstructionItem(
-                        id=inst_id,
-                        category=instruction.category,
-                        text=version.text or "",
-                        load_mode="intelligent",
-                        load_reason=f"search_match:{score:.2f}" if score > 0 else "fill",
-                        source_type=instruction.source_type,
-                        title=version.title,
-                        labels=self._extract_labels(instruction),
-                        usage_count=usage_counts.get(inst_id),
-                        # Version/Build lineage tracking
-                        version_id=str(version.id),
-                        version_number=version.version_number,
-                        content_hash=version.content_hash,
-                        build_number=build.build_number,
-                    )
-                    scored.append((item, score))
-            
-            # Sort by score descending and take top N
-            scored.sort(key=lambda x: x[1], reverse=True)
-            intelligent_items = [item for item, _ in scored[:remaining_slots]]
+        for (content, instruction, version), score in selected:
+            inst_id = str(instruction.id)
+            intelligent_items.append(InstructionItem(
+                id=inst_id,
+                category=instruction.category,
+                text=version.text or "",
+                load_mode="intelligent",
+                load_reason=f"search_match:{score:.2f}" if score > 0 else "fill",
+                source_type=instruction.source_type,
+                title=version.title,
+                labels=self._extract_labels(instruction),
+                usage_count=usage_counts.get(inst_id),
+                # Version/Build lineage tracking
+                version_id=str(version.id),
+                version_number=version.version_number,
+                content_hash=version.content_hash,
+                build_number=build.build_number,
+            ))
         
         logger.info(
             f"_load_from_build: loaded {len(always_items)} always + "
@@ -582,25 +579,100 @@ class InstructionContextBuilder:
         }
         return keywords
     
-    def _score_instruction(self, instruction: Instruction, keywords: Set[str]) -> float:
-        """
-        Score an instruction based on keyword matching.
+    async def _get_org_index(self) -> InstructionSearchIndex:
+        """Return the cached index of published intelligent instructions for the org."""
+        org_id = str(self.organization.id)
+        index_key = ("org", org_id)
+        index = instruction_index_cache.get(index_key, org_id)
+        if index is not None:
+            return index
+
+        version = instruction_index_cache.version(org_id)
+        result = await self.db.execute(
+            select(Instruction)
+            .where(
+                and_(
+                    Instruction.status == "published",
+                    Instruction.organization_id == self.organization.id,
+                    Instruction.deleted_at.is_(None),
+                    Instruction.load_mode == "intelligent",
+                )
+            )
+        )
+        index = InstructionSearchIndex(
+            (
+                (str(inst.id), self._build_searchable_text(inst), {"category": inst.category})
+                for inst in result.scalars().all()
+            ),
+            self.STOPWORDS,
+        )
+        instruction_index_cache.put(index_key, index, version=version)
+        return index
+
+    async def _load_build_contents(
+        self,
+        build_id: str,
+        *,
+        always_only: bool = False,
+        instruction_ids: Optional[List[str]] = None,
+    ) -> List[BuildContent]:
+        """Load build contents with their instruction and version."""
+        stmt = (
+            select(BuildContent)
+            .options(
+                selectinload(BuildContent.instruction),
+                selectinload(BuildContent.instruction_version),
+            )
+            .where(BuildContent.build_id == build_id)
+        )
+        if always_only:
+            stmt = stmt.join(
+                InstructionVersion, BuildContent.instruction_version_id == InstructionVersion.id
+            ).where(
+                or_(
+                    InstructionVersion.load_mode.is_(None),
+                    InstructionVersion.load_mode != "intelligent",
+                )
+            )
+        if instruction_ids is not None:
+            stmt = stmt.where(BuildContent.instruction_id.in_(instruction_ids))
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    def _split_build_contents(
+        contents: List[BuildContent],
+    ) -> Tuple[
+        List[Tuple[BuildContent, Instruction, InstructionVersion]],
+        List[Tuple[BuildContent, Instruction, InstructionVersion]],
+    ]:
+        """Split build contents into (always, intelligent), skipping unpublished and disabled."""
+        always_contents: List[Tuple[BuildContent, Instruction, InstructionVersion]] = []
+        intelligent_contents: List[Tuple[BuildContent, Instruction, InstructionVersion]] = []
         
-        Uses both exact matching and substring matching for better recall.
-        Returns a score between 0 and 1.
-        """
-        # Build searchable text from instruction
-        searchable = self._build_searchable_text(instruction)
-        return self._score_text(searchable, keywords)
+        for content in contents:
+            instruction = content.instruction
+            version = content.instruction_version
+            
+            if not instruction or not version:
+                continue
+            
+            # Skip unpublished and disabled
+            if instruction.status != "published":
+                continue
+            if version.load_mode == "disabled":
+                continue
+            
+            # Categorize by load_mode
+            if version.load_mode == "intelligent":
+                intelligent_contents.append((content, instruction, version))
+            else:
+                # 'always' or None (treat NULL as always for backwards compat)
+                always_contents.append((content, instruction, version))
+        return always_contents, intelligent_contents
     
-    def _score_instruction_version(self, version: InstructionVersion, keywords: Set[str]) -> float:
-        """
-        Score an instruction version based on keyword matching.
-        
-        Used for build-based loading to match against version.text/title.
-        Returns a score between 0 and 1.
-        """
-        # Build searchable text from version fields
+    def _build_version_searchable_text(self, version: InstructionVersion) -> str:
+        """Build searchable text from instruction version fields."""
         parts = [version.text or ""]
         if version.title:
             parts.append(version.title)
@@ -610,39 +682,7 @@ class InstructionContextBuilder:
                     parts.append(version.structured_data['name'])
                 if version.structured_data.get('description'):
                     parts.append(version.structured_data['description'])
-        searchable = " ".join(parts)
-        return self._score_text(searchable, keywords)
-    
-    def _score_text(self, searchable: str, keywords: Set[str]) -> float:
-        """
-        Score text based on keyword matching.
-        
-        Uses both exact matching and substring matching for better recall.
-        Returns a score between 0 and 1.
-        """
-        searchable_lower = searchable.lower()
-        searchable_keywords = self._extract_keywords(searchable)
-        
-        if not searchable_keywords and not searchable_lower:
-            return 0.0
-        
-        if not keywords:
-            return 0.0
-        
-        # Score 1: Exact keyword match (Jaccard similarity)
-        exact_intersection = len(keywords & searchable_keywords)
-        exact_union = len(keywords | searchable_keywords) if searchable_keywords else 1
-        jaccard_score = exact_intersection / exact_union if exact_union > 0 else 0.0
-        
-        # Score 2: Substring match (check if query keywords appear in searchable text)
-        substring_matches = 0
-        for kw in keywords:
-            if len(kw) >= 3 and kw in searchable_lower:  # Only match keywords 3+ chars
-                substring_matches += 1
-        substring_score = substring_matches / len(keywords) if keywords else 0.0
-        
-        # Combined score: max of exact and substring (substring helps when words are joined)
-        return max(jaccard_score, substring_score * 0.8)  # Slight penalty for substring-only
+        return " ".join(parts)
     
     def _build_searchable_text(self, instruction: Instruction) -> str:
         """Build searchable text from instruction fields."""
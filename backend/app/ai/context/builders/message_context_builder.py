@@ -2,9 +2,10 @@
 Message Context Builder - Ports proven logic from agent._build_messages_context()
 """
 import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from collections import OrderedDict, deque
+from sqlalchemy import select, func, or_
 from sqlalchemy import and_
 
 from app.models.completion import Completion
@@ -19,6 +20,35 @@ from app.models.data_source import DataSource
 from app.models.datasource_table import DataSourceTable
 
 
+# Older-turn summaries per report; older completions don't change, so only new
+# turns past the cached watermark are read on subsequent builds.
+OLDER_TURNS_SUMMARY_LINES = 10
+OLDER_TURNS_SUMMARY_CHARS = 200
+
+
+class _OlderTurnsCache:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(report_id)
+        if entry is not None:
+            self._entries.move_to_end(report_id)
+            # Copy so a failed build can't leave a half-updated entry behind
+            entry = {"watermark": entry["watermark"], "count": entry["count"], "recent": deque(entry["recent"], maxlen=entry["recent"].maxlen)}
+        return entry
+
+    def put(self, report_id: str, entry: Dict[str, Any]) -> None:
+        self._entries[report_id] = entry
+        self._entries.move_to_end(report_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_older_turns_cache = _OlderTurnsCache()
+
+
 class MessageContextBuilder:
     """
     Builds conversation message context for agent execution.
@@ -65,30 +95,14 @@ class MessageContextBuilder:
             except:
                 allow_llm_see_data = False  # Default to True if settings unavailable
                     
-        # Get all completions for this report ordered by creation time
-        report_completions = await self.db.execute(
-            select(Completion)
-            .filter(Completion.report_id == self.report.id)
-            .order_by(Completion.created_at.asc())
-        )
-        report_completions = report_completions.scalars().all()
-        
-        # Skip the last completion if it's from a user (current incomplete conversation)
-        completions_to_process = (
-            report_completions[:-1] 
-            if report_completions and report_completions[-1].role == 'user' 
-            else report_completions
-        )
-        
-        # Apply role filter if provided
-        if role_filter:
-            completions_to_process = [
-                c for c in completions_to_process 
-                if c.role in role_filter
-            ]
-        
-        # Limit to max_messages (considering pairs)
-        completions_to_process = completions_to_process[-max_messages:]
+        # Only the last max_messages completions (minus a trailing user message) are read
+        completions_to_process, has_older = await self._load_tail_completions(max_messages, role_filter)
+        if has_older and completions_to_process:
+            summary = await self._older_turns_summary(completions_to_process[0])
+            if summary:
+                conversation.append(summary)
+        # System turns without blocks fall back to their payload, loaded in one query after the loop
+        deferred: List[Tuple[int, str, str]] = []
         
         for completion in completions_to_process:
             timestamp = completion.created_at.strftime("%H:%M")
@@ -143,7 +157,7 @@ class MessageContextBuilder:
                                     columns = widget_data.get('columns', []) or []
                                     rows = widget_data.get('rows', []) or []
                                     col_names = [c.get('field') or c.get('headerName') for c in columns if (c.get('field') or c.get('headerName'))]
-                                    row_count = len(rows)
+                                    row_count = (widget_data.get('info') or {}).get('total_rows') or len(rows)
                                     sample_row = None
                                     if allow_llm_see_data:
                                         preview = result_json.get('data_preview', {}) or {}
@@ -173,7 +187,7 @@ class MessageContextBuilder:
                                         for c in columns
                                         if isinstance(c, dict) and (c.get('field') or c.get('headerName'))
                                     ]
-                                    row_count = len(rows)
+                                    row_count = (data_obj.get('info') or {}).get('total_rows') or len(rows)
                                     sample_row = None
                                     if allow_llm_see_data:
                                         preview = rj.get('data_preview', {}) or {}
@@ -266,19 +280,20 @@ class MessageContextBuilder:
                             system_parts.append(tool_info)
                 
                 # If no blocks or content, fall back to completion.completion
-                if not system_parts and completion.completion:
-                    if isinstance(completion.completion, dict):
-                        # Handle JSON completion format
-                        content = completion.completion.get('content', '') or completion.completion.get('message', '')
-                    else:
-                        content = str(completion.completion)
-                    
-                    if content.strip():
-                        system_parts.append(f"Response: {content.strip()}")
+                if not system_parts:
+                    deferred.append((len(conversation), str(completion.id), timestamp))
+                    conversation.append(None)
                 
                 if system_parts:
                     conversation.append(f"Assistant ({timestamp}): {' | '.join(system_parts)}")
         
+        payloads = await self._load_completion_payloads([cid for _, cid, _ in deferred])
+        for index, cid, timestamp in deferred:
+            response = self._payload_response(payloads.get(cid))
+            if response:
+                conversation[index] = f"Assistant ({timestamp}): {response}"
+        conversation = [part for part in conversation if part is not None]
+        
         # Join all conversation parts
         conversation_text = "\n".join(conversation) if conversation else "No conversation history available"
         
@@ -307,23 +322,11 @@ class MessageContextBuilder:
             except Exception:
                 allow_llm_see_data = False
 
-        report_completions = await self.db.execute(
-            select(Completion)
-            .filter(Completion.report_id == self.report.id)
-            .order_by(Completion.created_at.asc())
-        )
-        report_completions = report_completions.scalars().all()
-
-        completions_to_process = (
-            report_completions[:-1]
-            if report_completions and report_completions[-1].role == 'user'
-            else report_completions
-        )
-
-        if role_filter:
-            completions_to_process = [c for c in completions_to_process if c.role in role_filter]
-
-        completions_to_process = completions_to_process[-max_messages:]
+        completions_to_process, has_older = await self._load_tail_completions(max_messages, role_filter)
+        summary: Optional[str] = None
+        if has_older and completions_to_process:
+            summary = await self._older_turns_summary(completions_to_process[0])
+        deferred: List[Tuple[int, str, Optional[str]]] = []
 
         # =========================
         # Batch-load mentions for all user messages to avoid N+1 queries
@@ -509,7 +512,7 @@ class MessageContextBuilder:
                                 columns = widget_data.get('columns', []) or []
                                 rows = widget_data.get('rows', []) or []
                                 col_names = [c.get('field') or c.get('headerName') for c in columns if (c.get('field') or c.get('headerName'))]
-                                row_count = len(rows)
+                                row_count = (widget_data.get('info') or {}).get('total_rows') or len(rows)
                                 digest_parts = [f"{row_count} rows × {len(col_names)} cols"]
                                 if col_names:
                                     head_cols = ", ".join(col_names[:3])
@@ -534,7 +537,7 @@ class MessageContextBuilder:
                                     for c in columns
                                     if isinstance(c, dict) and (c.get('field') or c.get('headerName'))
                                 ]
-                                row_count = len(rows)
+                                row_count = (data_obj.get('info') or {}).get('total_rows') or len(rows)
                                 digest_parts = [f"{row_count} rows × {len(col_names)} cols"]
                                 if col_names:
                                     head_cols = ", ".join(col_names[:3])
@@ -590,27 +593,142 @@ class MessageContextBuilder:
                                     error = error[:50] + "..."
                                 tool_info += f" - Error: {error}"
                             system_parts.append(tool_info)
-                if not system_parts and completion.completion:
-                    if isinstance(completion.completion, dict):
-                        content = completion.completion.get('content', '') or completion.completion.get('message', '')
-                    else:
-                        content = str(completion.completion)
-                    if content.strip():
-                        system_parts.append(f"Response: {content.strip()}")
+                if not system_parts:
+                    deferred.append((len(items), str(completion.id), ts))
+                    items.append(None)
                 if system_parts:
                     items.append(MessageItem(role="system", timestamp=ts, text=" | ".join(system_parts)))
 
-        return MessagesSection(items=items)
+        payloads = await self._load_completion_payloads([cid for _, cid, _ in deferred])
+        for index, cid, ts in deferred:
+            response = self._payload_response(payloads.get(cid))
+            if response:
+                items[index] = MessageItem(role="system", timestamp=ts, text=response)
+        items = [item for item in items if item is not None]
+
+        return MessagesSection(items=items, summary=summary)
     
+    # --------------------------------------------------------------------- #
+    # Loading helpers                                                       #
+    # --------------------------------------------------------------------- #
+
+    async def _load_tail_completions(
+        self,
+        max_messages: int,
+        role_filter: Optional[List[str]] = None,
+    ) -> Tuple[List[Any], bool]:
+        """Return (last max_messages completions in ascending order, has_older).
+
+        Reads newest-first with a LIMIT on (report_id, created_at) and only
+        the light columns; the JSON ``completion`` payload is fetched on
+        demand. The report's latest completion is skipped when it is a user
+        message (the current, unanswered prompt).
+        """
+        limit = max(0, max_messages)
+        stmt = (
+            select(Completion.id, Completion.role, Completion.created_at, Completion.prompt)
+            .where(Completion.report_id == self.report.id)
+        )
+        if role_filter:
+            stmt = stmt.where(Completion.role.in_(role_filter))
+        # +1 for a trailing user message, +1 to know whether older turns exist
+        stmt = stmt.order_by(Completion.created_at.desc(), Completion.id.desc()).limit(limit + 2)
+        rows = list((await self.db.execute(stmt)).all())
+
+        if rows:
+            if role_filter:
+                latest = (await self.db.execute(
+                    select(Completion.id, Completion.role)
+                    .where(Completion.report_id == self.report.id)
+                    .order_by(Completion.created_at.desc(), Completion.id.desc())
+                    .limit(1)
+                )).first()
+            else:
+                latest = rows[0]
+            if latest is not None and latest.role == 'user' and str(latest.id) == str(rows[0].id):
+                rows = rows[1:]
+
+        has_older = len(rows) > limit
+        return list(reversed(rows[:limit])), has_older
+
+    async def _load_completion_payloads(self, completion_ids: List[str]) -> Dict[str, Any]:
+        """``completion`` payloads by id for the given completions, in one query."""
+        if not completion_ids:
+            return {}
+        result = await self.db.execute(
+            select(Completion.id, Completion.completion).where(Completion.id.in_(completion_ids))
+        )
+        return {str(row.id): row.completion for row in result.all()}
+
+    @staticmethod
+    def _payload_response(payload: Any) -> Optional[str]:
+        if not payload:
+            return None
+        if isinstance(payload, dict):
+            # Handle JSON completion format
+            content = payload.get('content', '') or payload.get('message', '')
+        else:
+            content = str(payload)
+        return f"Response: {content.strip()}" if content.strip() else None
+
+    async def _older_turns_summary(self, first_in_window) -> Optional[str]:
+        """Rolling summary of user turns older than the message window (cached per report)."""
+        report_id = str(self.report.id)
+        boundary = (first_in_window.created_at, str(first_in_window.id))
+        entry = _older_turns_cache.get(report_id)
+        if entry is not None and entry["watermark"] is not None and entry["watermark"] >= boundary:
+            # Window moved back (e.g. larger max_messages): start over
+            entry = None
+        if entry is None:
+            entry = {"watermark": None, "count": 0, "recent": deque(maxlen=OLDER_TURNS_SUMMARY_LINES)}
+
+        stmt = (
+            select(Completion.id, Completion.created_at, Completion.prompt)
+            .where(
+                Completion.report_id == self.report.id,
+                Completion.role == 'user',
+                or_(
+                    Completion.created_at < boundary[0],
+                    and_(Completion.created_at == boundary[0], Completion.id < boundary[1]),
+                ),
+            )
+            .order_by(Completion.created_at.asc(), Completion.id.asc())
+        )
+        if entry["watermark"] is not None:
+            wm_ts, wm_id = entry["watermark"]
+            stmt = stmt.where(
+                or_(
+                    Completion.created_at > wm_ts,
+                    and_(Completion.created_at == wm_ts, Completion.id > wm_id),
+                )
+            )
+        for row in (await self.db.execute(stmt)).all():
+            prompt = row.prompt if isinstance(row.prompt, dict) else {}
+            content = (prompt.get('content') or '').strip().replace("\n", " ")
+            if content:
+                if len(content) > OLDER_TURNS_SUMMARY_CHARS:
+                    content = content[:OLDER_TURNS_SUMMARY_CHARS] + "..."
+                entry["recent"].append(content)
+                entry["count"] += 1
+            entry["watermark"] = (row.created_at, str(row.id))
+        _older_turns_cache.put(report_id, entry)
+
+        if not entry["count"]:
+            return None
+        shown = list(entry["recent"])
+        header = f"Earlier in this conversation ({entry['count']} older user messages"
+        header += f", last {len(shown)} shown):" if entry["count"] > len(shown) else "):"
+        return header + "\n" + "\n".join(f"- {line}" for line in shown)
+
     async def get_message_count(self, role_filter: Optional[List[str]] = None) -> int:
         """Get total number of messages for this report."""
-        query = select(Completion).filter(Completion.report_id == self.report.id)
+        query = select(func.count(Completion.id)).filter(Completion.report_id == self.report.id)
         
         if role_filter:
             query = query.filter(Completion.role.in_(role_filter))
             
         result = await self.db.execute(query)
-        return len(result.scalars().all())
+        return int(result.scalar() or 0)
     
     async def render(self, max_messages: int = 10) -> str:
         """Render a human-readable view of message context."""
@@ -111,7 +111,7 @@ class QueryContextBuilder:
                         obs.column_names = [c.get('field', '?') for c in default_step.data['columns']]
                     if 'rows' in default_step.data and isinstance(default_step.data['rows'], list):
                         rows = default_step.data['rows']
-                        obs.row_count = len(rows)
+                        obs.row_count = (default_step.data.get('info') or {}).get('total_rows') or len(rows)
                         if include_data_preview and rows and obs.column_names:
                             try:
                                 cols = obs.column_names
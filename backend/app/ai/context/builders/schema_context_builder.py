@@ -2,11 +2,13 @@
 Schema Context Builder - builds TablesSchemaContext object for schemas
 """
 from typing import List, Optional, Dict, Any
+from datetime import datetime, timezone
 import re
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select
 from app.ai.context.sections.tables_schema_section import TablesSchemaContext
+from app.ai.context.schema_context_cache import schema_context_cache
 from app.schemas.data_source_schema import DataSourceSummarySchema
 from app.ai.prompt_formatters import Table as PromptTable, TableColumn as PromptTableColumn, ForeignKey as PromptForeignKey
 from app.models.table_stats import TableStats
@@ -57,195 +59,42 @@ class SchemaContextBuilder:
         for ds in self.data_sources:
             if ds_filter and str(ds.id) not in ds_filter:
                 continue
-            # Build stats map (table name lowercase -> TableStats)
-            stats_map: Dict[str, TableStats] = {}
-            if with_stats:
-                res = await self.db.execute(
-                    select(TableStats).where(
-                        TableStats.report_id == None,
-                        TableStats.data_source_id == str(ds.id),
-                    )
-                )
-                for s in res.scalars().all():
-                    stats_map[(s.table_fqn or '').lower()] = s
-
-            # Canonical (org-level) source
-            ds_tables_result = await self.db.execute(
-                select(DataSourceTable).where(DataSourceTable.datasource_id == str(ds.id))
-            )
-            ds_tables = ds_tables_result.scalars().all()
-            canonical_by_name: Dict[str, DataSourceTable] = {getattr(t, 'name', ''): t for t in ds_tables}
 
             # Choose source: overlay for user_required with user, else canonical
             use_overlay = (getattr(ds, 'auth_policy', 'system_only') == 'user_required') and (self.user is not None)
+            overlay_user_id = str(self.user.id) if use_overlay else None
 
-            # Normalize into a common shape for downstream rendering
-            # Each entry: { name, columns: [{name,dtype}], pks: [{name,dtype}], fks: [fk], metadata_json, metrics, is_active }
-            normalized: List[Dict[str, Any]] = []
-
-            if use_overlay:
-                overlays_q = await self.db.execute(
-                    select(UserDataSourceTable).where(
-                        UserDataSourceTable.data_source_id == str(ds.id),
-                        UserDataSourceTable.user_id == str(self.user.id),
-                        UserDataSourceTable.is_accessible == True,
-                    )
-                )
-                overlay_tables = overlays_q.scalars().all()
-                overlay_ids = [str(ot.id) for ot in overlay_tables]
-                cols_q = await self.db.execute(
-                    select(UserDataSourceColumn).where(
-                        UserDataSourceColumn.user_data_source_table_id.in_(overlay_ids)
-                    )
-                )
-                cols = cols_q.scalars().all()
-                cols_by_table: Dict[str, list[UserDataSourceColumn]] = {}
-                for c in cols:
-                    cols_by_table.setdefault(str(c.user_data_source_table_id), []).append(c)
-
-                for ot in overlay_tables:
-                    name = getattr(ot, 'table_name', '') or ''
-                    overlay_cols = cols_by_table.get(str(ot.id), [])
-                    columns = [{"name": getattr(c, 'column_name', ''), "dtype": getattr(c, 'data_type', None)} for c in overlay_cols]
-                    base = canonical_by_name.get(name)
-                    # Respect canonical table's is_active status (default False if not found)
-                    canonical_is_active = bool(getattr(base, 'is_active', False)) if base is not None else False
-                    # Skip inactive tables when active_only is True
-                    if active_only and not canonical_is_active:
-                        continue
-                    pks = getattr(base, 'pks', []) if base is not None else []
-                    fks = getattr(base, 'fks', []) if base is not None else []
-                    metadata_json = getattr(base, 'metadata_json', None) if base is not None else None
-                    normalized.append({
-                        "name": name,
-                        "columns": columns,
-                        "pks": pks,
-                        "fks": fks,
-                        "metadata_json": metadata_json,
-                        "centrality_score": getattr(base, 'centrality_score', None) if base is not None else None,
-                        "richness": getattr(base, 'richness', None) if base is not None else None,
-                        "degree_in": getattr(base, 'degree_in', None) if base is not None else None,
-                        "degree_out": getattr(base, 'degree_out', None) if base is not None else None,
-                        "entity_like": getattr(base, 'entity_like', None) if base is not None else None,
-                        "is_active": canonical_is_active,
-                    })
-            else:
-                for t in ds_tables:
-                    table_is_active = bool(getattr(t, 'is_active', False))
-                    # Skip inactive tables when active_only is True
-                    if active_only and not table_is_active:
-                        continue
-                    columns = [{"name": col.get("name"), "dtype": col.get("dtype", "unknown")} for col in (getattr(t, 'columns', []) or [])]
-                    normalized.append({
-                        "name": getattr(t, 'name', ''),
-                        "columns": columns,
-                        "pks": getattr(t, 'pks', []) or [],
-                        "fks": getattr(t, 'fks', []) or [],
-                        "metadata_json": getattr(t, 'metadata_json', None),
-                        "centrality_score": getattr(t, 'centrality_score', None),
-                        "richness": getattr(t, 'richness', None),
-                        "degree_in": getattr(t, 'degree_in', None),
-                        "degree_out": getattr(t, 'degree_out', None),
-                        "entity_like": getattr(t, 'entity_like', None),
-                        "is_active": table_is_active,
-                    })
-
-            # Common rendering and scoring
-            scored: List[tuple[float, PromptTable]] = []
-            tables: List[PromptTable] = []
-            for item in normalized:
-                columns = [
-                    PromptTableColumn(name=c.get("name"), dtype=c.get("dtype"))
-                    for c in (item.get("columns") or [])
-                ]
-                pks = [
-                    PromptTableColumn(name=pk.get("name"), dtype=pk.get("dtype"))
-                    for pk in (item.get("pks") or [])
-                ]
-                fks = [
-                    PromptForeignKey(
-                        column=PromptTableColumn(name=fk.get('column', {}).get('name'), dtype=fk.get('column', {}).get('dtype')),
-                        references_name=fk.get('references_name'),
-                        references_column=PromptTableColumn(name=fk.get('references_column', {}).get('name'), dtype=fk.get('references_column', {}).get('dtype')),
-                    )
-                    for fk in (item.get("fks") or [])
-                ]
-
-                tbl = PromptTable(
-                    name=item.get("name", ""),
-                    columns=columns,
-                    pks=pks,
-                    fks=fks,
-                    is_active=bool(item.get("is_active", False)),  # Default False for safety
-                    centrality_score=item.get("centrality_score"),
-                    richness=item.get("richness"),
-                    degree_in=item.get("degree_in"),
-                    degree_out=item.get("degree_out"),
-                    entity_like=item.get("entity_like"),
-                    metadata_json=item.get("metadata_json"),
+            normalized = schema_context_cache.get(
+                str(ds.id), overlay_user_id, active_only=active_only, with_stats=with_stats
+            )
+            if normalized is None:
+                versions = schema_context_cache.versions(str(ds.id), overlay_user_id)
+                normalized = await self._load_normalized(ds, use_overlay, active_only, with_stats)
+                schema_context_cache.put(
+                    str(ds.id), overlay_user_id, normalized,
+                    active_only=active_only, with_stats=with_stats, versions=versions,
                 )
 
-                if with_stats:
-                    key = (item.get("name", "") or '').lower()
-                    s = stats_map.get(key)
-                    if s:
-                        usage_count = int(s.usage_count or 0)
-                        success_count = int(s.success_count or 0)
-                        failure_count = int(s.failure_count or 0)
-                        weighted_usage_count = float(s.weighted_usage_count or 0.0)
-                        pos_feedback_count = int(s.pos_feedback_count or 0)
-                        neg_feedback_count = int(s.neg_feedback_count or 0)
-                        last_used_at = s.last_used_at.isoformat() if s.last_used_at else None
-                        last_feedback_at = s.last_feedback_at.isoformat() if s.last_feedback_at else None
-                        success_rate = (success_count / max(1, usage_count)) if usage_count > 0 else 0.0
-                        from datetime import datetime, timezone
-                        now = datetime.now(timezone.utc)
-                        if s.last_used_at:
-                            age_days = max(0.0, (now - s.last_used_at.replace(tzinfo=timezone.utc)).total_seconds() / 86400.0)
-                        else:
-                            age_days = 365.0
-                        recency = pow(2.718281828, -age_days / 14.0)
-                        usage_signal = (weighted_usage_count)**0.5
-                        feedback_signal = (float(s.weighted_pos_feedback or 0.0) - float(s.weighted_neg_feedback or 0.0))
-                        structural_signal = (float(item.get("centrality_score") or 0.0) + float(item.get("richness") or 0.0) + (0.5 if item.get("entity_like") else 0.0))
-                        score = 0.35 * (usage_signal * recency) + 0.25 * success_rate + 0.2 * feedback_signal + 0.2 * structural_signal - 0.2 * (failure_count**0.5)
-                        tbl.usage_count = usage_count
-                        tbl.success_count = success_count
-                        tbl.failure_count = failure_count
-                        tbl.weighted_usage_count = weighted_usage_count
-                        tbl.pos_feedback_count = pos_feedback_count
-                        tbl.neg_feedback_count = neg_feedback_count
-                        tbl.last_used_at = last_used_at
-                        tbl.last_feedback_at = last_feedback_at
-                        tbl.success_rate = round(success_rate, 4)
-                        tbl.score = float(round(score, 6))
-                        scored.append((tbl.score or 0.0, tbl))
-                    else:
-                        structural_signal = (float(item.get("centrality_score") or 0.0) + float(item.get("richness") or 0.0) + (0.5 if item.get("entity_like") else 0.0))
-                        score = 0.1 * structural_signal
-                        tbl.score = float(round(score, 6))
-                        scored.append((tbl.score or 0.0, tbl))
-                else:
-                    tables.append(tbl)
-
-            # Default ordering by composite score when stats are present
+            # Score, sort and filter the plain dicts; PromptTables are only built for survivors
             if with_stats:
-                scored.sort(key=lambda x: x[0], reverse=True)
-                tables = [t for (_, t) in scored]
+                views = [self._score_item(item) for item in normalized]
+                views.sort(key=lambda v: v.get("score") or 0.0, reverse=True)
+            else:
+                views = [dict(item) for item in normalized]
 
             # Apply alternate sorts if requested
             try:
                 if sort == "alpha":
-                    tables.sort(key=lambda t: (t.name or '').lower())
+                    views.sort(key=lambda v: (v.get("name") or '').lower())
                 elif sort == "usage":
-                    tables.sort(key=lambda t: (getattr(t, 'weighted_usage_count', 0.0) or 0.0, getattr(t, 'usage_count', 0) or 0), reverse=True)
+                    views.sort(key=lambda v: (v.get("weighted_usage_count", 0.0) or 0.0, v.get("usage_count", 0) or 0), reverse=True)
                 elif sort == "centrality":
-                    def _cent(t):
-                        di = float(getattr(t, 'degree_in', 0.0) or 0.0)
-                        do = float(getattr(t, 'degree_out', 0.0) or 0.0)
-                        cs = float(getattr(t, 'centrality_score', 0.0) or 0.0)
+                    def _cent(v):
+                        di = float(v.get("degree_in", 0.0) or 0.0)
+                        do = float(v.get("degree_out", 0.0) or 0.0)
+                        cs = float(v.get("centrality_score", 0.0) or 0.0)
                         return di + do + cs
-                    tables.sort(key=_cent, reverse=True)
+                    views.sort(key=_cent, reverse=True)
             except Exception:
                 pass
 
@@ -268,16 +117,13 @@ class SchemaContextBuilder:
                         except Exception:
                             continue
                     return (not name_set) and (not patterns)
-                filtered = []
-                for t in tables:
-                    if not _match(getattr(t, 'name', '')):
-                        continue
-                    filtered.append(t)
-                tables = filtered
+                views = [v for v in views if _match(v.get("name", ''))]
 
             # Apply top_k cap last
             if top_k is not None and top_k > 0:
-                tables = tables[:top_k]
+                views = views[:top_k]
+
+            tables = [self._to_prompt_table(v) for v in views]
 
             ds_sections.append(
                 TablesSchemaContext.DataSource(
@@ -295,6 +141,200 @@ class SchemaContextBuilder:
 
         return TablesSchemaContext(data_sources=ds_sections)
 
+    async def _load_normalized(
+        self,
+        ds: DataSource,
+        use_overlay: bool,
+        active_only: bool,
+        with_stats: bool,
+    ) -> List[Dict[str, Any]]:
+        """Load tables for a data source into plain dicts (cacheable across requests)."""
+        # Build stats map (table name lowercase -> plain stats dict)
+        stats_map: Dict[str, Dict[str, Any]] = {}
+        if with_stats:
+            res = await self.db.execute(
+                select(TableStats).where(
+                    TableStats.report_id == None,
+                    TableStats.data_source_id == str(ds.id),
+                )
+            )
+            for s in res.scalars().all():
+                stats_map[(s.table_fqn or '').lower()] = {
+                    "usage_count": int(s.usage_count or 0),
+                    "success_count": int(s.success_count or 0),
+                    "failure_count": int(s.failure_count or 0),
+                    "weighted_usage_count": float(s.weighted_usage_count or 0.0),
+                    "pos_feedback_count": int(s.pos_feedback_count or 0),
+                    "neg_feedback_count": int(s.neg_feedback_count or 0),
+                    "weighted_pos_feedback": float(s.weighted_pos_feedback or 0.0),
+                    "weighted_neg_feedback": float(s.weighted_neg_feedback or 0.0),
+                    "last_used_at": s.last_used_at,
+                    "last_feedback_at": s.last_feedback_at,
+                }
+
+        # Canonical (org-level) source
+        ds_tables_result = await self.db.execute(
+            select(DataSourceTable).where(DataSourceTable.datasource_id == str(ds.id))
+        )
+        ds_tables = ds_tables_result.scalars().all()
+        canonical_by_name: Dict[str, DataSourceTable] = {getattr(t, 'name', ''): t for t in ds_tables}
+
+        # Normalize into a common shape for downstream rendering
+        # Each entry: { name, columns: [{name,dtype}], pks: [{name,dtype}], fks: [fk], metadata_json, metrics, is_active, stats }
+        normalized: List[Dict[str, Any]] = []
+
+        if use_overlay:
+            overlays_q = await self.db.execute(
+                select(UserDataSourceTable).where(
+                    UserDataSourceTable.data_source_id == str(ds.id),
+                    UserDataSourceTable.user_id == str(self.user.id),
+                    UserDataSourceTable.is_accessible == True,
+                )
+            )
+            overlay_tables = overlays_q.scalars().all()
+            overlay_ids = [str(ot.id) for ot in overlay_tables]
+            cols_q = await self.db.execute(
+                select(UserDataSourceColumn).where(
+                    UserDataSourceColumn.user_data_source_table_id.in_(overlay_ids)
+                )
+            )
+            cols = cols_q.scalars().all()
+            cols_by_table: Dict[str, list[UserDataSourceColumn]] = {}
+            for c in cols:
+                cols_by_table.setdefault(str(c.user_data_source_table_id), []).append(c)
+
+            for ot in overlay_tables:
+                name = getattr(ot, 'table_name', '') or ''
+                overlay_cols = cols_by_table.get(str(ot.id), [])
+                columns = [{"name": getattr(c, 'column_name', ''), "dtype": getattr(c, 'data_type', None)} for c in overlay_cols]
+                base = canonical_by_name.get(name)
+                # Respect canonical table's is_active status (default False if not found)
+                canonical_is_active = bool(getattr(base, 'is_active', False)) if base is not None else False
+                # Skip inactive tables when active_only is True
+                if active_only and not canonical_is_active:
+                    continue
+                pks = getattr(base, 'pks', []) if base is not None else []
+                fks = getattr(base, 'fks', []) if base is not None else []
+                metadata_json = getattr(base, 'metadata_json', None) if base is not None else None
+                normalized.append({
+                    "name": name,
+                    "columns": columns,
+                    "pks": pks,
+                    "fks": fks,
+                    "metadata_json": metadata_json,
+                    "centrality_score": getattr(base, 'centrality_score', None) if base is not None else None,
+                    "richness": getattr(base, 'richness', None) if base is not None else None,
+                    "degree_in": getattr(base, 'degree_in', None) if base is not None else None,
+                    "degree_out": getattr(base, 'degree_out', None) if base is not None else None,
+                    "entity_like": getattr(base, 'entity_like', None) if base is not None else None,
+                    "is_active": canonical_is_active,
+                    "stats": stats_map.get(name.lower()),
+                })
+        else:
+            for t in ds_tables:
+                table_is_active = bool(getattr(t, 'is_active', False))
+                # Skip inactive tables when active_only is True
+                if active_only and not table_is_active:
+                    continue
+                columns = [{"name": col.get("name"), "dtype": col.get("dtype", "unknown")} for col in (getattr(t, 'columns', []) or [])]
+                name = getattr(t, 'name', '')
+                normalized.append({
+                    "name": name,
+                    "columns": columns,
+                    "pks": getattr(t, 'pks', []) or [],
+                    "fks": getattr(t, 'fks', []) or [],
+                    "metadata_json": getattr(t, 'metadata_json', None),
+                    "centrality_score": getattr(t, 'centrality_score', None),
+                    "richness": getattr(t, 'richness', None),
+                    "degree_in": getattr(t, 'degree_in', None),
+                    "degree_out": getattr(t, 'degree_out', None),
+                    "entity_like": getattr(t, 'entity_like', None),
+                    "is_active": table_is_active,
+                    "stats": stats_map.get((name or '').lower()),
+                })
+        return normalized
+
+    @staticmethod
+    def _score_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a shallow copy of a cached item with usage stats and composite score."""
+        view = dict(item)
+        structural_signal = (float(item.get("centrality_score") or 0.0) + float(item.get("richness") or 0.0) + (0.5 if item.get("entity_like") else 0.0))
+        s = item.get("stats")
+        if not s:
+            view["score"] = float(round(0.1 * structural_signal, 6))
+            return view
+
+        usage_count = s["usage_count"]
+        success_count = s["success_count"]
+        failure_count = s["failure_count"]
+        weighted_usage_count = s["weighted_usage_count"]
+        success_rate = (success_count / max(1, usage_count)) if usage_count > 0 else 0.0
+        # Recency is time-dependent, so it is computed per build rather than cached
+        now = datetime.now(timezone.utc)
+        if s["last_used_at"]:
+            age_days = max(0.0, (now - s["last_used_at"].replace(tzinfo=timezone.utc)).total_seconds() / 86400.0)
+        else:
+            age_days = 365.0
+        recency = pow(2.718281828, -age_days / 14.0)
+        usage_signal = (weighted_usage_count)**0.5
+        feedback_signal = (s["weighted_pos_feedback"] - s["weighted_neg_feedback"])
+        score = 0.35 * (usage_signal * recency) + 0.25 * success_rate + 0.2 * feedback_signal + 0.2 * structural_signal - 0.2 * (failure_count**0.5)
+        view.update({
+            "usage_count": usage_count,
+            "success_count": success_count,
+            "failure_count": failure_count,
+            "weighted_usage_count": weighted_usage_count,
+            "pos_feedback_count": s["pos_feedback_count"],
+            "neg_feedback_count": s["neg_feedback_count"],
+            "last_used_at": s["last_used_at"].isoformat() if s["last_used_at"] else None,
+            "last_feedback_at": s["last_feedback_at"].isoformat() if s["last_feedback_at"] else None,
+            "success_rate": round(success_rate, 4),
+            "score": float(round(score, 6)),
+        })
+        return view
+
+    @staticmethod
+    def _to_prompt_table(view: Dict[str, Any]) -> PromptTable:
+        columns = [
+            PromptTableColumn(name=c.get("name"), dtype=c.get("dtype"))
+            for c in (view.get("columns") or [])
+        ]
+        pks = [
+            PromptTableColumn(name=pk.get("name"), dtype=pk.get("dtype"))
+            for pk in (view.get("pks") or [])
+        ]
+        fks = [
+            PromptForeignKey(
+                column=PromptTableColumn(name=fk.get('column', {}).get('name'), dtype=fk.get('column', {}).get('dtype')),
+                references_name=fk.get('references_name'),
+                references_column=PromptTableColumn(name=fk.get('references_column', {}).get('name'), dtype=fk.get('references_column', {}).get('dtype')),
+            )
+            for fk in (view.get("fks") or [])
+        ]
+        return PromptTable(
+            name=view.get("name", ""),
+            columns=columns,
+            pks=pks,
+            fks=fks,
+            is_active=bool(view.get("is_active", False)),  # Default False for safety
+            centrality_score=view.get("centrality_score"),
+            richness=view.get("richness"),
+            degree_in=view.get("degree_in"),
+            degree_out=view.get("degree_out"),
+            entity_like=view.get("entity_like"),
+            metadata_json=view.get("metadata_json"),
+            usage_count=view.get("usage_count"),
+            success_count=view.get("success_count"),
+            failure_count=view.get("failure_count"),
+            weighted_usage_count=view.get("weighted_usage_count"),
+            pos_feedback_count=view.get("pos_feedback_count"),
+            neg_feedback_count=view.get("neg_feedback_count"),
+            last_used_at=view.get("last_used_at"),
+            last_feedback_at=view.get("last_feedback_at"),
+            success_rate=view.get("success_rate"),
+            score=view.get("score"),
+        )
+
     # Backward-compatibility helpers (temporary; will be removed after full migration)
     async def get_data_source_count(self) -> int:
         data_sources = getattr(self.report, 'data_sources', []) or []
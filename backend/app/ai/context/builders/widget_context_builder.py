@@ -190,7 +190,7 @@ class WidgetContextBuilder:
                 
                 if "rows" in step.data and isinstance(step.data["rows"], list):
                     rows = step.data["rows"]
-                    observation_data["row_count"] = len(rows)
+                    observation_data["row_count"] = (step.data.get("info") or {}).get("total_rows") or len(rows)
                     observation_data["data"] = rows
                     
                     # Only include formatted preview if allowed and requested
@@ -288,7 +288,7 @@ class WidgetContextBuilder:
             
             # Get row count if available
             if step and step.data and isinstance(step.data, dict) and 'rows' in step.data:
-                row_count = len(step.data['rows'])
+                row_count = (step.data.get('info') or {}).get('total_rows') or len(step.data['rows'])
             
             parts.append(f"  {i+1}. {widget.title} ({widget_type}) - {row_count} rows")
             parts.append(f"     Step: {step_title}")
@@ -1,9 +1,12 @@
 """
 ContextHub - Main orchestrator for all agent context.
 """
+import asyncio
 import json
+import logging
 import time
-from typing import Optional, Dict, Any
+from types import SimpleNamespace
+from typing import Optional, Dict, Any, Awaitable, Callable
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .context_specs import (
@@ -31,6 +34,9 @@ from .sections.code_section import CodeSection
 from .builders.mention_context_builder import MentionContextBuilder
 from .builders.entity_context_builder import EntityContextBuilder
 from app.ai.utils.token_counter import count_tokens
+from app.dependencies import async_session_maker
+
+logger = logging.getLogger(__name__)
 
 
 # Default caps to keep planner prompt small and predictable
@@ -58,6 +64,25 @@ def _safe_setattr_list(section, attr, max_items):
         pass
 
 
+def _ref(obj, **values):
+    """Primary key of an ORM object plus the loaded values a builder reads, bound to no session."""
+    if obj is None:
+        return None
+    return SimpleNamespace(id=obj.id, **values)
+
+
+def _data_source_ref(ds):
+    connections = getattr(ds, "connections", None)
+    return _ref(
+        ds,
+        name=getattr(ds, "name", None),
+        type=getattr(ds, "type", None) or (connections[0].type if connections else None),
+        description=getattr(ds, "description", None),
+        context=getattr(ds, "context", None),
+        auth_policy=getattr(ds, "auth_policy", "system_only"),
+    )
+
+
 def _section_token_length(text: Optional[str]) -> int:
     """Measure a section's size using token counts with safe fallbacks."""
     if not text:
@@ -87,7 +112,8 @@ class ContextHub:
         head_completion=None,
         widget=None,
         organization_settings=None,
-        build_id: Optional[str] = None
+        build_id: Optional[str] = None,
+        shared_static=None,
     ):
         self.db = db
         self.organization = organization
@@ -100,6 +126,8 @@ class ContextHub:
         self.prompt_content = head_completion.prompt if head_completion else ""
         # Build system: specific instruction build to use (None = main build)
         self.build_id = build_id
+        # Optional cache shared across hubs (eval runs): get_or_build(key, build)
+        self.shared_static = shared_static
         
         # Initialize metadata
         self.metadata = ContextMetadata(
@@ -142,6 +170,32 @@ class ContextHub:
         
         # Observation context builder (tracks tool execution results)
         self.observation_builder = ObservationContextBuilder()
+
+        # Builders gathered in prime_static/refresh_warm are created per call on
+        # their own session (see _run_builder). They get plain references (ids
+        # plus values already loaded here) instead of the request's ORM objects,
+        # so nothing they touch can lazy-load through the request session.
+        data_sources = [_data_source_ref(ds) for ds in (self.data_sources or [])]
+        organization = _ref(self.organization, settings=getattr(self.organization, "settings", None))
+        report = _ref(
+            self.report,
+            files=list(getattr(self.report, "files", None) or []),
+            data_sources=[_data_source_ref(ds) for ds in (getattr(self.report, "data_sources", None) or [])],
+        )
+        user = _ref(self.user)
+        head_completion = _ref(self.head_completion)
+        self._builder_factories: Dict[str, Callable[[AsyncSession], Any]] = {
+            "schemas": lambda db: SchemaContextBuilder(db, data_sources, organization, report, user=user),
+            "instructions": lambda db: InstructionContextBuilder(
+                db, organization, organization_settings=self.organization_settings
+            ),
+            "resources": lambda db: ResourceContextBuilder(db, data_sources, organization, self.prompt_content),
+            "files": lambda db: FilesContextBuilder(db, organization, report),
+            "messages": lambda db: MessageContextBuilder(db, organization, report, user),
+            "queries": lambda db: QueryContextBuilder(db, organization, report),
+            "mentions": lambda db: MentionContextBuilder(db, organization, report, head_completion),
+            "entities": lambda db: EntityContextBuilder(db, organization, report),
+        }
         
     async def build_context(
         self,
@@ -394,6 +448,38 @@ class ContextHub:
     # --------------------------------------------------------------
     # Simple lifecycle helpers to prime static and refresh warm
     # --------------------------------------------------------------
+    async def _run_builder(self, section: str, call: Callable[[Any], Awaitable[Any]]) -> Any:
+        """Run one builder call on its own short-lived session and time it.
+
+        An AsyncSession can't be used by concurrent tasks, so builders that are
+        gathered together each get a session from ``async_session_maker`` and
+        a fresh builder instance bound to it for the duration of the call;
+        the shared builders (``self.schema_builder``, ...) keep the request
+        session for sequential callers (build_context, build). Nothing is
+        committed; the session is rolled back and closed on exit.
+        """
+        started = time.monotonic()
+        try:
+            async with async_session_maker() as session:
+                return await call(self._builder_factories[section](session))
+        except Exception as e:
+            logger.warning(f"Context builder '{section}' failed: {e}")
+            raise
+        finally:
+            self.metadata.builder_timings_ms[section] = round((time.monotonic() - started) * 1000.0, 2)
+
+    async def _build_static(self, section: str, key: tuple, call: Callable[[Any], Awaitable[Any]]) -> Any:
+        """Run a static builder, or reuse its result from ``shared_static``.
+
+        ``key`` lists everything besides the organization the section depends
+        on; the shared cache is scoped to one organization and build.
+        """
+        if self.shared_static is None:
+            return await self._run_builder(section, call)
+        return await self.shared_static.get_or_build(
+            (section,) + key, lambda: self._run_builder(section, call)
+        )
+
     async def prime_static(self, query: str | None = None) -> None:
         """Build and cache static sections once (schemas, instructions, code, resources).
         
@@ -405,13 +491,21 @@ class ContextHub:
             The user's query/prompt. If provided, enables intelligent instruction
             search to find relevant instructions beyond just 'always' load mode.
         """
-        import asyncio
-        # Run all static builders in parallel
-        schemas_task = asyncio.create_task(self.schema_builder.build())
+        # Run all static builders in parallel, each on its own session
+        ds_key = tuple(sorted(str(ds.id) for ds in (self.data_sources or [])))
+        user_key = str(self.user.id) if self.user else None
+        schemas_task = asyncio.create_task(self._build_static(
+            "schemas", (ds_key, user_key), lambda builder: builder.build()
+        ))
         # Pass query and build_id to enable intelligent instruction search from specific build
-        instructions_task = asyncio.create_task(self.instruction_builder.build(query, build_id=self.build_id))
-        resources_task = asyncio.create_task(self.resource_builder.build())
-        files_task = asyncio.create_task(self.files_builder.build())
+        instructions_task = asyncio.create_task(self._build_static(
+            "instructions", (self.build_id, query or ""),
+            lambda builder: builder.build(query, build_id=self.build_id),
+        ))
+        resources_task = asyncio.create_task(self._build_static(
+            "resources", (ds_key, str(self.prompt_content or "")), lambda builder: builder.build(),
+        ))
+        files_task = asyncio.create_task(self._run_builder("files", lambda builder: builder.build()))
         
         # Wait for all to complete
         schemas, instructions, resources, files = await asyncio.gather(
@@ -431,8 +525,6 @@ class ContextHub:
         
         Runs builders in parallel where possible for faster refresh.
         """
-        import asyncio
-        
         # Get org settings first (needed for queries and entities)
         allow_llm_see_data = True
         try:
@@ -452,15 +544,24 @@ class ContextHub:
         except Exception:
             user_text = ""
         
-        # Run all warm builders in parallel
-        messages_task = asyncio.create_task(self.message_builder.build(max_messages=DEFAULT_CONTEXT_LIMITS["messages_max"]))
-        queries_task = asyncio.create_task(self.query_builder.build(max_queries=5, include_data_preview=allow_llm_see_data))
-        mentions_task = asyncio.create_task(self.mention_builder.build())
-        entities_task = asyncio.create_task(self.entity_builder.build_for_turn(
-            top_k=5,
-            require_source_assoc=True,
-            user_text=user_text,
-            allow_llm_see_data=allow_llm_see_data,
+        # Run all warm builders in parallel, each on its own session
+        messages_task = asyncio.create_task(self._run_builder(
+            "messages",
+            lambda builder: builder.build(max_messages=DEFAULT_CONTEXT_LIMITS["messages_max"]),
+        ))
+        queries_task = asyncio.create_task(self._run_builder(
+            "queries",
+            lambda builder: builder.build(max_queries=5, include_data_preview=allow_llm_see_data),
+        ))
+        mentions_task = asyncio.create_task(self._run_builder("mentions", lambda builder: builder.build()))
+        entities_task = asyncio.create_task(self._run_builder(
+            "entities",
+            lambda builder: builder.build_for_turn(
+                top_k=5,
+                require_source_assoc=True,
+                user_text=user_text,
+                allow_llm_see_data=allow_llm_see_data,
+            ),
         ))
         
         # Wait for all to complete
@@ -36,6 +36,8 @@ class ContextMetadata(BaseModel):
     total_tokens: int = 0
     section_sizes: Dict[str, int] = Field(default_factory=dict)
     build_duration_ms: float = 0
+    # Wall time per builder in prime_static / refresh_warm (ms), keyed by section
+    builder_timings_ms: Dict[str, float] = Field(default_factory=dict)
     
     # Content metadata
     schemas_count: int = 0
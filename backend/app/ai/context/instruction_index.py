@@ -0,0 +1,217 @@
+"""
+Instruction Index - in-memory inverted index with BM25 scoring for
+'intelligent' instructions.
+
+InstructionContextBuilder used to load every intelligent instruction of an
+org (or build) per turn, re-tokenize its text and score it with a Jaccard /
+substring loop. Corpora are now indexed once and cached here:
+
+- ("build", build_id): versions pinned by a build
+- ("org", org_id): legacy (non-build) published instructions
+
+Retrieval walks the postings of the query terms only. Query terms of 3+
+characters also match vocabulary terms they prefix (e.g. "revenue" ->
+"revenues"), at a discount, which stands in for the old substring match.
+
+Writers (InstructionService, InstructionSyncService, BuildService) call
+``invalidate_organization``; entries also expire after ``ttl_seconds`` so
+other worker processes pick up changes.
+"""
+import bisect
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 128
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Weight applied to prefix (non-exact) term matches
+PREFIX_MATCH_WEIGHT = 0.8
+MAX_PREFIX_EXPANSIONS = 20
+
+_SPLIT_RE = re.compile(r'[^a-z0-9]+')
+
+
+def tokenize(text: str, stopwords: Set[str]) -> List[str]:
+    """Split text into lowercase terms, dropping stopwords and 1-char words."""
+    return [
+        w for w in _SPLIT_RE.split((text or "").lower())
+        if w and len(w) >= 2 and w not in stopwords
+    ]
+
+
+class InstructionSearchIndex:
+    """Immutable inverted index over one instruction corpus."""
+
+    def __init__(self, docs: Iterable[Tuple[str, str, Dict[str, Any]]], stopwords: Set[str]):
+        """
+        Parameters
+        ----------
+        docs : iterable of (doc_id, searchable_text, meta)
+            ``meta`` is kept as-is and passed to search predicates.
+        """
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._order: List[str] = []
+
+        for doc_id, text, meta in docs:
+            if doc_id in self._doc_len:
+                continue
+            terms = tokenize(text, stopwords)
+            self._order.append(doc_id)
+            self._doc_len[doc_id] = len(terms)
+            self._meta[doc_id] = meta or {}
+            for term in terms:
+                tf = self._postings.setdefault(term, {})
+                tf[doc_id] = tf.get(doc_id, 0) + 1
+
+        self._vocab: List[str] = sorted(self._postings)
+        total = sum(self._doc_len.values())
+        self._avg_len = (total / len(self._doc_len)) if self._doc_len else 0.0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def meta(self, doc_id: str) -> Dict[str, Any]:
+        return self._meta.get(doc_id, {})
+
+    def _idf(self, term: str) -> float:
+        n = len(self._doc_len)
+        df = len(self._postings.get(term, ()))
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def _expand(self, keyword: str) -> List[Tuple[str, float]]:
+        """Return (term, weight) pairs that a query keyword matches."""
+        matches: List[Tuple[str, float]] = []
+        if keyword in self._postings:
+            matches.append((keyword, 1.0))
+        if len(keyword) >= 3:
+            i = bisect.bisect_right(self._vocab, keyword)
+            expanded = 0
+            while i < len(self._vocab) and self._vocab[i].startswith(keyword) and expanded < MAX_PREFIX_EXPANSIONS:
+                matches.append((self._vocab[i], PREFIX_MATCH_WEIGHT))
+                i += 1
+                expanded += 1
+        return matches
+
+    def search(
+        self,
+        keywords: Set[str],
+        *,
+        limit: Optional[int] = None,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Rank documents by BM25 against ``keywords``.
+
+        With no keywords every document is returned with score 0 in corpus
+        order. Otherwise only documents matching at least one term are
+        returned, best first.
+        """
+        if not keywords:
+            ranked = [
+                (doc_id, 0.0) for doc_id in self._order
+                if predicate is None or predicate(self._meta[doc_id])
+            ]
+            return ranked[:limit] if limit is not None else ranked
+
+        scores: Dict[str, float] = {}
+        for keyword in keywords:
+            # A keyword contributes once per doc: its best exact/prefix match
+            per_doc: Dict[str, float] = {}
+            for term, weight in self._expand(keyword):
+                idf = self._idf(term)
+                for doc_id, tf in self._postings[term].items():
+                    dl = self._doc_len[doc_id]
+                    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * (dl / self._avg_len if self._avg_len else 0.0))
+                    contribution = weight * idf * (tf * (BM25_K1 + 1.0)) / (tf + norm)
+                    if contribution > per_doc.get(doc_id, 0.0):
+                        per_doc[doc_id] = contribution
+            for doc_id, contribution in per_doc.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + contribution
+
+        ranked = [
+            (doc_id, score) for doc_id, score in scores.items()
+            if score > 0 and (predicate is None or predicate(self._meta[doc_id]))
+        ]
+        ranked.sort(key=lambda x: x[1], reverse=True)
+        return ranked[:limit] if limit is not None else ranked
+
+
+class InstructionIndexCache:
+    """Per-corpus index cache invalidated by an org-level version counter."""
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._org_versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def version(self, organization_id: str) -> int:
+        """Snapshot the org version before loading so a concurrent write isn't masked."""
+        with self._lock:
+            return self._org_versions.get(str(organization_id), 0)
+
+    def invalidate_organization(self, organization_id: Optional[str]) -> None:
+        """Call after instructions, versions or build contents of an org change."""
+        if not organization_id:
+            return
+        with self._lock:
+            key = str(organization_id)
+            self._org_versions[key] = self._org_versions.get(key, 0) + 1
+
+    def get(self, key: tuple, organization_id: str) -> Optional[InstructionSearchIndex]:
+        org_key = str(organization_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is None
+                or entry["version"] != self._org_versions.get(org_key, 0)
+                or (time.monotonic() - entry["built_at"]) > self.ttl_seconds
+            ):
+                if entry is not None:
+                    self._entries.pop(key, None)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry["index"]
+
+    def put(self, key: tuple, index: InstructionSearchIndex, *, version: int) -> None:
+        with self._lock:
+            self._entries[key] = {
+                "index": index,
+                "version": version,
+                "built_at": time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "documents": sum(len(e["index"]) for e in self._entries.values()),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+            }
+
+
+instruction_index_cache = InstructionIndexCache()
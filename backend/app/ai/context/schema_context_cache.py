@@ -0,0 +1,138 @@
+"""
+Schema Context Cache - cross-request cache of normalized, scored table lists.
+
+SchemaContextBuilder.build used to re-select every DataSourceTable and
+TableStats row per data source on every agent turn. The normalized table
+dicts (and their scores) are cached here per (data source, user overlay),
+guarded by two per-data-source version counters:
+
+- table version: bumped when tables/columns/activation change
+- stats version: bumped when TableStats rows are upserted
+
+Writers call ``invalidate_tables`` / ``invalidate_stats``; entries are also
+dropped after ``ttl_seconds`` so other worker processes (which don't see this
+process's invalidations) and the recency term of the score don't drift far.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 256
+
+
+class SchemaContextCache:
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._table_versions: Dict[str, int] = {}
+        self._stats_versions: Dict[str, int] = {}
+        self._overlay_versions: Dict[Tuple[str, str], int] = {}
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    # ----- versions -----
+
+    def _versions(self, data_source_id: str, user_id: Optional[str]) -> tuple:
+        return (
+            self._table_versions.get(data_source_id, 0),
+            self._stats_versions.get(data_source_id, 0),
+            self._overlay_versions.get((data_source_id, user_id), 0) if user_id else 0,
+        )
+
+    def invalidate_tables(self, data_source_id: str) -> None:
+        """Call after DataSourceTable rows (schema or is_active) change."""
+        with self._lock:
+            key = str(data_source_id)
+            self._table_versions[key] = self._table_versions.get(key, 0) + 1
+
+    def invalidate_stats(self, data_source_id: Optional[str]) -> None:
+        """Call after TableStats rows for a data source are upserted."""
+        if not data_source_id:
+            return
+        with self._lock:
+            key = str(data_source_id)
+            self._stats_versions[key] = self._stats_versions.get(key, 0) + 1
+
+    def invalidate_overlay(self, data_source_id: str, user_id: str) -> None:
+        """Call after a user's overlay tables/columns for a data source change."""
+        with self._lock:
+            key = (str(data_source_id), str(user_id))
+            self._overlay_versions[key] = self._overlay_versions.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ----- entries -----
+
+    def get(
+        self,
+        data_source_id: str,
+        user_id: Optional[str],
+        *,
+        active_only: bool,
+        with_stats: bool,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy-safe list of cached table dicts, or None on a miss."""
+        ds_key = str(data_source_id)
+        key = (ds_key, user_id, active_only, with_stats)
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is None
+                or entry["versions"] != self._versions(ds_key, user_id)
+                or (time.monotonic() - entry["built_at"]) > self.ttl_seconds
+            ):
+                if entry is not None:
+                    self._entries.pop(key, None)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            # Shallow copy of the list; callers must not mutate the dicts
+            return list(entry["items"])
+
+    def versions(self, data_source_id: str, user_id: Optional[str]) -> tuple:
+        """Snapshot versions before loading so a concurrent write isn't masked."""
+        with self._lock:
+            return self._versions(str(data_source_id), user_id)
+
+    def put(
+        self,
+        data_source_id: str,
+        user_id: Optional[str],
+        items: List[Dict[str, Any]],
+        *,
+        active_only: bool,
+        with_stats: bool,
+        versions: tuple,
+    ) -> None:
+        key = (str(data_source_id), user_id, active_only, with_stats)
+        with self._lock:
+            self._entries[key] = {
+                "items": items,
+                "versions": versions,
+                "built_at": time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+            }
+
+
+schema_context_cache = SchemaContextCache()
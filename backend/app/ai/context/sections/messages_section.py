@@ -14,11 +14,15 @@ class MessagesSection(ContextSection):
     tag_name: ClassVar[str] = "conversation"
 
     items: List[MessageItem] = []
+    # Rolling summary of turns older than the items window
+    summary: Optional[str] = None
 
     def render(self) -> str:
         if not self.items:
             return ""
         lines: List[str] = []
+        if self.summary:
+            lines.append(xml_escape(self.summary.strip()))
         for m in self.items:
             who = "User" if m.role == "user" else "Assistant"
             ts = f" ({m.timestamp})" if m.timestamp else ""
@@ -26,6 +26,23 @@ class Anthropic(LLMClient):
             max_tokens=self.max_tokens,
             temperature=self.temperature,
         )
+        return self._to_response(message)
+
+    async def ainference(self, model_id: str, prompt: str) -> LLMResponse:
+        message = await self.async_client.messages.create(
+            model=model_id,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt.strip(),
+                }
+            ],
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+        )
+        return self._to_response(message)
+
+    def _to_response(self, message) -> LLMResponse:
         usage = self._extract_usage(getattr(message, "usage", None))
         self._set_last_usage(usage)
         text = message.content[0].text if message.content and message.content[0].text else ""
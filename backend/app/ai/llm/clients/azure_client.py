@@ -23,20 +23,34 @@ class AzureClient(LLMClient):
 
     def inference(self, model_id: str, prompt: str) -> LLMResponse:
         # For Azure, model_id is the deployment (deployment name)
+        chat_completion = self.client.chat.completions.create(
+            **self._build_chat_params(model_id=model_id, prompt=prompt)
+        )
+        return self._to_response(chat_completion)
+
+    async def ainference(self, model_id: str, prompt: str) -> LLMResponse:
+        chat_completion = await self.async_client.chat.completions.create(
+            **self._build_chat_params(model_id=model_id, prompt=prompt)
+        )
+        return self._to_response(chat_completion)
+
+    @staticmethod
+    def _build_chat_params(model_id: str, prompt: str) -> dict[str, Any]:
         temperature = 0.3
         if "gpt-5" in model_id:
             temperature = 1.0
-
-        chat_completion = self.client.chat.completions.create(
-            messages=[
+        return {
+            "messages": [
                 {
                     "role": "user",
                     "content": prompt.strip(),
                 }
             ],
-            model=model_id,
-            temperature=temperature,
-        )
+            "model": model_id,
+            "temperature": temperature,
+        }
+
+    def _to_response(self, chat_completion) -> LLMResponse:
         usage = self._extract_usage(getattr(chat_completion, "usage", None))
         self._set_last_usage(usage)
         content = chat_completion.choices[0].message.content or ""
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 from app.ai.llm.types import LLMUsage
@@ -15,6 +16,11 @@ class LLMClient(ABC):
     def inference_stream(self, prompt: str):
         pass
 
+    async def ainference(self, model_id: str, prompt: str):
+        """Non-blocking inference. Clients with an async SDK client override this;
+        the default keeps the event loop free by running inference() in a thread."""
+        return await asyncio.to_thread(self.inference, model_id=model_id, prompt=prompt)
+
     def _set_last_usage(self, usage: LLMUsage):
         self._last_usage = usage or LLMUsage()
 
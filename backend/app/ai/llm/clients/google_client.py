@@ -14,16 +14,29 @@ class Google(LLMClient):
         self.temperature = 0.3
 
     def inference(self, model_id: str, prompt: str) -> LLMResponse:
-        thinking_budget = 128 if "pro" in model_id else 0
-
         response = self.client.models.generate_content(
             model=model_id,
             contents=prompt.strip(),
-            config=types.GenerateContentConfig(
-                thinking_config=types.ThinkingConfig(thinking_budget=thinking_budget),
-                temperature=self.temperature,
-            ),
+            config=self._generate_config(model_id),
+        )
+        return self._to_response(response)
+
+    async def ainference(self, model_id: str, prompt: str) -> LLMResponse:
+        response = await self.client.aio.models.generate_content(
+            model=model_id,
+            contents=prompt.strip(),
+            config=self._generate_config(model_id),
         )
+        return self._to_response(response)
+
+    def _generate_config(self, model_id: str) -> types.GenerateContentConfig:
+        thinking_budget = 128 if "pro" in model_id else 0
+        return types.GenerateContentConfig(
+            thinking_config=types.ThinkingConfig(thinking_budget=thinking_budget),
+            temperature=self.temperature,
+        )
+
+    def _to_response(self, response) -> LLMResponse:
         usage_meta = getattr(response, "usage_metadata", None)
         usage = LLMUsage(
             prompt_tokens=getattr(usage_meta, "prompt_token_count", 0) if usage_meta else 0,
@@ -52,6 +52,15 @@ class OpenAi(LLMClient):
         content = chat_completion.choices[0].message.content or ""
         return LLMResponse(text=content, usage=usage)
 
+    async def ainference(self, model_id: str, prompt: str) -> LLMResponse:
+        chat_completion = await self.async_client.chat.completions.create(
+            **self._build_chat_params(model_id=model_id, prompt=prompt)
+        )
+        usage = self._extract_usage(getattr(chat_completion, "usage", None))
+        self._set_last_usage(usage)
+        content = chat_completion.choices[0].message.content or ""
+        return LLMResponse(text=content, usage=usage)
+
     async def inference_stream(self, model_id: str, prompt: str) -> AsyncGenerator[str, None]:
         stream = await self.async_client.chat.completions.create(
             **self._build_chat_params(model_id=model_id, prompt=prompt, stream=True)
@@ -60,12 +60,55 @@ class LLM:
         should_record: bool = True,
     ) -> str:
         logger.debug("Model: %s, prompt: %s", self.model_id, prompt)
-        prompt_tokens_estimate = self._count_tokens(prompt)
         try:
             response = self.client.inference(model_id=self.model_id, prompt=prompt)
         except Exception as e:
             raise RuntimeError(f"LLM inference failed (provider={self.provider}, model={self.model_id}): {e}") from e
+        return self._finalize_inference(
+            prompt,
+            response,
+            usage_scope=usage_scope,
+            usage_scope_ref_id=usage_scope_ref_id,
+            should_record=should_record,
+        )
+
+    async def ainference(
+        self,
+        prompt: str,
+        *,
+        usage_scope: Optional[str] = None,
+        usage_scope_ref_id: Optional[str] = None,
+        should_record: bool = True,
+    ) -> str:
+        """Async counterpart of inference() using the provider's async client.
+
+        Does not block the event loop for the provider round trip; response
+        sanitizing and usage recording are identical to inference().
+        """
+        logger.debug("Model: %s, prompt: %s", self.model_id, prompt)
+        try:
+            response = await self.client.ainference(model_id=self.model_id, prompt=prompt)
+        except Exception as e:
+            raise RuntimeError(f"LLM inference failed (provider={self.provider}, model={self.model_id}): {e}") from e
+        return self._finalize_inference(
+            prompt,
+            response,
+            usage_scope=usage_scope,
+            usage_scope_ref_id=usage_scope_ref_id,
+            should_record=should_record,
+        )
+
+    def _finalize_inference(
+        self,
+        prompt: str,
+        response,
+        *,
+        usage_scope: Optional[str],
+        usage_scope_ref_id: Optional[str],
+        should_record: bool,
+    ) -> str:
         logger.debug("Response: %s", response)
+        prompt_tokens_estimate = self._count_tokens(prompt)
 
         text, usage = self._coerce_response(response)
         if not usage.prompt_tokens and not usage.completion_tokens and hasattr(self.client, "pop_last_usage"):
@@ -162,7 +205,7 @@ class LLM:
 
     async def test_connection(self, prompt: str = "Hello, how are you?"):
         try:
-            test_inference = self.inference(prompt, should_record=False)
+            test_inference = await self.ainference(prompt, should_record=False)
 
             if not isinstance(test_inference, str) or not test_inference.strip():
                 return {
@@ -434,7 +434,7 @@ REMEMBER: Use EXACT column names from: {column_names}
 Do NOT use generic placeholders like "value" unless that's the actual column name."""
 
         try:
-            raw = llm.inference(prompt, usage_scope="create_data.viz_infer")
+            raw = await llm.ainference(prompt, usage_scope="create_data.viz_infer")
         except Exception:
             raw = None
 
@@ -858,7 +858,13 @@ Do NOT use generic placeholders like "value" unless that's the actual column nam
             context_hub=context_hub,
             usage_session_maker=async_session_maker,
         )
-        streamer = StreamingCodeExecutor(organization_settings=organization_settings, logger=None, context_hub=context_hub)
+        organization = runtime_ctx.get("organization")
+        streamer = StreamingCodeExecutor(
+            organization_settings=organization_settings,
+            logger=None,
+            context_hub=context_hub,
+            organization_id=str(organization.id) if organization else None,
+        )
 
         # Build typed context via helper (use resolved active tables, not original patterns)
         codegen_context = await build_codegen_context(
@@ -925,7 +931,7 @@ Do NOT use generic placeholders like "value" unless that's the actual column nam
             return
 
         # Success path: format data and privacy-aware preview
-        formatted = streamer.format_df_for_widget(exec_df)
+        formatted = await streamer.aformat_df_for_widget(exec_df, persist_result=True)
         info = formatted.get("info", {})
         allow_llm_see_data = organization_settings.get_config("allow_llm_see_data").value if organization_settings else True
         if allow_llm_see_data:
@@ -344,7 +344,13 @@ CRITICAL:
             context_hub=context_hub,
             usage_session_maker=async_session_maker,
         )
-        streamer = StreamingCodeExecutor(organization_settings=organization_settings, logger=None, context_hub=context_hub)
+        organization = runtime_ctx.get("organization")
+        streamer = StreamingCodeExecutor(
+            organization_settings=organization_settings,
+            logger=None,
+            context_hub=context_hub,
+            organization_id=str(organization.id) if organization else None,
+        )
 
         context_view = runtime_ctx.get("context_view")
         schemas_section = getattr(context_view.static, "schemas", None) if context_view else None
@@ -416,7 +422,7 @@ CRITICAL:
             return
 
         # Success path: format widget data and preview (privacy aware)
-        widget_data = streamer.format_df_for_widget(exec_df)
+        widget_data = await streamer.aformat_df_for_widget(exec_df, persist_result=True)
         info = widget_data.get("info", {})
         allow_llm_see_data = organization_settings.get_config("allow_llm_see_data").value if organization_settings else True
         if allow_llm_see_data:
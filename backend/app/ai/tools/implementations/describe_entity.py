@@ -301,7 +301,7 @@ class DescribeEntityTool(Tool):
                 ds_clients = {}
                 for ds in (entity.data_sources or []):
                     try:
-                        ds_clients[ds.name] = ds.get_client()
+                        ds_clients[ds.name] = ds.get_client(query_cache=True)
                     except Exception as e:
                         errors.append(f"Failed to connect to {ds.name}: {str(e)}")
 
@@ -141,10 +141,12 @@ Use when:
             usage_session_maker=async_session_maker
         )
         
+        organization = runtime_ctx.get("organization")
         streamer = StreamingCodeExecutor(
             organization_settings=organization_settings, 
             logger=None, 
-            context_hub=context_hub
+            context_hub=context_hub,
+            organization_id=str(organization.id) if organization else None,
         )
 
         # Wrap generate_inspection_code to match the signature expected by streamer
@@ -94,7 +94,7 @@ async def build_rich_context(
     
     for ds in data_sources:
         try:
-            ds_clients[ds.name] = await ds_service.construct_client(db, ds, user)
+            ds_clients[ds.name] = await ds_service.construct_client(db, ds, user, query_cache=True)
             connected_sources.append(ds.name)
         except Exception as e:
             logger.warning(f"Failed to connect to data source {ds.name}: {e}")
@@ -309,7 +309,7 @@ Return ONLY the JSON array, no explanation or markdown. If no tables are relevan
 
     try:
         llm = LLM(model, usage_session_maker=async_session_maker)
-        response = llm.inference(
+        response = await llm.ainference(
             selection_prompt,
             usage_scope="mcp_table_selection",
             should_record=True,
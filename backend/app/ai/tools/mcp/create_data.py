@@ -139,6 +139,7 @@ class CreateDataMCPTool(MCPTool):
             organization_settings=rich_ctx.org_settings,
             logger=None,
             context_hub=rich_ctx.context_hub,
+            organization_id=str(rich_ctx.context_hub.organization.id),
         )
 
         # Execute code generation
@@ -187,7 +188,7 @@ class CreateDataMCPTool(MCPTool):
             ).model_dump()
         
         # Format data for widget
-        formatted = streamer.format_df_for_widget(exec_df)
+        formatted = await streamer.aformat_df_for_widget(exec_df, persist_result=True)
         
         # Determine title
         title = input_data.title or f"Query: {input_data.prompt[:50]}"
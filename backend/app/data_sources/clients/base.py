@@ -3,6 +3,14 @@ from abc import ABC, abstractmethod
 
 class DataSourceClient(ABC):
 
+    # Set by the schema refresh flow; see app.data_sources.clients.discovery
+    progress_reporter = None
+
+    # True when execute_query holds no per-call state on the instance (e.g. it
+    # checks out a pooled connection per call), so concurrent callers may share
+    # one client. See app.services.eval_scheduler.
+    thread_safe = False
+
     def __init__(self):
         pass
 
@@ -5,9 +5,10 @@ import os
 import pandas as pd
 from google.cloud import bigquery
 from google.oauth2 import service_account
-from typing import List, Generator, Optional
+from typing import Dict, List, Generator, Optional
 from app.ai.prompt_formatters import Table, TableColumn
 from app.ai.prompt_formatters import TableFormatter
+from app.data_sources.clients.discovery import fan_out, tables_from_frame
 from contextlib import contextmanager
 
 
@@ -87,47 +88,79 @@ class BigqueryClient(DataSourceClient):
             print(f"Error executing SQL: {e}")
             raise e
 
+    # Tables are fingerprinted and re-introspected per dataset (metadata_json["dataset"])
+    schema_scope_key = "dataset"
+
+    def _list_datasets(self, conn: bigquery.Client) -> List[str]:
+        if self._datasets:
+            return self._datasets
+        return [d.dataset_id for d in conn.list_datasets()]
+
+    def _introspect(self, conn: bigquery.Client, datasets: List[str]) -> List[Table]:
+        def dataset_tables(ds: str) -> List[Table]:
+            sql = f"""
+                SELECT table_name, column_name, data_type
+                FROM `{self.project_id}.{ds}.INFORMATION_SCHEMA.COLUMNS`
+                ORDER BY table_name, ordinal_position
+            """
+            results = conn.query(sql).result().to_dataframe()
+            return tables_from_frame(
+                results,
+                table_col="table_name",
+                column_col="column_name",
+                dtype_col="data_type",
+                name=lambda table_name: f"{ds}.{table_name}",
+                metadata_json=lambda _: {"dataset": ds},
+            )
+
+        per_dataset = fan_out(dataset_tables, datasets, progress=self.progress_reporter, phase="datasets")
+        return [table for tables in per_dataset for table in tables]
+
     def get_tables(self) -> List[Table]:
         """Get all tables and their columns across one or more datasets.
         - Supports comma-separated datasets via the existing `dataset` config field.
         - If no dataset provided, auto-discovers all datasets in the project.
+        - Datasets are queried concurrently (see app.data_sources.clients.discovery).
         - Emits fully qualified table names: DATASET.TABLE
+        - Raises if any dataset fails: an empty or partial list would read as
+          dropped tables to the schema refresh.
         """
         try:
             with self.connect() as conn:
-                # Determine datasets to scan
-                if self._datasets:
-                    datasets = self._datasets
-                else:
-                    datasets = [d.dataset_id for d in conn.list_datasets()]
-
-                tables = {}
-                for ds in datasets:
-                    sql = f"""
-                        SELECT table_name, column_name, data_type
-                        FROM `{self.project_id}.{ds}.INFORMATION_SCHEMA.COLUMNS`
-                        ORDER BY table_name, ordinal_position
-                    """
-                    query_job = conn.query(sql)
-                    results = query_job.result().to_dataframe()
-
-                    for _, row in results.iterrows():
-                        table_name = row["table_name"]
-                        column_name = row["column_name"]
-                        data_type = row["data_type"]
-
-                        key = (ds, table_name)
-                        fqn = f"{ds}.{table_name}"
-                        if key not in tables:
-                            tables[key] = Table(
-                                name=fqn, columns=[], pks=None, fks=None, metadata_json={"dataset": ds}
-                            )
-                        tables[key].columns.append(TableColumn(name=column_name, dtype=data_type))
-
-                return list(tables.values())
+                return self._introspect(conn, self._list_datasets(conn))
         except Exception as e:
             print(f"Error retrieving tables: {e}")
+            raise e
+
+    def get_tables_in_schemas(self, schemas: List[str]) -> List[Table]:
+        """Tables of the given datasets only; raises on failure."""
+        if not schemas:
             return []
+        with self.connect() as conn:
+            return self._introspect(conn, list(schemas))
+
+    def get_schema_fingerprints(self) -> Dict[str, str]:
+        """Per-dataset digest of the ``__TABLES__`` metadata (names, types, last modified).
+
+        Metadata-only queries, billed at the minimum. ``last_modified_time``
+        also moves on loads and streaming inserts, so such datasets are re-read
+        even when only data changed; schema changes are never missed.
+        """
+        with self.connect() as conn:
+            def dataset_fingerprint(ds: str) -> str:
+                sql = f"""
+                    SELECT COUNT(*) AS n,
+                           BIT_XOR(FARM_FINGERPRINT(CONCAT(table_id, ':', CAST(type AS STRING), ':',
+                                                           CAST(last_modified_time AS STRING)))) AS digest
+                    FROM `{self.project_id}.{ds}.__TABLES__`
+                """
+                row = next(iter(conn.query(sql).result()))
+                return f"{row['n']}:{row['digest']}"
+
+            datasets = self._list_datasets(conn)
+            fingerprints = fan_out(dataset_fingerprint, datasets)
+            # Empty datasets discover no tables; leave them out like a dropped scope
+            return {ds: fp for ds, fp in zip(datasets, fingerprints) if not fp.startswith("0:")}
 
     def get_schema(self, table_id: str) -> Table:
         """This method is now obsolete. Please use get_tables() instead."""
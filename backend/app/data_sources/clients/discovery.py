@@ -0,0 +1,302 @@
+"""
+Concurrent schema discovery for connectors that introspect one object at a time.
+
+HTTP/API connectors discover their schema as one request (or query) per
+object: ``TableauClient.get_schemas`` ran VizQL read-metadata plus a
+Metadata GraphQL call per published datasource, and ``BigqueryClient``
+queried ``INFORMATION_SCHEMA.COLUMNS`` per dataset, all serially, then built
+tables row by row with ``iterrows()``. Sites with hundreds of datasources or
+datasets took minutes to refresh.
+
+Shared pieces used by those clients:
+
+- ``fan_out`` runs the per-object work on a bounded thread pool
+  (``connector_discovery.max_workers``), keeps input order, and re-raises the
+  first failure once the rest have finished. A missing object would otherwise
+  be deleted as "no longer in the database" by the refresh.
+- ``http_session`` is a keep-alive ``requests.Session`` with a connection pool
+  sized for the fan-out. It retries 429/502/503/504 responses with
+  exponential backoff, honouring ``Retry-After``.
+- ``tables_from_frame`` converts a (table, column, type) DataFrame to
+  ``Table`` objects with factorize/argsort instead of per-row iteration.
+- ``discovery_progress`` tracks per-scope progress (a connection id during
+  ``ConnectionService.refresh_schema``). Clients report to
+  ``self.progress_reporter`` when the caller has set one.
+
+Change detection: a client may also expose ``get_schema_fingerprints()``
+(scope -> cheap catalog digest, e.g. one per schema or dataset) and
+``get_tables_in_schemas(scopes)``. The refresh compares the digests with the
+ones stored on the connection and only re-introspects scopes that moved.
+Both methods raise on failure rather than returning empty results, so a
+transient error never reads as "every table was dropped". ``table_scope``
+maps a stored table back to its scope via the client's ``schema_scope_key``.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.ai.prompt_formatters import Table, TableColumn
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_BACKOFF_MAX_SECONDS = 30
+PROGRESS_RETENTION_SECONDS = 600
+RETRY_STATUSES = (429, 502, 503, 504)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_config: Optional[Dict[str, float]] = None
+
+
+def discovery_config() -> Dict[str, float]:
+    """Discovery settings from ``connector_discovery`` in bow_config (cached)."""
+    global _config
+    if _config is None:
+        config = {
+            "max_workers": DEFAULT_MAX_WORKERS,
+            "max_retries": DEFAULT_MAX_RETRIES,
+            "backoff_factor": DEFAULT_BACKOFF_FACTOR,
+            "backoff_max_seconds": DEFAULT_BACKOFF_MAX_SECONDS,
+        }
+        try:
+            from app.settings.config import settings
+            cfg = getattr(settings.bow_config, "connector_discovery", None)
+            if cfg is not None:
+                config.update({k: v for k, v in cfg.model_dump().items() if v is not None})
+        except Exception:
+            pass
+        _config = config
+    return _config
+
+
+# ----- progress -----
+
+
+class DiscoveryProgress:
+    """Progress of one discovery run; safe to update from worker threads."""
+
+    def __init__(self, scope_id: str):
+        self.scope_id = scope_id
+        self._lock = threading.Lock()
+        self.status = "running"
+        self.phase: Optional[str] = None
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.error: Optional[str] = None
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self._finished_monotonic: Optional[float] = None
+
+    def start_phase(self, phase: str, total: int) -> None:
+        with self._lock:
+            self.phase = phase
+            self.total = int(total)
+            self.completed = 0
+            self.failed = 0
+
+    def advance(self, count: int = 1, failed: bool = False) -> None:
+        with self._lock:
+            self.completed += count
+            if failed:
+                self.failed += count
+
+    def finish(self, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.status = "failed" if error else "completed"
+            self.error = error
+            self.finished_at = datetime.utcnow()
+            self._finished_monotonic = time.monotonic()
+
+    def expired(self) -> bool:
+        return (
+            self._finished_monotonic is not None
+            and time.monotonic() - self._finished_monotonic > PROGRESS_RETENTION_SECONDS
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "scope_id": self.scope_id,
+                "status": self.status,
+                "phase": self.phase,
+                "total": self.total,
+                "completed": self.completed,
+                "failed": self.failed,
+                "percent": round(100.0 * self.completed / self.total, 1) if self.total else None,
+                "error": self.error,
+                "started_at": self.started_at.isoformat(),
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            }
+
+
+class DiscoveryProgressRegistry:
+    """Latest discovery run per scope, kept for a while after it finishes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[str, DiscoveryProgress] = {}
+
+    def begin(self, scope_id: str) -> DiscoveryProgress:
+        progress = DiscoveryProgress(str(scope_id))
+        with self._lock:
+            for key in [k for k, run in self._runs.items() if run.expired()]:
+                self._runs.pop(key, None)
+            self._runs[str(scope_id)] = progress
+        return progress
+
+    def get(self, scope_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            progress = self._runs.get(str(scope_id))
+        return progress.as_dict() if progress is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = list(self._runs.values())
+        return {
+            "tracked": len(runs),
+            "running": sum(1 for run in runs if run.status == "running"),
+        }
+
+
+discovery_progress = DiscoveryProgressRegistry()
+
+
+# ----- fan-out -----
+
+
+def fan_out(
+    fn: Callable[[T], R],
+    items: Sequence[T],
+    *,
+    max_workers: Optional[int] = None,
+    progress: Optional[DiscoveryProgress] = None,
+    phase: Optional[str] = None,
+) -> List[R]:
+    """Apply ``fn`` to every item on a bounded pool; results keep input order."""
+    items = list(items)
+    if progress is not None and phase:
+        progress.start_phase(phase, len(items))
+    workers = max(1, min(int(max_workers or discovery_config()["max_workers"]), len(items) or 1))
+
+    def run(item: T) -> R:
+        try:
+            result = fn(item)
+        except Exception:
+            if progress is not None:
+                progress.advance(failed=True)
+            raise
+        if progress is not None:
+            progress.advance()
+        return result
+
+    if workers == 1:
+        return [run(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="schema-discovery") as pool:
+        futures = [pool.submit(run, item) for item in items]
+        errors = [f.exception() for f in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [f.result() for f in futures]
+
+
+# ----- HTTP -----
+
+
+def http_session(pool_maxsize: Optional[int] = None) -> requests.Session:
+    """Keep-alive session pooled for the fan-out, retrying throttled/unavailable responses."""
+    config = discovery_config()
+    retry = Retry(
+        total=int(config["max_retries"]),
+        connect=int(config["max_retries"]),
+        read=0,
+        status=int(config["max_retries"]),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,  # also POST: discovery calls are read-only
+        backoff_factor=float(config["backoff_factor"]),
+        backoff_max=float(config["backoff_max_seconds"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    size = int(pool_maxsize or config["max_workers"])
+    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# ----- row-to-Table conversion -----
+
+
+def tables_from_frame(
+    df: pd.DataFrame,
+    *,
+    table_col: str,
+    column_col: str,
+    dtype_col: str,
+    name: Callable[[str], str] = str,
+    metadata_json: Optional[Callable[[str], Optional[dict]]] = None,
+) -> List[Table]:
+    """Group a (table, column, type) frame into ``Table`` objects, keeping row order."""
+    if df is None or df.empty:
+        return []
+    codes, uniques = pd.factorize(df[table_col], sort=False)
+    # Rows without a table name (code -1) are dropped
+    keep = codes >= 0
+    order = np.flatnonzero(keep)[np.argsort(codes[keep], kind="stable")]
+    bounds = np.cumsum(np.bincount(codes[keep], minlength=len(uniques)))
+    column_names = df[column_col].to_numpy(dtype=object)[order].tolist()
+    dtypes = df[dtype_col].to_numpy(dtype=object)[order].tolist()
+
+    tables: List[Table] = []
+    start = 0
+    for table_name, end in zip(uniques.tolist(), bounds.tolist()):
+        columns = [
+            TableColumn(name=column_names[i], dtype=dtypes[i]) for i in range(start, end)
+        ]
+        tables.append(
+            Table(
+                name=name(table_name),
+                columns=columns,
+                pks=None,
+                fks=None,
+                metadata_json=metadata_json(table_name) if metadata_json else None,
+            )
+        )
+        start = end
+    return tables
+
+
+
+# ----- change detection -----
+
+
+# Scope used by clients whose catalog has a single change counter (SQLite)
+SINGLE_SCOPE = "main"
+
+
+def table_scope(client: Any, name: str, metadata_json: Optional[dict]) -> str:
+    """Fingerprint scope a discovered table belongs to, for ``client``."""
+    key = getattr(client, "schema_scope_key", None)
+    if not key:
+        return SINGLE_SCOPE
+    if isinstance(metadata_json, dict) and metadata_json.get(key):
+        return str(metadata_json[key])
+    return name.split(".", 1)[0] if "." in name else SINGLE_SCOPE
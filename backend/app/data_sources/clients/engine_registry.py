@@ -0,0 +1,251 @@
+"""
+Process-wide registry of pooled SQLAlchemy engines for data source clients.
+
+SQLAlchemy-based clients used to build a fresh engine per ``connect()`` and
+dispose it afterwards, paying TCP + TLS + auth on every query. Engines are now
+kept here, keyed by a connection fingerprint, and reused across calls.
+
+- The fingerprint covers the non-secret identity (driver/host/db/user/schema)
+  plus a hash of the credentials, so rotated credentials never reuse a pool.
+- When an identity shows up with a new credential hash, the stale engine is
+  disposed immediately.
+- Engines unused for ``idle_timeout_seconds`` are disposed lazily, and the
+  registry never holds more than ``max_engines`` (least recently used first).
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, Optional
+
+import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 5
+DEFAULT_POOL_RECYCLE = 1800
+DEFAULT_IDLE_TIMEOUT_SECONDS = 600
+DEFAULT_MAX_ENGINES = 64
+
+
+def _hash_secret(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _EngineEntry:
+    __slots__ = ("engine", "identity", "credential_hash", "created_at", "last_used_at")
+
+    def __init__(self, engine, identity: str, credential_hash: str):
+        self.engine = engine
+        self.identity = identity
+        self.credential_hash = credential_hash
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+
+class EngineRegistry:
+    """Shared, lifecycle-managed engines keyed by connection fingerprint."""
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        pool_recycle: Optional[int] = None,
+        idle_timeout_seconds: Optional[int] = None,
+        max_engines: Optional[int] = None,
+    ):
+        self._overrides = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_recycle": pool_recycle,
+            "idle_timeout_seconds": idle_timeout_seconds,
+            "max_engines": max_engines,
+        }
+        self._config: Optional[Dict[str, int]] = None
+        self._entries: "OrderedDict[str, _EngineEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats: Dict[str, float] = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "checkouts": 0,
+            "checkout_errors": 0,
+            "total_checkout_ms": 0.0,
+            "max_checkout_ms": 0.0,
+        }
+
+    # ----- configuration -----
+
+    @property
+    def config(self) -> Dict[str, int]:
+        if self._config is None:
+            config = {
+                "pool_size": DEFAULT_POOL_SIZE,
+                "max_overflow": DEFAULT_MAX_OVERFLOW,
+                "pool_recycle": DEFAULT_POOL_RECYCLE,
+                "idle_timeout_seconds": DEFAULT_IDLE_TIMEOUT_SECONDS,
+                "max_engines": DEFAULT_MAX_ENGINES,
+            }
+            try:
+                from app.settings.config import settings
+                cfg = getattr(settings.bow_config, "data_source_engines", None)
+                if cfg is not None:
+                    config.update({k: int(v) for k, v in cfg.model_dump().items() if v is not None})
+            except Exception:
+                pass
+            config.update({k: v for k, v in self._overrides.items() if v is not None})
+            self._config = config
+        return self._config
+
+    def pool_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for ``create_engine`` so every client pools alike."""
+        cfg = self.config
+        return {
+            "pool_size": cfg["pool_size"],
+            "max_overflow": cfg["max_overflow"],
+            "pool_recycle": cfg["pool_recycle"],
+            "pool_pre_ping": True,
+        }
+
+    # ----- fingerprints -----
+
+    @staticmethod
+    def fingerprint(identity: Dict[str, Any], credentials: Dict[str, Any]) -> tuple:
+        """Return ``(identity_key, credential_hash)`` for a connection."""
+        identity_key = json.dumps(identity, sort_keys=True, default=str)
+        return identity_key, _hash_secret(credentials)
+
+    # ----- engine access -----
+
+    def get_engine(
+        self,
+        identity: Dict[str, Any],
+        credentials: Dict[str, Any],
+        factory: Callable[[], "sqlalchemy.engine.Engine"],
+    ) -> "sqlalchemy.engine.Engine":
+        """Return the pooled engine for this fingerprint, building it on a miss."""
+        identity_key, credential_hash = self.fingerprint(identity, credentials)
+        key = f"{identity_key}|{credential_hash}"
+        stale = []
+        with self._lock:
+            stale.extend(self._collect_idle_locked())
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_used_at = time.monotonic()
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+            else:
+                self._stats["misses"] += 1
+                # Same identity, different credentials: the old pool is stale
+                for other_key, other in list(self._entries.items()):
+                    if other.identity == identity_key and other.credential_hash != credential_hash:
+                        stale.append(self._entries.pop(other_key))
+                        self._stats["invalidations"] += 1
+                entry = _EngineEntry(factory(), identity_key, credential_hash)
+                self._entries[key] = entry
+                while len(self._entries) > max(1, self.config["max_engines"]):
+                    _, evicted = self._entries.popitem(last=False)
+                    stale.append(evicted)
+                    self._stats["evictions"] += 1
+            engine = entry.engine
+        self._dispose(stale)
+        return engine
+
+    @contextmanager
+    def connect(
+        self,
+        identity: Dict[str, Any],
+        credentials: Dict[str, Any],
+        factory: Callable[[], "sqlalchemy.engine.Engine"],
+    ) -> Generator["sqlalchemy.engine.Connection", None, None]:
+        """Check out a pooled connection, recording checkout latency."""
+        engine = self.get_engine(identity, credentials, factory)
+        started = time.monotonic()
+        try:
+            conn = engine.connect()
+        except Exception:
+            with self._lock:
+                self._stats["checkout_errors"] += 1
+            raise
+        elapsed_ms = (time.monotonic() - started) * 1000.0
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["total_checkout_ms"] += elapsed_ms
+            self._stats["max_checkout_ms"] = max(self._stats["max_checkout_ms"], elapsed_ms)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # ----- invalidation / eviction -----
+
+    def invalidate(self, identity: Dict[str, Any]) -> int:
+        """Dispose every engine for a connection identity (e.g. after a config change)."""
+        identity_key = json.dumps(identity, sort_keys=True, default=str)
+        with self._lock:
+            stale_keys = [k for k, e in self._entries.items() if e.identity == identity_key]
+            stale = [self._entries.pop(k) for k in stale_keys]
+            self._stats["invalidations"] += len(stale)
+        self._dispose(stale)
+        return len(stale)
+
+    def _collect_idle_locked(self):
+        idle_timeout = self.config["idle_timeout_seconds"]
+        if idle_timeout <= 0:
+            return []
+        now = time.monotonic()
+        idle = [k for k, e in self._entries.items() if now - e.last_used_at > idle_timeout]
+        self._stats["evictions"] += len(idle)
+        return [self._entries.pop(k) for k in idle]
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            stale = self._collect_idle_locked()
+        self._dispose(stale)
+        return len(stale)
+
+    def dispose_all(self):
+        with self._lock:
+            stale = list(self._entries.values())
+            self._entries.clear()
+        self._dispose(stale)
+
+    def _dispose(self, entries):
+        for entry in entries:
+            try:
+                entry.engine.dispose()
+            except Exception as e:
+                logger.warning(f"Failed to dispose data source engine: {e}")
+
+    # ----- metrics -----
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["engines"] = len(self._entries)
+            pools = []
+            for entry in self._entries.values():
+                pool = entry.engine.pool
+                pools.append({
+                    "identity": entry.identity,
+                    "idle_seconds": round(time.monotonic() - entry.last_used_at, 1),
+                    "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                    "size": pool.size() if hasattr(pool, "size") else None,
+                })
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = (snapshot["hits"] / lookups) if lookups else 0.0
+        snapshot["avg_checkout_ms"] = (
+            snapshot["total_checkout_ms"] / snapshot["checkouts"] if snapshot["checkouts"] else 0.0
+        )
+        snapshot["pools"] = pools
+        return snapshot
+
+
+engine_registry = EngineRegistry()
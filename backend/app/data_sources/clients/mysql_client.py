@@ -1,4 +1,5 @@
 from app.data_sources.clients.base import DataSourceClient
+from app.data_sources.clients.engine_registry import engine_registry
 
 import pandas as pd
 import sqlalchemy
@@ -12,6 +13,9 @@ from urllib.parse import quote_plus
 
 
 class MysqlClient(DataSourceClient):
+    # Each execute_query checks out its own pooled connection
+    thread_safe = True
+
     def __init__(self, host, port, database, user: Optional[str] = None, password: Optional[str] = None):
         self.host = host
         self.port = port
@@ -32,22 +36,27 @@ class MysqlClient(DataSourceClient):
         uri = f"mysql+pymysql://{auth_part}{self.host}:{self.port}/{self.database}"
         return uri
 
+    @property
+    def engine_identity(self) -> dict:
+        return {
+            "driver": "mysql",
+            "host": self.host,
+            "port": self.port,
+            "database": self.database,
+            "user": self.user,
+        }
+
+    def _create_engine(self):
+        return sqlalchemy.create_engine(self.mysql_uri, **engine_registry.pool_kwargs())
+
     @contextmanager
     def connect(self) -> Generator[sqlalchemy.engine.base.Connection, None, None]:
-        """Yield a connection to a MySQL db."""
-        engine = None
-        conn = None
+        """Yield a pooled connection to a MySQL db."""
         try:
-            engine = sqlalchemy.create_engine(self.mysql_uri)
-            conn = engine.connect()
-            yield conn
+            with engine_registry.connect(self.engine_identity, {"password": self.password}, self._create_engine) as conn:
+                yield conn
         except Exception as e:
             raise RuntimeError(f"{e}")
-        finally:
-            if conn is not None:
-                conn.close()
-            if engine is not None:
-                engine.dispose()
 
     def execute_query(self, sql: str) -> pd.DataFrame:
         """Execute SQL statement and return the result as a DataFrame."""
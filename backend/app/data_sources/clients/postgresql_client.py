@@ -1,16 +1,20 @@
 from app.data_sources.clients.base import DataSourceClient
+from app.data_sources.clients.engine_registry import engine_registry
 
 import pandas as pd
 import sqlalchemy
 from sqlalchemy import text
 from contextlib import contextmanager
-from typing import List, Generator
+from typing import Dict, List, Generator, Optional
 from app.ai.prompt_formatters import Table, TableColumn
 from app.ai.prompt_formatters import TableFormatter
 from functools import cached_property
 
 
 class PostgresqlClient(DataSourceClient):
+    # Each execute_query checks out its own pooled connection
+    thread_safe = True
+
     def __init__(self, host, port, database, user, password="", schema=None):
         self.host = host
         self.port = port
@@ -39,29 +43,35 @@ class PostgresqlClient(DataSourceClient):
 
         return uri
 
+    @property
+    def engine_identity(self) -> dict:
+        return {
+            "driver": "postgresql",
+            "host": self.host,
+            "port": self.port,
+            "database": self.database,
+            "user": self.user,
+            "schema": self._schemas,
+        }
+
+    def _create_engine(self):
+        return sqlalchemy.create_engine(self.pg_uri, **engine_registry.pool_kwargs())
+
     @contextmanager
     def connect(self) -> Generator[sqlalchemy.engine.base.Connection, None, None]:
-        """Yield a connection to a Postgres db."""
-        engine = None
-        conn = None
+        """Yield a pooled connection to a Postgres db."""
         try:
-            engine = sqlalchemy.create_engine(self.pg_uri)
-            conn = engine.connect()
-            # Set search_path if schemas are provided
-            if self._schemas:
-                search_path = ", ".join(self._schemas)
-                try:
-                    conn.execute(text(f"SET search_path TO {search_path}"))
-                except Exception:
-                    pass
-            yield conn
+            with engine_registry.connect(self.engine_identity, {"password": self.password}, self._create_engine) as conn:
+                # search_path is set per checkout; the pool's rollback-on-return resets it
+                if self._schemas:
+                    search_path = ", ".join(self._schemas)
+                    try:
+                        conn.execute(text(f"SET search_path TO {search_path}"))
+                    except Exception:
+                        pass
+                yield conn
         except Exception as e:
             raise RuntimeError(f"{e}")
-        finally:
-            if conn is not None:
-                conn.close()
-            if engine is not None:
-                engine.dispose()
 
     def execute_query(self, sql: str) -> pd.DataFrame:
         """Execute SQL statement and return the result as a DataFrame."""
@@ -73,51 +83,98 @@ class PostgresqlClient(DataSourceClient):
             print(f"Error executing SQL: {e}")
             raise
 
+    # Tables are fingerprinted and re-introspected per schema (metadata_json["schema"])
+    schema_scope_key = "schema"
+
+    def _schema_filter(self, schemas: List[str], column: str, params: dict) -> str:
+        in_keys = []
+        for idx, sch in enumerate(schemas):
+            key = f"s{idx}"
+            params[key] = sch
+            in_keys.append(f":{key}")
+        return f"{column} IN ({', '.join(in_keys)})"
+
+    def _introspect(self, schemas: Optional[List[str]]) -> List[Table]:
+        with self.connect() as conn:
+            # Build optional schema filter
+            params = {"database": self.database}
+            where_clauses = [
+                "table_catalog = :database",
+                "table_schema NOT IN ('information_schema', 'pg_catalog')",
+            ]
+            if schemas:
+                where_clauses.append(self._schema_filter(schemas, "table_schema", params))
+
+            where_sql = " WHERE " + " AND ".join(where_clauses)
+            sql = text(f"""
+                SELECT table_schema, table_name, column_name, data_type
+                FROM information_schema.columns
+                {where_sql}
+                ORDER BY table_schema, table_name, ordinal_position
+            """)
+            result = conn.execute(sql, params).fetchall()
+
+            tables = {}
+            for row in result:
+                table_schema, table_name, column_name, data_type = row
+                key = (table_schema, table_name)
+                fqn = f"{table_schema}.{table_name}"
+                if key not in tables:
+                    tables[key] = Table(
+                        name=fqn, columns=[], pks=[], fks=[], metadata_json={"schema": table_schema}
+                    )
+                tables[key].columns.append(TableColumn(name=column_name, dtype=data_type))
+            return list(tables.values())
+
     def get_tables(self) -> List[Table]:
         """Get all tables and their columns in the specified database.
         - Emits fully-qualified names: schema.table
         - If `schema` is configured, limits discovery to those schemas
         """
         try:
-            with self.connect() as conn:
-                # Build optional schema filter
-                params = {"database": self.database}
-                where_clauses = [
-                    "table_catalog = :database",
-                    "table_schema NOT IN ('information_schema', 'pg_catalog')",
-                ]
-                if self._schemas:
-                    in_keys = []
-                    for idx, sch in enumerate(self._schemas):
-                        key = f"s{idx}"
-                        params[key] = sch
-                        in_keys.append(f":{key}")
-                    where_clauses.append(f"table_schema IN ({', '.join(in_keys)})")
-
-                where_sql = " WHERE " + " AND ".join(where_clauses)
-                sql = text(f"""
-                    SELECT table_schema, table_name, column_name, data_type
-                    FROM information_schema.columns
-                    {where_sql}
-                    ORDER BY table_schema, table_name, ordinal_position
-                """)
-                result = conn.execute(sql, params).fetchall()
-
-                tables = {}
-                for row in result:
-                    table_schema, table_name, column_name, data_type = row
-                    key = (table_schema, table_name)
-                    fqn = f"{table_schema}.{table_name}"
-                    if key not in tables:
-                        tables[key] = Table(
-                            name=fqn, columns=[], pks=[], fks=[], metadata_json={"schema": table_schema}
-                        )
-                    tables[key].columns.append(TableColumn(name=column_name, dtype=data_type))
-                return list(tables.values())
+            return self._introspect(self._schemas or None)
         except Exception as e:
             print(f"Error retrieving tables: {e}")
             return []
 
+    def get_tables_in_schemas(self, schemas: List[str]) -> List[Table]:
+        """Tables of the given schemas only; raises on failure."""
+        if not schemas:
+            return []
+        return self._introspect(list(schemas))
+
+    def get_schema_fingerprints(self) -> Dict[str, str]:
+        """Digest of the catalog per schema, from pg_class/pg_attribute.
+
+        Covers relations, columns, types and grants; reading the system
+        catalogs directly is far cheaper than the information_schema views.
+        """
+        params = {}
+        where_clauses = [
+            "c.relkind IN ('r', 'v', 'f', 'p')",
+            "n.nspname NOT IN ('information_schema', 'pg_catalog')",
+            "n.nspname NOT LIKE 'pg_toast%'",
+            "n.nspname NOT LIKE 'pg_temp%'",
+        ]
+        if self._schemas:
+            where_clauses.append(self._schema_filter(self._schemas, "n.nspname", params))
+        sql = text(f"""
+            SELECT n.nspname,
+                   md5(string_agg(
+                       c.relname || ':' || c.relkind || ':' || a.attnum || ':' || a.attname || ':'
+                       || format_type(a.atttypid, a.atttypmod) || ':'
+                       || coalesce(c.relacl::text, '') || ':' || coalesce(a.attacl::text, ''),
+                       ',' ORDER BY c.relname, a.attnum
+                   ))
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            WHERE {" AND ".join(where_clauses)}
+            GROUP BY n.nspname
+        """)
+        with self.connect() as conn:
+            return {row[0]: row[1] for row in conn.execute(sql, params).fetchall()}
+
     def get_schema(self, table_id: str) -> Table:
         """This method is now obsolete. Please use get_tables() instead."""
         raise NotImplementedError(
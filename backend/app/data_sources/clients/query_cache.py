@@ -0,0 +1,256 @@
+"""
+Process-wide result cache for data source queries.
+
+Dashboard reruns, repeated ``inspect_data`` probes, eval suites and codegen
+retries often send byte-identical SQL through ``client.execute_query``, and
+every one used to hit the warehouse again. Data sources can now opt in by
+setting ``query_cache_ttl_seconds``; clients built for query execution then
+have ``execute_query`` wrapped by ``attach``.
+
+- Keys cover the connection fingerprint (connection id/type + config hash),
+  a hash of the credentials the client was built with (so per-user
+  credentials never share results), the data source's
+  ``query_cache_epoch``, the whitespace-normalized SQL and any extra call
+  arguments.
+- Only read statements returning a DataFrame are cached; hits return copies
+  so callers can mutate their frame freely.
+- Entries expire after the data source's TTL and are evicted least recently
+  used first once ``max_bytes`` is exceeded.
+- Entries live in each process, so invalidation is done by bumping
+  ``data_sources.query_cache_epoch`` in the database (manual invalidation,
+  connection or TTL changes): clients built afterwards read the new epoch
+  and miss everything cached under the old one, in every process. Stale
+  entries then age out by TTL/LRU; ``invalidate_data_source`` frees the
+  ones held by the process that did the bump right away.
+"""
+import functools
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRY_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_TTL_SECONDS = 24 * 3600
+
+_READ_PREFIXES = ("select", "with", "show", "describe", "desc", "explain", "values")
+_WRITE_RE = re.compile(
+    r"\b(insert|update|delete|merge|upsert|create|drop|alter|truncate|grant|revoke|call|exec|execute|copy|unload)\b",
+    re.IGNORECASE,
+)
+_QUOTED_OR_SPACE_RE = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`)|\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside quoted literals/identifiers and drop trailing ';'."""
+    normalized = _QUOTED_OR_SPACE_RE.sub(lambda m: m.group(1) or " ", sql).strip()
+    return normalized.rstrip(";").rstrip()
+
+
+def _is_read_query(sql: str) -> bool:
+    literal_free = _QUOTED_OR_SPACE_RE.sub(" ", sql).strip().lower()
+    return literal_free.startswith(_READ_PREFIXES) and not _WRITE_RE.search(literal_free)
+
+
+def _hash(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("df", "size", "expires_at", "data_source_id")
+
+    def __init__(self, df: pd.DataFrame, size: int, expires_at: float, data_source_id: str):
+        self.df = df
+        self.size = size
+        self.expires_at = expires_at
+        self.data_source_id = data_source_id
+
+
+class QueryResultCache:
+    """Byte-bounded LRU of query results with per-entry TTL."""
+
+    def __init__(self, max_bytes: Optional[int] = None, max_entry_bytes: Optional[int] = None):
+        self._overrides = {"max_bytes": max_bytes, "max_entry_bytes": max_entry_bytes}
+        self._config: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "skipped": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+        self._per_source: Dict[str, Dict[str, int]] = {}
+
+    # ----- configuration -----
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            config = {
+                "enabled": True,
+                "max_bytes": DEFAULT_MAX_BYTES,
+                "max_entry_bytes": DEFAULT_MAX_ENTRY_BYTES,
+                "max_ttl_seconds": DEFAULT_MAX_TTL_SECONDS,
+            }
+            try:
+                from app.settings.config import settings
+                cfg = getattr(settings.bow_config, "query_cache", None)
+                if cfg is not None:
+                    config.update({k: v for k, v in cfg.model_dump().items() if v is not None})
+            except Exception:
+                pass
+            config.update({k: v for k, v in self._overrides.items() if v is not None})
+            self._config = config
+        return self._config
+
+    # ----- client wrapping -----
+
+    def attach(
+        self,
+        client: Any,
+        *,
+        data_source_id: str,
+        ttl_seconds: Optional[int],
+        epoch: int = 0,
+        identity: Dict[str, Any],
+        credentials: Optional[Dict[str, Any]],
+    ) -> Any:
+        """Wrap ``client.execute_query`` with the cache when the data source opted in."""
+        if not ttl_seconds or ttl_seconds <= 0 or not self.config["enabled"]:
+            return client
+        execute_query = getattr(client, "execute_query", None)
+        if execute_query is None or getattr(execute_query, "_query_cache", False):
+            return client
+        ttl = min(int(ttl_seconds), int(self.config["max_ttl_seconds"]))
+        scope = f"{_hash(identity)}|{_hash(credentials or {})}|{int(epoch)}"
+        data_source_id = str(data_source_id)
+
+        @functools.wraps(execute_query)
+        def cached_execute_query(*args, **kwargs):
+            sql = args[0] if args else kwargs.get("sql", kwargs.get("query"))
+            if not isinstance(sql, str) or not _is_read_query(sql):
+                return execute_query(*args, **kwargs)
+            extra = {"args": list(args[1:]), "kwargs": {k: v for k, v in kwargs.items() if k not in ("sql", "query")}}
+            key = _hash([scope, normalize_sql(sql), extra])
+            cached = self.get(key, data_source_id)
+            if cached is not None:
+                return cached
+            result = execute_query(*args, **kwargs)
+            if isinstance(result, pd.DataFrame):
+                self.put(key, result, ttl_seconds=ttl, data_source_id=data_source_id)
+            return result
+
+        cached_execute_query._query_cache = True
+        client.execute_query = cached_execute_query
+        return client
+
+    # ----- entries -----
+
+    def _count(self, data_source_id: str, stat: str) -> None:
+        self._stats[stat] += 1
+        per_source = self._per_source.setdefault(data_source_id, {"hits": 0, "misses": 0})
+        if stat in per_source:
+            per_source[stat] += 1
+
+    def get(self, key: str, data_source_id: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._drop_locked(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._count(data_source_id, "misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count(data_source_id, "hits")
+            df = entry.df
+        return df.copy()
+
+    def put(self, key: str, df: pd.DataFrame, *, ttl_seconds: int, data_source_id: str) -> None:
+        try:
+            size = int(df.memory_usage(index=True, deep=True).sum())
+        except Exception:
+            size = 0
+        if size <= 0 or size > min(self.config["max_entry_bytes"], self.config["max_bytes"]):
+            with self._lock:
+                self._stats["skipped"] += 1
+            return
+        entry = _Entry(df.copy(), size, time.monotonic() + ttl_seconds, data_source_id)
+        with self._lock:
+            self._drop_locked(key)
+            self._entries[key] = entry
+            self._bytes += size
+            self._stats["stores"] += 1
+            while self._entries and self._bytes > self.config["max_bytes"]:
+                oldest = next(iter(self._entries))
+                self._drop_locked(oldest)
+                self._stats["evictions"] += 1
+
+    def _drop_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate_data_source(self, data_source_id: Optional[str]) -> int:
+        """Drop every cached result of a data source; returns the number dropped."""
+        if not data_source_id:
+            return 0
+        data_source_id = str(data_source_id)
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if e.data_source_id == data_source_id]
+            for key in keys:
+                self._drop_locked(key)
+            self._stats["invalidations"] += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self, data_source_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            if data_source_id is not None:
+                data_source_id = str(data_source_id)
+                counts = dict(self._per_source.get(data_source_id, {"hits": 0, "misses": 0}))
+                entries = [e for e in self._entries.values() if e.data_source_id == data_source_id]
+                counts["entries"] = len(entries)
+                counts["bytes"] = sum(e.size for e in entries)
+            else:
+                counts = dict(self._stats)
+                counts["entries"] = len(self._entries)
+                counts["bytes"] = self._bytes
+                counts["max_bytes"] = self.config["max_bytes"]
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = (counts["hits"] / lookups) if lookups else 0.0
+        return counts
+
+
+def connection_identity(connection: Any) -> Dict[str, Any]:
+    """Non-secret fingerprint of a Connection row for cache keys."""
+    config = connection.config
+    if isinstance(config, str):
+        try:
+            config = json.loads(config)
+        except ValueError:
+            pass
+    return {"id": str(connection.id), "type": connection.type, "config": _hash(config)}
+
+
+query_result_cache = QueryResultCache()
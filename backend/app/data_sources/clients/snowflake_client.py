@@ -1,13 +1,13 @@
 from app.data_sources.clients.base import DataSourceClient
+from app.data_sources.clients.engine_registry import engine_registry
 
 import pandas as pd
 import sqlalchemy
 from sqlalchemy import text
 from contextlib import contextmanager
-from typing import Generator, List, Optional
+from typing import Dict, Generator, List, Optional
 from app.ai.prompt_formatters import Table, TableColumn
 from app.ai.prompt_formatters import TableFormatter
-from functools import cached_property
 from snowflake.sqlalchemy import URL
 import base64
 from cryptography.hazmat.primitives import serialization
@@ -15,6 +15,9 @@ from cryptography.hazmat.backends import default_backend
 
 
 class SnowflakeClient(DataSourceClient):
+    # Each execute_query checks out its own pooled connection
+    thread_safe = True
+
     def __init__(
         self,
         account,
@@ -55,9 +58,33 @@ class SnowflakeClient(DataSourceClient):
         )
         self.warehouse = warehouse
 
-    @cached_property
+    @property
+    def engine_identity(self) -> dict:
+        return {
+            "driver": "snowflake",
+            "account": self.account,
+            "user": self.user,
+            "warehouse": self.warehouse,
+            "database": self.database,
+            "schema": self._schemas or self._primary_schema,
+            "role": self.role,
+        }
+
+    @property
+    def _engine_credentials(self) -> dict:
+        return {
+            "password": self.password,
+            "private_key_pem": self.private_key_pem,
+            "private_key_passphrase": self.private_key_passphrase,
+        }
+
+    @property
     def snowflake_engine(self):
-        """Return a SQLAlchemy engine configured for either password or keypair auth."""
+        """Return the pooled engine shared by every client with this fingerprint."""
+        return engine_registry.get_engine(self.engine_identity, self._engine_credentials, self._create_engine)
+
+    def _create_engine(self):
+        """Build a SQLAlchemy engine configured for either password or keypair auth."""
         connect_args = {
             "user": self.user,
             "account": self.account,
@@ -93,28 +120,18 @@ class SnowflakeClient(DataSourceClient):
             # Fallback to password-based auth
             connect_args["password"] = self.password
 
-        engine = sqlalchemy.create_engine(URL(**connect_args))
+        engine = sqlalchemy.create_engine(URL(**connect_args), **engine_registry.pool_kwargs())
         return engine
 
     @contextmanager
     def connect(self) -> Generator[sqlalchemy.engine.base.Connection, None, None]:
-        """Yield a connection to a Snowflake database."""
-        engine = None
-        conn = None
-
+        """Yield a pooled connection to a Snowflake database."""
         try:
-            engine = self.snowflake_engine
-            conn = engine.connect()
-            yield conn
+            with engine_registry.connect(self.engine_identity, self._engine_credentials, self._create_engine) as conn:
+                yield conn
         except Exception as e:
             raise RuntimeError(f"Error while connecting to Snowflake: {e}")
 
-        finally:
-            if conn is not None:
-                conn.close()
-            if engine is not None:
-                engine.dispose()
-
     def execute_query(self, sql: str) -> pd.DataFrame:
         """Run SQL statement."""
         try:
@@ -126,28 +143,29 @@ class SnowflakeClient(DataSourceClient):
             print(f"Error executing SQL: {e}")
             raise
 
-    def get_tables(self) -> List[Table]:
-        """Get all tables and their columns across one or more schemas.
-        - Supports comma-separated schemas via the existing `schema` config field.
-        - Always emits fully qualified table names: SCHEMA.TABLE
-        """
+    # Tables are fingerprinted and re-introspected per schema (metadata_json["schema"])
+    schema_scope_key = "schema"
+
+    def _schema_filter(self, schemas: Optional[List[str]], params: dict) -> str:
+        """WHERE clause limiting to ``schemas``, else to the configured schemas."""
+        where_clauses = []
+        if schemas:
+            in_keys = []
+            for idx, sch in enumerate(schemas):
+                key = f"s{idx}"
+                in_keys.append(f":{key}")
+                params[key] = sch
+            where_clauses.append(f"table_schema IN ({', '.join(in_keys)})")
+        elif self._primary_schema:
+            params["schema"] = self._primary_schema
+            where_clauses.append("table_schema = :schema")
+        return (" WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
+
+    def _introspect(self, schemas: Optional[List[str]]) -> List[Table]:
         tables = {}
         with self.connect() as conn:
-            # Build WHERE clause for single vs multi schema
             params = {}
-            where_clauses = []
-            if self._schemas:
-                in_keys = []
-                for idx, sch in enumerate(self._schemas):
-                    key = f"s{idx}"
-                    in_keys.append(f":{key}")
-                    params[key] = sch
-                where_clauses.append(f"table_schema IN ({', '.join(in_keys)})")
-            elif self._primary_schema:
-                params["schema"] = self._primary_schema
-                where_clauses.append("table_schema = :schema")
-
-            where_sql = (" WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
+            where_sql = self._schema_filter(schemas, params)
             sql = text(f"""
                 SELECT table_schema, table_name, column_name, data_type
                 FROM {self.database}.INFORMATION_SCHEMA.COLUMNS
@@ -169,6 +187,36 @@ class SnowflakeClient(DataSourceClient):
 
         return list(tables.values())
 
+    def get_tables(self) -> List[Table]:
+        """Get all tables and their columns across one or more schemas.
+        - Supports comma-separated schemas via the existing `schema` config field.
+        - Always emits fully qualified table names: SCHEMA.TABLE
+        """
+        return self._introspect(self._schemas or None)
+
+    def get_tables_in_schemas(self, schemas: List[str]) -> List[Table]:
+        """Tables of the given schemas only."""
+        if not schemas:
+            return []
+        return self._introspect(list(schemas))
+
+    def get_schema_fingerprints(self) -> Dict[str, str]:
+        """Per-schema digest of INFORMATION_SCHEMA.TABLES (names, types, LAST_ALTERED).
+
+        LAST_ALTERED also moves on DML, so busy schemas may be re-read when
+        only data changed; DDL is never missed.
+        """
+        params = {}
+        where_sql = self._schema_filter(self._schemas or None, params)
+        sql = text(f"""
+            SELECT table_schema, COUNT(*), HASH_AGG(table_name, table_type, last_altered)
+            FROM {self.database}.INFORMATION_SCHEMA.TABLES
+            {where_sql}
+            GROUP BY table_schema
+        """)
+        with self.connect() as conn:
+            return {row[0]: f"{row[1]}:{row[2]}" for row in conn.execute(sql, params).fetchall()}
+
     def get_schema(self, table: str, schema: str) -> Table:
         """Return Table."""
         with self.connect() as conn:
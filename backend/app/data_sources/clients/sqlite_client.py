@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import sqlite3
 from contextlib import contextmanager
-from typing import Generator, List
+from typing import Dict, Generator, List
 
 import pandas as pd
 
 from app.ai.prompt_formatters import Table, TableColumn, TableFormatter
 from app.data_sources.clients.base import DataSourceClient
+from app.data_sources.clients.discovery import SINGLE_SCOPE
 
 
 class SqliteClient(DataSourceClient):
@@ -38,34 +39,47 @@ class SqliteClient(DataSourceClient):
             print(f"Error executing SQL: {exc}")
             raise
 
+    def _introspect(self) -> List[Table]:
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+            tables: List[Table] = []
+            for (table_name,) in cursor.fetchall():
+                cursor.execute(f"PRAGMA table_info('{table_name}')")
+                columns = [
+                    TableColumn(name=row["name"], dtype=row["type"] or "unknown")
+                    for row in cursor.fetchall()
+                ]
+                tables.append(
+                    Table(
+                        name=table_name,
+                        columns=columns,
+                        pks=[],
+                        fks=[],
+                        metadata_json={"database": self.database},
+                    )
+                )
+            return tables
+
     def get_tables(self) -> List[Table]:
         try:
-            with self.connect() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
-                )
-                tables: List[Table] = []
-                for (table_name,) in cursor.fetchall():
-                    cursor.execute(f"PRAGMA table_info('{table_name}')")
-                    columns = [
-                        TableColumn(name=row["name"], dtype=row["type"] or "unknown")
-                        for row in cursor.fetchall()
-                    ]
-                    tables.append(
-                        Table(
-                            name=table_name,
-                            columns=columns,
-                            pks=[],
-                            fks=[],
-                            metadata_json={"database": self.database},
-                        )
-                    )
-                return tables
+            return self._introspect()
         except Exception as exc:
             print(f"Error retrieving tables: {exc}")
             return []
 
+    def get_tables_in_schemas(self, schemas: List[str]) -> List[Table]:
+        """The whole database is a single scope; raises on failure."""
+        return self._introspect() if schemas else []
+
+    def get_schema_fingerprints(self) -> Dict[str, str]:
+        """``PRAGMA schema_version``, bumped by SQLite on every schema change."""
+        with self.connect() as conn:
+            (version,) = conn.execute("PRAGMA schema_version").fetchone()
+        return {SINGLE_SCOPE: str(version)}
+
     def get_schemas(self):
         return self.get_tables()
 
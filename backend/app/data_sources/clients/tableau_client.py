@@ -1,7 +1,7 @@
 from app.data_sources.clients.base import DataSourceClient
 from app.ai.prompt_formatters import Table, TableColumn, ServiceFormatter
+from app.data_sources.clients.discovery import fan_out, http_session
 from typing import List, Dict, Optional
-import requests
 import pandas as pd
 
 
@@ -47,7 +47,7 @@ class TableauClient(DataSourceClient):
         if not self.server_url:
             raise RuntimeError("server_url is required")
 
-        session = requests.Session()
+        session = http_session()
 
         signin_url = f"{self.server_url.rstrip('/')}/api/{self._api_version}/auth/signin"
         if self.pat_name and self.pat_token:
@@ -176,11 +176,17 @@ class TableauClient(DataSourceClient):
         """
         Build Table objects representing published datasources with columns
         discovered by combining VizQL read-metadata with Metadata GraphQL API (publishedDatasources).
+        Datasources are fetched concurrently over the pooled session.
         """
         datasources = self.list_published_datasources()
+        all_fields = fan_out(
+            lambda ds: self._combined_fields_for_datasource(ds["id"]),
+            datasources,
+            progress=self.progress_reporter,
+            phase="datasources",
+        )
         tables: List[Table] = []
-        for ds in datasources:
-            fields = self._combined_fields_for_datasource(ds["id"])  # list of dicts
+        for ds, fields in zip(datasources, all_fields):
             columns = [
                 TableColumn(name=(f.get("fieldCaption") or f.get("fieldName") or ""), dtype=(f.get("dataType") or "unknown"))
                 for f in fields
@@ -3,7 +3,7 @@ from fastapi import Depends
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session
 from fastapi_users.db import SQLAlchemyUserDatabase, SQLAlchemyBaseOAuthAccountTableUUID
-from app.settings.database import create_session_factory, create_async_session_factory, create_async_database_engine
+from app.settings.database import create_session_factory, create_async_session_factory, get_async_engine
 from app.models.user import User
 from app.models.organization import Organization
 from fastapi import HTTPException
@@ -18,10 +18,8 @@ from app.settings import config
 # Create a session factory at the start to reuse
 SessionLocal = create_session_factory()
 
-# Create an async session factory at the start to reuse
-# async_session_maker = create_async_session_factory()
-# Create an async engine
-engine = create_async_database_engine()
+# Shared, process-wide async engine for request handlers
+engine = get_async_engine()
 
 # Create an async session maker
 async_session_maker = create_async_session_factory()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, event, UUID, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, event, UUID, DateTime, Index
 from sqlalchemy.orm import relationship, selectinload
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,7 +13,7 @@ from app.models.mention import MentionType
 from sqlalchemy.orm.exc import DetachedInstanceError
 
 # Add these imports for the new functionality
-from app.settings.database import create_async_session_factory
+from app.settings.database import create_async_session_factory, BACKGROUND_POOL
 from app.services.platform_adapters.adapter_factory import PlatformAdapterFactory
 from app.models.external_platform import ExternalPlatform
 from app.settings.logging_config import get_logger
@@ -23,6 +23,10 @@ logger = get_logger(__name__)
 
 class Completion(BaseSchema):
     __tablename__ = 'completions'
+    __table_args__ = (
+        # Tail-of-conversation reads: WHERE report_id = ? ORDER BY created_at DESC LIMIT n
+        Index("ix_completions_report_created_at", "report_id", "created_at"),
+    )
 
     prompt = Column(JSON, nullable=False, default="")
     completion = Column(JSON, nullable=False, default="")
@@ -77,7 +81,7 @@ async def send_final_slack_dm(completion_id: str):
     Fetches the final answer for a completion and sends it as a DM on Slack.
     This is triggered when the main system_completion is marked as 'success'.
     """
-    session_maker = create_async_session_factory()
+    session_maker = create_async_session_factory(BACKGROUND_POOL)
     async with session_maker() as db:
         try:
             # Get the system completion that triggered this event
@@ -5,7 +5,7 @@ import asyncio
 from typing import Dict
 
 # Async DB + adapter imports used by event callbacks
-from app.settings.database import create_async_session_factory
+from app.settings.database import create_async_session_factory, BACKGROUND_POOL
 from app.services.platform_adapters.adapter_factory import PlatformAdapterFactory
 from app.models.external_platform import ExternalPlatform
 from app.models.completion import Completion
@@ -60,7 +60,7 @@ _block_locks: Dict[str, asyncio.Lock] = {}
 
 async def send_completion_blocks_to_slack(completion_id: str):
     """Send all terminal completion blocks for a finished completion to Slack."""
-    session_maker = create_async_session_factory()
+    session_maker = create_async_session_factory(BACKGROUND_POOL)
     async with session_maker() as db:
         try:
             # Load completion with report for organization routing
@@ -157,7 +157,7 @@ async def send_completion_blocks_to_slack(completion_id: str):
 
 
 async def _send_block_to_slack(block_id: str):
-    session_maker = create_async_session_factory()
+    session_maker = create_async_session_factory(BACKGROUND_POOL)
     async with session_maker() as db:
         try:
             # Load block
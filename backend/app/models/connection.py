@@ -21,6 +21,8 @@ class Connection(BaseSchema):
     
     is_active = Column(Boolean, nullable=False, default=True)
     last_synced_at = Column(DateTime, nullable=True)
+    # Catalog fingerprint per schema/dataset from the last refresh; see ConnectionService.refresh_schema
+    schema_fingerprints = Column(JSON, nullable=True)
     
     # Connection test cache - stores last test result to avoid repeated slow tests
     last_connection_status = Column(String, nullable=True)  # "success", "not_connected", "offline"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, select, UniqueConstraint, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, select, UniqueConstraint, JSON
 from sqlalchemy.orm import relationship, selectinload, object_session
 from sqlalchemy import ForeignKey
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -31,6 +31,10 @@ class DataSource(BaseSchema):
     summary = Column(Text, nullable=True)
     conversation_starters = Column(JSON, nullable=True)
     use_llm_sync = Column(Boolean, nullable=False, default=False)
+    # Opt-in query result cache; null or 0 disables it
+    query_cache_ttl_seconds = Column(Integer, nullable=True)
+    # Part of every cache key; bumped to invalidate cached results in all processes
+    query_cache_epoch = Column(Integer, nullable=False, default=0, server_default="0")
 
     # The organization that owns this data source
     organization_id = Column(String(36), ForeignKey(
@@ -106,13 +110,28 @@ class DataSource(BaseSchema):
         lazy="selectin"
     )
     
-    def get_client(self):
+    def get_client(self, query_cache: bool = False):
         """
         Get database client from the first associated connection.
+
+        With ``query_cache``, ``execute_query`` results are cached when the
+        data source has a query cache TTL configured.
         """
         if not self.connections:
             raise ValueError(f"Data source '{self.name}' has no associated connections.")
-        return self.connections[0].get_client()
+        connection = self.connections[0]
+        client = connection.get_client()
+        if query_cache and self.query_cache_ttl_seconds:
+            from app.data_sources.clients.query_cache import query_result_cache, connection_identity
+            client = query_result_cache.attach(
+                client,
+                data_source_id=self.id,
+                ttl_seconds=self.query_cache_ttl_seconds,
+                epoch=self.query_cache_epoch or 0,
+                identity=connection_identity(connection),
+                credentials=connection.decrypt_credentials(),
+            )
+        return client
     
     def get_credentials(self):
         """
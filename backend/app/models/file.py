@@ -27,6 +27,17 @@ class File(BaseSchema):
     file_tags = relationship("FileTag", back_populates="file", lazy="selectin")
     sheet_schemas = relationship("SheetSchema", back_populates="file", lazy="selectin")
 
+    def read_sheet(self, sheet_name=0, **read_kwargs):
+        """Load one sheet (or the CSV) as a DataFrame from the columnar cache.
+
+        Excel sheets come back as raw cells, like ``pd.read_excel(self.path,
+        sheet_name=..., header=None)``; CSV files like ``pd.read_csv(self.path)``.
+        Pass ``header=`` or other reader options to change that. The file is
+        parsed once rather than on every call.
+        """
+        from app.services.file_data_cache import read_file_data
+        return read_file_data(self, sheet_name=sheet_name, **read_kwargs)
+
     def prompt_schema(self):
         """Legacy method - returns description for backward compatibility."""
         return self.description
@@ -23,6 +23,7 @@ from app.models.plan_decision import PlanDecision
 from app.models.tool_execution import ToolExecution
 from app.models.context_snapshot import ContextSnapshot
 from app.models.completion_block import CompletionBlock
+from app.services.agent.trace_journal import TraceJournal
 from app.services.dashboard_layout_service import DashboardLayoutService
 from app.schemas.dashboard_layout_version_schema import (
     DashboardLayoutBlocksPatch,
@@ -40,6 +41,8 @@ class ProjectManager:
         self.table_usage_service = TableUsageService()
         self.visualization_service = VisualizationService()
         self.query_service = QueryService()
+        # Write-behind journal for trace rows of the current agent run (see begin_trace_journal)
+        self.trace_journal: TraceJournal | None = None
 
     async def emit_table_usage(self, db, report: Report, step: Step, data_model: dict, user_id: str | None = None, user_role: str | None = None, source_type: str | None = None):
         try:
@@ -763,6 +766,26 @@ class ProjectManager:
     # Agent Execution Tracking Methods
     # ==============================
 
+    def begin_trace_journal(self, db, **kwargs) -> TraceJournal:
+        """Batch trace writes (decisions, tool executions, blocks) made on ``db``."""
+        self.trace_journal = TraceJournal(db, **kwargs)
+        return self.trace_journal
+
+    async def close_trace_journal(self) -> None:
+        """Flush pending trace rows; safe to call more than once."""
+        if self.trace_journal is not None:
+            await self.trace_journal.close()
+
+    async def _persist_trace(self, db, obj, *, flush: bool = False):
+        """Persist a trace row through the journal, or commit it directly."""
+        journal = self.trace_journal
+        if journal is not None and journal.accepts(db):
+            return await journal.record(obj, flush=flush)
+        db.add(obj)
+        await db.commit()
+        await db.refresh(obj)
+        return obj
+
     async def start_agent_execution(self, db, completion_id, organization_id=None, user_id=None, report_id=None, config_json=None, build_id=None):
         """Start tracking an agent execution run."""
         from app.settings.config import settings
@@ -805,10 +828,7 @@ class ProjectManager:
             existing.action_args_json = action_args_json
             existing.metrics_json = metrics_json
             existing.context_snapshot_id = context_snapshot_id
-            db.add(existing)
-            await db.commit()
-            await db.refresh(existing)
-            return existing
+            return await self._persist_trace(db, existing)
 
         decision = PlanDecision(
             agent_execution_id=agent_execution.id,
@@ -824,10 +844,7 @@ class ProjectManager:
             metrics_json=metrics_json,
             context_snapshot_id=context_snapshot_id,
         )
-        db.add(decision)
-        await db.commit()
-        await db.refresh(decision)
-        return decision
+        return await self._persist_trace(db, decision)
 
     async def start_tool_execution(self, db, agent_execution, plan_decision_id, tool_name, 
                                   tool_action, arguments_json, attempt_number=1, max_retries=0):
@@ -843,10 +860,8 @@ class ProjectManager:
             attempt_number=attempt_number,
             max_retries=max_retries,
         )
-        db.add(tool_exec)
-        await db.commit()
-        await db.refresh(tool_exec)
-        return tool_exec
+        # Flush now: the tool runs for a while, on its own sessions, and may reference this row
+        return await self._persist_trace(db, tool_exec, flush=True)
 
     async def finish_tool_execution(self, db, tool_execution, status, success, result_summary=None,
                                    result_json=None, created_widget_id=None, created_step_id=None, created_visualization_ids: list[str] | None = None,
@@ -876,10 +891,7 @@ class ProjectManager:
         tool_execution.error_message = error_message
         tool_execution.token_usage_json = token_usage_json
         tool_execution.context_snapshot_id = context_snapshot_id
-        db.add(tool_execution)
-        await db.commit()
-        await db.refresh(tool_execution)
-        return tool_execution
+        return await self._persist_trace(db, tool_execution)
 
     # Pydantic-friendly helpers
     async def save_plan_decision_from_model(self, db, agent_execution, seq: int, loop_index: int,
@@ -1047,6 +1059,12 @@ class ProjectManager:
         agent_execution.thinking_ms = thinking_ms
         agent_execution.token_usage_json = token_usage_json
         agent_execution.error_json = error_json
+        journal = self.trace_journal
+        if journal is not None and journal.accepts(db):
+            # Final flush: run status and all pending trace rows in one commit
+            journal.stage(agent_execution)
+            await journal.close()
+            return agent_execution
         db.add(agent_execution)
         await db.commit()
         await db.refresh(agent_execution)
@@ -1101,10 +1119,7 @@ class ProjectManager:
             existing.reasoning = reasoning
             if plan_decision.analysis_complete and not existing.completed_at:
                 existing.completed_at = datetime.datetime.utcnow()
-            db.add(existing)
-            await db.commit()
-            await db.refresh(existing)
-            return existing
+            return await self._persist_trace(db, existing)
 
         block = CompletionBlock(
             completion_id=str(completion.id),
@@ -1122,10 +1137,7 @@ class ProjectManager:
             started_at=plan_decision.created_at,
             completed_at=plan_decision.updated_at if plan_decision.analysis_complete else None,
         )
-        db.add(block)
-        await db.commit()
-        await db.refresh(block)
-        return block
+        return await self._persist_trace(db, block)
 
     async def upsert_block_for_tool(self, db, completion, agent_execution, tool_execution: ToolExecution):
         """Update existing decision block with tool execution data."""
@@ -1155,10 +1167,7 @@ class ProjectManager:
             existing.status = 'in_progress'
         existing.completed_at = tool_execution.completed_at
         
-        db.add(existing)
-        await db.commit()
-        await db.refresh(existing)
-        return existing
+        return await self._persist_trace(db, existing)
 
     async def rebuild_completion_from_blocks(self, db, completion, agent_execution):
         """Recompose transcript content/reasoning from stored blocks."""
@@ -1183,10 +1192,7 @@ class ProjectManager:
             'content': '\n\n'.join(content_parts),
             'reasoning': ' | '.join(reasoning_parts[-3:]) if reasoning_parts else base.get('reasoning') if isinstance(base, dict) else None,
         }
-        db.add(completion)
-        await db.commit()
-        await db.refresh(completion)
-        return completion
+        return await self._persist_trace(db, completion)
 
     async def mark_error_on_latest_block(self, db, agent_execution, error_message: str | None = None):
         """Mark the latest decision block as error and append error message to its content."""
@@ -1204,7 +1210,4 @@ class ProjectManager:
             block.content = (base + suffix) if suffix not in base else base
         if not block.completed_at:
             block.completed_at = datetime.utcnow()
-        db.add(block)
-        await db.commit()
-        await db.refresh(block)
-        return block
\ No newline at end of file
+        return await self._persist_trace(db, block)
\ No newline at end of file
@@ -15,6 +15,7 @@ from app.models.datasource_table import DataSourceTable
 from app.models.connection_table import ConnectionTable
 from app.dependencies import get_current_organization
 from app.services.connection_service import ConnectionService
+from app.data_sources.clients.discovery import discovery_progress
 from app.core.permissions_decorator import requires_permission
 from app.schemas.connection_schema import (
     ConnectionCreate,
@@ -224,13 +225,18 @@ async def test_connection(
 @requires_permission('update_data_source')  # Admin-only
 async def refresh_connection_schema(
     connection_id: str,
+    full: bool = False,
     current_user: User = Depends(current_user),
     db: AsyncSession = Depends(get_async_db),
     organization: Organization = Depends(get_current_organization)
 ):
-    """Refresh connection schema (discover tables)."""
+    """Refresh connection schema (discover tables).
+
+    Incremental when the connector supports change detection; ``full=true``
+    re-introspects every schema.
+    """
     connection = await connection_service.get_connection(db, connection_id, organization)
-    tables = await connection_service.refresh_schema(db, connection, current_user)
+    tables = await connection_service.refresh_schema(db, connection, current_user, full=full)
     
     return {
         "message": f"Refreshed schema. Found {len(tables)} tables.",
@@ -238,6 +244,20 @@ async def refresh_connection_schema(
     }
 
 
+@router.get("/{connection_id}/refresh/progress")
+@requires_permission('update_data_source')  # Admin-only
+async def get_connection_refresh_progress(
+    connection_id: str,
+    current_user: User = Depends(current_user),
+    db: AsyncSession = Depends(get_async_db),
+    organization: Organization = Depends(get_current_organization)
+):
+    """Progress of the current (or last) schema discovery for this connection in this process."""
+    connection = await connection_service.get_connection(db, connection_id, organization)
+    progress = discovery_progress.get(str(connection.id))
+    return progress or {"scope_id": str(connection.id), "status": "idle"}
+
+
 @router.get("/{connection_id}/tables", response_model=List[ConnectionTableSchema])
 @requires_permission('update_data_source')  # Admin-only
 async def get_connection_tables(
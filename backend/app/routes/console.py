@@ -6,7 +6,7 @@ from app.models.user import User
 from app.models.organization import Organization
 from app.core.auth import current_user
 from app.core.permissions_decorator import requires_permission
-from app.schemas.console_schema import SimpleMetrics, MetricsQueryParams, MetricsComparison, TimeSeriesMetrics, TableUsageData, TableUsageMetrics, TableJoinsHeatmap, TableJoinData, ToolUsageMetrics, LLMUsageMetrics
+from app.schemas.console_schema import SimpleMetrics, MetricsQueryParams, TimeSeriesQueryParams, MetricsComparison, TimeSeriesMetrics, TableUsageData, TableUsageMetrics, TableJoinsHeatmap, TableJoinData, ToolUsageMetrics, LLMUsageMetrics
 from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 from app.models.step import Step
@@ -63,7 +63,7 @@ async def get_recent_widgets(
 @router.get("/console/metrics/timeseries", response_model=TimeSeriesMetrics)
 @requires_permission('view_organization_overview')
 async def get_timeseries_metrics(
-    params: MetricsQueryParams = Depends(),
+    params: TimeSeriesQueryParams = Depends(),
     db: AsyncSession = Depends(get_async_db),
     organization: Organization = Depends(get_current_organization),
     current_user: User = Depends(current_user)
@@ -264,6 +264,26 @@ async def llm_sync(
 ):
     return await data_source_service.llm_sync(db=db, data_source_id=data_source_id, organization=organization, current_user=current_user)
 
+@router.get("/data_sources/{data_source_id}/query_cache", response_model=dict)
+@requires_permission('view_data_source', model=DataSource)
+async def get_query_cache_stats(
+    data_source_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    organization: Organization = Depends(get_current_organization),
+    current_user: User = Depends(current_user)
+):
+    return await data_source_service.get_query_cache_stats(db, data_source_id, organization)
+
+@router.post("/data_sources/{data_source_id}/query_cache/invalidate", response_model=dict)
+@requires_permission('update_data_source', model=DataSource)
+async def invalidate_query_cache(
+    data_source_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    organization: Organization = Depends(get_current_organization),
+    current_user: User = Depends(current_user)
+):
+    return await data_source_service.invalidate_query_cache(db, data_source_id, organization)
+
 @router.get("/data_sources/{data_source_id}/refresh_schema", response_model=list)
 @requires_permission('view_data_source_full_schema', model=DataSource)
 async def refresh_data_source_schema(
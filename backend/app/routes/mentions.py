@@ -9,7 +9,7 @@ from app.dependencies import get_current_organization
 from app.models.user import User
 from app.models.organization import Organization
 from app.services.mention_service import MentionService
-from app.schemas.mention_schema import AvailableMentionsResponse
+from app.schemas.mention_schema import AvailableMentionsResponse, TableColumnsResponse
 
 
 router = APIRouter(prefix="/mentions", tags=["mentions"])
@@ -25,6 +25,20 @@ async def get_available_mentions(
         None,
         description="Comma-separated categories to return: data_sources, tables, files, entities (default: all)"
     ),
+    q: Optional[str] = Query(
+        None,
+        description="Search text; matches by prefix first, then fuzzy"
+    ),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Max items per category (default: all)"
+    ),
+    offset: int = Query(0, ge=0, description="Items to skip per category"),
+    include_columns: Optional[bool] = Query(
+        None,
+        description="Include table columns (default: true without q, false with q)"
+    ),
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(auth_current_user),
     organization: Organization = Depends(get_current_organization)
@@ -44,12 +58,17 @@ async def get_available_mentions(
     Query Parameters:
     - data_source_ids: Optional filter to scope tables/entities to specific data sources
     - categories: Optional filter to only return specific categories
+    - q: Optional search text, results ranked by match
+    - limit / offset: Optional per-category pagination
+    - include_columns: Whether table items carry their columns; typeahead
+      clients should leave it off and fetch /mentions/tables/{id}/columns
     
     Returns:
     - data_sources: List of accessible data sources
     - tables: List of tables from accessible data sources
     - files: List of organization files
     - entities: List of published entities
+    - total: Matches per category before pagination
     """
     
     # Parse comma-separated values
@@ -68,8 +87,29 @@ async def get_available_mentions(
         organization=organization,
         current_user=current_user,
         data_source_ids=ds_ids,
-        categories=cats
+        categories=cats,
+        q=q,
+        limit=limit,
+        offset=offset,
+        include_columns=include_columns if include_columns is not None else not q,
     )
     
     return result
 
+
+@router.get("/tables/{table_id}/columns", response_model=TableColumnsResponse)
+async def get_mention_table_columns(
+    table_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(auth_current_user),
+    organization: Organization = Depends(get_current_organization)
+):
+    """Columns of a mentioned table, for the table the user selected in the prompt box."""
+    mention_service = MentionService()
+    return await mention_service.get_table_columns(
+        db=db,
+        organization=organization,
+        current_user=current_user,
+        table_id=table_id
+    )
+
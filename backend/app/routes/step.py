@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies import get_async_db, get_current_organization
 from app.services.step_service import StepService
@@ -6,9 +7,8 @@ from app.models.user import User
 from app.models.organization import Organization
 from app.core.auth import current_user
 from app.core.permissions_decorator import requires_permission
-import io
 import logging
-from app.schemas.step_schema import StepSchema
+from app.schemas.step_schema import StepSchema, StepRowsPage
 
 router = APIRouter(tags=["steps"])
 step_service = StepService()
@@ -23,17 +23,16 @@ async def export_step(
 ):
     logging.info(f"CSV export request received for step {step_id}")
     try:
-        df, step = await step_service.export_step_to_csv(db, step_id)
-        
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_buffer.seek(0)
-        
-        response = Response(content=csv_buffer.getvalue(), media_type="text/csv")
+        csv_stream, step = await step_service.export_step_to_csv(db, step_id)
+
         widget_title = "".join(c for c in step.widget.title if c.isalnum() or c in (' ', '_')).rstrip()
         file_name = f"{widget_title}-{step.slug}.csv".replace(" ", "_")
-        response.headers["Content-Disposition"] = f"attachment; filename=\"{file_name}\""
-        return response
+        # Sync iterator: Starlette pulls it in a threadpool, one record batch at a time
+        return StreamingResponse(
+            csv_stream,
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename=\"{file_name}\""},
+        )
 
     except ValueError as e:
         logging.warning(f"Value error in export_step route for step {step_id}: {str(e)}")
@@ -54,4 +53,40 @@ async def get_step(
     step = await step_service.get_step_by_id(db, step_id)
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
-    return StepSchema.from_orm(step)
\ No newline at end of file
+    return StepSchema.from_orm(step)
+
+
+@router.get("/steps/{step_id}/rows", response_model=StepRowsPage)
+@requires_permission('view_reports')
+async def get_step_rows(
+    step_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=5000),
+    sort_by: str | None = None,
+    sort_dir: str = Query("asc", pattern="^(asc|desc)$"),
+    current_user: User = Depends(current_user),
+    organization: Organization = Depends(get_current_organization),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await step_service.get_step_rows(
+            db, step_id, offset=offset, limit=limit, sort_by=sort_by, descending=(sort_dir == "desc")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404 if "not found" in str(e) else 400, detail=str(e))
+
+
+@router.get("/steps/{step_id}/data", response_class=Response)
+@requires_permission('view_reports')
+async def get_step_data_columnar(
+    step_id: str,
+    current_user: User = Depends(current_user),
+    organization: Organization = Depends(get_current_organization),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Step preview as a columnar payload (column arrays + dtypes), encoded once."""
+    try:
+        body = await step_service.get_step_payload(db, step_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(content=body, media_type="application/json")
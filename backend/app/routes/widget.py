@@ -50,16 +50,12 @@ async def export_widget(
 ):
     logging.info(f"CSV export request received for widget {widget_id}")
     try:
-        csv_data = await widget_service.export_widget_to_csv(db, widget_id)
-        logging.info(f"CSV data generated, size: {len(csv_data)} characters")
-        
-        # Create a StringIO object from the csv_data
-        csv_buffer = io.StringIO()
-        csv_data.to_csv(csv_buffer, index=False)
-        
-        response = Response(content=csv_buffer.getvalue(), media_type="text/csv")
-        response.headers["Content-Disposition"] = f"attachment; filename={widget_id}.csv"
-        return response
+        csv_stream = await widget_service.export_widget_to_csv(db, widget_id, current_user, organization)
+        return StreamingResponse(
+            csv_stream,
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename={widget_id}.csv"},
+        )
 
     except Exception as e:
         logging.error(f"Error in export_widget route: {str(e)}")
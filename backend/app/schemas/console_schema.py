@@ -1,11 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Literal
 from datetime import datetime
 
 class MetricsQueryParams(BaseModel):
     start_date: Optional[datetime] = Field(None, description="Start date for metrics query")
     end_date: Optional[datetime] = Field(None, description="End date for metrics query")
 
+class TimeSeriesQueryParams(MetricsQueryParams):
+    granularity: Literal["day", "week", "month"] = Field("day", description="Bucket size for time-series points")
+    fill_gaps: bool = Field(False, description="Include buckets without activity as zero points")
+
 class SimpleMetrics(BaseModel):
     total_messages: int
     total_queries: int
@@ -127,6 +127,7 @@ class DataSourceSchema(DataSourceBase):
     is_active: bool
     is_public: bool = False
     use_llm_sync: bool = False
+    query_cache_ttl_seconds: Optional[int] = None
     owner_user_id: Optional[str] = None
     git_repository: Optional[GitRepositorySchema] = None
     memberships: Optional[List[DataSourceMembershipSchema]] = []
@@ -235,6 +236,7 @@ class DataSourceUpdate(DataSourceBase):
     conversation_starters: Optional[list] = None
     is_public: Optional[bool] = None
     use_llm_sync: Optional[bool] = None
+    query_cache_ttl_seconds: Optional[int] = Field(None, ge=0)  # 0 disables the query result cache
     member_user_ids: Optional[List[str]] = None  # User IDs to grant access to
     
     # Connection-related fields (will be delegated to Connection update)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 from enum import Enum
 from datetime import datetime
 
@@ -33,7 +33,7 @@ class TableMention(BaseModel):
     
     # Real fields from DataSourceTable model
     datasource_id: str
-    columns: List[dict]  # Column names/types from DataSourceTable.columns
+    columns: List[dict] = []  # Column names/types; empty unless include_columns (see /mentions/tables/{id}/columns)
     is_active: bool
     
     # Computed/joined fields (need to join DataSource)
@@ -87,6 +87,15 @@ class AvailableMentionsResponse(BaseModel):
     tables: List[TableMention]
     files: List[FileMention]
     entities: List[EntityMention]
+    # Matches per category before limit/offset
+    total: Dict[str, int] = {}
+
+
+class TableColumnsResponse(BaseModel):
+    id: str
+    name: str
+    datasource_id: str
+    columns: List[dict]
 
 
 # =====================================================
@@ -25,6 +25,24 @@ class ReportUpdate(BaseModel):
     data_sources: Optional[List[str]] = None
     mode: Optional[Literal["chat", "deep", "training"]] = None
 
+class TileRefreshResult(BaseModel):
+    visualization_id: str
+    step_id: Optional[str] = None
+    status: Literal["success", "error", "skipped"]
+    error: Optional[str] = None
+    duration_ms: Optional[float] = None
+    # True when another tile backed by the same step already ran it
+    deduplicated: bool = False
+
+class ReportRefreshSummary(BaseModel):
+    total_tiles: int = 0
+    steps_run: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    duration_ms: float = 0.0
+    tiles: List[TileRefreshResult] = []
+
 class ReportSchema(ReportBase):
     class PublicGeneralSettings(BaseModel):
         ai_analyst_name: str = "AI Analyst"
@@ -51,6 +69,8 @@ class ReportSchema(ReportBase):
     # Conversation sharing
     conversation_share_enabled: bool = False
     conversation_share_token: Optional[str] = None
+    # Set on responses to a dashboard rerun
+    last_refresh: Optional[ReportRefreshSummary] = None
 
     class Config:
         from_attributes = True
@@ -47,3 +47,13 @@ class StepCreate(StepBase):
 class StepUpdate(StepBase):
     pass
 
+
+
+class StepRowsPage(BaseModel):
+    columns: List[dict] = Field(default_factory=list)
+    rows: List[dict] = Field(default_factory=list)
+    offset: int = 0
+    limit: int = 100
+    total_rows: int = 0
+    sort_by: Optional[str] = None
+    descending: bool = False
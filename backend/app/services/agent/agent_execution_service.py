@@ -3,6 +3,7 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.agent_execution import AgentExecution
+from app.services.agent.trace_journal import TraceJournal
 
 
 class AgentExecutionService:
@@ -31,10 +32,8 @@ class AgentExecutionService:
         return run
 
     async def next_seq(self, db: AsyncSession, run: AgentExecution) -> int:
+        """In-memory counter; latest_seq is persisted with the next flush/finish_run."""
         run.latest_seq = (run.latest_seq or 0) + 1
-        db.add(run)
-        await db.commit()
-        await db.refresh(run)
         return run.latest_seq
 
     async def finish_run(
@@ -47,6 +46,7 @@ class AgentExecutionService:
         thinking_ms: Optional[float] = None,
         token_usage_json: Optional[Dict[str, Any]] = None,
         error_json: Optional[Dict[str, Any]] = None,
+        journal: Optional[TraceJournal] = None,
     ) -> AgentExecution:
         run.status = status
         run.completed_at = datetime.utcnow()
@@ -56,6 +56,10 @@ class AgentExecutionService:
         run.thinking_ms = thinking_ms
         run.token_usage_json = token_usage_json or run.token_usage_json
         run.error_json = error_json
+        if journal is not None and journal.accepts(db):
+            journal.stage(run)
+            await journal.close()
+            return run
         db.add(run)
         await db.commit()
         await db.refresh(run)
@@ -1,6 +1,7 @@
 from typing import Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.plan_decision import PlanDecision
+from app.services.agent.trace_journal import TraceJournal
 
 
 class PlanDecisionService:
@@ -20,6 +21,7 @@ class PlanDecisionService:
         action_args_json: Optional[Dict[str, Any]],
         metrics_json: Optional[Dict[str, Any]],
         context_snapshot_id: Optional[str] = None,
+        journal: Optional[TraceJournal] = None,
     ) -> PlanDecision:
         frame = PlanDecision(
             agent_execution_id=agent_execution_id,
@@ -35,6 +37,8 @@ class PlanDecisionService:
             metrics_json=metrics_json,
             context_snapshot_id=context_snapshot_id,
         )
+        if journal is not None and journal.accepts(db):
+            return await journal.record(frame)
         db.add(frame)
         await db.commit()
         await db.refresh(frame)
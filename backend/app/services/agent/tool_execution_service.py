@@ -2,6 +2,7 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.tool_execution import ToolExecution
+from app.services.agent.trace_journal import TraceJournal
 
 
 class ToolExecutionService:
@@ -16,6 +17,7 @@ class ToolExecutionService:
         arguments_json: Dict[str, Any],
         attempt_number: int = 1,
         max_retries: int = 0,
+        journal: Optional[TraceJournal] = None,
     ) -> ToolExecution:
         te = ToolExecution(
             agent_execution_id=agent_execution_id,
@@ -29,6 +31,9 @@ class ToolExecutionService:
             attempt_number=attempt_number,
             max_retries=max_retries,
         )
+        if journal is not None and journal.accepts(db):
+            # Flushed right away: the tool may reference this row from its own session
+            return await journal.record(te, flush=True)
         db.add(te)
         await db.commit()
         await db.refresh(te)
@@ -48,6 +53,7 @@ class ToolExecutionService:
         created_step_id: Optional[str] = None,
         error_message: Optional[str] = None,
         token_usage_json: Optional[Dict[str, Any]] = None,
+        journal: Optional[TraceJournal] = None,
     ) -> ToolExecution:
         te.status = status
         te.success = success
@@ -61,6 +67,8 @@ class ToolExecutionService:
         te.created_step_id = created_step_id
         te.error_message = error_message
         te.token_usage_json = token_usage_json
+        if journal is not None and journal.accepts(db):
+            return await journal.record(te)
         db.add(te)
         await db.commit()
         await db.refresh(te)
@@ -0,0 +1,276 @@
+"""
+Trace Journal - write-behind batching of agent execution trace rows.
+
+An agent run used to commit (and re-select) its session for every plan
+decision frame, tool execution start/finish and completion block update, so
+a single run did dozens to hundreds of commits on the streaming path.
+
+Trace rows are now staged on the run's session and committed together:
+
+- when ``max_batch`` rows are pending, or the oldest pending row is older
+  than ``max_delay_seconds`` (checked whenever a row is recorded)
+- on a timer after ``max_delay_seconds``, while the run is inside an idle
+  window (``while_idle``/``idle_iter``), i.e. waiting on the LLM planner.
+  The run's AsyncSession must not be used concurrently, so the timer only
+  fires while the caller has declared it isn't touching the session; the
+  window doesn't close until an in-flight timed flush has finished.
+- when an idle window opens while the session has flushed but uncommitted
+  writes (a read autoflushed staged rows, or other changes): that open
+  transaction holds the database write lock (all of SQLite), so it is
+  committed before the wait instead of for the length of an LLM call
+- when a caller asks for it (``flush=True``), e.g. before a tool runs, since
+  tools use their own sessions and may reference the tool execution row
+- when the run ends (``close``)
+
+Primary keys and timestamps are assigned when a row is staged so callers can
+link rows (block -> decision -> tool execution) before anything is flushed;
+reads on the same session autoflush, so the agent always sees its own rows.
+
+If a commit fails, the pending rows are snapshotted, the session is rolled
+back and the rows are merged through a fresh session so a crash in the run
+doesn't lose its trace. The rollback expires every object in the run's
+session and expunges the new rows, and AsyncSession can't lazy-load on
+attribute access, so afterwards recovered new rows are re-attached as
+persistent and all expired objects (completion, execution, step, ...) are
+explicitly refreshed.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_BATCH = 50
+DEFAULT_MAX_DELAY_SECONDS = 1.0
+
+T = TypeVar("T")
+
+
+class TraceJournal:
+    """Per-run write-behind journal bound to one AsyncSession."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        *,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay_seconds: float = DEFAULT_MAX_DELAY_SECONDS,
+        recovery_session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
+        self.db = db
+        self.max_batch = max(1, max_batch)
+        self.max_delay_seconds = max_delay_seconds
+        self.closed = False
+        self._pending: Dict[int, Any] = {}
+        self._oldest_pending_at: Optional[float] = None
+        self._recovery_session_factory = recovery_session_factory
+        # Serializes flushes (caller-driven and timed) on the run's session
+        self._lock = asyncio.Lock()
+        self._idle_depth = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timed_flush: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {
+            "staged": 0, "commits": 0, "timed_commits": 0, "recovered": 0, "lost": 0,
+        }
+        # Whether the session's current transaction has written anything
+        self._writes_open = False
+        self._listeners = (
+            ("after_flush", self._on_flush),
+            ("after_commit", self._on_transaction_end),
+            ("after_rollback", self._on_transaction_end),
+        )
+        for name, listener in self._listeners:
+            event.listen(db.sync_session, name, listener)
+
+    def _on_flush(self, session, flush_context) -> None:
+        self._writes_open = True
+
+    def _on_transaction_end(self, session) -> None:
+        self._writes_open = False
+
+    def accepts(self, db: AsyncSession) -> bool:
+        return not self.closed and db is self.db
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def stage(self, obj: Any) -> Any:
+        """Add ``obj`` to the session without committing."""
+        now = datetime.utcnow()
+        if hasattr(obj, "id") and getattr(obj, "id", None) is None:
+            obj.id = str(uuid.uuid4())
+        if hasattr(obj, "created_at") and getattr(obj, "created_at", None) is None:
+            obj.created_at = now
+        if hasattr(obj, "updated_at"):
+            obj.updated_at = now
+        self.db.add(obj)
+        if id(obj) not in self._pending:
+            self._pending[id(obj)] = obj
+            self.stats["staged"] += 1
+        if self._oldest_pending_at is None:
+            self._oldest_pending_at = time.monotonic()
+            self._arm_timer()
+        return obj
+
+    async def record(self, obj: Any, *, flush: bool = False) -> Any:
+        """Stage ``obj`` and flush if requested or a threshold is reached."""
+        self.stage(obj)
+        if flush or self._due():
+            await self.flush()
+        return obj
+
+    def _due(self) -> bool:
+        if len(self._pending) >= self.max_batch:
+            return True
+        return (
+            self._oldest_pending_at is not None
+            and (time.monotonic() - self._oldest_pending_at) >= self.max_delay_seconds
+        )
+
+    async def flush(self) -> None:
+        """Commit all pending rows in one transaction."""
+        async with self._lock:
+            await self._flush_locked()
+
+    async def _flush_locked(self) -> None:
+        self._cancel_timer()
+        if not self._pending and not self._writes_open:
+            return
+        pending = list(self._pending.values())
+        self._pending.clear()
+        self._oldest_pending_at = None
+        try:
+            await self.db.commit()
+            self.stats["commits"] += 1
+        except Exception as e:
+            logger.warning(f"Trace journal commit failed ({len(pending)} rows), recovering: {e}")
+            await self._recover(pending)
+
+    async def close(self) -> None:
+        """Final flush; later writes go straight to the session again."""
+        if self.closed:
+            return
+        try:
+            await self.flush()
+        finally:
+            self.closed = True
+            self._cancel_timer()
+            for name, listener in self._listeners:
+                event.remove(self.db.sync_session, name, listener)
+
+    # ----- idle windows and the delay timer -----
+
+    async def while_idle(self, awaitable: Awaitable[T]) -> T:
+        """Await ``awaitable``, which must not use the run's session, letting due rows flush meanwhile."""
+        if self._writes_open and self._idle_depth == 0:
+            # Don't hold the write transaction open across the wait
+            await self.flush()
+        self._idle_depth += 1
+        self._arm_timer()
+        try:
+            return await awaitable
+        finally:
+            self._idle_depth -= 1
+            if self._idle_depth == 0:
+                self._cancel_timer()
+            task = self._timed_flush
+            if task is not None and not task.done():
+                # The caller may use the session as soon as we return
+                await asyncio.shield(task)
+
+    async def idle_iter(self, iterable: AsyncIterable[T]) -> AsyncIterator[T]:
+        """Iterate ``iterable``, treating each wait for the next item as an idle window."""
+        iterator = iterable.__aiter__()
+        while True:
+            try:
+                item = await self.while_idle(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+            yield item
+
+    def _arm_timer(self) -> None:
+        if self._timer is not None or self._idle_depth == 0 or self._oldest_pending_at is None or self.closed:
+            return
+        delay = max(0.0, self.max_delay_seconds - (time.monotonic() - self._oldest_pending_at))
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        if self._idle_depth == 0 or not self._pending or self.closed:
+            return
+        if self._timed_flush is not None and not self._timed_flush.done():
+            return
+        self._timed_flush = asyncio.create_task(self._run_timed_flush())
+
+    async def _run_timed_flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            await self._flush_locked()
+            self.stats["timed_commits"] += 1
+
+    async def _recover(self, pending: List[Any]) -> None:
+        snapshots = []
+        for obj in pending:
+            try:
+                mapper = sa_inspect(obj).mapper
+                values = {attr.key: obj.__dict__[attr.key] for attr in mapper.column_attrs if attr.key in obj.__dict__}
+                snapshots.append((mapper.class_, values))
+            except Exception:
+                self.stats["lost"] += 1
+        try:
+            await self.db.rollback()
+        except Exception:
+            pass
+
+        session_factory = self._recovery_session_factory
+        if session_factory is None:
+            from app.settings.database import create_async_session_factory, BACKGROUND_POOL
+            session_factory = create_async_session_factory(BACKGROUND_POOL)
+        recovered = False
+        try:
+            async with session_factory() as session:
+                for cls, values in snapshots:
+                    await session.merge(cls(**values))
+                await session.commit()
+            self.stats["recovered"] += len(snapshots)
+            recovered = True
+        except Exception as e:
+            self.stats["lost"] += len(snapshots)
+            logger.error(f"Trace journal recovery failed, {len(snapshots)} trace rows lost: {e}")
+        await self._reload_after_rollback(pending, recovered)
+
+    async def _reload_after_rollback(self, pending: List[Any], recovered: bool) -> None:
+        """Make the run's session usable again after the rollback in ``_recover``."""
+        if recovered:
+            # New rows were expunged by the rollback; they now exist, so attach them as persistent
+            for obj in pending:
+                try:
+                    if sa_inspect(obj).transient:
+                        make_transient_to_detached(obj)
+                        self.db.add(obj)
+                except Exception as e:
+                    logger.debug(f"Trace journal could not re-attach {obj!r}: {e}")
+        # Everything else was expired; load it now rather than on (async-unsafe) attribute access
+        for obj in list(self.db.identity_map.values()):
+            if not sa_inspect(obj).expired_attributes:
+                continue
+            try:
+                await self.db.refresh(obj)
+            except Exception as e:
+                logger.debug(f"Trace journal could not refresh {obj!r} after rollback: {e}")
@@ -13,6 +13,7 @@ from app.models.instruction import Instruction
 from app.models.organization import Organization
 from app.models.user import User
 from app.models.eval import TestRun
+from app.ai.context.instruction_index import instruction_index_cache
 
 import logging
 logger = logging.getLogger(__name__)
@@ -463,6 +464,7 @@ class BuildService:
                     branch=build.branch,
                 )
             await db.commit()
+            instruction_index_cache.invalidate_organization(build.organization_id)
             await db.refresh(existing_content)
             return existing_content
         else:
@@ -484,6 +486,7 @@ class BuildService:
                 branch=build.branch,
             )
             await db.commit()
+            instruction_index_cache.invalidate_organization(build.organization_id)
             await db.refresh(content)
             return content
     
@@ -529,6 +532,7 @@ class BuildService:
             branch=build.branch,
         )
         await db.commit()
+        instruction_index_cache.invalidate_organization(build.organization_id)
         return True
     
     async def get_build_contents(
@@ -756,6 +760,7 @@ class BuildService:
                 instruction.current_version_id = content.instruction_version_id
         
         await db.commit()
+        instruction_index_cache.invalidate_organization(build.organization_id)
         await db.refresh(build)
         return build
     
@@ -272,7 +272,7 @@ class CompletionService:
 
             clients = {}
             for data_source in report.data_sources:
-                clients[data_source.name] = await self.data_source_service.construct_client(db, data_source, current_user)
+                clients[data_source.name] = await self.data_source_service.construct_client(db, data_source, current_user, query_cache=True)
             # Pre-load files relationship in async context to avoid greenlet error in AgentV2.__init__
             _ = report.files
 
@@ -475,7 +475,7 @@ class CompletionService:
                             
                             clients = {}
                             for data_source in report_obj.data_sources:
-                                clients[data_source.name] = await self.data_source_service.construct_client(session, data_source, current_user)
+                                clients[data_source.name] = await self.data_source_service.construct_client(session, data_source, current_user, query_cache=True)
                             # Pre-load files relationship in async context to avoid greenlet error in AgentV2.__init__
                             _ = report_obj.files
 
@@ -525,7 +525,7 @@ class CompletionService:
                     # Foreground execution (wait and return final v2)
                     clients = {}
                     for data_source in report.data_sources:
-                        clients[data_source.name] = await self.data_source_service.construct_client(db, data_source, current_user)
+                        clients[data_source.name] = await self.data_source_service.construct_client(db, data_source, current_user, query_cache=True)
                     # Pre-load files relationship in async context to avoid greenlet error in AgentV2.__init__
                     _ = report.files
                     agent = AgentV2(
@@ -1474,7 +1474,7 @@ class CompletionService:
                         
                         clients = {}
                         for data_source in report_obj.data_sources:
-                            clients[data_source.name] = await self.data_source_service.construct_client(session, data_source, current_user)
+                            clients[data_source.name] = await self.data_source_service.construct_client(session, data_source, current_user, query_cache=True)
 
                         # Pre-load files relationship in async context to avoid greenlet error in AgentV2.__init__
                         # (AgentV2.__init__ is synchronous, so lazy-loading files there would fail)
@@ -1598,22 +1598,27 @@ class CompletionService:
                         "user_prompt": completion_data.prompt.content,
                     }
                 )
-                yield format_sse_event(start_event)
-                
-                # Stream agent events
-                async for event in event_queue.get_events():
-                    yield format_sse_event(event)
-                
-                # Send completion event
-                finish_event = SSEEvent(
-                    event="completion.finished",
-                    completion_id=str(completion.id),
-                    data={
-                        "system_completion_id": str(system_completion.id),
-                    }
-                )
-                yield format_sse_event(finish_event)
-                yield "data: [DONE]\n\n"
+                try:
+                    yield format_sse_event(start_event)
+
+                    # Stream agent events
+                    async for event in event_queue.get_events():
+                        yield format_sse_event(event)
+
+                    # Send completion event
+                    finish_event = SSEEvent(
+                        event="completion.finished",
+                        completion_id=str(completion.id),
+                        data={
+                            "system_completion_id": str(system_completion.id),
+                        }
+                    )
+                    yield format_sse_event(finish_event)
+                    yield "data: [DONE]\n\n"
+                finally:
+                    # Client disconnected (or the stream was cancelled) at any point,
+                    # including before get_events was entered: release the agent
+                    event_queue.close()
 
             # Return streaming response
             return StreamingResponse(
@@ -2,11 +2,12 @@
 Connection Service - Handles connection-level operations.
 Extracted from DataSourceService for the domain-connection architecture.
 """
+import asyncio
 import importlib
 import logging
 import json
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 import uuid as uuid_module
 
@@ -23,9 +24,30 @@ from app.models.user import User
 from app.models.user_connection_credentials import UserConnectionCredentials
 from app.models.user_connection_overlay import UserConnectionTable, UserConnectionColumn
 from app.schemas.data_source_registry import resolve_client_class, list_available_data_sources
+from app.data_sources.clients.engine_registry import engine_registry
+from app.data_sources.clients.discovery import discovery_progress, table_scope
+from app.services.schema_graph_analytics import schema_graph_analytics
 
 logger = logging.getLogger(__name__)
 
+_schema_refresh_config: Optional[Dict[str, Any]] = None
+
+
+def schema_refresh_config() -> Dict[str, Any]:
+    """Settings from ``schema_refresh`` in bow_config (cached)."""
+    global _schema_refresh_config
+    if _schema_refresh_config is None:
+        config = {"incremental": True, "scheduled_enabled": True, "scheduled_interval_minutes": 60}
+        try:
+            from app.settings.config import settings
+            cfg = getattr(settings.bow_config, "schema_refresh", None)
+            if cfg is not None:
+                config.update({k: v for k, v in cfg.model_dump().items() if v is not None})
+        except Exception:
+            pass
+        _schema_refresh_config = config
+    return _schema_refresh_config
+
 
 class ConnectionService:
     """Service for managing database connections."""
@@ -164,6 +186,7 @@ class ConnectionService:
 
         # Track if connection-relevant fields changed
         connection_changed = False
+        previous_engine_identity = self._engine_identity(connection)
 
         if "config" in updates:
             new_config = updates.pop("config")
@@ -180,6 +203,10 @@ class ConnectionService:
             if value is not None and hasattr(connection, field):
                 setattr(connection, field, value)
 
+        if connection_changed:
+            # Fingerprints describe the previous target; next refresh scans everything
+            connection.schema_fingerprints = None
+
         # Revalidate if connection fields changed
         if connection_changed and connection.auth_policy == "system_only":
             current_config = json.loads(connection.config) if isinstance(connection.config, str) else connection.config
@@ -200,6 +227,10 @@ class ConnectionService:
         try:
             await db.commit()
 
+            # Pooled engines built from the old config/credentials are stale now
+            if connection_changed and previous_engine_identity:
+                engine_registry.invalidate(previous_engine_identity)
+
             # Refresh tables if connection changed
             if connection_changed and connection.auth_policy == "system_only":
                 await self.refresh_schema(db=db, connection=connection)
@@ -231,10 +262,14 @@ class ConnectionService:
             )
 
         # Tables and credentials will cascade delete
+        previous_engine_identity = self._engine_identity(connection)
 
         await db.delete(connection)
         await db.commit()
 
+        if previous_engine_identity:
+            engine_registry.invalidate(previous_engine_identity)
+
         return {"message": "Connection deleted successfully"}
 
     def test_connection_params(
@@ -319,24 +354,79 @@ class ConnectionService:
                 "message": str(e)
             }
 
+    async def _schema_fingerprints(self, client) -> Optional[Dict[str, str]]:
+        """Catalog fingerprint per schema, or None when the client can't provide them."""
+        if not hasattr(client, "get_schema_fingerprints"):
+            return None
+        try:
+            fingerprints = await asyncio.to_thread(client.get_schema_fingerprints)
+        except Exception as e:
+            logger.warning(f"refresh_schema: Fingerprinting failed, falling back to a full scan: {e}")
+            return None
+        return {str(scope): str(fp) for scope, fp in (fingerprints or {}).items()}
+
     async def refresh_schema(
         self,
         db: AsyncSession,
         connection: Connection,
         current_user: User = None,
+        full: bool = False,
     ) -> List[ConnectionTable]:
-        """Refresh schema and update ConnectionTable records."""
+        """Refresh schema and update ConnectionTable records.
+
+        Clients that expose catalog fingerprints (see
+        app.data_sources.clients.discovery) are refreshed incrementally: only
+        schemas whose fingerprint differs from the one stored on the connection
+        are re-introspected. ``full=True`` forces a complete scan.
+        """
         try:
             logger.info(f"refresh_schema: Starting for connection {connection.id} (type={connection.type}, auth_policy={connection.auth_policy})")
             client = await self.construct_client(db, connection, current_user)
             logger.info(f"refresh_schema: Client constructed successfully, calling get_schemas()...")
-            fresh_tables = client.get_schemas()
+            # Off the event loop, so progress can be polled while discovery runs
+            progress = discovery_progress.begin(str(connection.id))
+            client.progress_reporter = progress
+            # Scopes to reconcile; None means every table (full scan)
+            changed_scopes = None
+            try:
+                # Taken before the scan, so changes made during it show up next time
+                fingerprints = await self._schema_fingerprints(client)
+                previous = connection.schema_fingerprints or {}
+                if fingerprints is not None and previous and not full and schema_refresh_config()["incremental"]:
+                    changed_scopes = {scope for scope, fp in fingerprints.items() if previous.get(scope) != fp}
+                    changed_scopes |= {scope for scope in previous if scope not in fingerprints}
+                    fresh_scopes = sorted(scope for scope in changed_scopes if scope in fingerprints)
+                    logger.info(
+                        f"refresh_schema: {len(changed_scopes)} of {len(fingerprints)} schemas changed; "
+                        f"re-introspecting {fresh_scopes}"
+                    )
+                    fresh_tables = (
+                        await asyncio.to_thread(client.get_tables_in_schemas, fresh_scopes)
+                        if fresh_scopes else []
+                    )
+                else:
+                    fresh_tables = await asyncio.to_thread(client.get_schemas)
+            except Exception as e:
+                progress.finish(error=str(e) or e.__class__.__name__)
+                raise
+            progress.finish()
+
+            connection_id_str = str(connection.id)
+            if changed_scopes is not None and not changed_scopes:
+                # Nothing moved since the last refresh
+                connection.last_synced_at = datetime.utcnow()
+                await db.commit()
+                result = await db.execute(
+                    select(ConnectionTable)
+                    .filter(ConnectionTable.connection_id == connection_id_str)
+                )
+                return result.scalars().all()
 
             logger.info(f"refresh_schema: Got {len(fresh_tables) if fresh_tables else 0} tables from database")
             if fresh_tables and len(fresh_tables) > 0:
                 logger.info(f"refresh_schema: First table name: {getattr(fresh_tables[0], 'name', 'N/A')}")
 
-            if not fresh_tables:
+            if not fresh_tables and changed_scopes is None:
                 logger.warning(f"refresh_schema: No tables returned from get_schemas()")
                 return []
 
@@ -372,7 +462,6 @@ class ConnectionService:
                     }
 
             # Get existing tables - ensure connection_id is string
-            connection_id_str = str(connection.id)
             logger.info(f"refresh_schema: Looking for existing tables with connection_id={connection_id_str}")
 
             existing_q = await db.execute(
@@ -411,8 +500,13 @@ class ConnectionService:
             logger.info(f"refresh_schema: Created {created_count}, updated {updated_count} ConnectionTable records")
 
             # Delete ConnectionTable entries for tables that no longer exist in the database
+            # (only within the re-introspected schemas on an incremental refresh)
             deleted_count = 0
             for existing_name, existing_table in existing_tables.items():
+                if changed_scopes is not None and table_scope(
+                    client, existing_name, existing_table.metadata_json
+                ) not in changed_scopes:
+                    continue
                 if existing_name not in incoming:
                     await db.delete(existing_table)
                     deleted_count += 1
@@ -423,9 +517,12 @@ class ConnectionService:
             # NOTE: our SQLAlchemy DateTime columns are stored as TIMESTAMP WITHOUT TIME ZONE,
             # so we must write naive UTC datetimes (asyncpg will error on tz-aware datetimes).
             connection.last_synced_at = datetime.utcnow()
+            if fingerprints is not None:
+                connection.schema_fingerprints = fingerprints
             logger.info(f"refresh_schema: Committing {created_count} new tables to database...")
             await db.commit()
             logger.info(f"refresh_schema: Commit successful")
+            schema_graph_analytics.schedule(connection_id=connection_id_str)
 
             # Return all tables
             result = await db.execute(
@@ -510,6 +607,16 @@ class ConnectionService:
             
         return row.decrypt_credentials()
 
+    def _engine_identity(self, connection: Connection) -> Optional[dict]:
+        """Pooled-engine identity for a connection's system config, if its client pools engines."""
+        try:
+            config = json.loads(connection.config) if isinstance(connection.config, str) else (connection.config or {})
+            credentials = connection.decrypt_credentials() if connection.auth_policy == "system_only" else {}
+            client = self._resolve_client_by_type(connection.type, config, credentials)
+            return getattr(client, "engine_identity", None)
+        except Exception:
+            return None
+
     def _resolve_client_by_type(
         self,
         data_source_type: str,
@@ -576,3 +683,57 @@ class ConnectionService:
                 "table_count": 0,
             }
 
+
+async def refresh_all_connection_schemas() -> int:
+    """Scheduled job: incrementally refresh system-credential connections that support fingerprints.
+
+    Connectors without change detection are skipped, since each refresh
+    would be a full scan. Domains of a connection whose schema moved get
+    their tables re-synced. Returns the number of connections refreshed.
+    """
+    from app.dependencies import async_session_maker
+    from app.services.data_source_service import DataSourceService
+
+    if not schema_refresh_config()["scheduled_enabled"]:
+        return 0
+    async with async_session_maker() as session:
+        rows = (
+            await session.execute(
+                select(Connection.id, Connection.type).filter(
+                    Connection.is_active == True,
+                    Connection.auth_policy == "system_only",
+                )
+            )
+        ).all()
+
+    connection_ids = []
+    for connection_id, connection_type in rows:
+        try:
+            client_class = resolve_client_class(connection_type)
+        except Exception:
+            continue
+        if hasattr(client_class, "get_schema_fingerprints"):
+            connection_ids.append(str(connection_id))
+
+    service = ConnectionService()
+    data_source_service = DataSourceService()
+    refreshed = 0
+    for connection_id in connection_ids:
+        try:
+            async with async_session_maker() as session:
+                connection = (
+                    await session.execute(select(Connection).filter(Connection.id == connection_id))
+                ).scalar_one_or_none()
+                if connection is None:
+                    continue
+                before = dict(connection.schema_fingerprints or {})
+                await service.refresh_schema(db=session, connection=connection)
+                if (connection.schema_fingerprints or {}) != before:
+                    for data_source in connection.data_sources:
+                        await data_source_service.sync_domain_tables_from_connection(
+                            session, data_source, connection, max_auto_select=None
+                        )
+            refreshed += 1
+        except Exception as e:
+            logger.warning(f"Scheduled schema refresh failed for connection {connection_id}: {e}")
+    return refreshed
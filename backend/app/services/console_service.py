@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text, literal, Integer
+from sqlalchemy import select, func, text, literal, Integer, case
 from app.models.organization import Organization
 from app.models.user import User
 from app.models.completion import Completion
@@ -25,6 +25,7 @@ from app.settings.logging_config import get_logger
 from collections import Counter, defaultdict
 import json
 import re
+import time
 from pydantic import BaseModel
 from app.models.membership import Membership
 from app.models.tool_execution import ToolExecution
@@ -48,6 +49,38 @@ from app.models.instruction_build import InstructionBuild
 
 logger = get_logger(__name__)
 
+
+class _TTLCache:
+    """Small per-process cache for console results that are reloaded often."""
+
+    def __init__(self, ttl_seconds: int = 60, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Any, tuple] = {}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() > expires_at:
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def put(self, key, value):
+        if len(self._entries) >= self.max_entries:
+            now = time.monotonic()
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+
+# Timeseries charts are re-requested on every console load; 60s staleness is fine
+_timeseries_cache = _TTLCache(ttl_seconds=60)
+
+
 class ConsoleService:
     
     def _to_utc_naive(self, dt: Optional[datetime]) -> Optional[datetime]:
@@ -284,25 +317,121 @@ class ConsoleService:
         # Your existing implementation here
         pass
 
+    def _date_bucket(self, db: AsyncSession, column, granularity: str):
+        """SQL expression truncating ``column`` to the start of its day/week/month bucket."""
+        bind = db.get_bind()
+        dialect_name = bind.dialect.name if bind else "sqlite"
+        if dialect_name == "postgresql":
+            return func.date_trunc(granularity, column)
+        # SQLite: ISO weeks start on Monday, like Postgres date_trunc('week')
+        if granularity == "week":
+            return func.date(column, "weekday 0", "-6 days")
+        if granularity == "month":
+            return func.strftime("%Y-%m-01", column)
+        return func.date(column)
+
+    @staticmethod
+    def _bucket_key(value) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%d')
+        return str(value)[:10]
+
+    @staticmethod
+    def _bucket_starts(start_date: datetime, end_date: datetime, granularity: str) -> List[datetime]:
+        """All bucket start dates covering [start_date, end_date], in order."""
+        current = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        if granularity == "week":
+            current = current - timedelta(days=current.weekday())
+        elif granularity == "month":
+            current = current.replace(day=1)
+        starts = []
+        while current <= end_date:
+            starts.append(current)
+            if granularity == "week":
+                current = current + timedelta(days=7)
+            elif granularity == "month":
+                current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+            else:
+                current = current + timedelta(days=1)
+        return starts
+
     async def get_timeseries_metrics(
         self, 
         db: AsyncSession, 
         organization: Organization, 
         params: MetricsQueryParams
     ) -> TimeSeriesMetrics:
-        """Get time-series metrics data for charts"""
-        
+        """Get time-series metrics data for charts.
+
+        Each metric family is computed with one GROUP BY bucket query over the
+        whole range; results are cached briefly per org and query.
+        """
         start_date, end_date = self._normalize_date_range(params.start_date, params.end_date)
-        
-        # Generate daily intervals
-        intervals = []
-        current = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        while current <= end_date:
-            next_day = current + timedelta(days=1)
-            intervals.append((current, next_day))
-            current = next_day
-        
-        # Get data for each day
+        granularity = getattr(params, "granularity", None) or "day"
+        fill_gaps = bool(getattr(params, "fill_gaps", False))
+
+        cache_key = (str(organization.id), start_date, end_date, granularity, fill_gaps)
+        cached = _timeseries_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Completions: messages, accuracy and judge metrics
+        completion_bucket = self._date_bucket(db, Completion.created_at, granularity).label("bucket")
+        judged = Completion.instructions_effectiveness.isnot(None)
+        completions_result = await db.execute(
+            select(
+                completion_bucket,
+                func.count(Completion.id).label("total"),
+                func.sum(Completion.response_score).label("response_score_sum"),
+                func.avg(Completion.instructions_effectiveness).label("avg_instructions_effectiveness"),
+                func.avg(case((judged, Completion.context_effectiveness), else_=None)).label("avg_context_effectiveness"),
+                func.avg(case((judged, Completion.response_score), else_=None)).label("avg_response_score"),
+            )
+            .join(Report)
+            .where(
+                Report.organization_id == organization.id,
+                Completion.created_at >= start_date,
+                Completion.created_at <= end_date,
+            )
+            .group_by(completion_bucket)
+        )
+        completions_by_bucket = {self._bucket_key(row.bucket): row for row in completions_result.all()}
+
+        # Queries (steps)
+        step_bucket = self._date_bucket(db, Step.created_at, granularity).label("bucket")
+        steps_result = await db.execute(
+            select(step_bucket, func.count(Step.id).label("total"))
+            .join(Widget).join(Report)
+            .where(
+                Report.organization_id == organization.id,
+                Step.created_at >= start_date,
+                Step.created_at <= end_date,
+            )
+            .group_by(step_bucket)
+        )
+        queries_by_bucket = {self._bucket_key(row.bucket): int(row.total or 0) for row in steps_result.all()}
+
+        # Feedback
+        feedback_bucket = self._date_bucket(db, CompletionFeedback.created_at, granularity).label("bucket")
+        feedback_result = await db.execute(
+            select(
+                feedback_bucket,
+                func.count(CompletionFeedback.id).label("total"),
+                func.sum(case((CompletionFeedback.direction > 0, 1), else_=0)).label("positive"),
+            )
+            .join(Completion, CompletionFeedback.completion_id == Completion.id)
+            .join(Report, Completion.report_id == Report.id)
+            .where(
+                Report.organization_id == organization.id,
+                CompletionFeedback.created_at >= start_date,
+                CompletionFeedback.created_at <= end_date,
+            )
+            .group_by(feedback_bucket)
+        )
+        feedback_by_bucket = {self._bucket_key(row.bucket): row for row in feedback_result.all()}
+
         messages_data = []
         queries_data = []
         accuracy_data = []
@@ -317,108 +446,28 @@ class ConsoleService:
         last_context_effectiveness = 0.0
         last_response_quality = 0.0
         
-        for interval_start, interval_end in intervals:
-            # Messages count for this day
-            messages_result = await db.execute(
-                select(func.count(Completion.id))
-                .join(Report)
-                .where(
-                    Report.organization_id == organization.id,
-                    Completion.created_at >= interval_start,
-                    Completion.created_at < interval_end
-                )
-            )
-            messages_count = messages_result.scalar() or 0
-            
-            # Queries count for this day
-            queries_result = await db.execute(
-                select(func.count(Step.id))
-                .join(Widget).join(Report)
-                .where(
-                    Report.organization_id == organization.id,
-                    Step.created_at >= interval_start,
-                    Step.created_at < interval_end
-                )
-            )
-            queries_count = queries_result.scalar() or 0
-            
-            # Calculate accuracy rate from response scores for this day
-            # Count ALL completions for this day
-            total_completions_result = await db.execute(
-                select(func.count(Completion.id))
-                .join(Report)
-                .where(
-                    Report.organization_id == organization.id,
-                    Completion.created_at >= interval_start,
-                    Completion.created_at < interval_end
-                )
-            )
-            total_completions = total_completions_result.scalar() or 0
-            
-            # Sum response scores (only non-null ones)
-            response_score_result = await db.execute(
-                select(func.sum(Completion.response_score))
-                .join(Report)
-                .where(
-                    Report.organization_id == organization.id,
-                    Completion.created_at >= interval_start,
-                    Completion.created_at < interval_end,
-                    Completion.response_score.isnot(None)
-                )
-            )
-            response_score_sum = response_score_result.scalar() or 0
+        # Walk every bucket in the range (gap-filling) so smoothing carries across empty ones
+        for bucket_start in self._bucket_starts(start_date, end_date, granularity):
+            date_str = bucket_start.strftime('%Y-%m-%d')
+            completion_row = completions_by_bucket.get(date_str)
+            feedback_row = feedback_by_bucket.get(date_str)
+
+            messages_count = int(completion_row.total or 0) if completion_row else 0
+            queries_count = queries_by_bucket.get(date_str, 0)
             
             # Calculate accuracy: sum of scores / total completions * 20
-            accuracy_rate = (response_score_sum / total_completions * 20) if total_completions > 0 else 0
-            
-            # Positive feedback rate for this day (for feedback metric)
-            total_feedbacks_result = await db.execute(
-                select(func.count(CompletionFeedback.id))
-                .join(Completion, CompletionFeedback.completion_id == Completion.id)
-                .join(Report, Completion.report_id == Report.id)
-                .where(
-                    Report.organization_id == organization.id,
-                    CompletionFeedback.created_at >= interval_start,
-                    CompletionFeedback.created_at < interval_end
-                )
-            )
-            total_feedbacks = total_feedbacks_result.scalar() or 0
+            response_score_sum = (completion_row.response_score_sum or 0) if completion_row else 0
+            accuracy_rate = (response_score_sum / messages_count * 20) if messages_count > 0 else 0
             
-            positive_feedbacks_result = await db.execute(
-                select(func.count(CompletionFeedback.id))
-                .join(Completion, CompletionFeedback.completion_id == Completion.id)
-                .join(Report, Completion.report_id == Report.id)
-                .where(
-                    Report.organization_id == organization.id,
-                    CompletionFeedback.created_at >= interval_start,
-                    CompletionFeedback.created_at < interval_end,
-                    CompletionFeedback.direction > 0
-                )
-            )
-            positive_feedbacks = positive_feedbacks_result.scalar() or 0
+            # Positive feedback rate for this bucket
+            total_feedbacks = int(feedback_row.total or 0) if feedback_row else 0
+            positive_feedbacks = int(feedback_row.positive or 0) if feedback_row else 0
             positive_rate = (positive_feedbacks / total_feedbacks * 100) if total_feedbacks > 0 else 0
             
-            # Calculate judge metrics for this day
-            judge_metrics_result = await db.execute(
-                select(
-                    func.avg(Completion.instructions_effectiveness).label('avg_instructions_effectiveness'),
-                    func.avg(Completion.context_effectiveness).label('avg_context_effectiveness'),
-                    func.avg(Completion.response_score).label('avg_response_score')
-                )
-                .join(Report)
-                .where(
-                    Report.organization_id == organization.id,
-                    Completion.created_at >= interval_start,
-                    Completion.created_at < interval_end,
-                    Completion.instructions_effectiveness.isnot(None)
-                )
-            )
-            judge_data = judge_metrics_result.first()
-            
             # Apply smoothing logic and convert to 1-100 scale
-            current_instructions_effectiveness = (judge_data.avg_instructions_effectiveness or 0.0) * 20
-            current_context_effectiveness = (judge_data.avg_context_effectiveness or 0.0) * 20
-            current_response_quality = (judge_data.avg_response_score or 0.0) * 20
+            current_instructions_effectiveness = float((completion_row.avg_instructions_effectiveness if completion_row else None) or 0.0) * 20
+            current_context_effectiveness = float((completion_row.avg_context_effectiveness if completion_row else None) or 0.0) * 20
+            current_response_quality = float((completion_row.avg_response_score if completion_row else None) or 0.0) * 20
             
             # For smoothing: if no queries (scores are 0), keep last non-zero value
             if current_instructions_effectiveness > 0:
@@ -436,12 +485,10 @@ class ConsoleService:
             elif last_response_quality > 0:
                 current_response_quality = last_response_quality
             
-            # Show all days with activity (messages or queries)
+            # Show all buckets with activity (messages or queries), or every bucket when filling gaps
             has_activity = messages_count > 0 or queries_count > 0
             
-            if has_activity:
-                date_str = interval_start.strftime('%Y-%m-%d')
-                
+            if has_activity or fill_gaps:
                 # Create TimeSeriesPoint objects
                 messages_data.append(TimeSeriesPoint(date=date_str, value=messages_count))
                 queries_data.append(TimeSeriesPoint(date=date_str, value=queries_count))
@@ -454,7 +501,7 @@ class ConsoleService:
                 response_quality_data.append(TimeSeriesPointFloat(date=date_str, value=current_response_quality))
                 feedback_data.append(TimeSeriesPointFloat(date=date_str, value=positive_rate))
         
-        return TimeSeriesMetrics(
+        result = TimeSeriesMetrics(
             date_range=DateRange(
                 start=start_date.isoformat(),
                 end=end_date.isoformat()
@@ -472,6 +519,8 @@ class ConsoleService:
                 positive_feedback_rate=feedback_data
             )
         )
+        _timeseries_cache.put(cache_key, result)
+        return result
 
     async def get_compact_issues(
         self,
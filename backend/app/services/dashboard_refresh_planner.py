@@ -0,0 +1,234 @@
+"""
+Dashboard Refresh Planner
+
+Plans and runs the step reruns behind a dashboard refresh
+(``ReportService.rerun_report_steps``).
+
+The refresh used to walk the layout's visualization blocks one by one,
+loading each visualization, query and step separately and awaiting
+``StepService.rerun_step`` before moving on, so a dashboard took the sum of
+its query latencies and the first bad tile aborted the rest.
+
+- ``plan`` batch-loads the visualization, query and step rows (ids and code
+  only; the ORM relationships on these models eagerly load whole graphs) and
+  groups tiles by the step that backs them, so a step shared by several tiles
+  runs once.
+- ``execute`` reruns the distinct steps concurrently, each in its own session,
+  bounded by ``dashboard_refresh.max_concurrency`` overall and
+  ``per_data_source_concurrency`` per data source. A step's data sources are
+  the report data sources its code refers to by name (all of them when none
+  match).
+- Failures are recorded per tile instead of raised; the summary carries each
+  tile's status, error and timing.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.query import Query
+from app.models.step import Step
+from app.models.visualization import Visualization
+from app.schemas.report_schema import ReportRefreshSummary, TileRefreshResult
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_PER_DATA_SOURCE_CONCURRENCY = 3
+
+
+class _StepTask:
+    __slots__ = ("step_id", "data_sources", "visualization_ids")
+
+    def __init__(self, step_id: str, data_sources: List[str]):
+        self.step_id = step_id
+        self.data_sources = data_sources
+        self.visualization_ids: List[str] = []
+
+
+def _referenced_data_sources(code: str, names: Iterable[str]) -> List[str]:
+    names = sorted(set(names))
+    used = [n for n in names if f"'{n}'" in code or f'"{n}"' in code]
+    return used or names
+
+
+class DashboardRefreshPlanner:
+
+    def __init__(
+        self,
+        step_service,
+        *,
+        max_concurrency: Optional[int] = None,
+        per_data_source_concurrency: Optional[int] = None,
+    ):
+        self.step_service = step_service
+        config = self._config()
+        self.max_concurrency = max(1, max_concurrency or config["max_concurrency"])
+        self.per_data_source_concurrency = max(
+            1, per_data_source_concurrency or config["per_data_source_concurrency"]
+        )
+
+    @staticmethod
+    def _config() -> Dict[str, int]:
+        config = {
+            "max_concurrency": DEFAULT_MAX_CONCURRENCY,
+            "per_data_source_concurrency": DEFAULT_PER_DATA_SOURCE_CONCURRENCY,
+        }
+        try:
+            from app.settings.config import settings
+            cfg = getattr(settings.bow_config, "dashboard_refresh", None)
+            if cfg is not None:
+                config.update({k: int(v) for k, v in cfg.model_dump().items() if v is not None})
+        except Exception:
+            pass
+        return config
+
+    async def plan(
+        self,
+        db: AsyncSession,
+        visualization_ids: List[str],
+        data_source_names: Iterable[str],
+    ) -> tuple:
+        """Return ``(tasks by step id, skipped tile results)`` for the given tiles."""
+        skipped: List[TileRefreshResult] = []
+        viz_ids = list(OrderedDict.fromkeys(v for v in visualization_ids if v))
+        if not viz_ids:
+            return OrderedDict(), skipped
+
+        viz_rows = await db.execute(
+            select(Visualization.id, Visualization.query_id).where(Visualization.id.in_(viz_ids))
+        )
+        viz_query = {str(vid): (str(qid) if qid else None) for vid, qid in viz_rows.all()}
+
+        query_ids = sorted({q for q in viz_query.values() if q})
+        query_default: Dict[str, Optional[str]] = {}
+        if query_ids:
+            query_rows = await db.execute(
+                select(Query.id, Query.default_step_id).where(Query.id.in_(query_ids))
+            )
+            query_default = {str(qid): (str(sid) if sid else None) for qid, sid in query_rows.all()}
+
+        # Default steps, then the latest step of queries that have none (or a dangling one)
+        step_code: Dict[str, str] = {}
+        default_ids = sorted({s for s in query_default.values() if s})
+        if default_ids:
+            rows = await db.execute(select(Step.id, Step.code).where(Step.id.in_(default_ids)))
+            step_code.update({str(sid): code for sid, code in rows.all()})
+
+        query_step: Dict[str, str] = {
+            qid: sid for qid, sid in query_default.items() if sid and sid in step_code
+        }
+        missing = [qid for qid in query_default if qid not in query_step]
+        if missing:
+            latest = (
+                select(Step.query_id, func.max(Step.created_at).label("created_at"))
+                .where(Step.query_id.in_(missing))
+                .group_by(Step.query_id)
+                .subquery()
+            )
+            rows = await db.execute(
+                select(Step.id, Step.query_id, Step.code).join(
+                    latest,
+                    (Step.query_id == latest.c.query_id) & (Step.created_at == latest.c.created_at),
+                )
+            )
+            for sid, qid, code in rows.all():
+                query_step.setdefault(str(qid), str(sid))
+                step_code[str(sid)] = code
+
+        tasks: "OrderedDict[str, _StepTask]" = OrderedDict()
+        for viz_id in viz_ids:
+            if viz_id not in viz_query:
+                skipped.append(TileRefreshResult(visualization_id=viz_id, status="skipped", error="Visualization not found"))
+                continue
+            query_id = viz_query[viz_id]
+            if not query_id or query_id not in query_default:
+                skipped.append(TileRefreshResult(visualization_id=viz_id, status="skipped", error="Query not found"))
+                continue
+            step_id = query_step.get(query_id)
+            if not step_id:
+                skipped.append(TileRefreshResult(visualization_id=viz_id, status="error", error="No step found for visualization"))
+                continue
+            code = step_code.get(step_id) or ""
+            if not code.strip():
+                skipped.append(TileRefreshResult(visualization_id=viz_id, step_id=step_id, status="error", error="Step code is empty; cannot rerun"))
+                continue
+            task = tasks.get(step_id)
+            if task is None:
+                task = _StepTask(step_id, _referenced_data_sources(code, data_source_names))
+                tasks[step_id] = task
+            task.visualization_ids.append(viz_id)
+        return tasks, skipped
+
+    async def execute(self, tasks: "OrderedDict[str, _StepTask]") -> List[TileRefreshResult]:
+        """Rerun every planned step concurrently and return one result per tile."""
+        from app.dependencies import async_session_maker
+
+        overall = asyncio.Semaphore(self.max_concurrency)
+        per_source: Dict[str, asyncio.Semaphore] = {}
+        for task in tasks.values():
+            for name in task.data_sources:
+                per_source.setdefault(name, asyncio.Semaphore(self.per_data_source_concurrency))
+
+        async def run(task: _StepTask) -> List[TileRefreshResult]:
+            # Data source slots first, in a fixed order (sorted names) so tasks sharing
+            # sources can't deadlock, then an overall slot: a task queued behind a busy
+            # source doesn't hold an overall slot that tiles of other sources could use
+            acquired = []
+            try:
+                for name in task.data_sources:
+                    await per_source[name].acquire()
+                    acquired.append(per_source[name])
+                async with overall:
+                    started = time.monotonic()
+                    error = None
+                    try:
+                        async with async_session_maker() as session:
+                            await self.step_service.rerun_step(session, task.step_id)
+                    except Exception as e:
+                        error = str(e) or e.__class__.__name__
+                        logger.warning(f"Dashboard refresh: step {task.step_id} failed: {error}")
+                    duration_ms = (time.monotonic() - started) * 1000.0
+            finally:
+                for semaphore in reversed(acquired):
+                    semaphore.release()
+            return [
+                TileRefreshResult(
+                    visualization_id=viz_id,
+                    step_id=task.step_id,
+                    status="error" if error else "success",
+                    error=error,
+                    duration_ms=round(duration_ms, 1),
+                    deduplicated=index > 0,
+                )
+                for index, viz_id in enumerate(task.visualization_ids)
+            ]
+
+        results = await asyncio.gather(*(run(task) for task in tasks.values()))
+        return [tile for tiles in results for tile in tiles]
+
+    async def refresh(
+        self,
+        db: AsyncSession,
+        visualization_ids: List[str],
+        data_source_names: Iterable[str],
+    ) -> ReportRefreshSummary:
+        started = time.monotonic()
+        tasks, planned_failures = await self.plan(db, visualization_ids, data_source_names)
+        tiles = await self.execute(tasks) if tasks else []
+        by_viz = {t.visualization_id: t for t in tiles + planned_failures}
+        ordered = [by_viz[v] for v in OrderedDict.fromkeys(v for v in visualization_ids if v) if v in by_viz]
+        return ReportRefreshSummary(
+            total_tiles=len(ordered),
+            steps_run=len(tasks),
+            succeeded=sum(1 for t in ordered if t.status == "success"),
+            failed=sum(1 for t in ordered if t.status == "error"),
+            skipped=sum(1 for t in ordered if t.status == "skipped"),
+            duration_ms=round((time.monotonic() - started) * 1000.0, 1),
+            tiles=ordered,
+        )
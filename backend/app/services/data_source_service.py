@@ -1,3 +1,4 @@
+import hashlib
 import importlib
 import logging
 
@@ -20,6 +21,9 @@ from app.models.git_repository import GitRepository
 from app.models.membership import Membership, ROLES_PERMISSIONS
 
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.ai.context.schema_context_cache import schema_context_cache
+from app.services.schema_graph_analytics import schema_graph_analytics
+from app.data_sources.clients.query_cache import query_result_cache, connection_identity
 from sqlalchemy.future import select
 from app.schemas.data_source_schema import (
     DataSourceCreate, DataSourceBase, DataSourceSchema, DataSourceUpdate,
@@ -37,7 +41,7 @@ from uuid import UUID
 import json
 from datetime import datetime, timezone
 
-from sqlalchemy import insert, delete, or_, and_, func
+from sqlalchemy import insert, delete, update, or_, and_, func
 from sqlalchemy.exc import IntegrityError
 from app.schemas.datasource_table_schema import DataSourceTableSchema
 from app.models.datasource_table import DataSourceTable  # Add this import at the top of the file
@@ -355,6 +359,7 @@ class DataSourceService:
             is_active=final_data_source.is_active,
             is_public=final_data_source.is_public,
             use_llm_sync=final_data_source.use_llm_sync,
+            query_cache_ttl_seconds=final_data_source.query_cache_ttl_seconds,
             owner_user_id=str(final_data_source.owner_user_id) if final_data_source.owner_user_id else None,
             git_repository=final_data_source.git_repository,
             memberships=final_data_source.data_source_memberships,
@@ -381,11 +386,11 @@ class DataSourceService:
         data_source_agent = DataSourceAgent(data_source=data_source, schema=schema, model=model)
         response = {}
         if item == "summary":
-            response["summary"] = data_source_agent.generate_summary()
+            response["summary"] = await data_source_agent.generate_summary()
         elif item == "conversation_starters":
-            response["conversation_starters"] = data_source_agent.generate_conversation_starters()
+            response["conversation_starters"] = await data_source_agent.generate_conversation_starters()
         elif item == "description":
-            response["description"] = data_source_agent.generate_description()
+            response["description"] = await data_source_agent.generate_description()
 
         return response
 
@@ -623,6 +628,7 @@ class DataSourceService:
             is_active=data_source.is_active,
             is_public=data_source.is_public,
             use_llm_sync=data_source.use_llm_sync,
+            query_cache_ttl_seconds=data_source.query_cache_ttl_seconds,
             owner_user_id=data_source.owner_user_id,
             git_repository=data_source.git_repository,
             memberships=data_source.data_source_memberships,
@@ -950,6 +956,7 @@ class DataSourceService:
         # 7) Finally delete the data source
         await db.delete(data_source)
         await db.commit()
+        query_result_cache.invalidate_data_source(data_source_id)
         return {"message": "Data source deleted successfully"}
     
     async def delete_data_source_tables(self, db: AsyncSession, data_source_id: str, organization: Organization, current_user: User):
@@ -1175,7 +1182,12 @@ class DataSourceService:
             raise HTTPException(status_code=403, detail="User credentials required for this data source")
         return row.decrypt_credentials() or {}
 
-    async def construct_client(self, db: AsyncSession, data_source: DataSource, current_user: User | None):
+    async def construct_client(self, db: AsyncSession, data_source: DataSource, current_user: User | None, query_cache: bool = False):
+        """Build the data source's client with the user's (or system) credentials.
+
+        Pass ``query_cache=True`` for clients that run queries on behalf of
+        agents/dashboards; results are then cached if the data source opted in.
+        """
         # Get connection from data source
         if not data_source.connections:
             raise HTTPException(status_code=400, detail="Data source has no associated connection")
@@ -1198,7 +1210,54 @@ class DataSourceService:
             allowed = {k: v for k, v in params.items() if k in sig.parameters and k != "self"}
         except Exception:
             allowed = params
-        return ClientClass(**allowed)
+        client = ClientClass(**allowed)
+        if query_cache and data_source.query_cache_ttl_seconds:
+            client = query_result_cache.attach(
+                client,
+                data_source_id=str(data_source.id),
+                ttl_seconds=data_source.query_cache_ttl_seconds,
+                epoch=data_source.query_cache_epoch or 0,
+                identity=connection_identity(conn),
+                credentials=creds,
+            )
+        return client
+
+    async def get_query_cache_stats(self, db: AsyncSession, data_source_id: str, organization: Organization) -> dict:
+        data_source = await self._get_org_data_source(db, data_source_id, organization)
+        return {
+            "data_source_id": str(data_source.id),
+            "ttl_seconds": data_source.query_cache_ttl_seconds,
+            "enabled": bool(data_source.query_cache_ttl_seconds),
+            "epoch": data_source.query_cache_epoch,
+            **query_result_cache.stats(str(data_source.id)),
+        }
+
+    async def invalidate_query_cache(self, db: AsyncSession, data_source_id: str, organization: Organization) -> dict:
+        data_source = await self._get_org_data_source(db, data_source_id, organization)
+        await self._bump_query_cache_epoch(db, str(data_source.id))
+        await db.commit()
+        await db.refresh(data_source, ["query_cache_epoch"])
+        # Other processes miss on the new epoch; entries here can go right away
+        invalidated = query_result_cache.invalidate_data_source(str(data_source.id))
+        return {"data_source_id": str(data_source.id), "invalidated": invalidated, "epoch": data_source.query_cache_epoch}
+
+    async def _bump_query_cache_epoch(self, db: AsyncSession, data_source_id: str) -> None:
+        """Move the data source to a new cache epoch; committed by the caller."""
+        await db.execute(
+            update(DataSource)
+            .where(DataSource.id == data_source_id)
+            .values(query_cache_epoch=DataSource.query_cache_epoch + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _get_org_data_source(self, db: AsyncSession, data_source_id: str, organization: Organization) -> DataSource:
+        result = await db.execute(
+            select(DataSource).filter(DataSource.id == data_source_id, DataSource.organization_id == organization.id)
+        )
+        data_source = result.scalar_one_or_none()
+        if not data_source:
+            raise HTTPException(status_code=404, detail="Data source not found")
+        return data_source
 
     def _resolve_client_by_type(self, data_source_type: str, config: dict, credentials: dict):
         """Dynamically import and construct the client for a given data source type.
@@ -1281,8 +1340,14 @@ class DataSourceService:
                 **connection_updates
             )
         
+        invalidate_query_cache = connection_changed or 'query_cache_ttl_seconds' in update_data
+        if invalidate_query_cache:
+            await self._bump_query_cache_epoch(db, str(data_source_db.id))
+
         try:
             await db.commit()
+            if invalidate_query_cache:
+                query_result_cache.invalidate_data_source(str(data_source_db.id))
             
             # Refresh tables if connection fields changed
             if connection_changed and data_source_db.connections:
@@ -1640,6 +1705,7 @@ class DataSourceService:
         update_query = update_query.values(is_active=new_status)
         result = await db.execute(update_query)
         await db.commit()
+        schema_context_cache.invalidate_tables(str(data_source_id))
         
         affected_count = result.rowcount
         
@@ -1716,6 +1782,7 @@ class DataSourceService:
             deactivated_count = deactivate_result.rowcount
         
         await db.commit()
+        schema_context_cache.invalidate_tables(str(data_source_id))
         
         # Get new total selected count
         selected_count_result = await db.execute(
@@ -1847,6 +1914,7 @@ class DataSourceService:
                 db.add(c_row)
 
         await db.commit()
+        schema_context_cache.invalidate_overlay(str(data_source.id), str(user.id))
     
     async def update_table_status_in_schema(self, db: AsyncSession, data_source_id: str, tables: list[DataSourceTableSchema], organization: Organization):
         data_source = await self.get_data_source(db=db, data_source_id=data_source_id, organization=organization)
@@ -1860,6 +1928,7 @@ class DataSourceService:
                 table_object.is_active = table.is_active
                 await db.commit()
                 await db.refresh(table_object)
+        schema_context_cache.invalidate_tables(str(data_source_id))
         
         return data_source
     
@@ -1869,21 +1938,33 @@ class DataSourceService:
     # Onboarding: auto-select a focused set of tables
     ONBOARDING_MAX_TABLES = 0
 
+    # Rows per bulk INSERT/UPDATE statement when syncing tables
+    TABLE_SYNC_CHUNK_SIZE = 500
+
+    @staticmethod
+    def _table_fingerprint(columns, pks, fks, metadata_json) -> str:
+        """Stable hash of the schema fields that save_or_update_tables writes."""
+        raw = json.dumps([columns or [], pks or [], fks or [], metadata_json or None], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
     async def save_or_update_tables(self, db: AsyncSession, data_source: DataSource, organization: Organization = None, should_set_active: bool = True, current_user: User | None = None, force_all_active: bool = False):
         """Diff-based upsert of datasource tables.
         - Insert new tables
-        - Update changed tables
+        - Update changed tables (rows whose columns/pks/fks/metadata hash is unchanged are skipped)
         - Deactivate missing tables (keep history)
+        - Writes are applied as chunked bulk statements (TABLE_SYNC_CHUNK_SIZE rows each)
         - If should_set_active and > ONBOARDING_MAX_TABLES, auto-select top tables via SQL
         - If force_all_active=True, bypass smart selection and activate all tables (for demos)
+
+        Returns counts of created/updated/unchanged/deactivated tables.
         """
-        from sqlalchemy import text, update
-        import json as json_module
+        from sqlalchemy import update
         
+        counts = {"created": 0, "updated": 0, "unchanged": 0, "deactivated": 0}
         try:
             fresh_tables = await self.get_data_source_fresh_schema(db=db, data_source_id=data_source.id, organization=organization, current_user=current_user)
             if not fresh_tables:
-                return
+                return counts
 
             # Map incoming by name
             def normalize_columns(cols):
@@ -1916,70 +1997,80 @@ class DataSourceService:
             # Skip smart selection if force_all_active (e.g., demo data sources)
             needs_smart_selection = should_set_active and total_tables > self.ONBOARDING_MAX_TABLES and not force_all_active
 
-            # Load existing table names only (not full objects for efficiency)
+            # Load only the columns needed to diff (no ORM objects)
             existing_q = await db.execute(
-                select(DataSourceTable.id, DataSourceTable.name)
+                select(
+                    DataSourceTable.id,
+                    DataSourceTable.name,
+                    DataSourceTable.is_active,
+                    DataSourceTable.columns,
+                    DataSourceTable.pks,
+                    DataSourceTable.fks,
+                    DataSourceTable.metadata_json,
+                )
                 .where(DataSourceTable.datasource_id == data_source.id)
             )
-            existing_names = {row.name: row.id for row in existing_q.fetchall()}
+            existing_rows = {row.name: row for row in existing_q.fetchall()}
 
-            # Prepare bulk insert for new tables
-            new_tables = []
+            new_rows = []
+            changed_rows = []
+            unchanged_count = 0
             for name, payload in incoming.items():
-                if name not in existing_names:
-                    new_tables.append({
+                row = existing_rows.get(name)
+                if row is None:
+                    new_rows.append({
                         "name": name,
-                        "columns": json_module.dumps(payload["columns"]),
-                        "pks": json_module.dumps(payload["pks"]),
-                        "fks": json_module.dumps(payload["fks"]),
+                        "columns": payload["columns"],
+                        "pks": payload["pks"],
+                        "fks": payload["fks"],
                         "datasource_id": str(data_source.id),
                         "is_active": False if needs_smart_selection else bool(should_set_active),
-                        "metadata_json": json_module.dumps(payload.get("metadata_json")) if payload.get("metadata_json") else None,
+                        "metadata_json": payload.get("metadata_json") or None,
                         "no_rows": 0,
                     })
+                elif self._table_fingerprint(payload["columns"], payload["pks"], payload["fks"], payload.get("metadata_json")) != self._table_fingerprint(row.columns, row.pks, row.fks, row.metadata_json):
+                    changed_rows.append({
+                        "id": row.id,
+                        "columns": payload["columns"],
+                        "pks": payload["pks"],
+                        "fks": payload["fks"],
+                        "metadata_json": payload.get("metadata_json"),
+                    })
+                else:
+                    unchanged_count += 1
+
+            # Deactivate tables that no longer exist in fresh schema (already-inactive rows are left alone)
+            deactivate_ids = [
+                row.id for name, row in existing_rows.items()
+                if name not in incoming and row.is_active
+            ]
+
+            chunk = self.TABLE_SYNC_CHUNK_SIZE
+            for i in range(0, len(new_rows), chunk):
+                await db.execute(insert(DataSourceTable), new_rows[i:i + chunk])
+            for i in range(0, len(changed_rows), chunk):
+                await db.execute(update(DataSourceTable), changed_rows[i:i + chunk])
+            for i in range(0, len(deactivate_ids), chunk):
+                await db.execute(
+                    update(DataSourceTable)
+                    .where(DataSourceTable.id.in_(deactivate_ids[i:i + chunk]))
+                    .values(is_active=False)
+                    .execution_options(synchronize_session=False)
+                )
 
-            # Bulk insert new tables using ORM (database-agnostic)
-            if new_tables:
-                for table_data in new_tables:
-                    db.add(DataSourceTable(
-                        name=table_data["name"],
-                        columns=json_module.loads(table_data["columns"]),
-                        pks=json_module.loads(table_data["pks"]),
-                        fks=json_module.loads(table_data["fks"]),
-                        datasource_id=table_data["datasource_id"],  # Already a string
-                        is_active=table_data["is_active"],
-                        metadata_json=json_module.loads(table_data["metadata_json"]) if table_data["metadata_json"] else None,
-                        no_rows=table_data["no_rows"],
-                    ))
-                await db.commit()
-
-            # Update existing tables with new column data
-            for name, payload in incoming.items():
-                if name in existing_names:
-                    table_id = existing_names[name]
-                    await db.execute(
-                        update(DataSourceTable)
-                        .where(DataSourceTable.id == table_id)
-                        .values(
-                            columns=payload["columns"],
-                            pks=payload["pks"],
-                            fks=payload["fks"],
-                            metadata_json=payload.get("metadata_json"),
-                        )
-                    )
-            
-            # Deactivate tables that no longer exist in fresh schema
-            missing_tables = set(existing_names.keys()) - set(incoming.keys())
-            if missing_tables:
-                for table_name in missing_tables:
-                    table_id = existing_names[table_name]
-                    await db.execute(
-                        update(DataSourceTable)
-                        .where(DataSourceTable.id == table_id)
-                        .values(is_active=False)
-                    )
-            
             await db.commit()
+            schema_context_cache.invalidate_tables(str(data_source.id))
+            schema_graph_analytics.schedule(data_source_id=str(data_source.id))
+            counts = {
+                "created": len(new_rows),
+                "updated": len(changed_rows),
+                "unchanged": unchanged_count,
+                "deactivated": len(deactivate_ids),
+            }
+            logger.info(
+                f"save_or_update_tables: data_source={data_source.id} "
+                + " ".join(f"{key}={value}" for key, value in counts.items())
+            )
 
             # If smart selection needed, use SQL to select top tables (onboarding limit)
             if needs_smart_selection:
@@ -1989,9 +2080,7 @@ class DataSourceService:
             print(f"Error saving tables: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to save database tables: {e}")
 
-        # Return full schema including inactive for downstream context
-        schemas = await data_source.get_schemas(db=db, include_inactive=True)
-        return schemas
+        return counts
 
     async def _select_active_tables_sql(self, db: AsyncSession, datasource_id: str, max_active: int):
         """
@@ -2091,6 +2180,7 @@ class DataSourceService:
             )
         
         await db.commit()
+        schema_context_cache.invalidate_tables(datasource_id)
         
     
     async def refresh_data_source_schema(self, db: AsyncSession, data_source_id: str, organization: Organization, current_user: User):
@@ -2135,7 +2225,10 @@ class DataSourceService:
 
         # Fallback to legacy behavior for user_required connections or if no connections
         # This uses data_source_service.resolve_credentials which has owner/admin fallback
-        schemas = await self.save_or_update_tables(db=db, data_source=data_source, organization=organization, should_set_active=False, current_user=current_user)
+        counts = await self.save_or_update_tables(db=db, data_source=data_source, organization=organization, should_set_active=False, current_user=current_user)
+        logger.info(f"refresh_data_source_schema: data_source={data_source.id} tables {counts}")
+        # Return full schema including inactive for downstream context
+        schemas = await data_source.get_schemas(db=db, include_inactive=True)
         return schemas
     
     async def get_metadata_resources(self, db: AsyncSession, data_source_id: str, organization: Organization, current_user: User = None):
@@ -2619,6 +2712,8 @@ class DataSourceService:
                 )
 
         await db.commit()
+        schema_context_cache.invalidate_tables(str(data_source.id))
+        schema_graph_analytics.schedule(data_source_id=str(data_source.id))
 
         # If too many tables for auto-select, use smart selection algorithm
         if needs_smart_selection and max_auto_select:
@@ -342,7 +342,7 @@ class DemoDataSourceService:
         
         try:
             ds_service = DataSourceService()
-            await ds_service.save_or_update_tables(
+            counts = await ds_service.save_or_update_tables(
                 db=db,
                 data_source=data_source,
                 organization=organization,
@@ -350,7 +350,7 @@ class DemoDataSourceService:
                 current_user=current_user,
                 force_all_active=True,  # Demo data sources should have all tables active
             )
-            logger.info(f"Loaded tables for demo data source: {data_source.name}")
+            logger.info(f"Loaded {counts['created']} new tables for demo data source: {data_source.name}")
         except Exception as e:
             # Log but don't fail - the data source is still created
             logger.warning(f"Failed to load tables for demo data source {data_source.name}: {e}")
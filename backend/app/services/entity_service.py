@@ -16,6 +16,7 @@ from app.schemas.entity_schema import EntityCreate, EntityUpdate
 from datetime import datetime
 from app.schemas.entity_schema import EntityRunPayload
 from app.core.telemetry import telemetry
+from app.services.mention_index import mention_index
 
 
 class EntityService:
@@ -137,6 +138,7 @@ class EntityService:
 
         await db.flush()
         await db.commit()
+        mention_index.invalidate(organization_id=str(organization.id))
         await db.refresh(entity)
         # Telemetry: entity created from step (minimal fields only)
         try:
@@ -189,6 +191,7 @@ class EntityService:
             entity.data_sources = list(result.scalars().all())
         await db.flush()
         await db.commit()
+        mention_index.invalidate(organization_id=str(organization.id))
         await db.refresh(entity)
         # Telemetry: entity created (payload)
         try:
@@ -370,6 +373,7 @@ class EntityService:
 
         await db.flush()
         await db.commit()
+        mention_index.invalidate(organization_id=str(organization.id))
         await db.refresh(entity)
         return entity
 
@@ -385,6 +389,7 @@ class EntityService:
             return False
         await db.delete(entity)
         await db.commit()
+        mention_index.invalidate(organization_id=str(organization.id))
         return True
 
     async def run_entity_with_update(
@@ -407,7 +412,7 @@ class EntityService:
         # Resolve report/data sources context via any linked data sources on the entity
         # When entities are not tied to a report, we execute with all entity data sources
         from app.ai.code_execution.code_execution import StreamingCodeExecutor
-        ds_clients = {ds.name: ds.get_client() for ds in (entity.data_sources or [])}
+        ds_clients = {ds.name: ds.get_client(query_cache=True) for ds in (entity.data_sources or [])}
         excel_files = []
 
         executor = StreamingCodeExecutor()
@@ -463,7 +468,7 @@ class EntityService:
         code_to_run = (getattr(payload, "code", None) if payload else None) or entity.code or ""
 
         from app.ai.code_execution.code_execution import StreamingCodeExecutor
-        ds_clients = {ds.name: ds.get_client() for ds in (entity.data_sources or [])}
+        ds_clients = {ds.name: ds.get_client(query_cache=True) for ds in (entity.data_sources or [])}
         excel_files = []
 
         executor = StreamingCodeExecutor()
@@ -0,0 +1,246 @@
+"""
+Eval Scheduler
+
+Bounded-concurrency execution of test run cases (``TestRunService``).
+
+``stream_run`` used to start one unbounded ``asyncio.create_task`` per
+pending result, and every task built its data source clients with
+``construct_client`` and primed a fresh ``ContextHub`` from scratch, even
+though all cases of a run share the organization, the pinned instruction
+build and usually the same data sources.
+
+- ``slot`` bounds concurrent agent runs by ``evals.max_concurrency_per_run``
+  per run and ``evals.max_concurrency_per_org`` across all runs of an
+  organization in this process (run slot first, then org slot).
+- Each run gets an ``EvalRunContext`` holding per-run caches: static
+  context sections (schemas, instructions, resources) keyed by what they are
+  built from, and clients per (data source, user). Concurrent requests for
+  the same entry wait on one build. Clients are only shared between cases
+  when their class declares ``thread_safe`` (pooled connection per call);
+  any other client is built for the case that asked for it.
+- The context counts started/completed cases; ``throughput`` reports
+  cases per minute, which ``TestRunService`` stores in ``run.summary_json``.
+- ``stop_run`` flags a tracked run as stopped; launchers check
+  ``ctx.stopped`` once a case gets its slot and skip cases that were still
+  queued.
+- A context has one owner, the code path that launched its agents.
+  Only ``finish_run`` with the owner's token retires it. Summary writers
+  read ``run_throughput``, which still answers after the run finished.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_CONCURRENCY_PER_RUN = 4
+DEFAULT_MAX_CONCURRENCY_PER_ORG = 8
+FINISHED_RUNS_KEPT = 256
+
+
+class EvalRunContext:
+    """Per-run concurrency limit, shared caches and throughput counters."""
+
+    def __init__(self, run_id: str, organization_id: str, max_concurrency: int):
+        self.run_id = run_id
+        self.organization_id = organization_id
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.started_at = time.monotonic()
+        self.cases_started = 0
+        self.cases_completed = 0
+        self.owner: Optional[str] = None
+        self.stopped = False
+        self._clients: Dict[tuple, Any] = {}
+        self._client_locks: Dict[tuple, asyncio.Lock] = {}
+        self._unshared_clients: set = set()
+        self._static: Dict[tuple, "asyncio.Future"] = {}
+
+    # ----- clients -----
+
+    async def get_clients(
+        self,
+        session,
+        data_sources: Iterable[Any],
+        user,
+        construct: Callable[..., Awaitable[Any]],
+    ) -> Dict[str, Any]:
+        """Clients by data source name for one case.
+
+        Thread-safe clients are built once per (data source, user) and shared
+        by the run's cases; others are built per call, so concurrent cases
+        never use the same connection. Data sources whose client can't be
+        built are left out, as before.
+        """
+        user_id = str(user.id) if user is not None else None
+        clients: Dict[str, Any] = {}
+        for data_source in data_sources:
+            key = (str(data_source.id), user_id)
+            if key in self._unshared_clients:
+                client = await self._construct_client(session, data_source, user, construct)
+            else:
+                async with self._client_locks.setdefault(key, asyncio.Lock()):
+                    client = self._clients.get(key)
+                    if client is None:
+                        client = await self._construct_client(session, data_source, user, construct)
+                        if client is not None:
+                            if getattr(client, "thread_safe", False):
+                                self._clients[key] = client
+                            else:
+                                self._unshared_clients.add(key)
+            if client is not None:
+                clients[data_source.name] = client
+        return clients
+
+    async def _construct_client(self, session, data_source, user, construct: Callable[..., Awaitable[Any]]) -> Any:
+        try:
+            return await construct(session, data_source, user, query_cache=True)
+        except Exception as e:
+            logger.debug(f"Eval run {self.run_id}: client for {data_source.name} failed: {e}")
+            return None
+
+    # ----- static context -----
+
+    async def get_or_build(self, key: tuple, build: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached static section for ``key``, building it once.
+
+        Failed builds are not cached, so the next case retries.
+        """
+        future = self._static.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._static[key] = future
+            try:
+                value = await build()
+            except BaseException as e:
+                self._static.pop(key, None)
+                future.set_exception(e)
+                # Mark retrieved so waiter-less failures aren't logged as unhandled
+                future.exception()
+                raise
+            future.set_result(value)
+            return value
+        return await asyncio.shield(future)
+
+    # ----- throughput -----
+
+    def throughput(self) -> Dict[str, Any]:
+        elapsed = max(0.0, time.monotonic() - self.started_at)
+        return {
+            "cases_completed": self.cases_completed,
+            "duration_seconds": round(elapsed, 1),
+            "cases_per_minute": round(self.cases_completed * 60.0 / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+class EvalScheduler:
+    """Process-wide registry of run contexts and per-organization limits."""
+
+    def __init__(self):
+        self._config: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+        self._runs: Dict[str, EvalRunContext] = {}
+        self._finished: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._org_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def config(self) -> Dict[str, int]:
+        if self._config is None:
+            config = {
+                "max_concurrency_per_run": DEFAULT_MAX_CONCURRENCY_PER_RUN,
+                "max_concurrency_per_org": DEFAULT_MAX_CONCURRENCY_PER_ORG,
+            }
+            try:
+                from app.settings.config import settings
+                cfg = getattr(settings.bow_config, "evals", None)
+                if cfg is not None:
+                    config.update({k: int(v) for k, v in cfg.model_dump().items() if v is not None})
+            except Exception:
+                pass
+            self._config = config
+        return self._config
+
+    def run_context(self, run_id: str, organization_id: str, owner: Optional[str] = None) -> EvalRunContext:
+        """The run's context, created on first use.
+
+        ``owner`` claims the context if nobody has yet; check ``ctx.owner``
+        to see whether the claim won.
+        """
+        run_id = str(run_id)
+        with self._lock:
+            ctx = self._runs.get(run_id)
+            if ctx is None:
+                ctx = EvalRunContext(run_id, str(organization_id), self.config["max_concurrency_per_run"])
+                self._runs[run_id] = ctx
+            if owner is not None and ctx.owner is None:
+                ctx.owner = owner
+            return ctx
+
+    def _org_semaphore(self, organization_id: str) -> asyncio.Semaphore:
+        with self._lock:
+            semaphore = self._org_semaphores.get(organization_id)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(max(1, self.config["max_concurrency_per_org"]))
+                self._org_semaphores[organization_id] = semaphore
+            return semaphore
+
+    @asynccontextmanager
+    async def slot(self, ctx: EvalRunContext):
+        """Hold a run slot and an organization slot for one case."""
+        async with ctx.semaphore:
+            async with self._org_semaphore(ctx.organization_id):
+                ctx.cases_started += 1
+                try:
+                    yield
+                finally:
+                    ctx.cases_completed += 1
+
+    def stop_run(self, run_id: str) -> None:
+        """Flag a tracked run as stopped so its queued cases don't start."""
+        with self._lock:
+            ctx = self._runs.get(str(run_id))
+            if ctx is not None:
+                ctx.stopped = True
+
+    def finish_run(self, run_id: str, owner: str) -> Optional[Dict[str, Any]]:
+        """Drop a run's caches and return its final throughput.
+
+        Only the owner retires a context; other callers get None and leave
+        it in place for the cases still using it.
+        """
+        run_id = str(run_id)
+        with self._lock:
+            ctx = self._runs.get(run_id)
+            if ctx is None or owner is None or ctx.owner != owner:
+                return None
+            del self._runs[run_id]
+            throughput = ctx.throughput()
+            self._finished[run_id] = throughput
+            while len(self._finished) > FINISHED_RUNS_KEPT:
+                self._finished.popitem(last=False)
+        return throughput
+
+    def run_throughput(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Current throughput of a tracked run, or the final one once it finished."""
+        run_id = str(run_id)
+        with self._lock:
+            ctx = self._runs.get(run_id)
+            if ctx is None:
+                return self._finished.get(run_id)
+        return ctx.throughput()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = list(self._runs.values())
+        return {
+            "active_runs": len(runs),
+            "runs": {ctx.run_id: {"cases_started": ctx.cases_started, **ctx.throughput()} for ctx in runs},
+            **self.config,
+        }
+
+
+eval_scheduler = EvalScheduler()
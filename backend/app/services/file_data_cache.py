@@ -0,0 +1,405 @@
+"""
+File Data Cache
+
+Columnar copies of uploaded Excel/CSV files for generated code.
+
+Generated code used to call ``pd.read_excel(excel_files[i].path, ...)``, so
+every ``generate_df`` run, retry and step rerun re-parsed the workbook with
+openpyxl. Each sheet is now converted once (at upload, or lazily on first
+read for older files) into a sidecar directory next to the upload:
+
+    uploads/files/.columnar/<upload name>/manifest.json
+    uploads/files/.columnar/<upload name>/sheet_<index>.arrow | .pkl
+
+- Sheets whose columns round-trip through Arrow unchanged are written as
+  uncompressed Arrow IPC and memory-mapped on read.
+- Raw ``header=None`` Excel sheets mix text header rows with numbers or
+  dates in one column. The leading rows (up to ``MAX_HEAD_ROWS``) are split
+  off into a small pickle and the typed body below them is stored as Arrow;
+  ``header=None`` and ``header=n`` reads are rebuilt from the two. Sheets
+  with no such split are pickled whole (still far cheaper to load than
+  re-parsing the workbook).
+
+Loaded DataFrames are kept in an in-process LRU keyed by
+(file id, sheet index, source mtime) and handed out as copies, so code that
+mutates its frame can't poison the cache. ``File.read_sheet`` is the accessor
+exposed to the sandbox.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.file_preview import CSV_TYPES, EXCEL_TYPES
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Leading raw rows (titles, header) tried as the split above a typed body
+MAX_HEAD_ROWS = 10
+
+# Sentinel: "use the file kind's default header handling"
+DEFAULT_HEADER = object()
+
+
+def file_kind(content_type: Optional[str], path: Optional[str]) -> Optional[str]:
+    """Return 'excel', 'csv' or None for unsupported files."""
+    lowered = (path or "").lower()
+    if content_type in EXCEL_TYPES or lowered.endswith((".xlsx", ".xls")):
+        return "excel"
+    if content_type in CSV_TYPES or lowered.endswith(".csv"):
+        return "csv"
+    return None
+
+
+def _columnar_dir(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, ".columnar", name)
+
+
+def _source_signature(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _arrow_safe(df: pd.DataFrame) -> bool:
+    """True when every column survives an Arrow round-trip with its dtype."""
+    for col in df.columns:
+        series = df[col]
+        if series.dtype != object:
+            continue
+        kinds = {type(v) for v in series.tolist() if not (v is None or (isinstance(v, float) and v != v))}
+        if kinds - {str}:
+            return False
+    return True
+
+
+def _split_head(raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split a raw sheet into its leading text rows and a body Arrow can store typed."""
+    for rows in range(1, min(MAX_HEAD_ROWS, len(raw) - 1) + 1):
+        body = raw.iloc[rows:].reset_index(drop=True).infer_objects()
+        if _arrow_safe(body):
+            return raw.iloc[:rows], body
+    return raw.iloc[:0], raw
+
+
+def _write_sheet(df: pd.DataFrame, directory: str, index: int) -> Dict[str, Any]:
+    base = os.path.join(directory, f"sheet_{index}")
+    if _arrow_safe(df):
+        try:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+
+            table = pa.Table.from_pandas(
+                df.set_axis([str(c) for c in df.columns], axis=1),
+                preserve_index=False,
+            )
+            tmp = f"{base}.arrow.tmp"
+            feather.write_feather(table, tmp, compression="uncompressed")
+            os.replace(tmp, f"{base}.arrow")
+            return {"file": f"sheet_{index}.arrow", "format": "arrow"}
+        except Exception as e:
+            logger.debug(f"Arrow conversion failed for sheet {index}, falling back to pickle: {e}")
+    tmp = f"{base}.pkl.tmp"
+    df.to_pickle(tmp)
+    os.replace(tmp, f"{base}.pkl")
+    return {"file": f"sheet_{index}.pkl", "format": "pickle"}
+
+
+def _nan_nulls(df: pd.DataFrame) -> pd.DataFrame:
+    """Empty cells in object columns as NaN, as the pandas readers return them (Arrow gives None, concat NaT)."""
+    for i in np.flatnonzero((df.dtypes == object).to_numpy()):
+        column = df.iloc[:, i]
+        if column.isna().any():
+            df.isetitem(i, column.where(column.notna(), np.nan))
+    return df
+
+
+def _write_head(head: pd.DataFrame, directory: str, index: int) -> str:
+    name = f"sheet_{index}_head.pkl"
+    tmp = os.path.join(directory, f"{name}.tmp")
+    head.to_pickle(tmp)
+    os.replace(tmp, os.path.join(directory, name))
+    return name
+
+
+def _read_sheet_file(directory: str, entry: Dict[str, Any]) -> pd.DataFrame:
+    full_path = os.path.join(directory, entry["file"])
+    if entry["format"] == "arrow":
+        import pyarrow as pa
+
+        with pa.memory_map(full_path, "r") as source:
+            df = pa.ipc.open_file(source).read_all().to_pandas()
+        _nan_nulls(df)
+        if entry.get("positional_columns"):
+            df.columns = range(len(df.columns))
+        return df
+    return pd.read_pickle(full_path)
+
+
+def _read_sheet(directory: str, entry: Dict[str, Any]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(head rows, body) for a stored sheet; the head is empty unless it was split off."""
+    body = _read_sheet_file(directory, entry)
+    if entry.get("head_file"):
+        head = pd.read_pickle(os.path.join(directory, entry["head_file"]))
+    else:
+        head = body.iloc[:0]
+    return head, body
+
+
+class FileDataCache:
+    """Columnar conversion + LRU of loaded sheets for uploaded files."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # path -> [lock, threads using it]; dropped once the last user is done
+        self._convert_locks: Dict[str, list] = {}
+        self._entries: "OrderedDict[tuple, Tuple[Tuple[pd.DataFrame, pd.DataFrame], int]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._conversions = 0
+
+    # ----- conversion -----
+
+    @contextmanager
+    def _converting(self, path: str):
+        with self._lock:
+            entry = self._convert_locks.setdefault(path, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._convert_locks.pop(path, None)
+
+    def _load_manifest(self, path: str) -> Optional[Dict[str, Any]]:
+        manifest_path = os.path.join(_columnar_dir(path), MANIFEST_NAME)
+        try:
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("source") != _source_signature(path):
+            return None
+        return manifest
+
+    def ensure_converted(self, path: str, kind: str) -> Dict[str, Any]:
+        """Return the manifest for ``path``, converting the file if needed."""
+        manifest = self._load_manifest(path)
+        if manifest is not None:
+            return manifest
+        with self._converting(os.path.abspath(path)):
+            # Another thread may have finished the conversion meanwhile
+            manifest = self._load_manifest(path)
+            if manifest is not None:
+                return manifest
+            return self._convert(path, kind)
+
+    def _convert(self, path: str, kind: str) -> Dict[str, Any]:
+        directory = _columnar_dir(path)
+        os.makedirs(directory, exist_ok=True)
+        source = _source_signature(path)
+        sheets = []
+        if kind == "excel":
+            with pd.ExcelFile(path) as xl:
+                for index, sheet_name in enumerate(xl.sheet_names):
+                    # Raw cells, as the coder prompt reads them (header=None)
+                    head, body = _split_head(xl.parse(sheet_name, header=None))
+                    entry = _write_sheet(body, directory, index)
+                    entry.update({"name": str(sheet_name), "header": None, "positional_columns": True})
+                    if len(head):
+                        entry["head_file"] = _write_head(head, directory, index)
+                    sheets.append(entry)
+        elif kind == "csv":
+            df = pd.read_csv(path)
+            entry = _write_sheet(df, directory, 0)
+            entry.update({"name": os.path.basename(path), "header": 0, "positional_columns": False})
+            sheets.append(entry)
+        else:
+            raise ValueError(f"Unsupported file kind for columnar cache: {kind}")
+
+        manifest = {"version": MANIFEST_VERSION, "kind": kind, "source": source, "sheets": sheets}
+        tmp = os.path.join(directory, f"{MANIFEST_NAME}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(directory, MANIFEST_NAME))
+        with self._lock:
+            self._conversions += 1
+        logger.info(
+            f"Converted {kind} file {os.path.basename(path)} to columnar cache "
+            f"({len(sheets)} sheet(s): {', '.join(s['format'] for s in sheets)})"
+        )
+        return manifest
+
+    # ----- reads -----
+
+    @staticmethod
+    def _resolve_sheet(manifest: Dict[str, Any], sheet_name: Any) -> int:
+        sheets = manifest["sheets"]
+        if isinstance(sheet_name, int) and not isinstance(sheet_name, bool):
+            if -len(sheets) <= sheet_name < len(sheets):
+                return sheet_name % len(sheets)
+            raise IndexError(f"Worksheet index {sheet_name} is invalid, {len(sheets)} worksheets found")
+        for index, sheet in enumerate(sheets):
+            if sheet["name"] == str(sheet_name):
+                return index
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    def _get_cached(self, key: tuple) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return cached[0]
+
+    def _put_cached(self, key: tuple, sheet: Tuple[pd.DataFrame, pd.DataFrame]) -> None:
+        size = sum(int(df.memory_usage(index=True, deep=False).sum()) for df in sheet)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (sheet, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def read(self, file_id: str, path: str, kind: str, sheet_name: Any = 0, header: Any = DEFAULT_HEADER) -> pd.DataFrame:
+        """Return a private copy of one sheet, shaped like the pandas reader would."""
+        manifest = self.ensure_converted(path, kind)
+        index = self._resolve_sheet(manifest, sheet_name)
+        entry = manifest["sheets"][index]
+        directory = _columnar_dir(path)
+
+        key = (str(file_id), index, manifest["source"]["mtime_ns"])
+        sheet = self._get_cached(key)
+        if sheet is None:
+            sheet = _read_sheet(directory, entry)
+            self._put_cached(key, sheet)
+        head, body = sheet
+
+        stored_header = entry.get("header")
+        if header is DEFAULT_HEADER or header == stored_header:
+            return _join_head(head, body)
+        if stored_header is None and isinstance(header, int) and not isinstance(header, bool):
+            if header == len(head) - 1:
+                # The usual case: the header is the last split-off row, the body is already typed
+                df = body.copy()
+                df.columns = _header_names(head.iloc[header].tolist(), len(body.columns))
+                return df
+            return _promote_header(_join_head(head, body), header)
+        raise _Unsupported()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+                "conversions": self._conversions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class _Unsupported(Exception):
+    """Requested shape can't be served from the columnar copy."""
+
+
+def _join_head(head: pd.DataFrame, body: pd.DataFrame) -> pd.DataFrame:
+    """The raw (header=None) sheet: split-off head rows on top of the body, as a new frame."""
+    if not len(head):
+        return body.copy()
+    return _nan_nulls(pd.concat([head, body], ignore_index=True))
+
+
+def _header_names(names: List[Any], width: int) -> List[Any]:
+    """Column names as ``read_excel`` builds them: blanks as ``Unnamed: i``, repeats as ``a.1``, ``a.2``."""
+    columns = [
+        f"Unnamed: {i}" if (i >= len(names) or pd.isna(names[i])) else names[i]
+        for i in range(width)
+    ]
+    counts: Dict[Any, int] = defaultdict(int)
+    for i, name in enumerate(columns):
+        count = counts[name]
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts[name]
+        columns[i] = name
+        counts[name] = count + 1
+    return columns
+
+
+def _promote_header(raw: pd.DataFrame, row: int) -> pd.DataFrame:
+    """Turn a raw (header=None) sheet into what ``header=row`` would return."""
+    names = raw.iloc[row].tolist() if row < len(raw) else []
+    df = raw.iloc[row + 1:].reset_index(drop=True).copy()
+    df.columns = _header_names(names, len(raw.columns))
+    return df.infer_objects()
+
+
+def read_file_data(file, sheet_name: Any = 0, header: Any = DEFAULT_HEADER, **read_kwargs) -> pd.DataFrame:
+    """Read an uploaded Excel/CSV file, served from the columnar cache when possible.
+
+    Any extra pandas reader options (usecols, skiprows, dtype, ...) or a
+    header the cache can't reproduce fall back to ``pd.read_excel`` /
+    ``pd.read_csv`` on the original file.
+    """
+    path = file.path
+    kind = file_kind(getattr(file, "content_type", None), path)
+    if kind is None:
+        raise ValueError(f"{getattr(file, 'filename', path)} is not an Excel or CSV file")
+
+    if not read_kwargs and isinstance(sheet_name, (int, str)):
+        try:
+            return file_data_cache.read(file.id, path, kind, sheet_name=sheet_name, header=header)
+        except _Unsupported:
+            pass
+        except (IndexError, ValueError):
+            raise
+        except Exception as e:
+            logger.warning(f"Columnar cache read failed for {path}, reading source file: {e}")
+
+    if kind == "excel":
+        return pd.read_excel(path, sheet_name=sheet_name, header=None if header is DEFAULT_HEADER else header, **read_kwargs)
+    return pd.read_csv(path, **({} if header is DEFAULT_HEADER else {"header": header}), **read_kwargs)
+
+
+def convert_file(file) -> Optional[Dict[str, Any]]:
+    """Produce the columnar copy of an uploaded file (no-op for other types)."""
+    kind = file_kind(getattr(file, "content_type", None), file.path)
+    if kind is None:
+        return None
+    return file_data_cache.ensure_converted(file.path, kind)
+
+
+file_data_cache = FileDataCache()
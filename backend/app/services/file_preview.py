@@ -6,7 +6,7 @@ Used to provide context for the coder to generate appropriate data extraction co
 """
 
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
@@ -69,6 +69,34 @@ def generate_file_preview(file) -> Dict[str, Any]:
         }
 
 
+def _sheet_dimensions(xl: pd.ExcelFile, path: str) -> Dict[str, Tuple[int, int]]:
+    """Read (rows, cols) per sheet from workbook metadata instead of loading sheets."""
+    dims: Dict[str, Tuple[int, int]] = {}
+    try:
+        if xl.engine == "openpyxl":
+            from openpyxl import load_workbook
+
+            wb = load_workbook(path, read_only=True, data_only=True)
+            try:
+                for ws in wb.worksheets:
+                    max_row, max_col = ws.max_row, ws.max_column
+                    if max_row is None or max_col is None:
+                        # No <dimension> element: stream rows (constant memory)
+                        max_row, max_col = 0, 0
+                        for row in ws.iter_rows(values_only=True):
+                            max_row += 1
+                            max_col = max(max_col, len(row))
+                    dims[ws.title] = (max_row, max_col)
+            finally:
+                wb.close()
+        elif xl.engine == "xlrd":
+            for sheet in xl.book.sheets():
+                dims[sheet.name] = (sheet.nrows, sheet.ncols)
+    except Exception as e:
+        logger.debug(f"Could not read sheet dimensions from workbook metadata for {path}: {e}")
+    return dims
+
+
 def _preview_excel(path: str, filename: str) -> Dict[str, Any]:
     """Generate raw preview for Excel files (.xlsx, .xls)."""
     try:
@@ -82,25 +110,23 @@ def _preview_excel(path: str, filename: str) -> Dict[str, Any]:
             "sheet_count": len(sheet_names),
             "sheet_previews": {}
         }
+        dimensions = _sheet_dimensions(xl, path)
         
         # Preview first N sheets
         for sheet in sheet_names[:MAX_PREVIEW_SHEETS]:
             try:
                 # Read without header to get raw cell values
-                df = pd.read_excel(path, sheet_name=sheet, header=None, nrows=MAX_PREVIEW_ROWS)
+                df = xl.parse(sheet, header=None, nrows=MAX_PREVIEW_ROWS)
                 
                 # Limit columns
                 if len(df.columns) > MAX_PREVIEW_COLS:
                     df = df.iloc[:, :MAX_PREVIEW_COLS]
                 
-                # Get total shape by reading just first row of full data
-                try:
-                    df_shape = pd.read_excel(path, sheet_name=sheet, header=None)
-                    total_rows = len(df_shape)
-                    total_cols = len(df_shape.columns)
-                except Exception:
-                    total_rows = len(df)
-                    total_cols = len(df.columns)
+                # Total shape comes from workbook metadata, not a full read
+                if sheet in dimensions:
+                    total_rows, total_cols = dimensions[sheet]
+                else:
+                    total_rows, total_cols = len(df), len(df.columns)
                 
                 # Convert to raw cell values (handle NaN, dates, etc.)
                 raw_cells = _dataframe_to_raw_cells(df)
@@ -16,10 +16,18 @@ import aiofiles
 from sqlalchemy import select, exists
 from app.core.telemetry import telemetry
 from app.services.file_preview import generate_file_preview
+from app.services.file_data_cache import convert_file
+from app.settings.config import settings
+from app.services.mention_index import mention_index
+import asyncio
 import logging
+import os
+from types import SimpleNamespace
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 class FileService:
     def __init__(self):
         pass
@@ -29,10 +37,7 @@ class FileService:
         unique_filename = f"{uuid.uuid4()}_{file.filename}"
         file_location = f"uploads/files/{unique_filename}"
 
-        # Async file writing
-        async with aiofiles.open(file_location, "wb") as buffer:
-            content = await file.read()
-            await buffer.write(content)
+        size_bytes = await self._stream_to_disk(file, file_location)
 
         # Create the database entry
         db_file = File(
@@ -46,6 +51,7 @@ class FileService:
         db.add(db_file)
         await db.commit()
         await db.refresh(db_file)
+        mention_index.invalidate(organization_id=str(organization.id))
         
         # Telemetry: file uploaded (minimal fields only)
         try:
@@ -54,7 +60,7 @@ class FileService:
                 {
                     "file_id": str(db_file.id),
                     "content_type": db_file.content_type,
-                    "bytes": len(content or b""),
+                    "bytes": size_bytes,
                     "report_id": report_id,
                 },
                 user_id=current_user.id,
@@ -74,9 +80,17 @@ class FileService:
                 await db.commit()
                 await db.refresh(report)
 
-        # Generate raw preview (no LLM) - fast, instant
+        # Plain attributes for worker threads (ORM instances must stay on the loop)
+        file_ref = SimpleNamespace(
+            id=str(db_file.id),
+            filename=db_file.filename,
+            content_type=db_file.content_type,
+            path=db_file.path,
+        )
+
+        # Generate raw preview (no LLM) in a worker thread so large workbooks don't block the loop
         try:
-            db_file.preview = generate_file_preview(db_file)
+            db_file.preview = await asyncio.to_thread(generate_file_preview, file_ref)
             db.add(db_file)
             await db.commit()
             await db.refresh(db_file)
@@ -84,12 +98,49 @@ class FileService:
         except Exception as e:
             # Preview generation failure is non-fatal - log and continue
             logger.warning(f"Failed to generate preview for {db_file.filename}: {e}")
+
+        # Columnar copy for generated code (File.read_sheet); also built lazily on first read
+        try:
+            await asyncio.to_thread(convert_file, file_ref)
+        except Exception as e:
+            logger.warning(f"Failed to build columnar cache for {db_file.filename}: {e}")
         
         # Return the file schema
         file_schema = FileSchema.from_orm(db_file)
         
         return file_schema
     
+    async def _stream_to_disk(self, file: UploadFile, file_location: str) -> int:
+        """Copy the upload to disk in chunks, enforcing the configured size cap.
+
+        Writes to a temporary path and only moves it into place once complete,
+        so a rejected or interrupted upload never leaves a partial file behind.
+        """
+        max_bytes = settings.bow_config.file_uploads.max_size_mb * 1024 * 1024
+        tmp_location = f"{file_location}.part"
+        written = 0
+        try:
+            async with aiofiles.open(tmp_location, "wb") as buffer:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File exceeds the maximum upload size of {settings.bow_config.file_uploads.max_size_mb} MB",
+                        )
+                    await buffer.write(chunk)
+            os.replace(tmp_location, file_location)
+        except BaseException:
+            try:
+                os.remove(tmp_location)
+            except OSError:
+                pass
+            raise
+        return written
+
     async def remove_file_from_report(self, db: AsyncSession, file_id: str, report_id: str, organization: Organization, current_user: User):
         stmt = select(Report).filter(Report.id == report_id)
         result = await db.execute(stmt)
@@ -203,7 +254,7 @@ class FileService:
             processed_sheets_count = 0
             for index, sheet_name in enumerate(sheet_names):
                 ea = ExcelAgent(file, model) 
-                schema = ea.get_schema(index)
+                schema = await ea.get_schema(index)
 
                 if schema and "sheet_name" in schema:
                     sc = SheetSchema(
@@ -257,7 +308,7 @@ class FileService:
 
         for i in range(0, len(tokens), chunk_size - overlap):
             chunk = tokenizer.decode(tokens[i:i+chunk_size])
-            new_tags = da.get_tags_from_text(chunk, tags)
+            new_tags = await da.get_tags_from_text(chunk, tags)
             tags.extend(new_tags)
         
         file_tags = []
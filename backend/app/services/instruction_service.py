@@ -42,6 +42,7 @@ from app.services.build_service import BuildService
 from app.services.instruction_version_service import InstructionVersionService
 from app.dependencies import async_session_maker
 from app.ai.context.builders.instruction_context_builder import InstructionContextBuilder
+from app.ai.context.instruction_index import instruction_index_cache
 from app.core.telemetry import telemetry
 from app.models.completion import Completion
 from app.models.report import Report
@@ -190,6 +191,7 @@ class InstructionService:
             .where(Instruction.id == instruction.id)
         )
         instruction = fresh_instruction.scalar_one()
+        instruction_index_cache.invalidate_organization(str(organization.id))
         return await self._instruction_to_schema_with_references(db, instruction)
     
     async def analyze_instruction(
@@ -716,6 +718,7 @@ class InstructionService:
             .where(Instruction.id == instruction.id)
         )
         instruction = fresh_instruction.scalar_one()
+        instruction_index_cache.invalidate_organization(str(organization.id))
         return await self._instruction_to_schema_with_references(db, instruction)
     
     async def enhance_instruction(
@@ -814,6 +817,7 @@ class InstructionService:
             logger.warning(f"Failed to update build for deleted instruction {instruction_id}: {e}")
             # Don't fail the deletion if build update fails
         
+        instruction_index_cache.invalidate_organization(str(organization.id))
         return True
     
     async def increment_thumbs_up(
@@ -1073,6 +1077,7 @@ class InstructionService:
             except Exception as version_error:
                 logger.warning(f"Failed to create versions for bulk update: {version_error}")
         
+        instruction_index_cache.invalidate_organization(str(organization.id))
         return InstructionBulkResponse(
             updated_count=updated_count,
             failed_ids=failed_ids,
@@ -1157,6 +1162,7 @@ class InstructionService:
             except Exception as finalize_error:
                 logger.warning(f"Failed to finalize/promote bulk delete build: {finalize_error}")
         
+        instruction_index_cache.invalidate_organization(str(organization.id))
         return InstructionBulkResponse(
             updated_count=deleted_count,
             failed_ids=failed_ids,
@@ -29,6 +29,7 @@ from app.models.instruction_build import InstructionBuild
 from app.models.datasource_table import DataSourceTable
 from app.models.instruction_reference import InstructionReference
 from app.schemas.organization_settings_schema import OrganizationSettingsConfig
+from app.ai.context.instruction_index import instruction_index_cache
 
 logger = logging.getLogger(__name__)
 
@@ -120,7 +121,7 @@ class InstructionSyncService:
         existing = await self._find_instruction_for_resource(db, fresh_resource.id)
         
         if existing:
-            return await self._handle_existing_instruction(db, existing, fresh_resource, organization, commit_sha, build)
+            instruction = await self._handle_existing_instruction(db, existing, fresh_resource, organization, commit_sha, build)
         else:
             # Before creating a new instruction, check if there was an unlinked/deleted one
             # If an instruction was previously unlinked (source_sync_enabled=False), don't recreate it
@@ -129,7 +130,10 @@ class InstructionSyncService:
                 logger.debug(f"Skipping resource {fresh_resource.id} - previously unlinked instruction {unlinked_instruction.id} exists")
                 return None
             
-            return await self._create_instruction_from_resource(db, fresh_resource, organization, commit_sha, build)
+            instruction = await self._create_instruction_from_resource(db, fresh_resource, organization, commit_sha, build)
+        
+        instruction_index_cache.invalidate_organization(str(organization.id))
+        return instruction
     
     async def _find_instruction_for_resource(
         self,
@@ -487,6 +491,7 @@ class InstructionSyncService:
         )
         
         await db.commit()
+        instruction_index_cache.invalidate_organization(instruction.organization_id)
         await db.refresh(instruction)
         
         logger.info(f"Archived instruction {instruction.id} - source resource {resource_id} was deleted")
@@ -1084,9 +1089,11 @@ class InstructionSyncService:
         
         # Rule 1: New file -> Create
         if existing is None:
-            return await self._create_file_instruction(
+            instruction = await self._create_file_instruction(
                 db, file_path, file_content, content_hash, organization, git_repo, data_source
             )
+            instruction_index_cache.invalidate_organization(str(organization.id))
+            return instruction
         
         # Rule 2: User-created -> Never touch
         if existing.source_type != 'git':
@@ -1112,6 +1119,7 @@ class InstructionSyncService:
         existing.source_git_commit_sha = git_repo.last_indexed_commit_sha
         existing.updated_at = datetime.utcnow()
         await db.commit()
+        instruction_index_cache.invalidate_organization(str(organization.id))
         await db.refresh(existing)
         
         logger.info(f"Updated instruction {existing.id} from file {file_path}")
@@ -1362,5 +1370,6 @@ class InstructionSyncService:
         
         if archived_count > 0:
             await db.commit()
+            instruction_index_cache.invalidate_organization(org_id)
         
         return archived_count
@@ -1,8 +1,10 @@
+import asyncio
 from datetime import datetime, timedelta
 from typing import Tuple
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.exc import InterfaceError, OperationalError
 from app.dependencies import async_session_maker
+from app.services.step_result_store import step_result_store
 from app.settings.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -10,6 +12,16 @@ logger = get_logger(__name__)
 RETENTION_DAYS_DEFAULT = 14
 
 
+RESULT_REF_CHUNK_SIZE = 500
+
+
+def _result_ref_columns(dialect_name: str) -> str:
+    """SELECT expressions for the blob reference inside ``steps.data``."""
+    if dialect_name == "postgresql":
+        return "(s.data -> 'result_ref') ->> 'backend', (s.data -> 'result_ref') ->> 'key'"
+    return "json_extract(s.data, '$.result_ref.backend'), json_extract(s.data, '$.result_ref.key')"
+
+
 async def purge_step_payloads_keep_latest_per_query(
     retention_days: int = RETENTION_DAYS_DEFAULT,
     null_fields: Tuple[str, ...] = ("data", "data_model", "view"),
@@ -20,12 +32,14 @@ async def purge_step_payloads_keep_latest_per_query(
     - If that latest is stale (created_at and updated_at both older than cutoff), purge it too.
     - Rows with NULL query_id are only purged when stale.
     - Excludes active steps ('draft', 'running').
+    - When ``data`` is purged, the out-of-row result blob it references
+      (``data["result_ref"]``, see step_result_store) is deleted too.
     """
     cutoff = datetime.utcnow() - timedelta(days=retention_days)
     set_clause = ", ".join(f"{field} = NULL" for field in null_fields)
     nonnull_predicate = " OR ".join(f"s.{field} IS NOT NULL" for field in null_fields)
 
-    sql = text(f"""
+    ranked_cte = """
     WITH ranked AS (
       SELECT
         id,
@@ -39,28 +53,60 @@ async def purge_step_payloads_keep_latest_per_query(
         ) AS rn
       FROM steps
       WHERE status IN ('success')
-    )
-    UPDATE steps AS s
-    SET {set_clause}
-    FROM ranked r
-    WHERE r.id = s.id
+    )"""
+    purge_predicate = f"""
       AND (
             (r.query_id IS NOT NULL AND r.rn > 1)
          OR (s.created_at < :cutoff AND s.updated_at < :cutoff)
       )
-      AND ({nonnull_predicate})
+      AND ({nonnull_predicate})"""
+
+    sql = text(f"""{ranked_cte}
+    UPDATE steps AS s
+    SET {set_clause}
+    FROM ranked r
+    WHERE r.id = s.id{purge_predicate}
     """)
 
     async with async_session_maker() as session:
         purged = 0
         try:
+          # Blob references of the rows about to lose their data; deleted once the purge commits
+          candidate_refs = {}
+          if "data" in null_fields:
+              refs_sql = text(f"""{ranked_cte}
+              SELECT s.id, {_result_ref_columns(session.bind.dialect.name)}
+              FROM steps s
+              JOIN ranked r ON r.id = s.id
+              WHERE s.data IS NOT NULL{purge_predicate}
+              """)
+              for step_id, backend, key in (await session.execute(refs_sql, {"cutoff": cutoff})).all():
+                  if key:
+                      candidate_refs[str(step_id)] = {"backend": backend, "key": key}
+
           result = await session.execute(sql, {"cutoff": cutoff})
-          await session.commit()
           purged = result.rowcount or 0
+
+          # Only rows whose data actually got nulled (a concurrent rerun may have kept one)
+          purged_refs = []
+          ids = list(candidate_refs)
+          for i in range(0, len(ids), RESULT_REF_CHUNK_SIZE):
+              nulled = await session.execute(
+                  text("SELECT id FROM steps WHERE id IN :ids AND data IS NULL").bindparams(
+                      bindparam("ids", expanding=True)
+                  ),
+                  {"ids": ids[i:i + RESULT_REF_CHUNK_SIZE]},
+              )
+              purged_refs.extend(candidate_refs[str(step_id)] for (step_id,) in nulled.all())
+          await session.commit()
+
+          for ref in purged_refs:
+              await asyncio.to_thread(step_result_store.delete, ref)
           logger.info(
               "Purged step payloads (keep latest per query; purge stale latest)",
               extra={
                   "purged": purged,
+                  "deleted_result_blobs": len(purged_refs),
                   "cutoff": cutoff.isoformat(),
                   "null_fields": null_fields,
                   "retention_days": retention_days,
@@ -0,0 +1,623 @@
+"""
+Mention Index
+
+Typeahead search behind ``GET /mentions/available`` (``MentionService``).
+
+``MentionService._get_tables`` used to call ``get_data_source_schema`` for
+every active data source on every request and return every active table with
+all of its columns, so the ``@`` menu of a large warehouse downloaded
+megabytes before showing anything. Files were loaded with two extra queries
+each, and entities as whole ORM rows.
+
+The index keeps lightweight entries warm per process:
+
+- Tables per (data source, overlay user): id, name, usage count and the
+  lower-cased column names (for search only; columns are not returned). Entries are rebuilt when ``schema_context_cache``'s table or
+  overlay version for the data source moves (every schema refresh, table
+  activation change and overlay upsert already bumps it), and after
+  ``mentions.index_ttl_seconds`` so usage order and other workers' changes
+  catch up. Data sources with ``user_required`` auth keep the per-user schema
+  view they had before, built once per TTL instead of per request.
+- Files and published entities per organization, for
+  ``mentions.objects_ttl_seconds``.
+- Data source access is still resolved per request; entries are filtered by
+  it before searching.
+
+``search`` ranks by exact name, name prefix, token prefix (``orders`` matches
+``public.orders_2024``), substring, then RapidFuzz ``WRatio`` above
+``FUZZY_SCORE_CUTOFF``. Tables also match on column names (``customer_id``
+finds every table with that column), below any name match but above fuzzy
+ones; ties keep the unfiltered order (usage for tables,
+mention count for entities). Each category is paginated with ``limit`` and
+``offset`` and reports its total. Table columns are left out unless asked
+for; ``table_columns`` returns them for the one table the user picked.
+"""
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from rapidfuzz import fuzz, process
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.context.schema_context_cache import schema_context_cache
+from app.models.data_source import DataSource
+from app.models.data_source_membership import DataSourceMembership, PRINCIPAL_TYPE_USER
+from app.models.datasource_table import DataSourceTable
+from app.models.entity import Entity, entity_data_source_association
+from app.models.file import File
+from app.models.mention import Mention
+from app.models.organization import Organization
+from app.models.table_stats import TableStats
+from app.models.user import User
+from app.schemas.mention_schema import MentionType
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_INDEX_TTL_SECONDS = 300
+DEFAULT_OBJECTS_TTL_SECONDS = 30
+DEFAULT_MAX_LIMIT = 200
+MAX_TABLE_ENTRIES = 512
+FUZZY_SCORE_CUTOFF = 70
+KEYWORD_EXACT_SCORE = 99.0
+KEYWORD_PREFIX_SCORE = 98.0
+QUERY_CHUNK_SIZE = 500
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def _prefix_keys(values: Iterable[Tuple[int, str]]) -> List[Tuple[str, int]]:
+    """Sorted (key, position) pairs for each value and its tokens."""
+    keys = set()
+    for i, value in values:
+        keys.add((value, i))
+        for token in _TOKEN_SPLIT.split(value):
+            if token:
+                keys.add((token, i))
+    return sorted(keys)
+
+
+class SearchCatalog:
+    """Lower-cased names of one list of items, with a sorted prefix table.
+
+    ``keywords`` (one list per item, e.g. a table's column names) are matched
+    by prefix too, scoring below any name match.
+    """
+
+    def __init__(self, names: Iterable[Optional[str]], keywords: Optional[Iterable[Iterable[str]]] = None):
+        self.names = [(n or "").lower() for n in names]
+        self._keys = _prefix_keys(enumerate(self.names))
+        self._keyword_keys = _prefix_keys(
+            (i, (word or "").lower()) for i, words in enumerate(keywords or []) for word in words if word
+        )
+
+    def scores(self, q: str) -> Dict[int, float]:
+        """Match score per item position; any prefix or substring hit beats a fuzzy one."""
+        scores: Dict[int, float] = {}
+        start = bisect.bisect_left(self._keys, (q, -1))
+        for key, i in self._keys[start:]:
+            if not key.startswith(q):
+                break
+            name = self.names[i]
+            score = 300.0 if name == q else 200.0 if name.startswith(q) else 150.0
+            if score > scores.get(i, 0.0):
+                scores[i] = score
+        for i, name in enumerate(self.names):
+            if i not in scores and q in name:
+                scores[i] = 100.0
+        start = bisect.bisect_left(self._keyword_keys, (q, -1))
+        for key, i in self._keyword_keys[start:]:
+            if not key.startswith(q):
+                break
+            score = KEYWORD_EXACT_SCORE if key == q else KEYWORD_PREFIX_SCORE
+            if score > scores.get(i, 0.0):
+                scores[i] = score
+        if len(q) >= 2 and self.names:
+            for _, score, i in process.extract(
+                q, self.names, scorer=fuzz.WRatio, limit=None, score_cutoff=FUZZY_SCORE_CUTOFF
+            ):
+                # Fuzzy name hits rank below keyword hits
+                score = min(float(score), KEYWORD_PREFIX_SCORE - 1)
+                if score > scores.get(i, 0.0):
+                    scores[i] = score
+        return scores
+
+
+def _rank(groups: List[Tuple[SearchCatalog, List[Any]]], q: Optional[str]) -> List[Any]:
+    """Items of all groups, best match first; without ``q`` the groups' own order."""
+    if not q:
+        return [item for _, items in groups for item in items]
+    ranked: List[Tuple[float, int, Any]] = []
+    position = 0
+    for catalog, items in groups:
+        scores = catalog.scores(q)
+        for i, item in enumerate(items):
+            if i in scores:
+                ranked.append((-scores[i], position + i, item))
+        position += len(items)
+    ranked.sort(key=lambda r: (r[0], r[1]))
+    return [item for _, _, item in ranked]
+
+
+class _TableEntry:
+    """Indexed tables of one data source (or one user's view of it)."""
+
+    __slots__ = ("tables", "columns", "catalog", "versions", "built_at")
+
+    def __init__(
+        self,
+        tables: List[Dict[str, Any]],
+        columns: Optional[Dict[str, List[dict]]],
+        versions: tuple,
+        column_names: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.tables = tables
+        self.columns = columns
+        if column_names is None:
+            column_names = {tid: [c.get("name") for c in cols] for tid, cols in (columns or {}).items()}
+        self.catalog = SearchCatalog(
+            (t["name"] for t in tables),
+            keywords=[column_names.get(t["id"]) or [] for t in tables],
+        )
+        self.versions = versions
+        self.built_at = time.monotonic()
+
+
+class _ObjectsEntry:
+    __slots__ = ("items", "catalog", "built_at")
+
+    def __init__(self, items: List[Dict[str, Any]], names: Iterable[Optional[str]]):
+        self.items = items
+        self.catalog = SearchCatalog(names)
+        self.built_at = time.monotonic()
+
+
+class MentionIndex:
+    """Process-wide typeahead index of mentionable objects."""
+
+    def __init__(self):
+        self._config: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+        self._tables: "OrderedDict[tuple, _TableEntry]" = OrderedDict()
+        self._files: Dict[str, _ObjectsEntry] = {}
+        self._entities: Dict[str, _ObjectsEntry] = {}
+        self._hits = 0
+        self._builds = 0
+
+    @property
+    def config(self) -> Dict[str, int]:
+        if self._config is None:
+            config = {
+                "index_ttl_seconds": DEFAULT_INDEX_TTL_SECONDS,
+                "objects_ttl_seconds": DEFAULT_OBJECTS_TTL_SECONDS,
+                "max_limit": DEFAULT_MAX_LIMIT,
+            }
+            try:
+                from app.settings.config import settings
+                cfg = getattr(settings.bow_config, "mentions", None)
+                if cfg is not None:
+                    config.update({k: int(v) for k, v in cfg.model_dump().items() if v is not None})
+            except Exception:
+                pass
+            self._config = config
+        return self._config
+
+    def invalidate(self, organization_id: Optional[str] = None, data_source_id: Optional[str] = None) -> None:
+        """Drop cached entries; table entries also follow ``schema_context_cache`` versions."""
+        with self._lock:
+            if data_source_id is not None:
+                for key in [k for k in self._tables if k[0] == str(data_source_id)]:
+                    self._tables.pop(key, None)
+            if organization_id is not None:
+                self._files.pop(str(organization_id), None)
+                self._entities.pop(str(organization_id), None)
+
+    # ----- tables -----
+
+    @staticmethod
+    def _versions(data_source_id: str, user_id: Optional[str]) -> tuple:
+        # Stats versions move on every usage flush; usage order follows the TTL instead
+        tables, _, overlay = schema_context_cache.versions(data_source_id, user_id)
+        return tables, overlay
+
+    async def _table_entry(self, db: AsyncSession, organization: Organization, current_user: User, ds) -> _TableEntry:
+        ds_id = str(ds.id)
+        overlay_user = str(current_user.id) if (getattr(ds, "auth_policy", None) == "user_required" and current_user) else None
+        key = (ds_id, overlay_user)
+        versions = self._versions(ds_id, overlay_user)
+        with self._lock:
+            entry = self._tables.get(key)
+            if (
+                entry is not None
+                and entry.versions == versions
+                and time.monotonic() - entry.built_at <= self.config["index_ttl_seconds"]
+            ):
+                self._tables.move_to_end(key)
+                self._hits += 1
+                return entry
+
+        usage = await self._usage_counts(db, str(organization.id), ds_id)
+        if overlay_user is not None:
+            entry = await self._build_overlay_entry(db, organization, current_user, ds, usage, versions)
+        else:
+            rows = await db.execute(
+                select(DataSourceTable.id, DataSourceTable.name, DataSourceTable.columns).where(
+                    DataSourceTable.datasource_id == ds_id,
+                    DataSourceTable.is_active == True,
+                )
+            )
+            tables = []
+            column_names: Dict[str, List[str]] = {}
+            for tid, name, cols in rows.all():
+                tables.append({"id": str(tid), "name": name, "datasource_id": ds_id, "usage_count": usage.get((name or "").lower(), 0)})
+                # Only the names are kept; full columns are loaded per request
+                column_names[str(tid)] = [c.get("name") for c in (cols or []) if isinstance(c, dict) and c.get("name")]
+            tables.sort(key=lambda t: t["usage_count"], reverse=True)
+            entry = _TableEntry(tables, None, versions, column_names)
+
+        with self._lock:
+            self._tables[key] = entry
+            self._tables.move_to_end(key)
+            while len(self._tables) > MAX_TABLE_ENTRIES:
+                self._tables.popitem(last=False)
+            self._builds += 1
+        return entry
+
+    @staticmethod
+    async def _usage_counts(db: AsyncSession, org_id: str, ds_id: str) -> Dict[str, int]:
+        try:
+            rows = await db.execute(
+                select(TableStats.table_fqn, TableStats.usage_count).where(
+                    TableStats.org_id == org_id,
+                    TableStats.report_id == None,
+                    TableStats.data_source_id == ds_id,
+                )
+            )
+            return {(fqn or "").lower(): int(count or 0) for fqn, count in rows.all()}
+        except Exception:
+            return {}
+
+    async def _build_overlay_entry(
+        self, db: AsyncSession, organization: Organization, current_user: User, ds, usage: Dict[str, int], versions: tuple
+    ) -> _TableEntry:
+        """Index a user's live schema view of a ``user_required`` data source."""
+        from app.services.data_source_service import DataSourceService
+
+        ds_id = str(ds.id)
+        try:
+            schema = await DataSourceService().get_data_source_schema(
+                db=db,
+                data_source_id=ds_id,
+                include_inactive=False,
+                organization=organization,
+                current_user=current_user,
+            )
+        except Exception as e:
+            logger.debug(f"Mention index: schema for data source {ds_id} failed: {e}")
+            schema = []
+
+        # Overlay tables carry no id; link them to the canonical row by name
+        rows = await db.execute(
+            select(DataSourceTable.id, DataSourceTable.name).where(DataSourceTable.datasource_id == ds_id)
+        )
+        canonical = {name: str(tid) for tid, name in rows.all()}
+
+        tables: List[Dict[str, Any]] = []
+        columns: Dict[str, List[dict]] = {}
+        for table in schema:
+            if not getattr(table, "is_active", True):
+                continue
+            table_id = getattr(table, "id", None) or canonical.get(table.name)
+            if not table_id:
+                # Not synced into data_source_tables yet: no id a mention could resolve
+                logger.debug(f"Mention index: skipping overlay table {table.name!r} of {ds_id} without a canonical row")
+                continue
+            table_id = str(table_id)
+            tables.append({
+                "id": table_id,
+                "name": table.name,
+                "datasource_id": ds_id,
+                "usage_count": usage.get((table.name or "").lower(), 0),
+            })
+            columns[table_id] = [
+                {"name": getattr(col, "name", str(col)), "dtype": getattr(col, "dtype", None)}
+                for col in (getattr(table, "columns", None) or [])
+            ]
+        tables.sort(key=lambda t: t["usage_count"], reverse=True)
+        return _TableEntry(tables, columns, versions)
+
+    async def _load_columns(self, db: AsyncSession, table_ids: List[str]) -> Dict[str, List[dict]]:
+        columns: Dict[str, List[dict]] = {}
+        for i in range(0, len(table_ids), QUERY_CHUNK_SIZE):
+            rows = await db.execute(
+                select(DataSourceTable.id, DataSourceTable.columns).where(
+                    DataSourceTable.id.in_(table_ids[i:i + QUERY_CHUNK_SIZE])
+                )
+            )
+            for tid, cols in rows.all():
+                columns[str(tid)] = [
+                    {"name": c.get("name"), "dtype": c.get("dtype")} for c in (cols or []) if isinstance(c, dict)
+                ]
+        return columns
+
+    # ----- files and entities -----
+
+    async def _files_entry(self, db: AsyncSession, organization: Organization) -> _ObjectsEntry:
+        org_id = str(organization.id)
+        with self._lock:
+            entry = self._files.get(org_id)
+            if entry is not None and time.monotonic() - entry.built_at <= self.config["objects_ttl_seconds"]:
+                self._hits += 1
+                return entry
+        rows = await db.execute(
+            select(File.id, File.filename, File.content_type, File.path, File.created_at).where(
+                File.organization_id == org_id
+            )
+        )
+        items = [
+            {
+                "id": str(fid),
+                "type": "file",
+                "filename": filename,
+                "content_type": content_type,
+                "path": path,
+                "created_at": created_at.isoformat() if created_at else None,
+            }
+            for fid, filename, content_type, path, created_at in rows.all()
+        ]
+        entry = _ObjectsEntry(items, (i["filename"] for i in items))
+        with self._lock:
+            self._files[org_id] = entry
+            self._builds += 1
+        return entry
+
+    async def _entities_entry(self, db: AsyncSession, organization: Organization) -> _ObjectsEntry:
+        org_id = str(organization.id)
+        with self._lock:
+            entry = self._entities.get(org_id)
+            if entry is not None and time.monotonic() - entry.built_at <= self.config["objects_ttl_seconds"]:
+                self._hits += 1
+                return entry
+        rows = await db.execute(
+            select(
+                Entity.id, Entity.title, Entity.slug, Entity.type, Entity.description,
+                Entity.status, Entity.tags, Entity.created_at,
+            ).where(
+                Entity.organization_id == org_id,
+                Entity.deleted_at == None,
+                Entity.status == "published",
+            )
+        )
+        items = [
+            {
+                "id": str(eid),
+                "type": "entity",
+                "title": title,
+                "slug": slug,
+                "entity_type": etype,
+                "description": description,
+                "status": status,
+                "tags": tags or [],
+                "data_source_ids": [],
+                "_created_at": created_at,
+            }
+            for eid, title, slug, etype, description, status, tags, created_at in rows.all()
+        ]
+        by_id = {item["id"]: item for item in items}
+        mention_counts: Dict[str, int] = {}
+        entity_ids = list(by_id)
+        for i in range(0, len(entity_ids), QUERY_CHUNK_SIZE):
+            chunk = entity_ids[i:i + QUERY_CHUNK_SIZE]
+            links = await db.execute(
+                select(entity_data_source_association.c.entity_id, entity_data_source_association.c.data_source_id)
+                .where(entity_data_source_association.c.entity_id.in_(chunk))
+            )
+            for eid, ds_id in links.all():
+                by_id[str(eid)]["data_source_ids"].append(str(ds_id))
+            try:
+                counts = await db.execute(
+                    select(Mention.object_id, func.count().label("cnt"))
+                    .where(Mention.type == MentionType.ENTITY, Mention.object_id.in_(chunk))
+                    .group_by(Mention.object_id)
+                )
+                mention_counts.update({str(oid): int(cnt or 0) for oid, cnt in counts.all()})
+            except Exception:
+                pass
+
+        # Most mentioned first, then newest
+        items.sort(
+            key=lambda e: (mention_counts.get(e["id"], 0), e["_created_at"].timestamp() if e["_created_at"] else 0.0),
+            reverse=True,
+        )
+        for item in items:
+            del item["_created_at"]
+        entry = _ObjectsEntry(items, (f"{e['title'] or ''} {e['slug'] or ''}" for e in items))
+        with self._lock:
+            self._entities[org_id] = entry
+            self._builds += 1
+        return entry
+
+    @staticmethod
+    async def _accessible_data_source_ids(db: AsyncSession, organization: Organization, current_user: User) -> set:
+        """Data sources (active or not) the user may see; entities need all of theirs."""
+        rows = await db.execute(
+            select(DataSource.id).where(
+                DataSource.organization_id == organization.id,
+                or_(
+                    DataSource.is_public == True,
+                    DataSource.id.in_(
+                        select(DataSourceMembership.data_source_id).where(
+                            DataSourceMembership.principal_type == PRINCIPAL_TYPE_USER,
+                            DataSourceMembership.principal_id == current_user.id,
+                        )
+                    ),
+                ),
+            )
+        )
+        return {str(ds_id) for ds_id in rows.scalars().all()}
+
+    # ----- search -----
+
+    def _page(self, items: List[Any], limit: Optional[int], offset: int) -> List[Any]:
+        offset = max(0, offset or 0)
+        if limit is None:
+            return items[offset:]
+        limit = max(0, min(int(limit), self.config["max_limit"]))
+        return items[offset:offset + limit]
+
+    async def search(
+        self,
+        db: AsyncSession,
+        organization: Organization,
+        current_user: User,
+        data_sources: List[Any],
+        data_source_items: List[Dict[str, Any]],
+        *,
+        categories: Iterable[str],
+        data_source_ids: Optional[List[str]] = None,
+        q: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        include_columns: bool = False,
+    ) -> Dict[str, Any]:
+        """Ranked, paginated mentions per category plus ``total`` matches per category.
+
+        ``data_sources`` are the user's active data sources and
+        ``data_source_items`` their mention dicts (same order).
+        """
+        q = (q or "").strip().lower() or None
+        categories = set(categories)
+        id_filter = {str(x) for x in data_source_ids} if data_source_ids else None
+        result: Dict[str, Any] = {"data_sources": [], "tables": [], "files": [], "entities": []}
+        totals: Dict[str, int] = {}
+
+        if "data_sources" in categories:
+            catalog = SearchCatalog(item.get("name") for item in data_source_items)
+            ranked = _rank([(catalog, data_source_items)], q)
+            totals["data_sources"] = len(ranked)
+            result["data_sources"] = self._page(ranked, limit, offset)
+
+        if "tables" in categories:
+            groups = []
+            scoped = [ds for ds in data_sources if id_filter is None or str(ds.id) in id_filter]
+            entries: Dict[str, _TableEntry] = {}
+            for ds in scoped:
+                try:
+                    entries[str(ds.id)] = entry = await self._table_entry(db, organization, current_user, ds)
+                except Exception as e:
+                    logger.debug(f"Mention index: tables for data source {ds.id} failed: {e}")
+                    continue
+                groups.append((entry.catalog, [(ds, t) for t in entry.tables]))
+            ranked = _rank(groups, q)
+            if not q:
+                # Across data sources, most used first (stable within equal usage)
+                ranked.sort(key=lambda pair: pair[1]["usage_count"], reverse=True)
+            totals["tables"] = len(ranked)
+            page = self._page(ranked, limit, offset)
+
+            columns: Dict[str, List[dict]] = {}
+            if include_columns:
+                canonical_ids = []
+                for ds, table in page:
+                    overlay = entries[str(ds.id)].columns
+                    if overlay is not None:
+                        columns[table["id"]] = overlay.get(table["id"], [])
+                    else:
+                        canonical_ids.append(table["id"])
+                columns.update(await self._load_columns(db, canonical_ids))
+            result["tables"] = [
+                {
+                    "id": table["id"],
+                    "type": "datasource_table",
+                    "name": table["name"],
+                    "datasource_id": table["datasource_id"],
+                    "columns": columns.get(table["id"], []),
+                    "is_active": True,
+                    "data_source_name": ds.name,
+                    "data_source_type": ds.type,
+                }
+                for ds, table in page
+            ]
+
+        if "files" in categories:
+            try:
+                entry = await self._files_entry(db, organization)
+                ranked = _rank([(entry.catalog, entry.items)], q)
+            except Exception as e:
+                logger.debug(f"Mention index: files failed: {e}")
+                ranked = []
+            totals["files"] = len(ranked)
+            result["files"] = self._page(ranked, limit, offset)
+
+        if "entities" in categories:
+            try:
+                entry = await self._entities_entry(db, organization)
+                accessible = await self._accessible_data_source_ids(db, organization, current_user)
+                ranked = [
+                    e for e in _rank([(entry.catalog, entry.items)], q)
+                    if all(ds_id in accessible for ds_id in e["data_source_ids"])
+                    and (id_filter is None or any(ds_id in id_filter for ds_id in e["data_source_ids"]))
+                ]
+            except Exception as e:
+                logger.debug(f"Mention index: entities failed: {e}")
+                ranked = []
+            totals["entities"] = len(ranked)
+            result["entities"] = self._page(ranked, limit, offset)
+
+        result["total"] = totals
+        return result
+
+    async def table_columns(
+        self,
+        db: AsyncSession,
+        organization: Organization,
+        current_user: User,
+        data_sources: List[Any],
+        table_id: str,
+    ) -> Dict[str, Any]:
+        """Columns of one mentioned table the user can access."""
+        by_id = {str(ds.id): ds for ds in data_sources}
+        for ds in data_sources:
+            if getattr(ds, "auth_policy", None) != "user_required":
+                continue
+            entry = await self._table_entry(db, organization, current_user, ds)
+            if entry.columns is not None and table_id in entry.columns:
+                table = next(t for t in entry.tables if t["id"] == table_id)
+                return {"id": table_id, "name": table["name"], "datasource_id": str(ds.id), "columns": entry.columns[table_id]}
+
+        row = await db.execute(
+            select(DataSourceTable.id, DataSourceTable.name, DataSourceTable.datasource_id, DataSourceTable.columns).where(
+                DataSourceTable.id == table_id,
+                DataSourceTable.is_active == True,
+            )
+        )
+        row = row.first()
+        if row is None or str(row.datasource_id) not in by_id:
+            raise HTTPException(status_code=404, detail="Table not found")
+        return {
+            "id": str(row.id),
+            "name": row.name,
+            "datasource_id": str(row.datasource_id),
+            "columns": [{"name": c.get("name"), "dtype": c.get("dtype")} for c in (row.columns or []) if isinstance(c, dict)],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "table_entries": len(self._tables),
+                "indexed_tables": sum(len(e.tables) for e in self._tables.values()),
+                "file_entries": len(self._files),
+                "entity_entries": len(self._entities),
+                "hits": self._hits,
+                "builds": self._builds,
+                **self.config,
+            }
+
+
+mention_index = MentionIndex()
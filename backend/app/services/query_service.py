@@ -173,12 +173,12 @@ class QueryService:
         if not report:
             raise ValueError("Report not found for step's widget")
 
-        ds_clients = {ds.name: ds.get_client() for ds in report.data_sources}
+        ds_clients = {ds.name: ds.get_client(query_cache=True) for ds in report.data_sources}
         excel_files = report.files
-        executor = StreamingCodeExecutor()
+        executor = StreamingCodeExecutor(organization_id=str(report.organization_id))
         try:
-            exec_df, execution_log = executor.execute_code(code=step.code, ds_clients=ds_clients, excel_files=excel_files)
-            df = executor.format_df_for_widget(exec_df)
+            exec_df, execution_log = await executor.aexecute_code(code=step.code, ds_clients=ds_clients, excel_files=excel_files)
+            df = await executor.aformat_df_for_widget(exec_df, persist_result=True)
             # Persist results on the new step
             step.data = df
             step.status = "success"
@@ -286,12 +286,12 @@ class QueryService:
         if not report:
             raise ValueError("Report not found for query's widget")
 
-        ds_clients = {ds.name: ds.get_client() for ds in report.data_sources}
+        ds_clients = {ds.name: ds.get_client(query_cache=True) for ds in report.data_sources}
         excel_files = report.files
-        executor = StreamingCodeExecutor()
+        executor = StreamingCodeExecutor(organization_id=str(report.organization_id))
 
         try:
-            exec_df, execution_log = executor.execute_code(code=request.code or "", ds_clients=ds_clients, excel_files=excel_files)
+            exec_df, execution_log = await executor.aexecute_code(code=request.code or "", ds_clients=ds_clients, excel_files=excel_files)
             df = executor.format_df_for_widget(exec_df)
             return {"preview": df, "execution_log": execution_log}
         except Exception as e:
@@ -29,9 +29,7 @@ import asyncio
 from app.core.scheduler import scheduler
 from app.models.dashboard_layout_version import DashboardLayoutVersion
 from app.services.dashboard_layout_service import DashboardLayoutService
-from app.models.visualization import Visualization
-from app.models.query import Query
-from app.models.step import Step
+from app.services.dashboard_refresh_planner import DashboardRefreshPlanner
 
 logger = getLogger(__name__)
 
@@ -289,41 +287,21 @@ class ReportService:
             viz_blocks = []
 
         if viz_blocks:
-            for b in viz_blocks:
-                viz_id = b.get('visualization_id')
-                if not viz_id:
-                    continue
-                # Load visualization and its query
-                viz_result = await db.execute(select(Visualization).where(Visualization.id == viz_id))
-                viz = viz_result.scalar_one_or_none()
-                if not viz:
-                    logger.warning("Visualization %s not found for report %s; skipping", viz_id, report_id)
-                    continue
-                if not viz.query_id:
-                    logger.warning("Visualization %s has no query_id; skipping", viz_id)
-                    continue
-                query = await db.get(Query, viz.query_id)
-                if not query:
-                    logger.warning("Query %s not found for visualization %s; skipping", viz.query_id, viz_id)
-                    continue
-
-                # Choose step: prefer default_step, else latest step for query
-                step: Step | None = None
-                if query.default_step_id:
-                    step = await db.get(Step, query.default_step_id)
-                if not step:
-                    step_result = await db.execute(
-                        select(Step).where(Step.query_id == query.id).order_by(Step.created_at.desc()).limit(1)
-                    )
-                    step = step_result.scalar_one_or_none()
-
-                if not step:
-                    raise HTTPException(status_code=400, detail=f"No step found for visualization {viz_id}")
-                if not step.code or not str(step.code).strip():
-                    raise HTTPException(status_code=400, detail=f"Step code is empty for visualization {viz_id}; cannot rerun")
-
-                logger.info(f"Running visualization {viz_id} via step {step.id} for report {report_id}")
-                await self.widget_service.step_service.rerun_step(db, step.id)
+            planner = DashboardRefreshPlanner(self.widget_service.step_service)
+            summary = await planner.refresh(
+                db,
+                [b.get('visualization_id') for b in viz_blocks],
+                [ds.name for ds in (report.data_sources or [])],
+            )
+            logger.info(
+                f"Dashboard refresh for report {report_id}: {summary.succeeded} succeeded, "
+                f"{summary.failed} failed, {summary.skipped} skipped across {summary.steps_run} step(s) "
+                f"in {summary.duration_ms:.0f}ms"
+            )
+            for tile in summary.tiles:
+                if tile.status != "success":
+                    logger.warning(f"Visualization {tile.visualization_id} not refreshed ({tile.status}): {tile.error}")
+            report = report.model_copy(update={"last_refresh": summary})
         else:
             # Legacy fallback: rerun last step for each published widget
             published_widgets = await self.widget_service.get_published_widgets_for_report(db, report_id)
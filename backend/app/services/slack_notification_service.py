@@ -12,7 +12,7 @@ from app.models.step import Step
 from app.models.widget import Widget
 from app.models.completion import Completion
 from app.models.external_platform import ExternalPlatform
-from app.settings.database import create_async_session_factory
+from app.settings.database import create_async_session_factory, BACKGROUND_POOL
 from app.services.platform_adapters.adapter_factory import PlatformAdapterFactory
 
 def create_plot(data_model: dict, data: dict, title: str) -> str:
@@ -180,7 +180,7 @@ async def send_step_result_to_slack(step_id: str, external_user_id: str | None =
     If not provided, falls back to discovering them from the latest completion
     associated with the step.
     """
-    session_maker = create_async_session_factory()
+    session_maker = create_async_session_factory(BACKGROUND_POOL)
     async with session_maker() as db:
         try:
             stmt = select(Step).options(
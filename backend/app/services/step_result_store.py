@@ -0,0 +1,472 @@
+"""
+Step Result Store
+
+Full step results stored out of row as compressed Arrow IPC blobs.
+
+``Step.data`` holds ``format_df_for_widget`` output: row dicts (every key
+repeated) capped at 1000 rows, so CSV export could only ever return those
+rows. When a step's result is formatted with ``persist_result=True`` the
+whole DataFrame (up to ``step_results.max_rows``) is also written here and
+``Step.data["result_ref"]`` points at it:
+
+    {"backend": "local", "key": "ab/<uuid>.arrow", "format": "arrow_ipc",
+     "compression": "zstd", "total_rows": 123456, "columns": [...], "bytes": 4096}
+
+The inline rows then shrink to a sample (``step_results.inline_rows``) for
+charts and agent context. The blob serves paginated/sorted row reads
+(``page``, which reads only the record batches a page needs) and streamed
+CSV export (``iter_csv``). Backends are pluggable: anything implementing
+``ResultBackend`` can be registered under a name and selected with
+``step_results.backend``; ``local`` (files under ``step_results.local_path``)
+is built in.
+"""
+import base64
+import datetime
+import decimal
+import io
+import json
+import logging
+import math
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_LOCAL_PATH = "uploads/step_results"
+DEFAULT_MAX_ROWS = 1_000_000
+DEFAULT_COMPRESSION = "zstd"
+DEFAULT_INLINE_ROWS = 100
+MAX_PAGE_SIZE = 5000
+LAYOUT_CACHE_ENTRIES = 256
+SORT_CACHE_ENTRIES = 8
+
+
+class ResultBackend:
+    """Blob storage for result files."""
+
+    name = ""
+
+    def write(self, key: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalResultBackend(ResultBackend):
+    name = "local"
+
+    def __init__(self, root: str = DEFAULT_LOCAL_PATH):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(os.path.abspath(self.root) + os.sep):
+            raise ValueError(f"Invalid result key: {key}")
+        return path
+
+    def write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+def _to_arrow_table(df: pd.DataFrame):
+    """Arrow table for ``df``; columns Arrow can't type (mixed objects) become strings."""
+    import pyarrow as pa
+
+    df = df.reset_index(drop=True)
+    df.columns = [str(c) for c in df.columns]
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        pass
+    df = df.copy()
+    for col in df.columns:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            df[col] = df[col].map(lambda v: None if v is None or (isinstance(v, float) and math.isnan(v)) else str(v))
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _json_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return None if math.isnan(value) or math.isinf(value) else value
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, dict):
+        return {k: _json_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json_value(v) for v in value]
+    return value
+
+
+class StepResultStore:
+    """Writes, pages and exports out-of-row step results."""
+
+    def __init__(self):
+        self._backends: Dict[str, ResultBackend] = {}
+        self._config: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._layouts: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._sort_orders: "OrderedDict[tuple, Any]" = OrderedDict()
+
+    # ----- configuration -----
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            config = {
+                "enabled": True,
+                "backend": "local",
+                "local_path": DEFAULT_LOCAL_PATH,
+                "max_rows": DEFAULT_MAX_ROWS,
+                "compression": DEFAULT_COMPRESSION,
+                "inline_rows": DEFAULT_INLINE_ROWS,
+            }
+            try:
+                from app.settings.config import settings
+                cfg = getattr(settings.bow_config, "step_results", None)
+                if cfg is not None:
+                    config.update({k: v for k, v in cfg.model_dump().items() if v is not None})
+            except Exception:
+                pass
+            self._config = config
+        return self._config
+
+    def register_backend(self, backend: ResultBackend) -> None:
+        with self._lock:
+            self._backends[backend.name] = backend
+
+    def _backend(self, name: Optional[str] = None) -> ResultBackend:
+        name = name or self.config["backend"]
+        with self._lock:
+            backend = self._backends.get(name)
+            if backend is None and name == LocalResultBackend.name:
+                backend = LocalResultBackend(self.config["local_path"])
+                self._backends[name] = backend
+        if backend is None:
+            raise ValueError(f"Unknown step result backend: {name}")
+        return backend
+
+    # ----- write -----
+
+    def put_dataframe(self, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Store ``df`` and return its reference, or None when disabled."""
+        if not self.config["enabled"]:
+            return None
+        import pyarrow as pa
+
+        total_rows = int(len(df))
+        max_rows = int(self.config["max_rows"] or 0)
+        if max_rows and total_rows > max_rows:
+            df = df.head(max_rows)
+        table = _to_arrow_table(df)
+
+        sink = io.BytesIO()
+        compression = self.config["compression"] or None
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table, max_chunksize=64 * 1024)
+        data = sink.getvalue()
+
+        name = uuid.uuid4().hex
+        key = f"{name[:2]}/{name}.arrow"
+        backend = self._backend()
+        backend.write(key, data)
+        return {
+            "backend": backend.name,
+            "key": key,
+            "format": "arrow_ipc",
+            "compression": compression,
+            "total_rows": total_rows,
+            "stored_rows": int(table.num_rows),
+            "columns": list(table.column_names),
+            "bytes": len(data),
+        }
+
+    def delete(self, ref: Optional[Dict[str, Any]]) -> None:
+        if not ref or not ref.get("key"):
+            return
+        cache_key = (ref.get("backend"), ref["key"])
+        with self._lock:
+            self._layouts.pop(cache_key, None)
+            for key in [k for k in self._sort_orders if k[:2] == cache_key]:
+                self._sort_orders.pop(key, None)
+        try:
+            self._backend(ref.get("backend")).delete(ref["key"])
+        except Exception as e:
+            logger.warning(f"Failed to delete step result {ref.get('key')}: {e}")
+
+    # ----- read -----
+
+    def read_table(self, ref: Dict[str, Any]):
+        """The whole stored result as one Arrow table (not cached)."""
+        import pyarrow as pa
+
+        with self._backend(ref.get("backend")).open(ref["key"]) as f:
+            return pa.ipc.open_file(f).read_all()
+
+    def _cached(self, cache: "OrderedDict[tuple, Any]", key: tuple, entries: int, load):
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+                return value
+        value = load()
+        with self._lock:
+            cache[key] = value
+            while len(cache) > entries:
+                cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _open_file(f: BinaryIO, columns: Optional[List[int]] = None):
+        import pyarrow as pa
+
+        options = pa.ipc.IpcReadOptions(included_fields=columns) if columns is not None else None
+        return pa.ipc.open_file(f, options=options)
+
+    def _layout(self, ref: Dict[str, Any]) -> Dict[str, Any]:
+        """Column names and the first row of every record batch, read from the first column only."""
+        import numpy as np
+
+        def load():
+            with self._backend(ref.get("backend")).open(ref["key"]) as f:
+                names = list(self._open_file(f).schema.names)
+                reader = self._open_file(f, [0])
+                sizes = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+            starts = np.zeros(len(sizes) + 1, dtype=np.int64)
+            np.cumsum(sizes, out=starts[1:])
+            return {"columns": names, "starts": starts}
+
+        return self._cached(self._layouts, (ref.get("backend"), ref["key"]), LAYOUT_CACHE_ENTRIES, load)
+
+    def _sort_order(self, ref: Dict[str, Any], column: int, descending: bool):
+        """Row positions sorted by one column (nulls last), read from that column only."""
+        import pyarrow.compute as pc
+
+        def load():
+            with self._backend(ref.get("backend")).open(ref["key"]) as f:
+                values = self._open_file(f, [column]).read_all().column(0)
+            indices = pc.array_sort_indices(
+                values.combine_chunks(),
+                order="descending" if descending else "ascending",
+                null_placement="at_end",
+            )
+            return indices.to_numpy().astype("int64")
+
+        key = (ref.get("backend"), ref["key"], column, descending)
+        return self._cached(self._sort_orders, key, SORT_CACHE_ENTRIES, load)
+
+    def _take_rows(self, ref: Dict[str, Any], starts, positions) -> List[Dict[str, Any]]:
+        """Rows at ``positions``, decoding only the record batches that hold them."""
+        import numpy as np
+
+        if len(positions) == 0:
+            return []
+        batches = np.searchsorted(starts, positions, side="right") - 1
+        rows: List[Any] = [None] * len(positions)
+        with self._backend(ref.get("backend")).open(ref["key"]) as f:
+            reader = self._open_file(f)
+            for batch in np.unique(batches):
+                slots = np.flatnonzero(batches == batch)
+                local = positions[slots] - starts[batch]
+                taken = reader.get_batch(int(batch)).take(local).to_pylist()
+                for slot, row in zip(slots, taken):
+                    rows[slot] = {k: _json_value(v) for k, v in row.items()}
+        return rows
+
+    def page(
+        self,
+        ref: Dict[str, Any],
+        *,
+        offset: int = 0,
+        limit: int = 100,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+    ) -> Dict[str, Any]:
+        """Return one page of rows, optionally sorted by a column.
+
+        Only the record batches covering the page are read; a sort reads the
+        sort column once and keeps its order per (result, column, direction).
+        """
+        import numpy as np
+
+        layout = self._layout(ref)
+        columns, starts = layout["columns"], layout["starts"]
+        total_rows = int(starts[-1])
+        offset = max(0, int(offset))
+        limit = max(0, min(int(limit), MAX_PAGE_SIZE))
+        end = min(offset + limit, total_rows)
+        if sort_by:
+            if sort_by not in columns:
+                raise ValueError(f"Unknown sort column: {sort_by}")
+            positions = self._sort_order(ref, columns.index(sort_by), descending)[offset:end]
+        else:
+            positions = np.arange(offset, max(offset, end), dtype=np.int64)
+        return {
+            "columns": [{"headerName": c, "field": c} for c in columns],
+            "rows": self._take_rows(ref, starts, positions),
+            "offset": offset,
+            "limit": limit,
+            "total_rows": total_rows,
+            "sort_by": sort_by,
+            "descending": descending,
+        }
+
+    def iter_csv(self, ref: Dict[str, Any]) -> Iterator[bytes]:
+        """Yield the stored result as CSV, one record batch at a time.
+
+        The blob is opened before returning so a missing result fails here
+        rather than halfway through a streamed response.
+        """
+        f = self._backend(ref.get("backend")).open(ref["key"])
+        return self._csv_batches(f)
+
+    @staticmethod
+    def _csv_batches(f: BinaryIO) -> Iterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        try:
+            reader = pa.ipc.open_file(f)
+            if reader.num_record_batches == 0:
+                yield (",".join(_csv_header(reader.schema.names)) + "\n").encode("utf-8")
+                return
+            for i in range(reader.num_record_batches):
+                buffer = io.BytesIO()
+                pa_csv.write_csv(
+                    _csv_ready(reader.get_batch(i)),
+                    buffer,
+                    write_options=pa_csv.WriteOptions(include_header=(i == 0)),
+                )
+                yield buffer.getvalue()
+        finally:
+            f.close()
+
+
+def _csv_ready(batch):
+    """Nested columns (lists, structs, maps, e.g. from JSON results) as JSON text; the CSV writer rejects them."""
+    import pyarrow as pa
+
+    if not any(pa.types.is_nested(field.type) for field in batch.schema):
+        return batch
+    arrays = []
+    for field, column in zip(batch.schema, batch.columns):
+        if pa.types.is_nested(field.type):
+            column = pa.array(
+                [None if v is None else json.dumps(_json_value(v), default=str) for v in column.to_pylist()],
+                type=pa.string(),
+            )
+        arrays.append(column)
+    return pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
+
+
+def _csv_header(names: List[str]) -> List[str]:
+    return ['"' + n.replace('"', '""') + '"' for n in names]
+
+
+def get_result_ref(data: Any) -> Optional[Dict[str, Any]]:
+    """Return the result reference stored in a step's data, if any."""
+    if isinstance(data, dict):
+        ref = data.get("result_ref")
+        if isinstance(ref, dict) and ref.get("key"):
+            return ref
+    return None
+
+
+def _inline_frame(data: Any) -> pd.DataFrame:
+    columns = [c for c in (data or {}).get("columns") or [] if "field" in c]
+    fields = [c["field"] for c in columns]
+    rows = (data or {}).get("rows") or []
+    return pd.DataFrame(
+        [[row.get(f) for f in fields] for row in rows],
+        columns=[c.get("headerName", c["field"]) for c in columns],
+    )
+
+
+def page_step_data(
+    data: Any,
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+) -> Dict[str, Any]:
+    """Page a step's result from its stored blob, or its inline rows for small results."""
+    ref = get_result_ref(data)
+    if ref is not None:
+        try:
+            return step_result_store.page(ref, offset=offset, limit=limit, sort_by=sort_by, descending=descending)
+        except FileNotFoundError:
+            logger.warning(f"Step result {ref['key']} is missing, paging inline rows")
+
+    data = data or {}
+    rows = list(data.get("rows") or [])
+    columns = data.get("columns") or []
+    if sort_by:
+        if sort_by not in {c.get("field") for c in columns}:
+            raise ValueError(f"Unknown sort column: {sort_by}")
+        present = [r for r in rows if r.get(sort_by) is not None]
+        missing = [r for r in rows if r.get(sort_by) is None]
+        try:
+            present.sort(key=lambda r: r[sort_by], reverse=descending)
+        except TypeError:
+            present.sort(key=lambda r: str(r[sort_by]), reverse=descending)
+        rows = present + missing
+    offset = max(0, int(offset))
+    limit = max(0, min(int(limit), MAX_PAGE_SIZE))
+    return {
+        "columns": columns,
+        "rows": rows[offset:offset + limit],
+        "offset": offset,
+        "limit": limit,
+        "total_rows": len(rows),
+        "sort_by": sort_by,
+        "descending": descending,
+    }
+
+
+def iter_step_csv(data: Any) -> Iterator[bytes]:
+    """Yield a step's full result as CSV, falling back to its inline rows."""
+    ref = get_result_ref(data)
+    if ref is not None:
+        try:
+            return step_result_store.iter_csv(ref)
+        except FileNotFoundError:
+            logger.warning(f"Step result {ref['key']} is missing, exporting inline rows")
+    return iter([_inline_frame(data).to_csv(index=False).encode("utf-8")])
+
+
+step_result_store = StepResultStore()
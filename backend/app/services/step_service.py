@@ -1,4 +1,6 @@
+import asyncio
 import datetime
+from typing import Iterator, Optional
 from app.models.step import Step
 
 from sqlalchemy.orm import Session
@@ -16,7 +18,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.report import Report
 
-from app.ai.code_execution.code_execution import CodeExecutionManager
+from app.ai.code_execution.code_execution import StreamingCodeExecutor
+from app.ai.code_execution import widget_payload
+from app.services.step_result_store import get_result_ref, iter_step_csv, page_step_data, step_result_store
 
 
 
@@ -39,30 +43,36 @@ class StepService:
         step = result.scalar_one_or_none()
         return step
 
-    async def export_step_to_csv(self, db: AsyncSession, step_id: str) -> tuple[pd.DataFrame, Step]:
+    async def export_step_to_csv(self, db: AsyncSession, step_id: str) -> tuple[Iterator[bytes], Step]:
+        """Return a CSV byte stream of the step's full result and the step."""
         step = await self.get_step_by_id(db, step_id)
         if not step:
             raise ValueError(f"Step {step_id} not found")
+        return iter_step_csv(step.data), step
+
+    async def get_step_rows(
+        self,
+        db: AsyncSession,
+        step_id: str,
+        *,
+        offset: int = 0,
+        limit: int = 100,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+    ) -> dict:
+        step = await db.get(Step, step_id)
+        if not step:
+            raise ValueError(f"Step {step_id} not found")
+        return await asyncio.to_thread(
+            page_step_data, step.data, offset=offset, limit=limit, sort_by=sort_by, descending=descending
+        )
 
-        data = step.data
-        if not data or 'rows' not in data or 'columns' not in data:
-            return pd.DataFrame(), step
-
-        rows = data.get('rows', [])
-        columns = data.get('columns', [])
-
-        if not rows or not columns:
-            return pd.DataFrame(), step
-
-        headers = [col.get('headerName', col.get('field', '')) for col in columns if 'field' in col]
-        fields = [col['field'] for col in columns if 'field' in col]
-
-        data_for_df = []
-        for row in rows:
-            data_for_df.append([row.get(field) for field in fields])
-
-        df = pd.DataFrame(data_for_df, columns=headers)
-        return df, step
+    async def get_step_payload(self, db: AsyncSession, step_id: str) -> bytes:
+        """Encoded columnar payload of the step's stored preview rows."""
+        step = await db.get(Step, step_id)
+        if not step:
+            raise ValueError(f"Step {step_id} not found")
+        return widget_payload.encode_payload(widget_payload.payload_from_step_data(step.data))
 
     async def create_step(self, db: AsyncSession, widget_id: str, completion_id: str) -> StepSchema:
 
@@ -120,19 +130,21 @@ class StepService:
         if not report:
             raise ValueError("Report not found")
         
-        db_clients = {data_source.name: data_source.get_client() for data_source in report.data_sources}
+        db_clients = {data_source.name: data_source.get_client(query_cache=True) for data_source in report.data_sources}
 
         excel_files = report.files
-        code_execution_manager = CodeExecutionManager()
+        executor = StreamingCodeExecutor(organization_id=str(report.organization_id))
         code = step.code
         
-        df, output_log = code_execution_manager.execute_code(code=code, db_clients=db_clients, excel_files=excel_files)
-        df = code_execution_manager.format_df_for_widget(df)
+        df, output_log = await executor.aexecute_code(code=code, ds_clients=db_clients, excel_files=excel_files)
+        df = await executor.aformat_df_for_widget(df, persist_result=True)
         
         # Update existing step instead of creating new one
+        previous_ref = get_result_ref(step.data)
         step.data = df
         await db.commit()
         await db.refresh(step)
+        await asyncio.to_thread(step_result_store.delete, previous_ref)
 
         return StepSchema.from_orm(step)
 
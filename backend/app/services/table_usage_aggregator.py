@@ -0,0 +1,451 @@
+"""
+Table Usage Aggregator
+
+Buffered writes for ``TableUsageService``.
+
+``record_usage_event`` is called by ``ProjectManager`` for every table every
+step touches. It used to insert the event and commit, then run one or two
+read-modify-write cycles on the org-level ``TableStats`` rollup, each with its
+own commit, so a step over six tables cost ~18 round trips and serialized on
+the hottest ``TableStats`` rows. Feedback events did the same.
+
+The service now validates the event and hands it to ``table_usage_aggregator``:
+
+- Event rows are buffered as-is. Stats deltas are coalesced per
+  (org, data source, table) as they arrive.
+- ``flush`` writes a batch in two commits. The first bulk-inserts the
+  events, skipping (step, table) pairs that already exist. The second applies
+  the deltas with one executemany ``UPDATE ... SET col = col + :delta`` over
+  the existing rollups and bulk-inserts the missing ones.
+- A delta the database rejects (IntegrityError, e.g. its data source or
+  table was deleted meanwhile) would fail every later flush if it were
+  requeued. So on an IntegrityError the deltas are retried one key per
+  commit; the rejected ones are dropped and counted.
+- A flush runs ``table_usage.flush_interval_seconds`` after the first buffered
+  event, or right away once ``max_pending_events`` are buffered. ``main.py``
+  flushes what's left on shutdown.
+- Any other failure (e.g. the database is unreachable) puts the unwritten
+  part of the batch back, up to ``max_backlog_events`` events and
+  ``max_backlog_stats_rows`` deltas; beyond that the oldest events and the
+  newest deltas are dropped and counted.
+- ``stats`` reports the backlog and flush counters.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models.table_feedback_event import TableFeedbackEvent
+from app.models.table_stats import TableStats
+from app.models.table_usage_event import TableUsageEvent
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_FLUSH_INTERVAL_SECONDS = 5.0
+DEFAULT_MAX_PENDING_EVENTS = 500
+DEFAULT_MAX_BACKLOG_EVENTS = 50_000
+DEFAULT_MAX_BACKLOG_STATS_ROWS = 10_000
+QUERY_CHUNK_SIZE = 500
+
+# Counter columns of TableStats that deltas add to
+COUNTERS = (
+    "usage_count",
+    "success_count",
+    "weighted_usage_count",
+    "pos_feedback_count",
+    "neg_feedback_count",
+    "weighted_pos_feedback",
+    "weighted_neg_feedback",
+    "unique_users",
+    "trusted_usage_count",
+    "failure_count",
+)
+
+StatsKey = Tuple[str, str, str]
+
+
+def _new_delta(datasource_table_id: Optional[str]) -> Dict[str, Any]:
+    delta: Dict[str, Any] = {c: 0 for c in COUNTERS}
+    delta.update(datasource_table_id=datasource_table_id, last_used_at=None, last_feedback_at=None)
+    return delta
+
+
+def _latest(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+def _merge_delta(target: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    for column in COUNTERS:
+        target[column] += delta.get(column, 0)
+    target["datasource_table_id"] = target["datasource_table_id"] or delta.get("datasource_table_id")
+    target["last_used_at"] = _latest(target["last_used_at"], delta.get("last_used_at"))
+    target["last_feedback_at"] = _latest(target["last_feedback_at"], delta.get("last_feedback_at"))
+
+
+class TableUsageAggregator:
+    """Process-wide buffer of usage/feedback events and coalesced TableStats deltas."""
+
+    def __init__(self):
+        self._config: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()
+        self._usage_rows: List[Dict[str, Any]] = []
+        self._feedback_rows: List[Dict[str, Any]] = []
+        self._deltas: Dict[StatsKey, Dict[str, Any]] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        self._oldest_pending: Optional[float] = None
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._flushed_usage_events = 0
+        self._flushed_feedback_events = 0
+        self._duplicate_usage_events = 0
+        self._dropped_events = 0
+        self._dropped_stats_rows = 0
+        self._last_flush_at: Optional[datetime] = None
+        self._last_flush_ms: Optional[float] = None
+
+    @property
+    def config(self) -> Dict[str, float]:
+        if self._config is None:
+            config = {
+                "flush_interval_seconds": DEFAULT_FLUSH_INTERVAL_SECONDS,
+                "max_pending_events": DEFAULT_MAX_PENDING_EVENTS,
+                "max_backlog_events": DEFAULT_MAX_BACKLOG_EVENTS,
+                "max_backlog_stats_rows": DEFAULT_MAX_BACKLOG_STATS_ROWS,
+            }
+            try:
+                from app.settings.config import settings
+                cfg = getattr(settings.bow_config, "table_usage", None)
+                if cfg is not None:
+                    config.update({k: v for k, v in cfg.model_dump().items() if v is not None})
+            except Exception:
+                pass
+            self._config = config
+        return self._config
+
+    # ----- intake -----
+
+    def add_usage(self, row: Dict[str, Any], delta: Dict[str, Any]) -> str:
+        """Buffer one ``TableUsageEvent`` row and its rollup delta; returns the event id."""
+        row = dict(row)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("used_at", datetime.utcnow())
+        with self._lock:
+            self._usage_rows.append(row)
+            self._add_delta(row, delta)
+        self._schedule_flush()
+        return row["id"]
+
+    def add_feedback(self, row: Dict[str, Any], delta: Dict[str, Any]) -> str:
+        """Buffer one ``TableFeedbackEvent`` row and its rollup delta; returns the event id."""
+        row = dict(row)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at_event", datetime.utcnow())
+        with self._lock:
+            self._feedback_rows.append(row)
+            self._add_delta(row, delta)
+        self._schedule_flush()
+        return row["id"]
+
+    def _add_delta(self, row: Dict[str, Any], delta: Dict[str, Any]) -> None:
+        # Caller holds self._lock
+        key = (row["org_id"], row["data_source_id"], row["table_fqn"])
+        target = self._deltas.get(key)
+        if target is None:
+            target = self._deltas[key] = _new_delta(row.get("datasource_table_id"))
+        _merge_delta(target, delta)
+        if self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+
+    def pending_events(self) -> int:
+        with self._lock:
+            return len(self._usage_rows) + len(self._feedback_rows)
+
+    # ----- scheduling -----
+
+    def _schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (scripts); events stay buffered until flush() is awaited
+            return
+        if not self._tasks and self.pending_events() >= int(self.config["max_pending_events"]):
+            task = loop.create_task(self.flush())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif self._timer is None or self._timer.done():
+            self._timer = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(float(self.config["flush_interval_seconds"]))
+        self._timer = None
+        await self.flush()
+        if self.pending_events():
+            self._schedule_flush()
+
+    # ----- flushing -----
+
+    async def flush(self) -> Dict[str, int]:
+        """Write everything buffered so far. Never raises; failures requeue the batch."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            with self._lock:
+                usage_rows, self._usage_rows = self._usage_rows, []
+                feedback_rows, self._feedback_rows = self._feedback_rows, []
+                deltas, self._deltas = self._deltas, {}
+                self._oldest_pending = None
+            if not usage_rows and not feedback_rows and not deltas:
+                return {"usage_events": 0, "feedback_events": 0, "stats_rows": 0}
+
+            from app.dependencies import async_session_maker
+
+            started = time.monotonic()
+            written = (0, 0)
+            # Deltas are popped from ``unwritten`` as they are applied or dropped
+            unwritten = dict(deltas)
+            applied: List[StatsKey] = []
+            failed = False
+            try:
+                async with async_session_maker() as db:
+                    if usage_rows or feedback_rows:
+                        written = await self._insert_events(db, usage_rows, feedback_rows)
+                        usage_rows, feedback_rows = [], []
+                    await self._write_deltas(db, unwritten, applied)
+            except Exception as e:
+                failed = True
+                self._failed_flushes += 1
+                logger.error(f"Table usage flush failed, requeueing {len(unwritten)} stats rows: {e}")
+                self._requeue(usage_rows, feedback_rows, unwritten)
+
+            from app.ai.context.schema_context_cache import schema_context_cache
+            for data_source_id in {key[1] for key in applied}:
+                schema_context_cache.invalidate_stats(data_source_id)
+
+            if not failed:
+                self._flushes += 1
+                self._last_flush_at = datetime.utcnow()
+                self._last_flush_ms = round((time.monotonic() - started) * 1000.0, 1)
+            return {"usage_events": written[0], "feedback_events": written[1], "stats_rows": len(applied)}
+
+    async def _insert_events(
+        self, db, usage_rows: List[Dict[str, Any]], feedback_rows: List[Dict[str, Any]]
+    ) -> Tuple[int, int]:
+        """Insert buffered events and commit; returns (usage, feedback) events written."""
+        # One event per (step, table), as enforced by uq_usage_step_table
+        unique: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for row in usage_rows:
+            unique.setdefault((row["step_id"], row["table_fqn"]), row)
+        step_ids = sorted({step_id for step_id, _ in unique})
+        for i in range(0, len(step_ids), QUERY_CHUNK_SIZE):
+            existing = await db.execute(
+                select(TableUsageEvent.step_id, TableUsageEvent.table_fqn).where(
+                    TableUsageEvent.step_id.in_(step_ids[i:i + QUERY_CHUNK_SIZE])
+                )
+            )
+            for pair in existing.all():
+                unique.pop((pair[0], pair[1]), None)
+        rows = list(unique.values())
+        self._duplicate_usage_events += len(usage_rows) - len(rows)
+
+        try:
+            if rows:
+                await db.execute(insert(TableUsageEvent), rows)
+            if feedback_rows:
+                await db.execute(insert(TableFeedbackEvent), feedback_rows)
+            await db.commit()
+            written_usage, written_feedback = len(rows), len(feedback_rows)
+        except IntegrityError:
+            # A concurrent writer got some of these first; fall back to row by row
+            await db.rollback()
+            written_usage = await self._insert_one_by_one(db, TableUsageEvent, rows)
+            written_feedback = await self._insert_one_by_one(db, TableFeedbackEvent, feedback_rows)
+            self._duplicate_usage_events += len(rows) - written_usage
+        self._flushed_usage_events += written_usage
+        self._flushed_feedback_events += written_feedback
+        return written_usage, written_feedback
+
+    @staticmethod
+    async def _insert_one_by_one(db, model, rows: List[Dict[str, Any]]) -> int:
+        written = 0
+        for row in rows:
+            try:
+                await db.execute(insert(model), [row])
+                await db.commit()
+                written += 1
+            except IntegrityError:
+                await db.rollback()
+        return written
+
+    async def _write_deltas(
+        self, db, unwritten: Dict[StatsKey, Dict[str, Any]], applied: List[StatsKey]
+    ) -> None:
+        """Commit ``unwritten`` deltas, popping each key once it is applied or dropped."""
+        if not unwritten:
+            return
+        try:
+            await self._apply_deltas(db, unwritten)
+            await db.commit()
+            applied.extend(unwritten)
+            unwritten.clear()
+            return
+        except IntegrityError as e:
+            await db.rollback()
+            logger.warning(f"Table stats batch rejected, retrying {len(unwritten)} rows one by one: {e}")
+
+        # Isolate the rows the database rejects; requeueing them would fail every later flush
+        for key in list(unwritten):
+            try:
+                await self._apply_deltas(db, {key: unwritten[key]})
+                await db.commit()
+                applied.append(key)
+            except IntegrityError as e:
+                await db.rollback()
+                self._dropped_stats_rows += 1
+                logger.warning(f"Dropping table stats delta for {key}: {e}")
+            unwritten.pop(key)
+
+    async def _apply_deltas(self, db, deltas: Dict[StatsKey, Dict[str, Any]]) -> None:
+        """Add ``deltas`` to the org-level (report_id NULL) rollups in one statement per kind."""
+        if not deltas:
+            return
+        existing: Dict[StatsKey, str] = {}
+        org_ids = list({key[0] for key in deltas})
+        fqns = list({key[2] for key in deltas})
+        for i in range(0, len(fqns), QUERY_CHUNK_SIZE):
+            result = await db.execute(
+                select(TableStats.id, TableStats.org_id, TableStats.data_source_id, TableStats.table_fqn).where(
+                    TableStats.report_id.is_(None),
+                    TableStats.org_id.in_(org_ids),
+                    TableStats.table_fqn.in_(fqns[i:i + QUERY_CHUNK_SIZE]),
+                )
+            )
+            for stats_id, org_id, data_source_id, table_fqn in result.all():
+                key = (org_id, data_source_id, table_fqn)
+                if key in deltas:
+                    existing.setdefault(key, stats_id)
+
+        now = datetime.utcnow()
+        updates: List[Dict[str, Any]] = []
+        inserts: List[Dict[str, Any]] = []
+        for key, delta in deltas.items():
+            stats_id = existing.get(key)
+            if stats_id is not None:
+                params = {f"d_{c}": delta[c] for c in COUNTERS}
+                params.update(
+                    b_id=stats_id,
+                    d_datasource_table_id=delta["datasource_table_id"],
+                    d_last_used_at=delta["last_used_at"],
+                    d_last_feedback_at=delta["last_feedback_at"],
+                    d_now=now,
+                )
+                updates.append(params)
+            else:
+                org_id, data_source_id, table_fqn = key
+                inserts.append({
+                    "org_id": org_id,
+                    "report_id": None,
+                    "data_source_id": data_source_id,
+                    "table_fqn": table_fqn,
+                    **{c: max(0, delta[c]) for c in COUNTERS},
+                    "datasource_table_id": delta["datasource_table_id"],
+                    "last_used_at": delta["last_used_at"],
+                    "last_feedback_at": delta["last_feedback_at"],
+                    "updated_at_stats": now,
+                })
+
+        if updates:
+            table = TableStats.__table__
+            values = {c: table.c[c] + bindparam(f"d_{c}") for c in COUNTERS}
+            values.update(
+                datasource_table_id=func.coalesce(table.c.datasource_table_id, bindparam("d_datasource_table_id")),
+                last_used_at=func.coalesce(bindparam("d_last_used_at", type_=DateTime), table.c.last_used_at),
+                last_feedback_at=func.coalesce(bindparam("d_last_feedback_at", type_=DateTime), table.c.last_feedback_at),
+                updated_at_stats=bindparam("d_now", type_=DateTime),
+            )
+            await db.execute(update(table).where(table.c.id == bindparam("b_id")).values(**values), updates)
+        if inserts:
+            await db.execute(insert(TableStats), inserts)
+
+    def _requeue(
+        self,
+        usage_rows: List[Dict[str, Any]],
+        feedback_rows: List[Dict[str, Any]],
+        deltas: Dict[StatsKey, Dict[str, Any]],
+    ) -> None:
+        limit = int(self.config["max_backlog_events"])
+        with self._lock:
+            self._usage_rows = usage_rows + self._usage_rows
+            self._feedback_rows = feedback_rows + self._feedback_rows
+            for key, delta in deltas.items():
+                target = self._deltas.get(key)
+                if target is None:
+                    self._deltas[key] = delta
+                else:
+                    _merge_delta(target, delta)
+            stats_limit = int(self.config["max_backlog_stats_rows"])
+            stats_overflow = len(self._deltas) - stats_limit
+            if stats_overflow > 0:
+                for key in list(self._deltas)[stats_limit:]:
+                    del self._deltas[key]
+                self._dropped_stats_rows += stats_overflow
+                logger.warning(f"Table stats backlog over {stats_limit} rows; dropped {stats_overflow} deltas")
+            overflow = len(self._usage_rows) + len(self._feedback_rows) - limit
+            if overflow > 0:
+                dropped_usage = min(overflow, len(self._usage_rows))
+                self._usage_rows = self._usage_rows[dropped_usage:]
+                self._feedback_rows = self._feedback_rows[overflow - dropped_usage:]
+                self._dropped_events += overflow
+                logger.warning(f"Table usage backlog over {limit} events; dropped {overflow} oldest events")
+            if self._oldest_pending is None and (self._usage_rows or self._feedback_rows or self._deltas):
+                self._oldest_pending = time.monotonic()
+
+    async def shutdown(self) -> None:
+        """Cancel the pending timer and flush the remaining backlog."""
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        self._timer = None
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        await self.flush()
+        remaining = self.pending_events()
+        if remaining:
+            logger.warning(f"Table usage aggregator shut down with {remaining} unflushed events")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending_usage = len(self._usage_rows)
+            pending_feedback = len(self._feedback_rows)
+            pending_stats = len(self._deltas)
+            oldest = self._oldest_pending
+        return {
+            "pending_usage_events": pending_usage,
+            "pending_feedback_events": pending_feedback,
+            "pending_stats_rows": pending_stats,
+            "oldest_pending_seconds": round(time.monotonic() - oldest, 1) if oldest is not None else 0.0,
+            "flushes": self._flushes,
+            "failed_flushes": self._failed_flushes,
+            "flushed_usage_events": self._flushed_usage_events,
+            "flushed_feedback_events": self._flushed_feedback_events,
+            "duplicate_usage_events": self._duplicate_usage_events,
+            "dropped_events": self._dropped_events,
+            "dropped_stats_rows": self._dropped_stats_rows,
+            "last_flush_at": self._last_flush_at.isoformat() if self._last_flush_at else None,
+            "last_flush_ms": self._last_flush_ms,
+            **self.config,
+        }
+
+
+table_usage_aggregator = TableUsageAggregator()
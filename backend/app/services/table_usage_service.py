@@ -1,11 +1,12 @@
 from typing import Optional, List
+import time
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 
-from app.models.table_usage_event import TableUsageEvent
-from app.models.table_feedback_event import TableFeedbackEvent
 from app.models.table_stats import TableStats
+from app.ai.context.schema_context_cache import schema_context_cache
+from app.services.table_usage_aggregator import table_usage_aggregator
 from app.models.data_source import DataSource
 from app.models.data_source_membership import DataSourceMembership, PRINCIPAL_TYPE_USER
 from app.schemas.table_usage_schema import (
@@ -17,6 +18,10 @@ from app.schemas.table_usage_schema import (
     TableStatsSchema,
 )
 
+# Access checks are repeated for every table of a step; remember them briefly
+ACCESS_CACHE_TTL_SECONDS = 60.0
+_access_cache: dict[tuple, tuple[float, bool]] = {}
+
 
 class TableUsageService:
     def __init__(self, role_weights: Optional[dict[str, float]] = None):
@@ -37,74 +42,26 @@ class TableUsageService:
         if role_weight is None and payload.user_role:
             role_weight = self.role_weights.get(payload.user_role.lower(), 1.0)
 
-        event = TableUsageEvent(
-            org_id=payload.org_id,
-            report_id=payload.report_id,
-            data_source_id=payload.data_source_id,
-            step_id=payload.step_id,
-            user_id=payload.user_id,
-            table_fqn=payload.table_fqn,
-            datasource_table_id=payload.datasource_table_id,
-            source_type=payload.source_type,
-            columns=payload.columns,
-            success=payload.success,
-            user_role=payload.user_role,
-            role_weight=role_weight,
-        )
-
-        db.add(event)
-        try:
-            await db.commit()
-        except Exception:
-            # Unique constraint might trip if called twice; ignore duplicates
-            await db.rollback()
-
-        # Upsert aggregate only at org-level (report_id None)
-        await self._upsert_stats(
-            db=db,
-            up=TableStatsUpsert(
-                org_id=payload.org_id,
-                report_id=None,
-                data_source_id=payload.data_source_id,
-                table_fqn=payload.table_fqn,
-                datasource_table_id=payload.datasource_table_id,
-                usage_count_delta=1,
-            ),
-        )
+        row = payload.model_dump()
+        row["role_weight"] = role_weight
 
+        # Rollup delta at org-level (report_id None); written by the aggregator's next flush
         if payload.success:
-            trusted_flag = (payload.user_role and payload.user_role.lower() in ("admin", "trusted"))
-            await self._upsert_stats(
-                db=db,
-                up=TableStatsUpsert(
-                    org_id=payload.org_id,
-                    report_id=None,
-                    data_source_id=payload.data_source_id,
-                    table_fqn=payload.table_fqn,
-                    datasource_table_id=payload.datasource_table_id,
-                    success_count_delta=1,
-                    weighted_usage_delta=role_weight or 1.0,
-                    unique_user_delta=1 if payload.user_id else 0,
-                    admin_usage_delta=1 if trusted_flag else 0,
-                    last_used_at=datetime.utcnow(),
-                ),
-            )
+            trusted_flag = bool(payload.user_role and payload.user_role.lower() in ("admin", "trusted"))
+            delta = {
+                "usage_count": 1,
+                "success_count": 1,
+                "weighted_usage_count": role_weight or 1.0,
+                "unique_users": 1 if payload.user_id else 0,
+                "trusted_usage_count": 1 if trusted_flag else 0,
+                "last_used_at": datetime.utcnow(),
+            }
         else:
-            # Record failure attempts to stats (do not increment usage)
-            await self._upsert_stats(
-                db=db,
-                up=TableStatsUpsert(
-                    org_id=payload.org_id,
-                    report_id=None,
-                    data_source_id=payload.data_source_id,
-                    table_fqn=payload.table_fqn,
-                    datasource_table_id=payload.datasource_table_id,
-                    failure_delta=1,
-                ),
-            )
+            # Record failure attempts to stats (do not increment success)
+            delta = {"usage_count": 1, "failure_count": 1}
 
-        await db.refresh(event)
-        return TableUsageEventSchema.from_orm(event)
+        event_id = table_usage_aggregator.add_usage(row, delta)
+        return TableUsageEventSchema(id=event_id, **row)
 
     async def record_feedback_event(self, db: AsyncSession, payload: TableFeedbackEventCreate, *, user_role: Optional[str] = None, role_weight: Optional[float] = None) -> TableFeedbackEventSchema:
         # Guard: ensure data_source exists within org and user can access
@@ -116,43 +73,22 @@ class TableUsageService:
         if w is None and user_role:
             w = self.role_weights.get(user_role.lower(), 1.0)
 
-        event = TableFeedbackEvent(
-            org_id=payload.org_id,
-            report_id=payload.report_id,
-            data_source_id=payload.data_source_id,
-            step_id=payload.step_id,
-            completion_feedback_id=payload.completion_feedback_id,
-            table_fqn=payload.table_fqn,
-            datasource_table_id=payload.datasource_table_id,
-            feedback_type=payload.feedback_type,
-        )
-        db.add(event)
-        await db.commit()
-        await db.refresh(event)
-
-        # Update stats for both scopes
         pos_delta = 1 if payload.feedback_type == "positive" else 0
         neg_delta = 1 if payload.feedback_type == "negative" else 0
-        weighted_pos = (w or 1.0) if pos_delta else 0.0
-        weighted_neg = (w or 1.0) if neg_delta else 0.0
-
-        await self._upsert_stats(
-            db=db,
-            up=TableStatsUpsert(
-                org_id=payload.org_id,
-                report_id=None,
-                data_source_id=payload.data_source_id,
-                table_fqn=payload.table_fqn,
-                datasource_table_id=payload.datasource_table_id,
-                pos_feedback_delta=pos_delta,
-                neg_feedback_delta=neg_delta,
-                weighted_pos_delta=weighted_pos,
-                weighted_neg_delta=weighted_neg,
-                last_feedback_at=datetime.utcnow(),
-            ),
+        now = datetime.utcnow()
+        row = payload.model_dump()
+        row["created_at_event"] = now
+        event_id = table_usage_aggregator.add_feedback(
+            row,
+            {
+                "pos_feedback_count": pos_delta,
+                "neg_feedback_count": neg_delta,
+                "weighted_pos_feedback": (w or 1.0) if pos_delta else 0.0,
+                "weighted_neg_feedback": (w or 1.0) if neg_delta else 0.0,
+                "last_feedback_at": now,
+            },
         )
-
-        return TableFeedbackEventSchema.from_orm(event)
+        return TableFeedbackEventSchema(id=event_id, **row)
 
     async def _upsert_stats(self, db: AsyncSession, up: TableStatsUpsert) -> TableStatsSchema:
         # Try select first
@@ -207,11 +143,24 @@ class TableUsageService:
 
         await db.commit()
         await db.refresh(row)
+        if row.report_id is None:
+            schema_context_cache.invalidate_stats(row.data_source_id)
         return TableStatsSchema.from_orm(row)
 
     async def _validate_data_source_access(self, db: AsyncSession, org_id: str, data_source_id: Optional[str], user_id: Optional[str]) -> bool:
         if not data_source_id:
             return False
+        key = (org_id, data_source_id, user_id)
+        cached = _access_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        allowed = await self._check_data_source_access(db, org_id, data_source_id, user_id)
+        if len(_access_cache) > 10_000:
+            _access_cache.clear()
+        _access_cache[key] = (time.monotonic() + ACCESS_CACHE_TTL_SECONDS, allowed)
+        return allowed
+
+    async def _check_data_source_access(self, db: AsyncSession, org_id: str, data_source_id: str, user_id: Optional[str]) -> bool:
         # Verify DS belongs to org
         ds_stmt = select(DataSource).where(
             DataSource.id == data_source_id,
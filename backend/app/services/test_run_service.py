@@ -1,8 +1,10 @@
 from typing import Optional, List, Tuple, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from fastapi import HTTPException
 from datetime import datetime
+import asyncio
+import logging
 import uuid
 
 from app.models.eval import TestSuite, TestCase, TestRun, TestResult
@@ -19,6 +21,19 @@ from app.models.agent_execution import AgentExecution
 from app.services.test_evaluation_service import TestEvaluationService
 from app.ai.agents.judge.judge import Judge
 from app.schemas.test_results_schema import TestResultTotals, TestResultJsonSchema, RuleSpec
+from app.services.eval_scheduler import eval_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Fire-and-forget tasks, referenced until done so they aren't garbage collected
+_background_tasks: set = set()
+
+
+def _spawn(coro) -> "asyncio.Task":
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
 
 
 class TestRunService:
@@ -32,7 +47,7 @@ class TestRunService:
         """Save summary_json with pass/fail counts when a test run completes."""
         passed = sum(1 for r in results if r.status == 'pass')
         failed = sum(1 for r in results if r.status in ('fail', 'error'))
-        run.summary_json = {'total': len(results), 'passed': passed, 'failed': failed}
+        run.summary_json = {'total': len(results), 'passed': passed, 'failed': failed, **(eval_scheduler.run_throughput(str(run.id)) or {})}
         db.add(run)
         await db.commit()
     
@@ -62,86 +77,146 @@ class TestRunService:
         res = await db.execute(select(TestCase).where(TestCase.suite_id == str(suite_id)).order_by(TestCase.created_at.asc()))
         return res.scalars().all()
 
-    async def _create_stub_report(self, db: AsyncSession, organization_id: str, user_id: str, title: str, ds_ids: Optional[List[str]] = None) -> Report:
-        slug = f"testrun-{uuid.uuid4().hex[:12]}"
-        report = Report(
-            title=title,
-            slug=slug,
-            status="draft",
-            report_type="test",
-            user_id=user_id,
-            organization_id=organization_id,
-        )
-        db.add(report)
-        await db.commit()
-        await db.refresh(report)
-        # Associate data sources like regular reports
-        try:
-            if ds_ids:
-                svc = ReportService()
-                await svc._associate_data_sources_with_report(db, report, [str(x) for x in ds_ids if x])
-                await db.refresh(report, ["data_sources"])
-        except Exception:
-            pass
-        return report
-
-    async def _create_head_completion(self, db: AsyncSession, report_id: str, organization, current_user, prompt: Dict[str, Any]) -> Completion:
+    async def _resolve_case_models(self, db: AsyncSession, organization, current_user, model_ids: List[Optional[str]]) -> Dict[Optional[str], Any]:
+        """Resolve each distinct prompt model_id once (falling back to the organization default)."""
+        default_model = None
+        models: Dict[Optional[str], Any] = {}
+        for model_id in dict.fromkeys(model_ids):
+            model = None
+            if model_id:
+                try:
+                    model = await self.completions.llm_service.get_model_by_id(db, organization, current_user, model_id)
+                except Exception:
+                    model = None
+            if not model:
+                if default_model is None:
+                    default_model = await organization.get_default_llm_model(db)
+                model = default_model
+            if not model:
+                raise HTTPException(status_code=400, detail="No default LLM model configured. Please configure a default model in organization settings.")
+            models[model_id] = model
+        return models
+
+    async def _create_case_setups(
+        self,
+        db: AsyncSession,
+        organization,
+        current_user,
+        cases: List[TestCase],
+        prompts: List[Dict[str, Any]],
+        with_system: bool = False,
+    ) -> List[Tuple[Report, Completion, Optional[Completion], Any]]:
         """
-        Create a user head completion for a test result, aligned with CompletionService semantics:
-        - Resolve model from prompt.model_id or organization default
-        - Normalize prompt fields (e.g., widget_id as string or None)
-        - Compute turn_index based on last completion in the report
-        - Do not set 'completion' for user role
+        Create the stub report, user head completion and (optionally) in-progress
+        system completion for every case in one batch:
+        - models are resolved once per distinct prompt model_id
+        - data sources for all cases are loaded with a single query
+        - rows are flushed together; the caller commits once along with its TestResults
+        Each report is new, so heads start at turn_index 0.
         """
-        # Resolve model
-        prompt_dict: Dict[str, Any] = dict(prompt or {})
-        model_id = prompt_dict.get("model_id")
-        model = None
-        if model_id:
+        from sqlalchemy.orm import selectinload
+        from app.models.data_source import DataSource
+
+        models = await self._resolve_case_models(db, organization, current_user, [p.get("model_id") for p in prompts])
+
+        ds_ids = sorted({str(x) for c in cases for x in (getattr(c, "data_source_ids_json", None) or []) if x})
+        data_sources: Dict[str, Any] = {}
+        if ds_ids:
             try:
-                model = await self.completions.llm_service.get_model_by_id(db, organization, current_user, model_id)
+                res = await db.execute(
+                    select(DataSource)
+                    .options(selectinload(DataSource.data_source_memberships))
+                    .where(DataSource.id.in_(ds_ids))
+                )
+                data_sources = {str(ds.id): ds for ds in res.scalars().all()}
             except Exception:
-                model = None
-        if not model:
-            model = await organization.get_default_llm_model(db)
-        if not model:
-            raise HTTPException(status_code=400, detail="No default LLM model configured. Please configure a default model in organization settings.")
-
-        # Normalize widget_id
-        if prompt_dict.get("widget_id"):
+                data_sources = {}
+
+        reports: List[Report] = []
+        for case in cases:
+            case_ds = [data_sources[str(x)] for x in (getattr(case, "data_source_ids_json", None) or []) if x and str(x) in data_sources]
+            report = Report(
+                title=f"Test Run · {case.name}",
+                slug=f"testrun-{uuid.uuid4().hex[:12]}",
+                status="draft",
+                report_type="test",
+                user_id=str(current_user.id),
+                organization_id=str(organization.id),
+                data_sources=case_ds,
+            )
+            db.add(report)
+            reports.append(report)
+        await db.flush()
+
+        heads: List[Completion] = []
+        for report, prompt_dict in zip(reports, prompts):
+            head = Completion(
+                prompt=prompt_dict or None,
+                model=models[prompt_dict.get("model_id")].model_id,
+                widget_id=prompt_dict.get("widget_id"),
+                report_id=str(report.id),
+                turn_index=0,
+                message_type="table",
+                role="user",
+                status="success",
+                user_id=str(current_user.id) if current_user else None,
+            )
+            db.add(head)
+            heads.append(head)
+        await db.flush()
+
+        systems: List[Optional[Completion]] = [None] * len(heads)
+        if with_system:
+            for i, head in enumerate(heads):
+                systems[i] = Completion(
+                    prompt=None,
+                    completion={"content": ""},
+                    model=head.model,
+                    widget_id=head.widget_id,
+                    report_id=head.report_id,
+                    parent_id=str(head.id),
+                    turn_index=head.turn_index + 1,
+                    message_type="table",
+                    role="system",
+                    status="in_progress",
+                )
+                db.add(systems[i])
+            await db.flush()
+
+        # Best-effort: create mentions based on prompt content (only prompts that carry any)
+        for head in heads:
+            if not (head.prompt or {}).get("mentions"):
+                continue
             try:
-                prompt_dict["widget_id"] = str(prompt_dict["widget_id"])
+                await self.completions.mention_service.create_completion_mentions(db, head)
             except Exception:
-                prompt_dict["widget_id"] = None
-        else:
-            prompt_dict["widget_id"] = None
-
-        # Compute turn index
-        last_completion = await self.completions.get_last_completion(db, report_id)
-        turn_index = last_completion.turn_index + 1 if last_completion else 0
-
-        head = Completion(
-            prompt=prompt_dict or None,
-            model=model.model_id,
-            widget_id=prompt_dict.get("widget_id"),
-            report_id=report_id,
-            turn_index=turn_index,
-            message_type="table",
-            role="user",
-            status="success",
-            user_id=str(current_user.id) if current_user else None,
-        )
-        db.add(head)
-        await db.commit()
-        await db.refresh(head)
+                pass
+
+        case_models = [models[p.get("model_id")] for p in prompts]
+        return list(zip(reports, heads, systems, case_models))
 
-        # Best-effort: create mentions based on prompt content
+    @staticmethod
+    def _initial_result_json(case: TestCase) -> Optional[Dict[str, Any]]:
+        """Initial result_json snapshot from the case expectations."""
         try:
-            await self.completions.mention_service.create_completion_mentions(db, head)
+            spec = dict(case.expectations_json or {})
+            rules = spec.get("rules") or []
+            return {
+                "spec": {
+                    "spec_version": spec.get("spec_version") or 1,
+                    "rules": rules,
+                    "order_mode": spec.get("order_mode"),
+                },
+                "totals": {
+                    "total": len(rules),
+                    "passed": 0,
+                    "failed": 0,
+                    "duration_ms": None,
+                },
+                "rule_results": [],
+            }
         except Exception:
-            pass
-
-        return head
+            return None
 
     async def create_run(self, db: AsyncSession, organization, current_user, case_ids: Optional[List[str]] = None, trigger_reason: Optional[str] = "manual", build_id: Optional[str] = None) -> TestRun:
         # Resolve cases set
@@ -198,42 +273,22 @@ class TestRunService:
         await db.commit()
         await db.refresh(run)
 
-        # Create placeholder TestResult per case (with stub report + head completion)
+        # Create placeholder TestResult per case (with stub report + head completion), committed together
+        prompts: List[Dict[str, Any]] = []
         for case in cases:
-            report_title = f"Test Run · {case.name}"
-            report = await self._create_stub_report(db, str(organization.id), str(current_user.id), report_title, ds_ids=case.data_source_ids_json)
-            head = await self._create_head_completion(db, str(report.id), organization, current_user, prompt=case.prompt_json or {})
-
-            # Build initial result_json snapshot from case expectations
-            try:
-                spec = dict(case.expectations_json or {})
-                rules = spec.get("rules") or []
-                result_json = {
-                    "spec": {
-                        "spec_version": spec.get("spec_version") or 1,
-                        "rules": rules,
-                        "order_mode": spec.get("order_mode"),
-                    },
-                    "totals": {
-                        "total": len(rules),
-                        "passed": 0,
-                        "failed": 0,
-                        "duration_ms": None,
-                    },
-                    "rule_results": [],
-                }
-            except Exception:
-                result_json = None
-
-            result = TestResult(
+            prompt_dict: Dict[str, Any] = dict(case.prompt_json or {})
+            prompt_dict["widget_id"] = str(prompt_dict["widget_id"]) if prompt_dict.get("widget_id") else None
+            prompts.append(prompt_dict)
+        setups = await self._create_case_setups(db, organization, current_user, cases, prompts)
+        for case, (report, head, _system, _model) in zip(cases, setups):
+            db.add(TestResult(
                 run_id=str(run.id),
                 case_id=str(case.id),
                 head_completion_id=str(head.id),
                 status="init",
                 report_id=str(report.id),
-                result_json=result_json,
-            )
-            db.add(result)
+                result_json=self._initial_result_json(case),
+            ))
         await db.commit()
 
         return run
@@ -326,6 +381,8 @@ class TestRunService:
 
         if getattr(run, "status", None) != "in_progress":
             return run
+        # Cases still waiting for a slot in this process must not start
+        eval_scheduler.stop_run(str(run.id))
         # Send sigkill to any in-progress system completions for this run
         try:
             res_results = await db.execute(select(TestResult).where(TestResult.run_id == str(run.id)))
@@ -510,15 +567,9 @@ class TestRunService:
         await db.commit()
         await db.refresh(run)
 
-        created_results: List[TestResult] = []
-
-        # For each case: create a report and kick off background completion via CompletionService
-        from app.schemas.completion_v2_schema import CompletionCreate, PromptSchema
+        # Create report + head + system completion for every case in one batch
+        prompts: List[Dict[str, Any]] = []
         for case in cases:
-            report_title = f"Test Run · {case.name}"
-            report = await self._create_stub_report(db, str(organization.id), str(current_user.id), report_title, ds_ids=getattr(case, "data_source_ids_json", None))
-
-            # Build prompt schema from case
             p = case.prompt_json or {}
             prompt = PromptSchema(
                 content=p.get("content") or "",
@@ -528,61 +579,125 @@ class TestRunService:
                 mode=p.get("mode"),
                 model_id=p.get("model_id"),
             )
-            completion_data = CompletionCreate(prompt=prompt)
-
-            # Create head+system and run agent in background using existing service
-            # Pass resolved_build_id so agent uses correct instruction build
-            v2 = await self.completions.create_completion(
-                db=db,
-                report_id=str(report.id),
-                completion_data=completion_data,
-                current_user=current_user,
-                organization=organization,
-                background=True,
-                build_id=resolved_build_id,
-            )
-
-            # Extract head completion id (user role) from the returned list
-            head_id = None
-            try:
-                for c in (v2.completions or []):
-                    if getattr(c, "role", None) == "user" and c.parent_id is None and str(getattr(c, "report_id", "")) == str(report.id):
-                        head_id = str(c.id)
-                        break
-            except Exception:
-                head_id = None
+            prompts.append(prompt.dict())
+        setups = await self._create_case_setups(db, organization, current_user, cases, prompts, with_system=True)
 
+        created_results: List[TestResult] = []
+        for case, (report, head, _system, _model) in zip(cases, setups):
             result = TestResult(
                 run_id=str(run.id),
                 case_id=str(case.id),
-                head_completion_id=str(head_id) if head_id else str(uuid.uuid4()),  # fallback placeholder
+                head_completion_id=str(head.id),
                 status="in_progress",
                 report_id=str(report.id),
-                result_json={
-                    "spec": {
-                        "spec_version": (case.expectations_json or {}).get("spec_version") or 1,
-                        "rules": (case.expectations_json or {}).get("rules") or [],
-                        "order_mode": (case.expectations_json or {}).get("order_mode"),
-                    },
-                    "totals": {
-                        "total": len(((case.expectations_json or {}).get("rules") or [])),
-                        "passed": 0,
-                        "failed": 0,
-                        "duration_ms": None,
-                    },
-                    "rule_results": [],
-                },
+                result_json=self._initial_result_json(case),
             )
             db.add(result)
             created_results.append(result)
-
         await db.commit()
         # refresh results to include IDs
         for r in created_results:
             await db.refresh(r)
 
+        # Run the agents in the background, bounded by the eval scheduler
+        org_settings = await organization.get_settings(db)
+        small_model = await self.completions.llm_service.get_default_model(db, organization, current_user, is_small=True)
+        owner = uuid.uuid4().hex
+        run_ctx = eval_scheduler.run_context(str(run.id), str(organization.id), owner=owner)
+        jobs = [
+            (str(report.id), str(head.id), str(system.id), model, prompt.get("mode"))
+            for (report, head, system, model), prompt in zip(setups, prompts)
+        ]
+        _spawn(self._run_background_cases(
+            run_ctx, owner, organization, org_settings, current_user, small_model, resolved_build_id, jobs,
+        ))
+
         return run, created_results
 
+    async def _run_background_cases(self, run_ctx, owner, organization, org_settings, current_user, small_model, build_id, jobs) -> None:
+        """Run each case's agent within the run/org concurrency limits, then record throughput.
+
+        Evaluation stays with stream_run, which evaluates results whose system
+        completion already finished. Cases still queued when the run is stopped
+        are skipped.
+        """
+        async def run_case(report_id: str, head_id: str, system_id: str, model, mode: Optional[str]):
+            async with eval_scheduler.slot(run_ctx):
+                async_session = create_async_session_factory()
+                async with async_session() as session:
+                    # stop_run in another process only shows up in the database
+                    run = await session.get(TestRun, run_ctx.run_id)
+                    if run_ctx.stopped or getattr(run, "status", None) == "stopped":
+                        logger.info(f"Eval run {run_ctx.run_id}: stopped, skipping case for report {report_id}")
+                        return
+                    try:
+                        report_obj = await session.get(Report, report_id)
+                        head_obj = await session.get(Completion, head_id)
+                        system_obj = await session.get(Completion, system_id)
+                        if not all([report_obj, head_obj, system_obj]):
+                            logger.error(f"Eval run {run_ctx.run_id}: agent init failed, missing objects")
+                            return
+                        clients = await run_ctx.get_clients(
+                            session, report_obj.data_sources, current_user,
+                            self.completions.data_source_service.construct_client,
+                        )
+                        # Pre-load files relationship in async context to avoid greenlet error in AgentV2.__init__
+                        _ = report_obj.files
+                        agent = AgentV2(
+                            db=session,
+                            organization=organization,
+                            organization_settings=org_settings,
+                            model=model,
+                            small_model=small_model or model,
+                            mode=mode,
+                            report=report_obj,
+                            messages=[],
+                            head_completion=head_obj,
+                            system_completion=system_obj,
+                            clients=clients,
+                            build_id=build_id,
+                            static_context=run_ctx,
+                        )
+                        await agent.main_execution()
+                    except Exception as e:
+                        logger.error(f"Eval run {run_ctx.run_id}: agent execution failed: {e}")
+                        try:
+                            await session.execute(
+                                update(Completion)
+                                .where(Completion.id == system_id)
+                                .values(status='error', completion={'content': f"Agent failed: {str(e)}", 'error': True})
+                            )
+                            await session.commit()
+                        except Exception:
+                            pass
+
+        try:
+            await asyncio.gather(*(run_case(*job) for job in jobs))
+        finally:
+            await self._finish_run_context(run_ctx, owner)
+
+    async def _finish_run_context(self, run_ctx, owner: str) -> None:
+        """Retire the run's scheduler context (owner only) and merge its throughput into the summary."""
+        throughput = eval_scheduler.finish_run(run_ctx.run_id, owner)
+        if not throughput:
+            return
+        try:
+            async_session = create_async_session_factory()
+            async with async_session() as session:
+                run = await session.get(TestRun, run_ctx.run_id)
+                if run:
+                    run.summary_json = {**(run.summary_json or {}), **throughput}
+                    await session.commit()
+        except Exception as e:
+            logger.warning(f"Eval run {run_ctx.run_id}: failed to record throughput: {e}")
+
+    async def _finish_after(self, run_ctx, owner: str, tasks: List["asyncio.Task"]) -> None:
+        """Finish the run context once the agents launched by its owner are done."""
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await self._finish_run_context(run_ctx, owner)
+
     # -------- New API: Run status with embedded completions (polling) --------
     async def get_run_status_with_completions(self, db: AsyncSession, organization, current_user, run_id: str, limit: int = 50):
         # Load run and validate
@@ -705,18 +820,29 @@ class TestRunService:
                         pass
 
             org_settings = await organization.get_settings(db)
-
-            for r in results:
+            small_model = await self.completions.llm_service.get_default_model(db, organization, current_user, is_small=True)
+            # Claimed once agents are launched; run_agent_task reads it when it runs
+            run_ctx = None
+            models: Dict[Optional[str], Any] = {}
+            # Agents are started after one commit for the whole batch
+            launches: List[Tuple[str, CompletionEventQueue, Any, Any]] = []
+            committed_launches = 0
+
+            pending = [r for r in results if getattr(r, "status", "") not in {"pass", "fail", "error", "stopped", "success"}]
+            cases_by_id: Dict[str, TestCase] = {}
+            heads_by_id: Dict[str, Completion] = {}
+            if pending:
+                res_cases = await db.execute(select(TestCase).where(TestCase.id.in_({str(r.case_id) for r in pending})))
+                cases_by_id = {str(c.id): c for c in res_cases.scalars().all()}
+                res_heads = await db.execute(select(Completion).where(Completion.id.in_({str(r.head_completion_id) for r in pending})))
+                heads_by_id = {str(h.id): h for h in res_heads.scalars().all()}
+
+            for r in pending:
                 # Process results that are not terminal; include both 'init' and 'in_progress'
-                if getattr(r, "status", "") in {"pass", "fail", "error", "stopped", "success"}:
-                    continue
-
-                # Load case + head completion
-                res_case = await db.execute(select(TestCase).where(TestCase.id == str(r.case_id)))
-                case = res_case.scalar_one_or_none()
+                case = cases_by_id.get(str(r.case_id))
                 if not case:
                     continue
-                head = await db.get(Completion, str(r.head_completion_id))
+                head = heads_by_id.get(str(r.head_completion_id))
                 if not head:
                     continue
                 # Pre-store expectations spec into result_json so UI shows pending assertions immediately.
@@ -752,7 +878,6 @@ class TestRunService:
                             current_rj["rule_results"] = []
                         r.result_json = current_rj
                         db.add(r)
-                        await db.commit()
                 except Exception:
                     pass
                 # Detect an existing system completion for this head/report (latest)
@@ -783,16 +908,18 @@ class TestRunService:
                     model_id=p.get("model_id"),
                 )
 
-                # Resolve models
-                model = None
-                if prompt.model_id:
-                    try:
-                        model = await self.completions.llm_service.get_model_by_id(db, organization, current_user, prompt.model_id)
-                    except Exception:
-                        model = None
-                if not model:
-                    model = await organization.get_default_llm_model(db)
-                small_model = await self.completions.llm_service.get_default_model(db, organization, current_user, is_small=True)
+                # Resolve models (once per distinct model_id)
+                if prompt.model_id not in models:
+                    model = None
+                    if prompt.model_id:
+                        try:
+                            model = await self.completions.llm_service.get_model_by_id(db, organization, current_user, prompt.model_id)
+                        except Exception:
+                            model = None
+                    if not model:
+                        model = await organization.get_default_llm_model(db)
+                    models[prompt.model_id] = model
+                model = models[prompt.model_id]
                 if not model:
                     # Cannot start - mark error
                     try:
@@ -807,6 +934,9 @@ class TestRunService:
                 # If an existing terminal system completion exists, evaluate immediately and emit update
                 if existing_system and getattr(existing_system, "status", "") in {"success", "error", "stopped"}:
                     try:
+                        # Persist pending batch changes first; evaluation writes the result from its own session
+                        await db.commit()
+                        committed_launches = len(launches)
                         # Evaluate and persist
                         async_session = create_async_session_factory()
                         async with async_session() as session:
@@ -906,37 +1036,36 @@ class TestRunService:
                 )
                 try:
                     db.add(system_completion)
-                    await db.commit()
-                    await db.refresh(system_completion)
-                except Exception:
+                    await db.flush()
+                except Exception as e:
+                    # The rollback also discards the uncommitted part of the batch; those
+                    # results keep their previous status and start on the next stream call
+                    logger.warning(f"Test run {run.id}: failed to create system completion: {e}")
                     try:
                         await db.rollback()
                     except Exception:
                         pass
+                    del launches[committed_launches:]
                     continue
 
                 # Mark in_progress
                 r.status = "in_progress"
                 db.add(r)
-                await db.commit()
 
                 # Event queue per result
                 eq = CompletionEventQueue()
 
-                # Emit completion.started (with system id) to central queue
-                try:
-                    start_ev = SSEEvent(
-                        event="completion.started",
-                        completion_id=str(system_completion.id),
-                        data={"result_id": str(r.id), "system_completion_id": str(system_completion.id), "head_completion_id": str(head.id)},
-                    )
-                    await central_queue.put((str(r.id), start_ev))
-                except Exception:
-                    pass
+                # completion.started (with system id), emitted once the batch is committed
+                start_ev = SSEEvent(
+                    event="completion.started",
+                    completion_id=str(system_completion.id),
+                    data={"result_id": str(r.id), "system_completion_id": str(system_completion.id), "head_completion_id": str(head.id)},
+                )
 
-                async def run_agent_task():
+                # Bind this iteration's objects; the task may start after the loop has moved on
+                async def run_agent_task(r=r, head=head, system_completion=system_completion, eq=eq, model=model, prompt=prompt):
                     async_session = create_async_session_factory()
-                    async with async_session() as session:
+                    async with eval_scheduler.slot(run_ctx), async_session() as session:
                         try:
                             report_obj = await session.get(Report, head.report_id)
                             head_obj = await session.get(Completion, head.id)
@@ -949,13 +1078,11 @@ class TestRunService:
                                 )
                                 await central_queue.put((str(r.id), err_ev))
                                 return
-                            # Build clients from report data sources
-                            clients = {}
-                            for data_source in getattr(report_obj, "data_sources", []):
-                                try:
-                                    clients[data_source.name] = await self.completions.data_source_service.construct_client(session, data_source, current_user)
-                                except Exception:
-                                    pass
+                            # Build clients from report data sources (shared across the run's cases)
+                            clients = await run_ctx.get_clients(
+                                session, getattr(report_obj, "data_sources", []), current_user,
+                                self.completions.data_source_service.construct_client,
+                            )
                             # Pre-load files relationship in async context to avoid greenlet error in AgentV2.__init__
                             _ = getattr(report_obj, "files", [])
                             # Get build_id from run
@@ -976,6 +1103,7 @@ class TestRunService:
                                 event_queue=eq,
                                 clients=clients,
                                 build_id=build_id,
+                                static_context=run_ctx,
                             )
                             await agent.main_execution()
                             # After agent finishes, evaluate assertions and persist TestResult
@@ -1099,9 +1227,25 @@ class TestRunService:
                         finally:
                             eq.finish()
 
-                # Start forwarder and runner
-                asyncio.create_task(forward_events(str(r.id), eq))
-                asyncio.create_task(run_agent_task())
+                launches.append((str(r.id), eq, run_agent_task, start_ev))
+
+            await db.commit()
+            if not launches:
+                return
+            # This stream owns the run context unless another launcher already does
+            owner = uuid.uuid4().hex
+            run_ctx = eval_scheduler.run_context(str(run.id), str(organization.id), owner=owner)
+            # Start forwarders and runners; the eval scheduler bounds how many agents run at once
+            agent_tasks = []
+            for res_id, eq, run_agent_task, start_ev in launches:
+                try:
+                    await central_queue.put((res_id, start_ev))
+                except Exception:
+                    pass
+                _spawn(forward_events(res_id, eq))
+                agent_tasks.append(asyncio.create_task(run_agent_task()))
+            # Tied to the agents, not the SSE consumer, so a disconnect doesn't leak the context
+            _spawn(self._finish_after(run_ctx, owner, agent_tasks))
 
         async def streamer():
             # Emit run.started
@@ -1178,7 +1322,7 @@ class TestRunService:
                             # Save summary_json with pass/fail counts
                             passed = sum(1 for r in rows if r.status == 'pass')
                             failed = sum(1 for r in rows if r.status in ('fail', 'error'))
-                            run.summary_json = {'total': len(rows), 'passed': passed, 'failed': failed}
+                            run.summary_json = {'total': len(rows), 'passed': passed, 'failed': failed, **(eval_scheduler.run_throughput(str(run.id)) or {})}
                             db.add(run)
                             await db.commit()
                         except Exception:
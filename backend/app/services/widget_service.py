@@ -5,6 +5,7 @@ from app.schemas.step_schema import StepSchema
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.step_service import StepService
+from app.services.step_result_store import iter_step_csv
 from app.models.step import Step
 import uuid
 from fastapi import HTTPException
@@ -14,6 +15,7 @@ import pandas as pd
 import io
 import logging
 import csv
+from typing import Iterator
 from app.models.user import User
 from app.models.organization import Organization
 
@@ -129,7 +131,8 @@ class WidgetService:
 
         return WidgetSchema.from_orm(widget).copy(update={"last_step": StepSchema.from_orm(step)})
 
-    async def export_widget_to_csv(self, db_session, widget_id: str, current_user: User, organization: Organization) -> str:
+    async def export_widget_to_csv(self, db_session, widget_id: str, current_user: User, organization: Organization) -> Iterator[bytes]:
+        """Return a CSV byte stream of the widget's latest step result."""
         logging.info(f"Starting CSV export for widget {widget_id}")
         try:
             widget = await db_session.execute(select(Widget).filter(Widget.id == widget_id))
@@ -141,12 +144,7 @@ class WidgetService:
             last_step = await self._get_last_step(db_session, widget.id)
             logging.info(f"Got last step: {last_step}")
             
-            # read the last_step.data[rows] and columns as df
-            columns = last_step.data['columns']
-            rows = last_step.data['rows']
-            df = pd.DataFrame(rows, columns=[col['headerName'] for col in columns])
-            
-            return df
+            return iter_step_csv(last_step.data if last_step else None)
 
         except Exception as e:
             logging.error(f"Error during CSV export: {str(e)}")
@@ -81,6 +81,12 @@ class Stripe(BaseModel):
     api_key: str = None
     webhook_secret: str = None
 
+class DatabasePool(BaseModel):
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
+
 class Database(BaseModel):
     url: str = Field(
         default_factory=lambda: os.getenv(
@@ -88,6 +94,91 @@ class Database(BaseModel):
             "sqlite:////app/backend/db/app.db"
         )
     )
+    # Shared async engine serving request handlers
+    app_pool: DatabasePool = DatabasePool()
+    # Separate, smaller engine for background work (titles, scoring, trace journal, Slack hooks);
+    # test runs use the app pool
+    background_pool: DatabasePool = DatabasePool(pool_size=3, max_overflow=5)
+
+class CodeExecution(BaseModel):
+    # Worker threads running generated code off the event loop (per process)
+    max_workers: int = 4
+    # Concurrent executions allowed per organization
+    per_organization_limit: int = 2
+    # Result profiling (get_df_info) samples frames above this many rows
+    profile_sample_threshold: int = 200_000
+    profile_sample_size: int = 50_000
+
+class DataSourceEngines(BaseModel):
+    # Pool settings for the shared SQLAlchemy engines of data source clients
+    pool_size: int = 5
+    max_overflow: int = 5
+    pool_recycle: int = 1800
+    # Dispose engines that have not been used for this long
+    idle_timeout_seconds: int = 600
+    max_engines: int = 64
+
+class FileUploads(BaseModel):
+    # Uploads larger than this are rejected with 413 while streaming to disk
+    max_size_mb: int = 200
+
+class QueryCache(BaseModel):
+    # Result cache for data sources that set query_cache_ttl_seconds
+    enabled: bool = True
+    max_bytes: int = 256 * 1024 * 1024
+    max_entry_bytes: int = 64 * 1024 * 1024
+    max_ttl_seconds: int = 86400
+
+class DashboardRefresh(BaseModel):
+    # Concurrent step reruns when refreshing a dashboard
+    max_concurrency: int = 8
+    per_data_source_concurrency: int = 3
+
+class Evals(BaseModel):
+    # Concurrent agent runs for test runs (per run and across an organization)
+    max_concurrency_per_run: int = 4
+    max_concurrency_per_org: int = 8
+
+class SchemaGraph(BaseModel):
+    # Structural table metrics (centrality, degrees, richness) computed after schema refresh
+    enabled: bool = True
+    observed_join_days: int = 90
+
+class TableUsage(BaseModel):
+    # Buffered TableUsageEvent/TableFeedbackEvent writes and TableStats rollups
+    flush_interval_seconds: float = 5.0
+    max_pending_events: int = 500
+    max_backlog_events: int = 50_000
+    max_backlog_stats_rows: int = 10_000
+
+class Mentions(BaseModel):
+    # Typeahead index behind /mentions/available
+    index_ttl_seconds: int = 300
+    objects_ttl_seconds: int = 30
+    max_limit: int = 200
+
+class ConnectorDiscovery(BaseModel):
+    # Parallel schema discovery for HTTP/API connectors (Tableau, BigQuery)
+    max_workers: int = 8
+    max_retries: int = 4
+    backoff_factor: float = 0.5
+    backoff_max_seconds: float = 30
+
+class SchemaRefresh(BaseModel):
+    # Incremental connection schema refresh driven by catalog fingerprints
+    incremental: bool = True
+    scheduled_enabled: bool = True
+    scheduled_interval_minutes: int = 60
+
+class StepResults(BaseModel):
+    # Full step results stored out of row (Arrow IPC) for paging and CSV export
+    enabled: bool = True
+    backend: str = "local"
+    local_path: str = "uploads/step_results"
+    max_rows: int = 1_000_000
+    compression: Optional[str] = "zstd"
+    # Rows kept inline in Step.data next to a stored result (charts, filters, agent context)
+    inline_rows: int = 100
 
 def generate_fernet_key():
     # Generate a valid Fernet-compatible key (32 url-safe base64-encoded bytes)
@@ -112,6 +203,18 @@ class BowConfig(BaseModel):
     database: Database = Database()
     intercom: Intercom = Intercom()
     telemetry: Telemetry = Telemetry()
+    code_execution: CodeExecution = CodeExecution()
+    data_source_engines: DataSourceEngines = DataSourceEngines()
+    file_uploads: FileUploads = FileUploads()
+    step_results: StepResults = StepResults()
+    query_cache: QueryCache = QueryCache()
+    dashboard_refresh: DashboardRefresh = DashboardRefresh()
+    evals: Evals = Evals()
+    schema_graph: SchemaGraph = SchemaGraph()
+    table_usage: TableUsage = TableUsage()
+    mentions: Mentions = Mentions()
+    connector_discovery: ConnectorDiscovery = ConnectorDiscovery()
+    schema_refresh: SchemaRefresh = SchemaRefresh()
 
     @validator('encryption_key')
     def validate_encryption_key(cls, v):
@@ -1,3 +1,8 @@
+import json
+import logging
+import threading
+from typing import Any, Dict
+
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
@@ -5,6 +10,16 @@ from sqlalchemy.pool import NullPool
 from app.settings.config import settings
 import os
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+APP_POOL = "app"
+BACKGROUND_POOL = "background"
+
 
 def _set_sqlite_pragmas(dbapi_connection, connection_record):
     """Set SQLite pragmas for better concurrency handling."""
@@ -14,6 +29,38 @@ def _set_sqlite_pragmas(dbapi_connection, connection_record):
     cursor.close()
 
 
+def _json_serializer(value: Any) -> str:
+    try:
+        return orjson.dumps(
+            value,
+            option=(
+                orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_SERIALIZE_NUMPY
+                | orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS
+            ),
+        ).decode("utf-8")
+    except TypeError:
+        # Whatever orjson can't encode (Decimal, models, ints past 64 bits) gets
+        # the stdlib encoder's result, or its error
+        return json.dumps(value)
+
+
+def _json_deserializer(value: Any) -> Any:
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        # Rows written by the stdlib encoder may contain NaN/Infinity tokens
+        return json.loads(value)
+
+
+def _json_kwargs() -> Dict[str, Any]:
+    """JSON columns (e.g. Step.data) are encoded with orjson when it is installed."""
+    if orjson is None:
+        return {}
+    return {"json_serializer": _json_serializer, "json_deserializer": _json_deserializer}
+
+
 def _get_test_database_url() -> str:
     """Get test database URL from env var (set by conftest.py) or settings."""
     return os.environ.get("TEST_DATABASE_URL", settings.TEST_DATABASE_URL)
@@ -26,8 +73,8 @@ def create_database_engine():
         if "postgres" in database_url:
             database_url = database_url.replace("postgres://", "postgresql://")
             # NullPool for tests to avoid connection issues
-            return create_engine(database_url, poolclass=NullPool)
-        return create_engine(database_url)
+            return create_engine(database_url, poolclass=NullPool, **_json_kwargs())
+        return create_engine(database_url, **_json_kwargs())
     else:
         if "postgres" in settings.bow_config.database.url:
             database_url = settings.bow_config.database.url.replace("postgres://", "postgresql://")
@@ -35,7 +82,7 @@ def create_database_engine():
             database_url = settings.bow_config.database.url
         else:
             database_url = "sqlite:///./app.db"  # Default fallback
-        return create_engine(database_url)
+        return create_engine(database_url, **_json_kwargs())
 
 
 def create_session_factory():
@@ -44,7 +91,13 @@ def create_session_factory():
     return SessionLocal
 
 
-def create_async_database_engine():
+def _pool_config(role: str):
+    database = settings.bow_config.database
+    return database.background_pool if role == BACKGROUND_POOL else database.app_pool
+
+
+def create_async_database_engine(role: str = APP_POOL):
+    """Build a new async engine. Use ``get_async_engine`` to share one per process."""
     if settings.TESTING:
         database_url = _get_test_database_url()
         
@@ -55,6 +108,7 @@ def create_async_database_engine():
                 database_url,
                 echo=False,
                 future=True,
+                **_json_kwargs(),
                 # NullPool: close connections immediately to avoid "database is locked" in CI
                 poolclass=NullPool,
                 connect_args={
@@ -73,7 +127,7 @@ def create_async_database_engine():
                 "postgresql://", "postgresql+asyncpg://"
             )
             # NullPool: no connection pooling - avoids stale connection issues with TestClient
-            engine = create_async_engine(database_url, echo=False, future=True, poolclass=NullPool)
+            engine = create_async_engine(database_url, echo=False, future=True, poolclass=NullPool, **_json_kwargs())
     else:
         if "postgres" in settings.bow_config.database.url:
             database_url = settings.bow_config.database.url.replace(
@@ -82,14 +136,16 @@ def create_async_database_engine():
                 "postgresql://", "postgresql+asyncpg://"
             )
             # PostgreSQL: use connection pooling for production
+            pool = _pool_config(role)
             engine = create_async_engine(
                 database_url,
                 echo=False,
-                pool_size=5,           # connections per worker
-                max_overflow=10,       # extra connections under load
-                pool_timeout=30,       # wait time for connection
-                pool_recycle=1800,     # recycle connections every 30min (avoids stale connections)
-                pool_pre_ping=True,    # check connection health before use
+                pool_size=pool.pool_size,        # connections per worker
+                max_overflow=pool.max_overflow,  # extra connections under load
+                pool_timeout=pool.pool_timeout,  # wait time for connection
+                pool_recycle=pool.pool_recycle,  # recycle connections (avoids stale connections)
+                pool_pre_ping=True,              # check connection health before use
+                **_json_kwargs(),
             )
         else:
             # SQLite: no connection pooling supported
@@ -99,12 +155,109 @@ def create_async_database_engine():
                 )
             else:
                 database_url = "sqlite+aiosqlite:///./app.db"
-            engine = create_async_engine(database_url, echo=False)
+            engine = create_async_engine(database_url, echo=False, **_json_kwargs())
 
     return engine
 
 
-def create_async_session_factory():
-    engine = create_async_database_engine()
-    async_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
-    return async_session
+class AsyncEngineRegistry:
+    """Process-wide async engines, one per pool role.
+
+    ``create_async_session_factory`` used to build a new engine (and pool) on
+    every call, and background tasks called it per task without ever
+    disposing it. Engines are now created lazily once per role and shared:
+
+    - ``app``: request handlers (``app.dependencies.async_session_maker``),
+      plus test runs and completion tasks that call
+      ``create_async_session_factory()`` without a role
+    - ``background``: agent side tasks (titles, scoring, context snapshots,
+      instruction usage), the trace journal, completion hooks and
+      Slack notifications
+
+    Keeping background work on its own, smaller pool means it can't starve
+    request handlers. ``dispose_all`` is awaited on shutdown.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: Dict[str, Any] = {}
+        self._session_makers: Dict[str, async_sessionmaker] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def get_engine(self, role: str = APP_POOL):
+        with self._lock:
+            engine = self._engines.get(role)
+            if engine is None:
+                engine = create_async_database_engine(role)
+                self._register_pool_events(role, engine)
+                self._engines[role] = engine
+            return engine
+
+    def get_session_maker(self, role: str = APP_POOL) -> async_sessionmaker:
+        engine = self.get_engine(role)
+        with self._lock:
+            maker = self._session_makers.get(role)
+            if maker is None:
+                maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+                self._session_makers[role] = maker
+            return maker
+
+    def _register_pool_events(self, role: str, engine) -> None:
+        counters = self._stats.setdefault(role, {"connects": 0, "checkouts": 0, "checkins": 0})
+
+        def _bump(key):
+            with self._lock:
+                counters[key] += 1
+
+        event.listen(engine.sync_engine, "connect", lambda *_: _bump("connects"))
+        event.listen(engine.sync_engine, "checkout", lambda *_: _bump("checkouts"))
+        event.listen(engine.sync_engine, "checkin", lambda *_: _bump("checkins"))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-role pool occupancy and connection counters."""
+        with self._lock:
+            engines = dict(self._engines)
+            counters = {role: dict(c) for role, c in self._stats.items()}
+        snapshot: Dict[str, Dict[str, Any]] = {}
+        for role, engine in engines.items():
+            pool = engine.pool
+            entry = dict(counters.get(role, {}))
+            entry["pool"] = type(pool).__name__
+            for attr in ("size", "checkedout", "checkedin", "overflow"):
+                fn = getattr(pool, attr, None)
+                entry[attr] = fn() if callable(fn) else None
+            snapshot[role] = entry
+        return snapshot
+
+    async def dispose(self, role: str) -> None:
+        with self._lock:
+            engine = self._engines.pop(role, None)
+            self._session_makers.pop(role, None)
+            self._stats.pop(role, None)
+        if engine is not None:
+            try:
+                await engine.dispose()
+            except Exception as e:
+                logger.warning(f"Failed to dispose {role} database engine: {e}")
+
+    async def dispose_all(self) -> None:
+        with self._lock:
+            roles = list(self._engines)
+        for role in roles:
+            await self.dispose(role)
+
+
+async_engine_registry = AsyncEngineRegistry()
+
+
+def get_async_engine(role: str = APP_POOL):
+    """Return the shared async engine for ``role``."""
+    return async_engine_registry.get_engine(role)
+
+
+def create_async_session_factory(role: str = APP_POOL):
+    """Return a session maker bound to the shared engine for ``role``.
+
+    Cheap to call repeatedly: no engine or pool is created after the first call.
+    """
+    return async_engine_registry.get_session_maker(role)
@@ -1,28 +1,132 @@
 import asyncio
-from typing import AsyncIterator
+from collections import deque
+from typing import AsyncIterator, Deque, Optional
 from app.schemas.sse_schema import SSEEvent
 
 
+# Token deltas are emitted at up to ~60fps per field; consecutive ones for the
+# same block/field can be merged without changing what the client renders.
+COALESCIBLE_EVENTS = {"block.delta.token"}
+
+
 class CompletionEventQueue:
-    """Queue for streaming SSE events during completion."""
-    
-    def __init__(self):
-        self.queue: asyncio.Queue[SSEEvent] = asyncio.Queue()
+    """Queue for streaming SSE events during completion.
+
+    - Push-based: consumers wake as soon as an event is put or the queue is
+      finished, instead of polling.
+    - Consecutive token deltas for the same block/field that the consumer has
+      not picked up yet are coalesced into a single frame.
+    - The buffer is bounded: ``put`` waits while it is full, so a slow SSE
+      client applies backpressure instead of growing memory. Once the
+      consumer goes away (``close``), further events are dropped.
+    - The wait is bounded too: if nothing drains the buffer for
+      ``put_timeout`` seconds the stream is truncated, so a producer can
+      never block forever. Events already buffered are kept for the client,
+      followed by a terminal ``completion.error`` saying the rest of the
+      stream was not delivered (the completion itself is still saved);
+      later events are dropped. Only the consumer going away (``close``,
+      from ``get_events``/the route) discards the buffer.
+    """
+
+    def __init__(self, max_size: int = 1000, coalesce_tokens: bool = True, put_timeout: float = 60.0):
+        self.max_size = max(1, max_size)
+        self.coalesce_tokens = coalesce_tokens
+        self.put_timeout = put_timeout
+        self._buffer: Deque[SSEEvent] = deque()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
         self.finished = False
-    
+        self.closed = False
+        self.truncated = False
+        self.dropped = 0
+        self.coalesced = 0
+
+    def _try_coalesce(self, event: SSEEvent) -> bool:
+        if not self.coalesce_tokens or not self._buffer or event.event not in COALESCIBLE_EVENTS:
+            return False
+        last = self._buffer[-1]
+        if last.event != event.event:
+            return False
+        last_data, data = last.data or {}, event.data or {}
+        if (
+            last_data.get("block_id") != data.get("block_id")
+            or last_data.get("field") != data.get("field")
+            or last.completion_id != event.completion_id
+            or last.agent_execution_id != event.agent_execution_id
+        ):
+            return False
+        # Replace rather than mutate: the producer may still hold the old event
+        merged = dict(last_data)
+        merged["token"] = str(last_data.get("token") or "") + str(data.get("token") or "")
+        self._buffer[-1] = last.model_copy(update={
+            "data": merged,
+            "seq": event.seq if event.seq is not None else last.seq,
+            "timestamp": event.timestamp,
+        })
+        self.coalesced += 1
+        return True
+
     async def put(self, event: SSEEvent):
-        """Add validated Pydantic event to queue."""
-        await self.queue.put(event)
-    
-    async def get_events(self) -> AsyncIterator[SSEEvent]:
-        """Yield validated Pydantic events."""
-        while not self.finished or not self.queue.empty():
+        """Add validated Pydantic event to queue, waiting while the buffer is full."""
+        if self.closed or self.truncated:
+            self.dropped += 1
+            return
+        if self._try_coalesce(event):
+            return
+        while len(self._buffer) >= self.max_size and not self.closed:
+            self._writable.clear()
             try:
-                event = await asyncio.wait_for(self.queue.get(), timeout=0.1)
-                yield event
+                await asyncio.wait_for(self._writable.wait(), timeout=self.put_timeout)
             except asyncio.TimeoutError:
-                continue
-    
+                # Nothing drained for put_timeout: keep what the client hasn't read, end the stream
+                self._truncate(event)
+                break
+        if self.closed or self.truncated:
+            self.dropped += 1
+            return
+        self._buffer.append(event)
+        self._readable.set()
+
+    def _truncate(self, event: SSEEvent):
+        self.truncated = True
+        # Terminal event goes past max_size on purpose: the client must learn the stream is incomplete
+        self._buffer.append(SSEEvent(
+            event="completion.error",
+            completion_id=event.completion_id,
+            agent_execution_id=event.agent_execution_id,
+            data={
+                "error": "The live stream fell too far behind and was cut short; reload to see the full response.",
+                "truncated": True,
+            },
+        ))
+        self.finish()
+
+    async def get_events(self) -> AsyncIterator[SSEEvent]:
+        """Yield validated Pydantic events until the queue is finished and drained."""
+        try:
+            while True:
+                if self._buffer:
+                    event = self._buffer.popleft()
+                    if len(self._buffer) < self.max_size:
+                        self._writable.set()
+                    yield event
+                    continue
+                if self.finished:
+                    return
+                self._readable.clear()
+                await self._readable.wait()
+        finally:
+            # Consumer is gone (finished, or the client disconnected)
+            self.close()
+
     def finish(self):
         """Mark the queue as finished (no more events will be added)."""
         self.finished = True
+        self._readable.set()
+
+    def close(self):
+        """Stop accepting events and release any producer blocked on a full buffer."""
+        self.closed = True
+        self._buffer.clear()
+        self._writable.set()
@@ -34,6 +34,12 @@ from app.core.cors import init_cors
 from app.core.scheduler import scheduler
 from app.models.user import User
 from app.services.maintenance_service import purge_step_payloads_keep_latest_per_query
+from app.services.schema_graph_analytics import refresh_all_schema_graphs
+from app.services.connection_service import refresh_all_connection_schemas, schema_refresh_config
+from app.services.table_usage_aggregator import table_usage_aggregator
+from app.ai.code_execution.execution_pool import code_execution_pool
+from app.data_sources.clients.engine_registry import engine_registry
+from app.settings.database import async_engine_registry
 
 from app.routes import (
     report,
@@ -307,6 +313,40 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to schedule purge job: {e}")
 
+    try:
+        scheduler.add_job(
+            refresh_all_schema_graphs,
+            trigger="cron",
+            hour=3,
+            minute=30,
+            id="refresh_schema_graphs_daily",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=3600,
+        )
+        logger.info("Scheduled job: refresh_all_schema_graphs @ 03:30 daily")
+    except Exception as e:
+        logger.error(f"Failed to schedule schema graph job: {e}")
+
+    try:
+        refresh_config = schema_refresh_config()
+        if refresh_config["scheduled_enabled"]:
+            interval_minutes = int(refresh_config["scheduled_interval_minutes"])
+            scheduler.add_job(
+                refresh_all_connection_schemas,
+                trigger="interval",
+                minutes=interval_minutes,
+                id="refresh_connection_schemas",
+                replace_existing=True,
+                coalesce=True,
+                max_instances=1,
+                misfire_grace_time=600,
+            )
+            logger.info(f"Scheduled job: refresh_all_connection_schemas every {interval_minutes} min")
+    except Exception as e:
+        logger.error(f"Failed to schedule connection schema refresh job: {e}")
+
     scheduler.start()
     print(f"""
    ____                       __                         _     
@@ -332,6 +372,13 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     scheduler.shutdown()
+    try:
+        await table_usage_aggregator.shutdown()
+    except Exception as e:
+        logger.error(f"Failed to flush table usage backlog: {e}")
+    code_execution_pool.shutdown(wait=False)
+    engine_registry.dispose_all()
+    await async_engine_registry.dispose_all()
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -90,6 +90,7 @@ def pytest_addoption(parser):
 def pytest_configure(config):
     """Configure pytest markers."""
     config.addinivalue_line("markers", "e2e: marks tests as end-to-end tests")
+    config.addinivalue_line("markers", "unit: marks tests of pure helpers that need no app or database")
 
 @pytest.fixture(scope="session", autouse=True)
 def disable_telemetry_for_tests():
@@ -109,6 +110,8 @@ from tests.fixtures.data_source import (
     test_connection,
     update_data_source,
     delete_data_source,
+    get_query_cache_stats,
+    invalidate_query_cache,
     get_schema,
     refresh_schema,
     get_metadata_resources,
@@ -148,7 +151,7 @@ from tests.fixtures.git_repository import (
 from tests.fixtures.instruction import create_instruction, create_global_instruction, get_instructions, get_instruction, update_instruction, delete_instruction, get_instructions_for_data_source, get_instruction_categories, get_instruction_statuses, create_label, list_labels, update_label, delete_label, get_instructions_by_source_type, unlink_instruction_from_git, bulk_update_instructions, bulk_delete_instructions
 from tests.fixtures.entity import get_entities, get_entity, create_global_entity
 from tests.fixtures.console_metrics import get_console_metrics, get_console_metrics_comparison, get_timeseries_metrics, get_table_usage_metrics, get_top_users_metrics, get_recent_negative_feedback, get_diagnosis_dashboard_metrics, get_agent_execution_summaries, create_test_data_for_console, get_tool_usage_metrics, get_llm_usage_metrics
-from tests.fixtures.mention import get_available_mentions
+from tests.fixtures.mention import get_available_mentions, get_mention_table_columns
 from tests.fixtures.eval import create_test_suite, get_test_suites, create_test_case, get_test_cases, get_test_case, get_test_suite, create_test_run, get_test_runs, get_test_run, get_suites_summary
 from tests.fixtures.file import upload_file, upload_csv_file, upload_excel_file, get_files, get_files_by_report, remove_file_from_report
 from tests.fixtures.organization_settings import get_organization_settings, update_organization_settings, upload_organization_icon, delete_organization_icon, get_organization_icon
@@ -143,6 +143,34 @@ def test_timeseries_metrics(
         assert field in performance
         assert isinstance(performance[field], list)
 
+@pytest.mark.e2e
+def test_timeseries_metrics_weekly_gap_filled(
+    get_timeseries_metrics,
+    create_user,
+    login_user,
+    whoami
+):
+    """Weekly buckets with gap-filling return one Monday-aligned point per week"""
+    user = create_user()
+    user_token = login_user(user["email"], user["password"])
+    org_id = whoami(user_token)['organizations'][0]['id']
+
+    start_date = datetime(2024, 1, 3)   # Wednesday
+    end_date = datetime(2024, 1, 28)    # Sunday
+    response = get_timeseries_metrics(
+        user_token=user_token,
+        org_id=org_id,
+        start_date=start_date,
+        end_date=end_date,
+        granularity="week",
+        fill_gaps=True,
+    )
+
+    assert response.status_code == 200
+    messages = response.json()["activity_metrics"]["messages"]
+    assert [p["date"] for p in messages] == ["2024-01-01", "2024-01-08", "2024-01-15", "2024-01-22"]
+    assert all(p["value"] == 0 for p in messages)
+
 @pytest.mark.e2e
 def test_table_usage_metrics(
     get_table_usage_metrics,
@@ -411,4 +411,61 @@ def test_selected_state_filter(
         data_source_id=data_source["id"],
         user_token=user_token,
         org_id=org_id
-    )
\ No newline at end of file
+    )
+
+
+@pytest.mark.e2e
+def test_query_cache_settings_and_invalidation(
+    create_data_source,
+    update_data_source,
+    delete_data_source,
+    get_query_cache_stats,
+    invalidate_query_cache,
+    create_user,
+    login_user,
+    whoami
+):
+    if not DATA_SOURCE_TEST_DB_PATH.exists():
+        pytest.skip(f"SQLite test database missing at {DATA_SOURCE_TEST_DB_PATH}")
+
+    user = create_user()
+    user_token = login_user(user["email"], user["password"])
+    org_id = whoami(user_token)['organizations'][0]['id']
+
+    data_source = create_data_source(
+        name="Query Cache Test DB",
+        type="sqlite",
+        config={"database": str(DATA_SOURCE_TEST_DB_PATH)},
+        credentials={},
+        user_token=user_token,
+        org_id=org_id
+    )
+    assert data_source.get("query_cache_ttl_seconds") is None
+
+    stats = get_query_cache_stats(data_source_id=data_source["id"], user_token=user_token, org_id=org_id)
+    assert stats["enabled"] is False
+    assert stats["entries"] == 0
+
+    updated = update_data_source(
+        data_source_id=data_source["id"],
+        payload={"query_cache_ttl_seconds": 300},
+        user_token=user_token,
+        org_id=org_id
+    )
+    assert updated["query_cache_ttl_seconds"] == 300
+
+    stats = get_query_cache_stats(data_source_id=data_source["id"], user_token=user_token, org_id=org_id)
+    assert stats["enabled"] is True
+    assert stats["ttl_seconds"] == 300
+    assert {"hits", "misses", "hit_rate", "bytes"} <= set(stats)
+    # Changing the TTL moved the data source to a new cache epoch
+    epoch = stats["epoch"]
+    assert epoch == 1
+
+    result = invalidate_query_cache(data_source_id=data_source["id"], user_token=user_token, org_id=org_id)
+    assert result["invalidated"] == 0
+    assert result["epoch"] == epoch + 1
+    stats = get_query_cache_stats(data_source_id=data_source["id"], user_token=user_token, org_id=org_id)
+    assert stats["epoch"] == epoch + 1
+
+    delete_data_source(data_source_id=data_source["id"], user_token=user_token, org_id=org_id)
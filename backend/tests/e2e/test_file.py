@@ -4,6 +4,8 @@ E2E tests for file upload and preview functionality.
 Tests the new raw preview system where file uploads generate structured previews
 (without LLM) that can be used for on-demand analysis by the coder.
 """
+import os
+
 import pytest
 
 
@@ -340,3 +342,94 @@ def test_upload_excel_with_large_sheet(
 
 
 
+
+
+@pytest.mark.e2e
+def test_uploaded_excel_read_sheet_matches_read_excel(
+    upload_excel_file,
+    create_user,
+    login_user,
+    whoami
+):
+    """Sheets served from the columnar cache match what pandas reads from the workbook."""
+    import pandas as pd
+    from app.models.file import File
+
+    user = create_user()
+    user_token = login_user(user["email"], user["password"])
+    org_id = whoami(user_token)['organizations'][0]['id']
+
+    sheets = {
+        "Sales": pd.DataFrame({
+            "Product": ["A", "B", "C"],
+            "Revenue": [1000, 2000, 3000]
+        }),
+        "Regions": pd.DataFrame({
+            "Region": ["North", "South"],
+            "Manager": ["Ann", "Bob"]
+        })
+    }
+
+    file_result = upload_excel_file(
+        user_token=user_token,
+        org_id=org_id,
+        filename="cached_sales.xlsx",
+        sheets=sheets
+    )
+
+    file = File(
+        id=file_result["id"],
+        filename=file_result["filename"],
+        content_type=file_result["content_type"],
+        path=file_result["path"],
+    )
+
+    raw = pd.read_excel(file.path, sheet_name=0, header=None)
+    pd.testing.assert_frame_equal(file.read_sheet(0), raw)
+    # Cached frames are handed out as copies
+    first = file.read_sheet(0)
+    first.iloc[0, 0] = "changed"
+    pd.testing.assert_frame_equal(file.read_sheet(0), raw)
+
+    by_name = file.read_sheet("Regions", header=0)
+    pd.testing.assert_frame_equal(by_name, pd.read_excel(file.path, sheet_name="Regions"))
+
+
+@pytest.mark.e2e
+def test_upload_over_size_limit_is_rejected_without_partial_file(
+    test_client,
+    monkeypatch,
+    upload_csv_file,
+    get_files,
+    create_user,
+    login_user,
+    whoami
+):
+    """Uploads past file_uploads.max_size_mb get 413 and leave nothing on disk."""
+    from app.settings.config import settings
+
+    monkeypatch.setattr(settings.bow_config.file_uploads, "max_size_mb", 1)
+    user = create_user()
+    user_token = login_user(user["email"], user["password"])
+    org_id = whoami(user_token)['organizations'][0]['id']
+    headers = {"Authorization": f"Bearer {user_token}", "X-Organization-Id": str(org_id)}
+
+    # A few chunks past the cap, so the rejection happens mid-stream
+    oversized = b"value\n" + b"1234567\n" * (3 * 1024 * 1024 // 8)
+    response = test_client.post(
+        "/api/files",
+        files={"file": ("too_big.csv", oversized, "text/csv")},
+        headers=headers,
+    )
+
+    assert response.status_code == 413
+    assert "maximum upload size of 1 MB" in response.json()["detail"]
+    # Neither the final file nor the temporary .part file is left behind
+    assert not any("too_big.csv" in name for name in os.listdir("uploads/files"))
+    assert all(f["filename"] != "too_big.csv" for f in get_files(user_token=user_token, org_id=org_id))
+
+    # Exactly at the cap is still accepted
+    at_limit = b"v\n" * (512 * 1024)
+    file_result = upload_csv_file(user_token=user_token, org_id=org_id, content=at_limit, filename="at_limit.csv")
+    assert file_result["filename"] == "at_limit.csv"
+    assert os.path.getsize(file_result["path"]) == 1024 * 1024
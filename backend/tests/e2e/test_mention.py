@@ -153,3 +153,55 @@ def test_table_mentions_have_valid_ids(
         delete_data_source(data_source_id=data_source_id, user_token=user_token, org_id=org_id)
 
 
+@pytest.mark.e2e
+def test_table_mentions_search_and_lazy_columns(
+    get_available_mentions,
+    get_mention_table_columns,
+    install_demo_data_source,
+    delete_data_source,
+    create_user,
+    login_user,
+    whoami,
+):
+    """Searching with q ranks prefix matches first, paginates, and leaves columns to the columns endpoint."""
+    if not DEMO_CHINOOK_PATH.exists():
+        pytest.skip(f"Demo database missing at {DEMO_CHINOOK_PATH}")
+
+    user = create_user()
+    user_token = login_user(user["email"], user["password"])
+    org_id = whoami(user_token)['organizations'][0]['id']
+
+    result = install_demo_data_source(demo_id="chinook", user_token=user_token, org_id=org_id)
+    assert result["success"] is True
+    data_source_id = result["data_source_id"]
+
+    try:
+        mentions = get_available_mentions(
+            user_token=user_token, org_id=org_id, categories="tables", q="invoice", limit=1
+        )
+        tables = mentions["tables"]
+        assert len(tables) == 1
+        assert tables[0]["name"].lower().startswith("invoice")
+        assert tables[0]["columns"] == []
+        assert mentions["total"]["tables"] >= 2  # Invoice and InvoiceLine
+
+        second_page = get_available_mentions(
+            user_token=user_token, org_id=org_id, categories="tables", q="invoice", limit=1, offset=1
+        )
+        assert len(second_page["tables"]) == 1
+        assert second_page["tables"][0]["id"] != tables[0]["id"]
+
+        columns = get_mention_table_columns(tables[0]["id"], user_token=user_token, org_id=org_id)
+        assert columns["id"] == tables[0]["id"]
+        assert columns["datasource_id"] == data_source_id
+        assert len(columns["columns"]) > 0
+        assert all("name" in c for c in columns["columns"])
+
+        # Column names are searchable: BillingCountry only exists on Invoice
+        by_column = get_available_mentions(
+            user_token=user_token, org_id=org_id, categories="tables", q="billingcountry", limit=5
+        )
+        assert [t["name"].lower() for t in by_column["tables"]][:1] == ["invoice"]
+
+    finally:
+        delete_data_source(data_source_id=data_source_id, user_token=user_token, org_id=org_id)
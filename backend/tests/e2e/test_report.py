@@ -100,3 +100,28 @@ def test_get_report_includes_conversation_share_status(
     fetched = get_report(report["id"], user_token=user_token, org_id=org_id)
     assert fetched["conversation_share_enabled"] is True
     assert fetched["conversation_share_token"] == payload["token"]
+
+
+@pytest.mark.e2e
+def test_report_rerun_empty_dashboard(
+    create_report,
+    rerun_report,
+    create_user,
+    login_user,
+    whoami
+):
+    user = create_user()
+    user_token = login_user(user["email"], user["password"])
+    org_id = whoami(user_token)['organizations'][0]['id']
+
+    report = create_report(
+        title="Rerun Report",
+        user_token=user_token,
+        org_id=org_id,
+        data_sources=[]
+    )
+
+    rerun = rerun_report(report["id"], user_token=user_token, org_id=org_id)
+    assert rerun["id"] == report["id"]
+    # No visualization tiles: nothing to plan, legacy widget path runs instead
+    assert rerun.get("last_refresh") is None
@@ -232,6 +232,71 @@ def test_schema_refresh_updates_column_changes(
     )
 
 
+@pytest.mark.e2e
+def test_schema_refresh_unchanged_database_is_incremental(
+    dynamic_sqlite_db,
+    create_data_source,
+    refresh_schema,
+    delete_data_source,
+    create_user,
+    login_user,
+    whoami,
+):
+    """Test that a refresh with no catalog changes keeps tables, and later changes are still picked up."""
+    user = create_user()
+    user_token = login_user(user["email"], user["password"])
+    org_id = whoami(user_token)['organizations'][0]['id']
+
+    domain = create_data_source(
+        name="Schema Drift Test - Incremental",
+        type="sqlite",
+        config={"database": dynamic_sqlite_db},
+        credentials={},
+        user_token=user_token,
+        org_id=org_id,
+    )
+
+    # 1. First refresh is a full scan and stores the catalog fingerprint
+    initial_schema = refresh_schema(
+        data_source_id=domain["id"],
+        user_token=user_token,
+        org_id=org_id,
+    )
+    initial = {t["name"]: len(t.get("columns", [])) for t in initial_schema}
+    assert "users" in initial
+
+    # 2. Nothing changed: fingerprint matches, tables are kept as they were
+    unchanged_schema = refresh_schema(
+        data_source_id=domain["id"],
+        user_token=user_token,
+        org_id=org_id,
+    )
+    assert {t["name"]: len(t.get("columns", [])) for t in unchanged_schema} == initial
+
+    # 3. A schema change moves the fingerprint and is re-introspected
+    conn = sqlite3.connect(dynamic_sqlite_db)
+    conn.execute("ALTER TABLE users ADD COLUMN nickname TEXT")
+    conn.commit()
+    conn.close()
+
+    changed_schema = refresh_schema(
+        data_source_id=domain["id"],
+        user_token=user_token,
+        org_id=org_id,
+    )
+    users_table = next((t for t in changed_schema if t["name"] == "users"), None)
+    assert users_table is not None
+    assert "nickname" in {c["name"] for c in users_table.get("columns", [])}
+    assert len(changed_schema) == len(initial)
+
+    # Cleanup
+    delete_data_source(
+        data_source_id=domain["id"],
+        user_token=user_token,
+        org_id=org_id,
+    )
+
+
 @pytest.mark.e2e
 def test_schema_refresh_preserves_table_selection(
     dynamic_sqlite_db,
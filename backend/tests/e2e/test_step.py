@@ -0,0 +1,133 @@
+import asyncio
+import io
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from app.services import step_result_store as store_module
+from app.services.step_result_store import LocalResultBackend, StepResultStore
+
+
+@pytest.fixture
+def result_store(tmp_path, monkeypatch):
+    store = StepResultStore()
+    store._config = {
+        "enabled": True,
+        "backend": "local",
+        "local_path": str(tmp_path),
+        "max_rows": 0,
+        "compression": "zstd",
+    }
+    store.register_backend(LocalResultBackend(str(tmp_path)))
+    monkeypatch.setattr(store_module, "step_result_store", store)
+    monkeypatch.setattr("app.services.maintenance_service.step_result_store", store)
+    return store
+
+
+def _insert_step(report_id, data, status="success", age_days=0):
+    """Widget + step rows for a report; returns the step id."""
+    async def run():
+        from app.dependencies import async_session_maker, engine
+        from app.models.step import Step
+        from app.models.widget import Widget
+
+        stamp = datetime.utcnow() - timedelta(days=age_days)
+        async with async_session_maker() as db:
+            widget = Widget(title="Big Result", slug=f"widget-{uuid.uuid4().hex}", report_id=report_id)
+            db.add(widget)
+            await db.flush()
+            step = Step(
+                title="step", slug=f"step-{uuid.uuid4().hex}", status=status, data=data,
+                widget_id=widget.id, created_at=stamp, updated_at=stamp,
+            )
+            db.add(step)
+            await db.commit()
+            step_id = step.id
+        await engine.dispose()
+        return step_id
+
+    return asyncio.run(run())
+
+
+def _step_data(store, rows=3000):
+    df = pd.DataFrame({"n": list(range(rows)), "label": [f"r{i}" for i in range(rows)]})
+    head = df.head(100)
+    return {
+        "columns": [{"headerName": c, "field": c} for c in df.columns],
+        "rows": head.to_dict(orient="records"),
+        "info": {"total_rows": rows},
+        "result_ref": store.put_dataframe(df),
+    }
+
+
+def _setup(create_user, login_user, whoami, create_report):
+    user = create_user()
+    user_token = login_user(user["email"], user["password"])
+    org_id = whoami(user_token)["organizations"][0]["id"]
+    report = create_report(title="Step Results", user_token=user_token, org_id=org_id)
+    headers = {"Authorization": f"Bearer {user_token}", "X-Organization-Id": str(org_id)}
+    return report, headers
+
+
+@pytest.mark.e2e
+def test_step_rows_pages_past_inline_preview(
+    test_client, result_store, create_user, login_user, whoami, create_report
+):
+    report, headers = _setup(create_user, login_user, whoami, create_report)
+    step_id = _insert_step(report["id"], _step_data(result_store))
+
+    response = test_client.get(f"/api/steps/{step_id}/rows?offset=2500&limit=100", headers=headers)
+    assert response.status_code == 200, response.json()
+    page = response.json()
+    assert page["total_rows"] == 3000
+    assert [r["n"] for r in page["rows"]] == list(range(2500, 2600))
+
+    response = test_client.get(f"/api/steps/{step_id}/rows?limit=2&sort_by=n&sort_dir=desc", headers=headers)
+    assert [r["n"] for r in response.json()["rows"]] == [2999, 2998]
+
+    response = test_client.get(f"/api/steps/{step_id}/rows?sort_by=missing", headers=headers)
+    assert response.status_code == 400
+
+    response = test_client.get(f"/api/steps/{uuid.uuid4()}/rows", headers=headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.e2e
+def test_step_export_streams_full_result_as_csv(
+    test_client, result_store, create_user, login_user, whoami, create_report
+):
+    report, headers = _setup(create_user, login_user, whoami, create_report)
+    step_id = _insert_step(report["id"], _step_data(result_store))
+
+    response = test_client.get(f"/api/steps/{step_id}/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"].endswith('.csv"')
+    exported = pd.read_csv(io.BytesIO(response.content))
+    assert list(exported.columns) == ["n", "label"]
+    assert len(exported) == 3000  # not capped at the 1000 inline rows
+
+
+@pytest.mark.e2e
+def test_purge_deletes_result_blobs_of_purged_steps(
+    test_client, tmp_path, result_store, create_user, login_user, whoami, create_report
+):
+    from app.services.maintenance_service import purge_step_payloads_keep_latest_per_query
+
+    report, _ = _setup(create_user, login_user, whoami, create_report)
+    stale = _step_data(result_store, rows=10)
+    fresh = _step_data(result_store, rows=10)
+    _insert_step(report["id"], stale, age_days=30)
+    _insert_step(report["id"], fresh)
+
+    async def purge():
+        from app.dependencies import engine
+        await purge_step_payloads_keep_latest_per_query(retention_days=14)
+        await engine.dispose()
+
+    asyncio.run(purge())
+
+    assert not (tmp_path / stale["result_ref"]["key"]).exists()
+    assert (tmp_path / fresh["result_ref"]["key"]).exists()
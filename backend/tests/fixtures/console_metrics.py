@@ -51,7 +51,7 @@ def get_console_metrics_comparison(test_client):
 
 @pytest.fixture
 def get_timeseries_metrics(test_client):
-    def _get_timeseries_metrics(user_token=None, org_id=None, start_date=None, end_date=None):
+    def _get_timeseries_metrics(user_token=None, org_id=None, start_date=None, end_date=None, granularity=None, fill_gaps=None):
         headers = {}
         if user_token:
             headers["Authorization"] = f"Bearer {user_token}"
@@ -63,6 +63,10 @@ def get_timeseries_metrics(test_client):
             params["start_date"] = start_date.isoformat()
         if end_date:
             params["end_date"] = end_date.isoformat()
+        if granularity:
+            params["granularity"] = granularity
+        if fill_gaps is not None:
+            params["fill_gaps"] = str(fill_gaps).lower()
         
         response = test_client.get(
             "/api/console/metrics/timeseries",
@@ -145,6 +145,54 @@ def delete_data_source(test_client):
     return _delete_data_source
 
 
+@pytest.fixture
+def get_query_cache_stats(test_client):
+    def _get_query_cache_stats(*, data_source_id: str, user_token: str = None, org_id: str = None):
+        if user_token is None:
+            pytest.fail("User token is required for get_query_cache_stats")
+        if org_id is None:
+            pytest.fail("Organization ID is required for get_query_cache_stats")
+
+        headers = {
+            "Authorization": f"Bearer {user_token}",
+            "X-Organization-Id": str(org_id)
+        }
+
+        response = test_client.get(
+            f"/api/data_sources/{data_source_id}/query_cache",
+            headers=headers
+        )
+
+        assert response.status_code == 200, response.json()
+        return response.json()
+
+    return _get_query_cache_stats
+
+
+@pytest.fixture
+def invalidate_query_cache(test_client):
+    def _invalidate_query_cache(*, data_source_id: str, user_token: str = None, org_id: str = None):
+        if user_token is None:
+            pytest.fail("User token is required for invalidate_query_cache")
+        if org_id is None:
+            pytest.fail("Organization ID is required for invalidate_query_cache")
+
+        headers = {
+            "Authorization": f"Bearer {user_token}",
+            "X-Organization-Id": str(org_id)
+        }
+
+        response = test_client.post(
+            f"/api/data_sources/{data_source_id}/query_cache/invalidate",
+            headers=headers
+        )
+
+        assert response.status_code == 200, response.json()
+        return response.json()
+
+    return _invalidate_query_cache
+
+
 @pytest.fixture
 def get_schema(test_client):
     def _get_schema(*, data_source_id: str, user_token: str = None, org_id: str = None):
@@ -6,7 +6,7 @@ import os
 
 @pytest.fixture
 def get_available_mentions(test_client):
-    def _get_available_mentions(user_token=None, org_id=None, data_source_ids=None, categories=None):
+    def _get_available_mentions(user_token=None, org_id=None, data_source_ids=None, categories=None, q=None, limit=None, offset=None):
         if user_token is None:
             pytest.fail("User token is required for get_available_mentions")
         if org_id is None:
@@ -28,6 +28,12 @@ def get_available_mentions(test_client):
                 params["categories"] = ",".join(categories)
             else:
                 params["categories"] = str(categories)
+        if q is not None:
+            params["q"] = q
+        if limit is not None:
+            params["limit"] = limit
+        if offset is not None:
+            params["offset"] = offset
 
         response = test_client.get(
             "/api/mentions/available",
@@ -41,3 +47,25 @@ def get_available_mentions(test_client):
     return _get_available_mentions
 
 
+@pytest.fixture
+def get_mention_table_columns(test_client):
+    def _get_mention_table_columns(table_id, user_token=None, org_id=None):
+        if user_token is None:
+            pytest.fail("User token is required for get_mention_table_columns")
+        if org_id is None:
+            pytest.fail("Organization ID is required for get_mention_table_columns")
+
+        headers = {
+            "Authorization": f"Bearer {user_token}",
+            "X-Organization-Id": str(org_id)
+        }
+
+        response = test_client.get(
+            f"/api/mentions/tables/{table_id}/columns",
+            headers=headers
+        )
+
+        assert response.status_code == 200, response.json()
+        return response.json()
+
+    return _get_mention_table_columns
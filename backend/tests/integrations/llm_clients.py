@@ -136,6 +136,38 @@ def test_llm_inference(provider: str) -> None:
     logger.info(f"{provider}: Inference successful")
 
 
+@pytest.mark.parametrize("provider", LLM_PROVIDERS)
+@pytest.mark.asyncio
+async def test_llm_ainference(provider: str) -> None:
+    """
+    Test async (non-blocking) inference for an LLM provider.
+    
+    1. Instantiate the client
+    2. Run inference through the async client
+    3. Verify we get a response with usage
+    """
+    cfg = llm_kwargs(provider)
+    model_id = cfg.pop("model_id", None)
+    
+    if not model_id:
+        pytest.skip(f"{provider}: no model_id configured")
+    
+    client = get_llm_client(provider, **cfg)
+    
+    logger.info(f"{provider}: Testing async inference with model {model_id}...")
+    
+    response = await client.ainference(model_id=model_id, prompt=TEST_PROMPT)
+    
+    assert response is not None, f"{provider}: Got None response"
+    assert response.text, f"{provider}: Got empty response text"
+    
+    logger.info(f"{provider}: Usage: {response.usage}")
+    
+    assert "4" in response.text, f"{provider}: Expected '4' in response, got: {response.text}"
+    
+    logger.info(f"{provider}: Async inference successful")
+
+
 @pytest.mark.parametrize("provider", LLM_PROVIDERS)
 @pytest.mark.asyncio
 async def test_llm_inference_stream(provider: str) -> None:
@@ -0,0 +1,86 @@
+"""
+Unit tests for CompletionEventQueue backpressure and release of blocked producers.
+"""
+import asyncio
+
+import pytest
+
+from app.schemas.sse_schema import SSEEvent
+from app.streaming.completion_stream import CompletionEventQueue
+
+
+def _event(i: int) -> SSEEvent:
+    return SSEEvent(event="tool.progress", data={"i": i})
+
+
+async def _drain(queue):
+    return [event async for event in queue.get_events()]
+
+
+@pytest.mark.unit
+def test_full_queue_without_consumer_releases_producer():
+    """A producer blocked on a full buffer is released when no consumer ever reads."""
+    async def run():
+        queue = CompletionEventQueue(max_size=3, put_timeout=0.05)
+        for i in range(3):
+            await queue.put(_event(i))
+        # Buffer is full and nobody reads: must return instead of hanging
+        await asyncio.wait_for(queue.put(_event(3)), timeout=2)
+        assert queue.truncated
+        assert not queue.closed
+        assert queue.dropped == 1
+        # Later events are dropped without waiting
+        await asyncio.wait_for(queue.put(_event(4)), timeout=0.5)
+        assert queue.dropped == 2
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_stalled_reader_keeps_buffered_events_and_gets_terminal_error():
+    """A slow but connected client still receives everything buffered, then an explicit error."""
+    async def run():
+        queue = CompletionEventQueue(max_size=3, put_timeout=0.05)
+        for i in range(4):
+            await asyncio.wait_for(queue.put(_event(i)), timeout=2)
+
+        events = await asyncio.wait_for(_drain(queue), timeout=2)
+        assert [e.data.get("i") for e in events[:3]] == [0, 1, 2]
+        assert events[3].event == "completion.error"
+        assert events[3].data["truncated"] is True
+        assert len(events) == 4
+        assert queue.dropped == 1
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_close_releases_blocked_producer():
+    """close() (the route generator's finally) wakes a producer waiting on a full buffer."""
+    async def run():
+        queue = CompletionEventQueue(max_size=1, put_timeout=30)
+        await queue.put(_event(0))
+        producer = asyncio.create_task(queue.put(_event(1)))
+        await asyncio.sleep(0.01)
+        assert not producer.done()
+        queue.close()
+        await asyncio.wait_for(producer, timeout=1)
+        assert queue.dropped == 1
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_consumer_drains_in_order_and_coalesces_tokens():
+    async def run():
+        queue = CompletionEventQueue(max_size=10)
+        for token in ("a", "b", "c"):
+            await queue.put(SSEEvent(event="block.delta.token", data={"block_id": "b1", "field": "content", "token": token}))
+        await queue.put(_event(1))
+        queue.finish()
+        events = [event async for event in queue.get_events()]
+        assert [e.event for e in events] == ["block.delta.token", "tool.progress"]
+        assert events[0].data["token"] == "abc"
+        assert queue.coalesced == 2
+
+    asyncio.run(run())
@@ -0,0 +1,77 @@
+"""
+Unit tests for ContextHub's concurrent builder runs: each call gets its own
+session and builder instance, and builders see plain references rather
+than the request's ORM objects.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.context.context_hub import ContextHub
+
+
+class _Session:
+    opened = []
+
+    async def __aenter__(self):
+        type(self).opened.append(self)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    _Session.opened = []
+    monkeypatch.setattr("app.ai.context.context_hub.async_session_maker", _Session)
+    connection = SimpleNamespace(type="postgresql")
+    data_source = SimpleNamespace(id="ds-1", name="warehouse", connections=[connection], auth_policy="system_only")
+    report = SimpleNamespace(id="report-1", files=[], data_sources=[data_source])
+    organization = SimpleNamespace(id="org-1", settings=None)
+    return ContextHub(
+        db="request-session",
+        organization=organization,
+        report=report,
+        data_sources=[data_source],
+        user=SimpleNamespace(id="user-1"),
+    )
+
+
+@pytest.mark.unit
+def test_concurrent_calls_get_their_own_session_and_builder(hub):
+    seen = []
+
+    async def call(builder):
+        seen.append(builder)
+        await asyncio.sleep(0.01)
+        # Still bound to this call's session after the other calls started
+        return builder.db
+
+    async def run():
+        return await asyncio.gather(*(hub._run_builder("schemas", call) for _ in range(3)))
+
+    sessions = asyncio.run(run())
+
+    assert sessions == _Session.opened
+    assert len({id(s) for s in sessions}) == 3
+    assert len({id(b) for b in seen}) == 3
+    assert hub.schema_builder.db == "request-session"
+    assert "schemas" in hub.metadata.builder_timings_ms
+
+
+@pytest.mark.unit
+def test_builders_get_references_instead_of_orm_objects(hub):
+    async def call(builder):
+        return builder
+
+    builder = asyncio.run(hub._run_builder("schemas", call))
+
+    assert builder.report is not hub.report
+    assert builder.report.id == "report-1"
+    assert [ds.id for ds in builder.report.data_sources] == ["ds-1"]
+    (data_source,) = builder.data_sources
+    assert data_source is not hub.data_sources[0]
+    assert (data_source.id, data_source.name, data_source.type) == ("ds-1", "warehouse", "postgresql")
+    assert builder.user.id == "user-1"
@@ -0,0 +1,116 @@
+"""
+Unit tests for the dashboard refresh planner: concurrent step reruns bounded
+overall and per data source, and per-tile results in plan order.
+"""
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+from app.services.dashboard_refresh_planner import DashboardRefreshPlanner, _StepTask
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _StepService:
+    """Records concurrency per data source while fake reruns sleep."""
+
+    def __init__(self, tasks, failing=()):
+        self.sources = {task.step_id: task.data_sources for task in tasks.values()}
+        self.failing = set(failing)
+        self.running = {"overall": 0}
+        self.peaks = {"overall": 0}
+        self.events = []
+
+    def _bump(self, keys, delta):
+        for key in keys:
+            self.running[key] = self.running.get(key, 0) + delta
+            self.peaks[key] = max(self.peaks.get(key, 0), self.running[key])
+
+    async def rerun_step(self, session, step_id):
+        keys = ["overall", *self.sources[step_id]]
+        self._bump(keys, 1)
+        self.events.append(("start", step_id))
+        try:
+            await asyncio.sleep(0.02)
+            if step_id in self.failing:
+                raise RuntimeError(f"{step_id} timed out")
+        finally:
+            self.events.append(("end", step_id))
+            self._bump(keys, -1)
+
+
+def _tasks(*specs):
+    tasks = OrderedDict()
+    for step_id, data_sources, viz_ids in specs:
+        task = _StepTask(step_id, data_sources)
+        task.visualization_ids.extend(viz_ids)
+        tasks[step_id] = task
+    return tasks
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    monkeypatch.setattr("app.dependencies.async_session_maker", _Session)
+
+
+@pytest.mark.unit
+def test_execute_bounds_concurrency_across_two_data_sources(sessions):
+    # Warehouse tiles come first; the CRM tiles must not queue behind them
+    tasks = _tasks(
+        *((f"w{i}", ["warehouse"], [f"viz-w{i}"]) for i in range(6)),
+        ("c0", ["crm"], ["viz-c0", "viz-c0-copy"]),
+        ("c1", ["crm"], ["viz-c1"]),
+        ("both", ["crm", "warehouse"], ["viz-both"]),
+    )
+    service = _StepService(tasks, failing={"w3"})
+    planner = DashboardRefreshPlanner(service, max_concurrency=4, per_data_source_concurrency=2)
+
+    tiles = asyncio.run(planner.execute(tasks))
+
+    assert service.peaks["overall"] == 4
+    assert service.peaks["warehouse"] == 2
+    assert service.peaks["crm"] == 2
+
+    # Both CRM steps start before the first warehouse step finishes
+    first_end = service.events.index(next(e for e in service.events if e[0] == "end"))
+    started_early = {step for kind, step in service.events[:first_end] if kind == "start"}
+    assert {"c0", "c1"} <= started_early
+    assert "both" not in started_early
+
+    # One result per tile, in plan order; a shared step runs once
+    assert [t.visualization_id for t in tiles] == [
+        *(f"viz-w{i}" for i in range(6)), "viz-c0", "viz-c0-copy", "viz-c1", "viz-both",
+    ]
+    assert [e for e in service.events if e == ("start", "c0")] == [("start", "c0")]
+    by_viz = {t.visualization_id: t for t in tiles}
+    assert by_viz["viz-c0-copy"].deduplicated is True
+    assert by_viz["viz-c0"].deduplicated is False
+    assert by_viz["viz-w3"].status == "error"
+    assert by_viz["viz-w3"].error == "w3 timed out"
+    assert all(t.status == "success" for t in tiles if t.visualization_id != "viz-w3")
+    assert all(t.duration_ms is not None and t.duration_ms >= 0 for t in tiles)
+
+
+@pytest.mark.unit
+def test_shared_data_sources_do_not_deadlock(sessions):
+    tasks = _tasks(
+        *((f"ab{i}", ["a", "b"], [f"viz-ab{i}"]) for i in range(4)),
+        *((f"b{i}", ["b"], [f"viz-b{i}"]) for i in range(4)),
+        *((f"a{i}", ["a"], [f"viz-a{i}"]) for i in range(4)),
+    )
+    service = _StepService(tasks)
+    planner = DashboardRefreshPlanner(service, max_concurrency=2, per_data_source_concurrency=1)
+
+    tiles = asyncio.run(asyncio.wait_for(planner.execute(tasks), timeout=5))
+
+    assert len(tiles) == 12
+    assert service.peaks["a"] == 1
+    assert service.peaks["b"] == 1
+    assert service.peaks["overall"] <= 2
@@ -0,0 +1,41 @@
+"""
+Unit tests for the orjson JSON column serializer: it matches the stdlib
+encoder, including raising for values the stdlib cannot encode.
+"""
+import datetime
+import decimal
+import json
+
+import numpy as np
+import pytest
+
+from app.settings.database import _json_deserializer, _json_serializer
+
+
+class _Opaque:
+    pass
+
+
+@pytest.mark.unit
+def test_serializer_round_trips_plain_json():
+    value = {"rows": [{"a": 1, "b": "x", "c": None, "d": 1.5, "e": True}], "n": np.int64(3)}
+    assert _json_deserializer(_json_serializer(value)) == {
+        "rows": [{"a": 1, "b": "x", "c": None, "d": 1.5, "e": True}], "n": 3,
+    }
+
+
+@pytest.mark.unit
+def test_serializer_falls_back_to_stdlib_for_big_ints():
+    big = 2 ** 70
+    assert json.loads(_json_serializer({"id": big})) == {"id": big}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value", [
+    decimal.Decimal("1.10"),
+    datetime.datetime(2024, 1, 5, 10, 0),
+    _Opaque(),
+])
+def test_serializer_raises_for_values_the_stdlib_rejects(value):
+    with pytest.raises(TypeError):
+        _json_serializer({"value": value})
@@ -0,0 +1,77 @@
+"""
+Unit tests for the DataFrame profiler: the HyperLogLog distinct estimate and
+its error bound, and distinct counts of unhashable cells in sampled mode.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ai.code_execution import df_profiler
+from app.ai.code_execution.df_profiler import HLL_PRECISION, _distinct_count, approx_distinct, profile_dataframe
+
+# Standard error of HLL is 1.04 / sqrt(m); allow four of them
+HLL_TOLERANCE = 4 * 1.04 / np.sqrt(1 << HLL_PRECISION)
+
+
+def _random_hashes(count, seed=0):
+    return np.random.default_rng(seed).integers(0, np.iinfo(np.uint64).max, size=count, dtype=np.uint64, endpoint=True)
+
+
+@pytest.mark.unit
+def test_approx_distinct_empty_and_duplicates():
+    assert approx_distinct(np.array([], dtype=np.uint64)) == 0
+    hashes = _random_hashes(10)
+    # Repeats don't count twice; tiny cardinalities are exact via linear counting
+    assert approx_distinct(np.concatenate([hashes] * 50)) == 10
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("count", [1_000, 20_000, 100_000, 1_000_000])
+def test_approx_distinct_stays_within_error_bound(count):
+    for seed in range(3):
+        estimate = approx_distinct(_random_hashes(count, seed))
+        assert abs(estimate - count) / count <= HLL_TOLERANCE, (count, seed, estimate)
+
+
+@pytest.mark.unit
+def test_approx_distinct_of_hashed_column_values():
+    values = pd.Series(np.arange(300_000) % 50_000)
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    assert abs(approx_distinct(hashes) - 50_000) / 50_000 <= HLL_TOLERANCE
+
+
+@pytest.mark.unit
+def test_sampled_distinct_count_falls_back_to_hashable_values(monkeypatch):
+    original = pd.util.hash_pandas_object
+
+    def hash_pandas_object(obj, *args, **kwargs):
+        if any(isinstance(v, dict) for v in obj):
+            raise TypeError("unhashable type: 'dict'")
+        return original(obj, *args, **kwargs)
+
+    monkeypatch.setattr(df_profiler.pd.util, "hash_pandas_object", hash_pandas_object)
+    cells = pd.Series([{"k": i % 3} for i in range(30)])
+
+    assert _distinct_count(cells, sampled=False) == (3, False)
+    # Used to report 0 distinct values when hashing failed
+    assert _distinct_count(cells, sampled=True) == (3, True)
+
+
+@pytest.mark.unit
+def test_sampled_profile_estimates_unique_count_of_unhashable_column():
+    rows = 5_000
+    df = pd.DataFrame({
+        "n": np.arange(rows),
+        "tags": [[i % 7, "x"] for i in range(rows)],
+    })
+    profile = profile_dataframe(df, sample_threshold=1_000, sample_size=500)
+
+    assert profile["profile"]["sampled"] is True
+    tags = profile["column_info"]["tags"]
+    assert tags["unique_count"] == 7
+    assert "unique_count" in tags["estimated"]
+    n = profile["column_info"]["n"]
+    assert abs(n["unique_count"] - rows) / rows <= HLL_TOLERANCE
+    # Exact stats stay exact under sampling
+    assert n["count"] == rows
+    assert n["min"] == 0 and n["max"] == rows - 1
@@ -0,0 +1,221 @@
+"""
+Unit tests for concurrent schema discovery: fan_out ordering and failure
+handling, tables_from_frame grouping, the retrying HTTP session and
+BigQuery's refusal to return partial schemas.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from app.data_sources.clients import discovery
+from app.data_sources.clients.discovery import DiscoveryProgress, fan_out, http_session, tables_from_frame
+
+
+@pytest.fixture
+def config(monkeypatch):
+    config = {
+        "max_workers": 4,
+        "max_retries": 3,
+        "backoff_factor": 0,
+        "backoff_max_seconds": 1,
+    }
+    monkeypatch.setattr(discovery, "_config", config)
+    return config
+
+
+@pytest.mark.unit
+def test_fan_out_keeps_input_order_and_bounds_workers(config):
+    lock = threading.Lock()
+    running = [0, 0]  # current, peak
+
+    def work(item):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        # Later items finish first
+        time.sleep(0.002 * (20 - item))
+        with lock:
+            running[0] -= 1
+        return item * 10
+
+    progress = DiscoveryProgress("conn-1")
+    assert fan_out(work, range(20), progress=progress, phase="datasets") == [i * 10 for i in range(20)]
+    assert running[1] == 4
+    assert progress.as_dict()["phase"] == "datasets"
+    assert (progress.total, progress.completed, progress.failed) == (20, 20, 0)
+    assert fan_out(work, []) == []
+
+
+@pytest.mark.unit
+def test_fan_out_reraises_only_after_every_item_finished(config):
+    finished = []
+    lock = threading.Lock()
+
+    def work(item):
+        if item == 0:
+            raise RuntimeError("dataset 0 failed")
+        time.sleep(0.02)
+        with lock:
+            finished.append(item)
+        return item
+
+    progress = DiscoveryProgress("conn-1")
+    with pytest.raises(RuntimeError, match="dataset 0 failed"):
+        fan_out(work, range(8), progress=progress, phase="datasets")
+    # The failure surfaced after the slow items completed, not mid-flight
+    assert sorted(finished) == list(range(1, 8))
+    assert (progress.completed, progress.failed) == (8, 1)
+
+
+@pytest.mark.unit
+def test_fan_out_single_worker_runs_inline(config):
+    seen = []
+
+    def work(item):
+        seen.append(threading.current_thread().name)
+        return item
+
+    assert fan_out(work, ["a", "b"], max_workers=1) == ["a", "b"]
+    assert not any(name.startswith("schema-discovery") for name in seen)
+
+
+@pytest.mark.unit
+def test_tables_from_frame_groups_rows_and_keeps_column_order():
+    df = pd.DataFrame({
+        "table_name": ["orders", "users", "orders", None, "users", "orders", float("nan")],
+        "column_name": ["id", "id", "total", "orphan", "email", "created_at", "lost"],
+        "data_type": ["INT64", "INT64", "NUMERIC", "STRING", "STRING", "TIMESTAMP", "STRING"],
+    })
+    tables = tables_from_frame(
+        df,
+        table_col="table_name",
+        column_col="column_name",
+        dtype_col="data_type",
+        name=lambda table_name: f"sales.{table_name}",
+        metadata_json=lambda _: {"dataset": "sales"},
+    )
+
+    # Tables in first-seen order; rows without a table name are dropped
+    assert [t.name for t in tables] == ["sales.orders", "sales.users"]
+    assert [(c.name, c.dtype) for c in tables[0].columns] == [
+        ("id", "INT64"), ("total", "NUMERIC"), ("created_at", "TIMESTAMP"),
+    ]
+    assert [c.name for c in tables[1].columns] == ["id", "email"]
+    assert tables[0].metadata_json == {"dataset": "sales"}
+
+    assert tables_from_frame(df.iloc[0:0], table_col="table_name", column_col="column_name", dtype_col="data_type") == []
+    assert tables_from_frame(None, table_col="table_name", column_col="column_name", dtype_col="data_type") == []
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    statuses = []
+    calls = 0
+
+    def _respond(self):
+        cls = type(self)
+        cls.calls += 1
+        status = cls.statuses.pop(0) if cls.statuses else 200
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    _FlakyHandler.statuses = []
+    _FlakyHandler.calls = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+def test_http_session_pool_and_retry_settings(config):
+    session = http_session(pool_maxsize=16)
+    for prefix in ("https://", "http://"):
+        adapter = session.get_adapter(prefix + "example.com")
+        assert adapter._pool_maxsize == 16
+        retry = adapter.max_retries
+        assert retry.total == 3
+        assert set(retry.status_forcelist) == {429, 502, 503, 504}
+        assert retry.allowed_methods is None
+        assert retry.respect_retry_after_header is True
+        assert retry.read == 0
+
+    # Defaults to the fan-out width
+    assert http_session().get_adapter("https://example.com")._pool_maxsize == 4
+
+
+@pytest.mark.unit
+def test_http_session_retries_throttled_responses(config, flaky_server):
+    session = http_session()
+
+    _FlakyHandler.statuses = [429, 503]
+    response = session.post(f"{flaky_server}/api/metadata", json={})
+    assert response.status_code == 200
+    assert _FlakyHandler.calls == 3
+
+    # Client errors are not retried; retries give up with the last response
+    _FlakyHandler.calls = 0
+    _FlakyHandler.statuses = [404]
+    assert session.get(flaky_server).status_code == 404
+    assert _FlakyHandler.calls == 1
+
+    _FlakyHandler.calls = 0
+    _FlakyHandler.statuses = [503] * 10
+    assert session.get(flaky_server).status_code == 503
+    assert _FlakyHandler.calls == 4
+
+
+class _Job:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def result(self):
+        return self
+
+    def to_dataframe(self):
+        if isinstance(self.frame, Exception):
+            raise self.frame
+        return self.frame
+
+
+class _FakeBigQuery:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def query(self, sql):
+        dataset = next(ds for ds in self.frames if f".{ds}.INFORMATION_SCHEMA" in sql)
+        return _Job(self.frames[dataset])
+
+
+@pytest.mark.unit
+def test_bigquery_get_tables_raises_instead_of_returning_partial_schema(config):
+    from app.data_sources.clients.bigquery_client import BigqueryClient
+
+    columns = pd.DataFrame({"table_name": ["t"], "column_name": ["c"], "data_type": ["STRING"]})
+    client = BigqueryClient.__new__(BigqueryClient)
+    client.project_id = "proj"
+    client._datasets = ["good", "bad"]
+    client.client = _FakeBigQuery({"good": columns, "bad": RuntimeError("quota exceeded")})
+
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        client.get_tables()
+
+    client.client = _FakeBigQuery({"good": columns, "bad": columns})
+    assert [t.name for t in client.get_tables()] == ["good.t", "bad.t"]
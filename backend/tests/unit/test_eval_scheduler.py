@@ -0,0 +1,125 @@
+"""
+Unit tests for the eval scheduler: client sharing between concurrent cases,
+single-owner run finishing and the run/org concurrency limits.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.eval_scheduler import EvalScheduler
+
+
+class PooledClient:
+    thread_safe = True
+
+
+class ConnectionClient:
+    """Holds one connection; must not be shared by concurrent cases."""
+
+
+def _data_source(ds_id, name):
+    return SimpleNamespace(id=ds_id, name=name)
+
+
+def _scheduler(per_run=4, per_org=8):
+    scheduler = EvalScheduler()
+    scheduler._config = {"max_concurrency_per_run": per_run, "max_concurrency_per_org": per_org}
+    return scheduler
+
+
+@pytest.mark.unit
+def test_only_thread_safe_clients_are_shared_between_cases():
+    async def run():
+        built = []
+
+        async def construct(session, data_source, user, query_cache=False):
+            assert query_cache is True
+            await asyncio.sleep(0.01)
+            if data_source.name == "broken":
+                raise RuntimeError("no credentials")
+            client = PooledClient() if data_source.name == "warehouse" else ConnectionClient()
+            built.append(data_source.name)
+            return client
+
+        ctx = _scheduler().run_context("run-1", "org-1")
+        data_sources = [_data_source("d1", "warehouse"), _data_source("d2", "sqlite"), _data_source("d3", "broken")]
+        user = SimpleNamespace(id="u1")
+
+        cases = await asyncio.gather(*(ctx.get_clients(None, data_sources, user, construct) for _ in range(3)))
+
+        # Failed clients are left out, as before
+        assert all(set(clients) == {"warehouse", "sqlite"} for clients in cases)
+        assert len({id(clients["warehouse"]) for clients in cases}) == 1
+        assert len({id(clients["sqlite"]) for clients in cases}) == 3
+        assert built.count("warehouse") == 1
+        assert built.count("sqlite") == 3
+
+        # Another user gets their own pooled client
+        other = await ctx.get_clients(None, data_sources[:1], SimpleNamespace(id="u2"), construct)
+        assert other["warehouse"] is not cases[0]["warehouse"]
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_finish_run_is_single_owner():
+    scheduler = _scheduler()
+    ctx = scheduler.run_context("run-1", "org-1", owner="background")
+    # A later launcher (e.g. the stream) does not take over
+    assert scheduler.run_context("run-1", "org-1", owner="stream") is ctx
+    assert ctx.owner == "background"
+    ctx.cases_completed = 2
+
+    assert scheduler.finish_run("run-1", "stream") is None
+    assert scheduler.stats()["active_runs"] == 1
+
+    throughput = scheduler.finish_run("run-1", "background")
+    assert throughput["cases_completed"] == 2
+    assert scheduler.stats()["active_runs"] == 0
+    assert scheduler.finish_run("run-1", "background") is None
+    # Summary writers still see the final numbers after the owner finished
+    assert scheduler.run_throughput("run-1") == throughput
+    assert scheduler.run_throughput("unknown") is None
+
+
+@pytest.mark.unit
+def test_ownerless_context_is_not_retired():
+    scheduler = _scheduler()
+    scheduler.run_context("run-1", "org-1")
+    assert scheduler.finish_run("run-1", None) is None
+    assert scheduler.stats()["active_runs"] == 1
+    # The first launcher to claim it becomes the owner
+    ctx = scheduler.run_context("run-1", "org-1", owner="late")
+    assert ctx.owner == "late"
+    assert scheduler.finish_run("run-1", "late") is not None
+
+
+@pytest.mark.unit
+def test_slot_bounds_run_and_org_concurrency():
+    async def run():
+        scheduler = _scheduler(per_run=2, per_org=3)
+        running = {"run-1": 0, "run-2": 0, "org": 0}
+        peaks = {"run-1": 0, "run-2": 0, "org": 0}
+
+        async def case(ctx):
+            async with scheduler.slot(ctx):
+                running[ctx.run_id] += 1
+                running["org"] += 1
+                for key in (ctx.run_id, "org"):
+                    peaks[key] = max(peaks[key], running[key])
+                await asyncio.sleep(0.01)
+                running[ctx.run_id] -= 1
+                running["org"] -= 1
+
+        first = scheduler.run_context("run-1", "org-1")
+        second = scheduler.run_context("run-2", "org-1")
+        await asyncio.gather(*(case(first) for _ in range(5)), *(case(second) for _ in range(5)))
+
+        assert peaks["run-1"] == 2
+        assert peaks["run-2"] == 2
+        assert peaks["org"] == 3
+        assert first.cases_completed == 5
+        assert second.throughput()["cases_completed"] == 5
+
+    asyncio.run(run())
@@ -0,0 +1,70 @@
+"""
+Unit tests for the code execution pool: prints captured per execution without
+touching sys.stdout, and abandoned workers not holding pool slots.
+"""
+import asyncio
+import io
+import sys
+import threading
+
+import pytest
+
+from app.ai.code_execution.execution_pool import CodeExecutionCancelled, CodeExecutionPool, captured_print
+
+
+def _execute(code):
+    with io.StringIO() as buffer:
+        namespace = {"print": captured_print(buffer)}
+        exec(code, namespace)
+        namespace["generate_df"]()
+        return buffer.getvalue()
+
+
+@pytest.mark.unit
+def test_concurrent_executions_capture_their_own_prints():
+    pool = CodeExecutionPool(max_workers=4, per_organization_limit=4)
+    stdout = sys.stdout
+    code = "def generate_df():\n    for _ in range(50):\n        print({n})\n"
+
+    async def run():
+        return await asyncio.gather(*(
+            pool.submit(_execute, code.format(n=n), organization_id="org-1") for n in range(4)
+        ))
+
+    try:
+        logs = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert logs == [f"{n}\n" * 50 for n in range(4)]
+    assert sys.stdout is stdout
+
+
+@pytest.mark.unit
+def test_abandoned_worker_does_not_hold_a_pool_slot():
+    pool = CodeExecutionPool(max_workers=1, per_organization_limit=2)
+    release = threading.Event()
+
+    async def run():
+        sigkill = asyncio.Event()
+        stuck = asyncio.create_task(pool.submit(release.wait, organization_id="org-1", sigkill_event=sigkill))
+        while pool.stats()["running"] == 0:
+            await asyncio.sleep(0.01)
+        sigkill.set()
+        with pytest.raises(CodeExecutionCancelled):
+            await stuck
+        assert pool.stats()["abandoned"] == 1
+        # Runs on the replacement executor while the abandoned worker is stuck
+        result = await asyncio.wait_for(pool.submit(lambda: "ok", organization_id="org-2"), timeout=5)
+        release.set()
+        return result
+
+    try:
+        assert asyncio.run(run()) == "ok"
+    finally:
+        release.set()
+        pool.shutdown(wait=True)
+
+    stats = pool.stats()
+    assert stats["executors_replaced"] == 1
+    assert stats["abandoned"] == 0
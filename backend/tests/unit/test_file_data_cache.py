@@ -0,0 +1,92 @@
+"""
+Unit tests for the columnar file cache: raw Excel sheets stored as typed
+Arrow bodies under their header rows, reads matching pd.read_excel, and
+conversion locks that do not outlive the conversion.
+"""
+import threading
+
+import pandas as pd
+import pytest
+
+from app.services.file_data_cache import FileDataCache, _header_names
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    sales = pd.DataFrame({
+        "name": ["a", "b", None, "d"],
+        "amount": [1, 2, 3, 4],
+        "price": [1.5, None, 2.0, 3.0],
+        "when": pd.to_datetime(["2024-01-01", "2024-02-01", None, "2024-03-01"]),
+        "extra": [5, 6, 7, 8],
+    }).rename(columns={"extra": "amount"})
+    report = pd.DataFrame([
+        ["Quarterly report", None, None],
+        [None, None, None],
+        ["region", "total", "total"],
+        ["north", 1, 2.5],
+        ["south", 2, None],
+    ])
+    with pd.ExcelWriter(path) as writer:
+        sales.to_excel(writer, sheet_name="Sales", index=False)
+        report.to_excel(writer, sheet_name="Report", index=False, header=False)
+    return path
+
+
+@pytest.mark.unit
+def test_raw_sheets_store_a_typed_arrow_body(workbook):
+    cache = FileDataCache()
+    manifest = cache.ensure_converted(workbook, "excel")
+
+    assert [s["format"] for s in manifest["sheets"]] == ["arrow", "arrow"]
+    assert all(s.get("head_file") for s in manifest["sheets"])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("sheet,header", [
+    ("Sales", None), ("Sales", 0), ("Sales", 1),
+    ("Report", None), ("Report", 0), ("Report", 2), ("Report", 3),
+])
+def test_reads_match_read_excel(workbook, sheet, header):
+    cache = FileDataCache()
+    expected = pd.read_excel(workbook, sheet_name=sheet, header=header)
+    pd.testing.assert_frame_equal(cache.read("f", workbook, "excel", sheet_name=sheet, header=header), expected)
+    # Served from the LRU the second time, still as a fresh copy
+    first = cache.read("f", workbook, "excel", sheet_name=sheet, header=header)
+    first.iloc[0, 0] = "changed"
+    pd.testing.assert_frame_equal(cache.read("f", workbook, "excel", sheet_name=sheet, header=header), expected)
+
+
+@pytest.mark.unit
+def test_duplicate_header_names_are_mangled_like_read_excel(workbook):
+    cache = FileDataCache()
+    df = cache.read("f", workbook, "excel", sheet_name="Report", header=2)
+    assert list(df.columns) == ["region", "total", "total.1"]
+    assert list(cache.read("f", workbook, "excel", sheet_name="Sales", header=0).columns) == [
+        "name", "amount", "price", "when", "amount.1",
+    ]
+    assert _header_names(["a", "a", "a.1", None, 1, 1], 7) == [
+        "a", "a.1", "a.1.1", "Unnamed: 3", 1, "1.1", "Unnamed: 6",
+    ]
+
+
+@pytest.mark.unit
+def test_convert_locks_are_dropped_after_conversion(workbook):
+    cache = FileDataCache()
+    barrier = threading.Barrier(4)
+    manifests = []
+
+    def convert():
+        barrier.wait()
+        manifests.append(cache.ensure_converted(workbook, "excel"))
+
+    threads = [threading.Thread(target=convert) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(manifests) == 4
+    assert cache.stats()["conversions"] == 1
+    assert cache._convert_locks == {}
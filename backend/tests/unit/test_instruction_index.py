@@ -0,0 +1,88 @@
+"""
+Unit tests for InstructionSearchIndex BM25 ranking and the keyword-less
+fallback of InstructionContextBuilder.search_instructions.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.context.builders.instruction_context_builder import InstructionContextBuilder
+from app.ai.context.instruction_index import InstructionSearchIndex
+
+STOPWORDS = InstructionContextBuilder.STOPWORDS
+
+DOCS = [
+    ("revenue", "Revenue is net of refunds. Revenue comes from the orders table.", {"category": "metrics"}),
+    ("churn", "Churn counts customers without orders in 90 days.", {"category": "metrics"}),
+    ("style", "Use snake_case aliases in SQL.", {"category": "style"}),
+    ("revenues", "Quarterly revenues roll up by fiscal calendar.", {"category": "metrics"}),
+]
+
+
+def _index():
+    return InstructionSearchIndex(DOCS, STOPWORDS)
+
+
+@pytest.mark.unit
+def test_bm25_ranks_term_frequency_and_rarity():
+    ranked = _index().search({"revenue"})
+    ids = [doc_id for doc_id, _ in ranked]
+    # Exact term twice beats a prefix-only match ("revenues"); unrelated docs are left out
+    assert ids == ["revenue", "revenues"]
+    scores = dict(ranked)
+    assert scores["revenue"] > scores["revenues"] > 0
+
+    # A rarer term outweighs a common one
+    ranked = _index().search({"orders", "churn"})
+    assert ranked[0][0] == "churn"
+    assert {doc_id for doc_id, _ in ranked} == {"churn", "revenue"}
+
+
+@pytest.mark.unit
+def test_search_without_keywords_returns_everything_in_corpus_order():
+    ranked = _index().search(set())
+    assert ranked == [(doc_id, 0.0) for doc_id, _, _ in DOCS]
+    ranked = _index().search(set(), predicate=lambda meta: meta["category"] == "style")
+    assert ranked == [("style", 0.0)]
+    assert _index().search({"nomatch"}) == []
+
+
+class _Result:
+    def __init__(self, items):
+        self._items = items
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._items
+
+
+class _FakeDb:
+    def __init__(self, instructions):
+        self.instructions = instructions
+
+    async def execute(self, statement):
+        return _Result(self.instructions)
+
+
+@pytest.mark.unit
+def test_stopword_only_query_falls_back_to_unfiltered_instructions(monkeypatch):
+    instructions = [SimpleNamespace(id=doc_id) for doc_id, _, _ in DOCS]
+    builder = InstructionContextBuilder(_FakeDb(instructions), SimpleNamespace(id="org-1"))
+
+    async def get_org_index():
+        return _index()
+
+    monkeypatch.setattr(builder, "_get_org_index", get_org_index)
+
+    async def run():
+        # Every word is a stopword: previously returned nothing at all
+        fallback = await builder.search_instructions("show me all of it", limit=3)
+        ranked = await builder.search_instructions("net revenue", limit=3)
+        return fallback, ranked
+
+    fallback, ranked = asyncio.run(run())
+    assert [(inst.id, score) for inst, score in fallback] == [("revenue", 0.0), ("churn", 0.0), ("style", 0.0)]
+    assert [inst.id for inst, _ in ranked] == ["revenue", "revenues"]
@@ -0,0 +1,91 @@
+"""
+Unit tests for the mention index: ranking, column-name search and overlay
+tables without a canonical id.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.mention_index import MentionIndex, SearchCatalog, _TableEntry, _rank
+
+
+def _tables(*names):
+    return [{"id": f"t{i}", "name": name, "datasource_id": "d1", "usage_count": 0} for i, name in enumerate(names)]
+
+
+@pytest.mark.unit
+def test_names_rank_exact_then_prefix_then_token_then_substring():
+    names = ["sales.orders_2024", "orders", "orders_archive", "preorders"]
+    catalog = SearchCatalog(names)
+    ranked = _rank([(catalog, names)], "orders")
+    assert ranked == ["orders", "orders_archive", "sales.orders_2024", "preorders"]
+    # Without a query the original order is kept
+    assert _rank([(catalog, names)], None) == names
+
+
+@pytest.mark.unit
+def test_tables_match_on_column_names_below_name_matches():
+    tables = _tables("customers", "orders", "payments")
+    column_names = {
+        "t0": ["id", "name"],
+        "t1": ["id", "customer_id", "total"],
+        "t2": ["id", "order_id", "amount"],
+    }
+    entry = _TableEntry(tables, None, (1, 1), column_names)
+
+    ranked = [t["name"] for t in _rank([(entry.catalog, entry.tables)], "customer")]
+    # Name prefix first, then the table that only has a customer_id column
+    assert ranked == ["customers", "orders"]
+
+    ranked = [t["name"] for t in _rank([(entry.catalog, entry.tables)], "amount")]
+    assert ranked == ["payments"]
+
+
+@pytest.mark.unit
+def test_overlay_columns_are_indexed_too():
+    tables = _tables("events")
+    entry = _TableEntry(tables, {"t0": [{"name": "session_id", "dtype": "text"}]}, (1, 1))
+    assert [t["name"] for t in _rank([(entry.catalog, entry.tables)], "session")] == ["events"]
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakeDb:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, statement):
+        return _Rows(self.rows)
+
+
+@pytest.mark.unit
+def test_overlay_tables_without_canonical_row_are_skipped(monkeypatch):
+    from app.services import data_source_service
+
+    schema = [
+        SimpleNamespace(id=None, name="synced", is_active=True, columns=[SimpleNamespace(name="a", dtype="int")]),
+        SimpleNamespace(id=None, name="not_synced_yet", is_active=True, columns=[]),
+        SimpleNamespace(id="t9", name="with_id", is_active=True, columns=[]),
+    ]
+
+    async def get_data_source_schema(self, **kwargs):
+        return schema
+
+    monkeypatch.setattr(data_source_service.DataSourceService, "get_data_source_schema", get_data_source_schema)
+
+    async def run():
+        db = _FakeDb([("t1", "synced")])
+        ds = SimpleNamespace(id="d1")
+        return await MentionIndex()._build_overlay_entry(db, None, None, ds, {}, (1, 1))
+
+    entry = asyncio.run(run())
+    assert [(t["id"], t["name"]) for t in entry.tables] == [("t1", "synced"), ("t9", "with_id")]
+    assert "None" not in entry.columns
+    assert entry.columns["t1"] == [{"name": "a", "dtype": "int"}]
@@ -0,0 +1,92 @@
+"""
+Unit tests for MessageContextBuilder: the tail's fallback payloads are read
+in one query, and only for system turns without blocks.
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.context.builders.message_context_builder import MessageContextBuilder
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def scalars(self):
+        return self
+
+
+class _Session:
+    """Answers the builder's queries from in-memory completions."""
+
+    def __init__(self, completions):
+        self.completions = completions
+        self.payload_queries = []
+
+    async def execute(self, stmt):
+        columns = [c["name"] for c in stmt.column_descriptions]
+        if columns == ["id", "role", "created_at", "prompt"]:
+            return _Result(sorted(self.completions, key=lambda c: c.created_at, reverse=True))
+        if columns == ["id", "completion"]:
+            ids = stmt.whereclause.right.value
+            self.payload_queries.append(sorted(ids))
+            return _Result([c for c in self.completions if c.id in ids])
+        # Blocks and mentions: none
+        return _Result([])
+
+
+def _completion(cid, role, minute, prompt=None, completion=None):
+    return SimpleNamespace(
+        id=cid, role=role, created_at=datetime(2024, 1, 1, 12, minute),
+        prompt=prompt, completion=completion,
+    )
+
+
+@pytest.fixture
+def session():
+    return _Session([
+        _completion("u1", "user", 0, prompt={"content": "How many orders?"}),
+        _completion("s1", "system", 1, completion={"content": "42 orders"}),
+        _completion("u2", "user", 2, prompt={"content": "And last week?"}),
+        _completion("s2", "system", 3, completion={"message": "7 orders"}),
+        _completion("s3", "system", 4, completion={"content": "  "}),
+    ])
+
+
+@pytest.mark.unit
+def test_build_context_loads_fallback_payloads_in_one_query(session):
+    builder = MessageContextBuilder(session, organization=None, report=SimpleNamespace(id="report-1"))
+
+    text = asyncio.run(builder.build_context(max_messages=10))
+
+    assert session.payload_queries == [["s1", "s2", "s3"]]
+    assert text.splitlines() == [
+        "User (12:00): How many orders?",
+        "Assistant (12:01): Response: 42 orders",
+        "User (12:02): And last week?",
+        "Assistant (12:03): Response: 7 orders",
+    ]
+
+
+@pytest.mark.unit
+def test_build_loads_fallback_payloads_in_one_query(session):
+    builder = MessageContextBuilder(session, organization=None, report=SimpleNamespace(id="report-1"))
+
+    section = asyncio.run(builder.build(max_messages=10))
+
+    assert session.payload_queries == [["s1", "s2", "s3"]]
+    assert [(item.role, item.timestamp, item.text) for item in section.items] == [
+        ("user", "12:00", "How many orders?"),
+        ("system", "12:01", "Response: 42 orders"),
+        ("user", "12:02", "And last week?"),
+        ("system", "12:03", "Response: 7 orders"),
+    ]
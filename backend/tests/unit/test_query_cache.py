@@ -0,0 +1,148 @@
+"""
+Unit tests for QueryResultCache: SQL normalization, the read-only guard,
+hit/miss accounting, TTL expiry and epoch-scoped keys.
+"""
+import pandas as pd
+import pytest
+
+from app.data_sources.clients import query_cache as query_cache_module
+from app.data_sources.clients.query_cache import QueryResultCache, _is_read_query, normalize_sql
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def execute_query(self, sql, limit=None):
+        self.calls.append(sql)
+        if sql.lower().startswith("update"):
+            return "1 row updated"
+        return pd.DataFrame({"n": [len(self.calls)]})
+
+
+@pytest.fixture
+def cache():
+    cache = QueryResultCache()
+    cache._config = {
+        "enabled": True,
+        "max_bytes": 10 * 1024 * 1024,
+        "max_entry_bytes": 1024 * 1024,
+        "max_ttl_seconds": 3600,
+    }
+    return cache
+
+
+def _attach(cache, client, epoch=0, credentials=None, ttl=60):
+    return cache.attach(
+        client,
+        data_source_id="ds1",
+        ttl_seconds=ttl,
+        epoch=epoch,
+        identity={"id": "c1", "type": "sqlite", "config": "x"},
+        credentials=credentials,
+    )
+
+
+@pytest.mark.unit
+def test_normalize_sql_collapses_whitespace_outside_quotes():
+    assert normalize_sql("  SELECT *\n\tFROM  t ;  ") == "SELECT * FROM t"
+    assert normalize_sql("select 'a   b' ,  \"Col  X\"\nfrom t") == "select 'a   b' , \"Col  X\" from t"
+    assert normalize_sql("select 'it''s  here'") == "select 'it''s  here'"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("sql,expected", [
+    ("select * from t", True),
+    ("  WITH x AS (select 1) select * from x", True),
+    ("show tables", True),
+    ("select * from t where note = 'delete me'", True),
+    ('select "update" from t', True),
+    ("update t set a = 1", False),
+    ("with x as (select 1) insert into t select * from x", False),
+    ("select * into backup from t; drop table t", False),
+    ("create table t as select 1", False),
+])
+def test_is_read_query_guard(sql, expected):
+    assert _is_read_query(sql) is expected
+
+
+@pytest.mark.unit
+def test_identical_reads_hit_and_writes_bypass(cache):
+    client = _attach(cache, FakeClient())
+
+    first = client.execute_query("select n from t")
+    second = client.execute_query("select  n\n  from t ;")
+    assert second.equals(first)
+    assert len(client.calls) == 1
+    # Hits are copies: mutating one doesn't leak into the cache
+    second["n"] = 99
+    assert client.execute_query("select n from t")["n"].tolist() == [1]
+
+    client.execute_query("select n from t", limit=5)  # different arguments: separate entry
+    assert len(client.calls) == 2
+
+    client.execute_query("update t set n = 1")
+    client.execute_query("update t set n = 1")
+    assert len(client.calls) == 4
+
+    stats = cache.stats("ds1")
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["entries"] == 2
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.unit
+def test_entries_expire_after_ttl(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache_module.time, "monotonic", lambda: now[0])
+    client = _attach(cache, FakeClient(), ttl=30)
+
+    client.execute_query("select n from t")
+    now[0] += 29
+    client.execute_query("select n from t")
+    assert len(client.calls) == 1
+
+    now[0] += 2
+    client.execute_query("select n from t")
+    assert len(client.calls) == 2
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.unit
+def test_epoch_and_credentials_scope_the_key(cache):
+    _attach(cache, FakeClient(), epoch=3).execute_query("select n from t")
+
+    same = _attach(cache, FakeClient(), epoch=3)
+    same.execute_query("select n from t")
+    assert same.calls == []
+
+    # A bumped epoch (another process invalidated) or other credentials never see old rows
+    bumped = _attach(cache, FakeClient(), epoch=4)
+    bumped.execute_query("select n from t")
+    assert bumped.calls == ["select n from t"]
+
+    other_user = _attach(cache, FakeClient(), epoch=3, credentials={"user": "bob"})
+    other_user.execute_query("select n from t")
+    assert other_user.calls == ["select n from t"]
+
+
+@pytest.mark.unit
+def test_disabled_ttl_leaves_client_untouched(cache):
+    client = FakeClient()
+    original = client.execute_query
+    assert _attach(cache, client, ttl=0).execute_query == original
+
+    attached = _attach(cache, client)
+    assert _attach(cache, attached).execute_query is attached.execute_query  # not wrapped twice
+
+
+@pytest.mark.unit
+def test_invalidate_data_source_drops_local_entries(cache):
+    client = _attach(cache, FakeClient())
+    client.execute_query("select 1")
+    client.execute_query("select 2")
+    assert cache.invalidate_data_source("ds1") == 2
+    assert cache.stats("ds1")["entries"] == 0
+    client.execute_query("select 1")
+    assert len(client.calls) == 3
@@ -0,0 +1,152 @@
+"""
+Unit tests for schema graph analytics: weighted PageRank, declared and
+inferred join edges, and the per-table metrics built from them.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.schema_graph_analytics import (
+    DECLARED_WEIGHT,
+    INFERRED_WEIGHT,
+    TableIndex,
+    compute_table_metrics,
+    pagerank,
+    structural_edges,
+)
+
+
+def _col(name, dtype="int"):
+    return {"name": name, "dtype": dtype}
+
+
+# customers <-FK- orders <- order_items -> products -> categories; accounts has no key
+TABLES = [
+    {"name": "public.customers", "columns": [_col("id"), _col("name", "text")], "pks": [{"name": "id"}], "fks": []},
+    {
+        "name": "public.orders",
+        "columns": [_col("id"), _col("customer_id"), _col("account_id"), _col("total", "numeric")],
+        "pks": [],
+        "fks": [{"references_name": "public.customers"}],
+    },
+    {"name": "public.order_items", "columns": [_col("order_id"), _col("product_id"), _col("qty")], "pks": [], "fks": []},
+    {"name": "public.products", "columns": [_col("product_id"), _col("categoryid"), _col("label", "text")], "pks": [], "fks": []},
+    {"name": "public.categories", "columns": [_col("id")], "pks": [], "fks": []},
+    {"name": "public.accounts", "columns": [_col("name", "text")], "pks": [], "fks": []},
+]
+CUSTOMERS, ORDERS, ORDER_ITEMS, PRODUCTS, CATEGORIES, ACCOUNTS = range(len(TABLES))
+
+
+def _edges(tables):
+    edges = structural_edges(tables, TableIndex([t["name"] for t in tables]))
+    return sorted((int(s), int(d), float(w)) for s, d, w in edges[["src", "dst", "weight"]].itertuples(index=False))
+
+
+@pytest.mark.unit
+def test_pagerank_two_nodes_matches_closed_form():
+    rank = pagerank(2, np.array([0]), np.array([1]), np.array([1.0]))
+    # r0 = 0.15/2 + 0.85 * r1/2 (node 1 is dangling), r0 + r1 = 1
+    assert rank.tolist() == pytest.approx([20 / 57, 37 / 57])
+
+
+@pytest.mark.unit
+def test_pagerank_cycle_star_and_weights():
+    cycle = pagerank(3, np.array([0, 1, 2]), np.array([1, 2, 0]), np.ones(3))
+    assert cycle.tolist() == pytest.approx([1 / 3] * 3)
+
+    star = pagerank(4, np.array([1, 2, 3]), np.array([0, 0, 0]), np.ones(3))
+    assert star.sum() == pytest.approx(1.0)
+    assert star[0] == pytest.approx(0.541985, abs=1e-6)
+    assert star[1:].tolist() == pytest.approx([0.152672] * 3, abs=1e-6)
+
+    weighted = pagerank(3, np.array([0, 0]), np.array([1, 2]), np.array([3.0, 1.0]))
+    assert weighted.tolist() == pytest.approx([0.259740, 0.425325, 0.314935], abs=1e-6)
+
+    assert pagerank(0, np.array([], np.int64), np.array([], np.int64), np.array([])).size == 0
+
+
+@pytest.mark.unit
+def test_pagerank_warm_start_converges_to_the_same_ranks():
+    src, dst, weight = np.array([1, 2, 3]), np.array([0, 0, 0]), np.ones(3)
+    cold = pagerank(4, src, dst, weight)
+    warm = pagerank(4, src, dst, weight, initial=np.array([0.0, 5.0, 1.0, 1.0]))
+    assert warm.tolist() == pytest.approx(cold.tolist(), abs=1e-8)
+    # A mismatched or empty warm start is ignored
+    assert pagerank(4, src, dst, weight, initial=np.zeros(4)).tolist() == pytest.approx(cold.tolist())
+    assert pagerank(4, src, dst, weight, initial=np.ones(2)).tolist() == pytest.approx(cold.tolist())
+
+
+@pytest.mark.unit
+def test_structural_edges_declared_and_inferred():
+    assert _edges(TABLES) == [
+        # Declared FK wins over the inferred customer_id edge between the same tables
+        (ORDERS, CUSTOMERS, DECLARED_WEIGHT),
+        # order_id -> orders (has "id"), product_id -> products (same column name)
+        (ORDER_ITEMS, ORDERS, INFERRED_WEIGHT),
+        (ORDER_ITEMS, PRODUCTS, INFERRED_WEIGHT),
+        # categoryid -> categories via the singular form
+        (PRODUCTS, CATEGORIES, INFERRED_WEIGHT),
+        # account_id does not point at accounts: it has no join key
+    ]
+
+
+@pytest.mark.unit
+def test_structural_edges_skip_ambiguous_and_self_references():
+    tables = [
+        {"name": "crm.users", "columns": [_col("id")]},
+        {"name": "billing.users", "columns": [_col("id")]},
+        {"name": "events", "columns": [_col("id"), _col("user_id"), _col("event_id")], "fks": [{"references_name": "events"}]},
+    ]
+    # "users" exists in two schemas and "events" referencing itself is not an edge
+    assert _edges(tables) == []
+
+    tables[2]["fks"] = [{"references_name": "billing.users"}]
+    assert _edges(tables) == [(2, 1, DECLARED_WEIGHT)]
+    assert _edges([]) == []
+
+
+@pytest.mark.unit
+def test_compute_table_metrics_on_small_schema():
+    metrics = compute_table_metrics(TABLES)
+
+    assert metrics["degree_in"].tolist() == [1, 1, 0, 1, 1, 0]
+    assert metrics["degree_out"].tolist() == [0, 1, 2, 1, 0, 0]
+    # Keyed and referenced at least as often as referencing
+    assert metrics["entity_like"].tolist() == [True, True, False, False, True, False]
+
+    # Both chain ends share the top score; the unreferenced fact table and the isolated table rank lowest
+    assert metrics["centrality_score"].tolist() == pytest.approx(
+        [1.0, 0.644432, 0.452233, 0.644432, 1.0, 0.452233], abs=1e-6
+    )
+    # Log-scaled column count (0.8) plus dtype diversity (0.2); orders has the most of both
+    assert metrics["richness"].tolist() == pytest.approx(
+        [0.746085, 1.0, 0.789082, 0.889082, 0.444541, 0.444541], abs=1e-6
+    )
+
+
+@pytest.mark.unit
+def test_observed_joins_lift_centrality_but_not_degrees():
+    step_tables = pd.DataFrame({
+        "step": ["s1", "s1", "s2", "s2", "s3"],
+        "table": [ACCOUNTS, CUSTOMERS, ACCOUNTS, CUSTOMERS, ACCOUNTS],
+    })
+    metrics = compute_table_metrics(TABLES, step_tables)
+
+    centrality = metrics["centrality_score"]
+    assert centrality[CUSTOMERS] == 1.0
+    assert centrality[ACCOUNTS] == pytest.approx(0.940649, abs=1e-6)
+    assert centrality[ACCOUNTS] > centrality[CATEGORIES]
+    # Degrees only count structural neighbours
+    assert metrics["degree_in"][ACCOUNTS] == 0
+    assert metrics["degree_out"][ACCOUNTS] == 0
+
+
+@pytest.mark.unit
+def test_compute_table_metrics_without_edges_or_tables():
+    metrics = compute_table_metrics([{"name": "lonely", "columns": [_col("a")], "pks": [], "fks": []}])
+    assert metrics["centrality_score"].tolist() == [0.0]
+    assert metrics["richness"].tolist() == [1.0]
+    assert metrics["entity_like"].tolist() == [False]
+
+    empty = compute_table_metrics([])
+    assert all(values.size == 0 for values in empty.values())
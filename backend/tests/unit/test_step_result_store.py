@@ -0,0 +1,190 @@
+"""
+Unit tests for StepResultStore: Arrow round-trip, sorted paging, streamed CSV
+and the inline-row fallbacks used when a step has no (or a missing) blob.
+"""
+import io
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from app.services import step_result_store as store_module
+from app.services.step_result_store import LocalResultBackend, StepResultStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = StepResultStore()
+    store._config = {
+        "enabled": True,
+        "backend": "local",
+        "local_path": str(tmp_path),
+        "max_rows": 1000,
+        "compression": "zstd",
+    }
+    store.register_backend(LocalResultBackend(str(tmp_path)))
+    # Module-level helpers (page_step_data / iter_step_csv) go through the singleton
+    monkeypatch.setattr(store_module, "step_result_store", store)
+    return store
+
+
+def _frame(n=250):
+    return pd.DataFrame({
+        "id": list(range(n)),
+        "name": [f"row-{i}" for i in range(n)],
+        "amount": [None if i % 10 == 0 else i * 1.5 for i in range(n)],
+    })
+
+
+@pytest.mark.unit
+def test_put_dataframe_round_trips_through_the_backend(store, tmp_path):
+    ref = store.put_dataframe(_frame())
+
+    assert ref["backend"] == "local"
+    assert ref["format"] == "arrow_ipc"
+    assert ref["total_rows"] == ref["stored_rows"] == 250
+    assert ref["columns"] == ["id", "name", "amount"]
+    assert os.path.getsize(tmp_path / ref["key"]) == ref["bytes"]
+
+    table = store.read_table(ref)
+    assert table.num_rows == 250
+    assert table.column("name").to_pylist()[:2] == ["row-0", "row-1"]
+
+    store.delete(ref)
+    assert not (tmp_path / ref["key"]).exists()
+    store.delete(ref)  # already gone: no error
+
+
+@pytest.mark.unit
+def test_put_dataframe_caps_stored_rows(store):
+    store._config["max_rows"] = 100
+    ref = store.put_dataframe(_frame())
+    assert ref["total_rows"] == 250
+    assert ref["stored_rows"] == 100
+
+
+@pytest.mark.unit
+def test_page_offsets_and_sorts_with_nulls_last(store):
+    ref = store.put_dataframe(_frame())
+
+    page = store.page(ref, offset=200, limit=100)
+    assert page["total_rows"] == 250
+    assert [r["id"] for r in page["rows"]] == list(range(200, 250))
+    assert page["rows"][0]["amount"] is None  # NaN comes back as null
+
+    page = store.page(ref, offset=0, limit=3, sort_by="amount", descending=True)
+    assert [r["id"] for r in page["rows"]] == [249, 248, 247]
+    page = store.page(ref, offset=220, limit=100, sort_by="amount")
+    assert all(r["amount"] is None for r in page["rows"][-25:])
+
+    with pytest.raises(ValueError):
+        store.page(ref, sort_by="missing")
+
+
+@pytest.mark.unit
+def test_page_reads_only_needed_batches_and_caches_sort_order(store, monkeypatch):
+    store._config["max_rows"] = 0
+    n = 150_000  # three record batches
+    df = pd.DataFrame({"id": list(range(n)), "score": [(i * 7919) % n for i in range(n)]})
+    ref = store.put_dataframe(df)
+
+    page = store.page(ref, offset=65_530, limit=10)
+    assert [r["id"] for r in page["rows"]] == list(range(65_530, 65_540))
+    assert page["total_rows"] == n
+
+    page = store.page(ref, offset=5, limit=4, sort_by="score", descending=True)
+    expected = df.sort_values("score", ascending=False)["id"].tolist()[5:9]
+    assert [r["id"] for r in page["rows"]] == expected
+
+    # Later pages reuse the cached order instead of re-reading the sort column
+    calls = []
+    load = store._open_file
+    monkeypatch.setattr(store, "_open_file", lambda f, columns=None: calls.append(columns) or load(f, columns))
+    page = store.page(ref, offset=n - 2, limit=10, sort_by="score", descending=True)
+    assert [r["id"] for r in page["rows"]] == df.sort_values("score", ascending=False)["id"].tolist()[-2:]
+    assert calls == [None]
+
+    store.delete(ref)
+    assert not store._layouts and not store._sort_orders
+
+
+@pytest.mark.unit
+def test_format_df_for_widget_keeps_a_small_sample_next_to_the_stored_result(store, monkeypatch):
+    from app.ai.code_execution.code_execution import StreamingCodeExecutor
+
+    monkeypatch.setattr("app.ai.code_execution.code_execution.step_result_store", store)
+    store._config.update(max_rows=0, inline_rows=20)
+    executor = StreamingCodeExecutor()
+    data = executor.format_df_for_widget(_frame(1500), persist_result=True)
+    assert len(data["rows"]) == 20
+    assert data["info"]["total_rows"] == 1500
+    assert data["result_ref"]["stored_rows"] == 1500
+
+    # Results that fit inline are not stored and keep every row
+    data = executor.format_df_for_widget(_frame(500), persist_result=True)
+    assert len(data["rows"]) == 500
+    assert "result_ref" not in data
+
+
+@pytest.mark.unit
+def test_iter_csv_streams_every_stored_row(store):
+    store._config["max_rows"] = 0
+    ref = store.put_dataframe(_frame(150_000))
+
+    chunks = list(store.iter_csv(ref))
+    assert len(chunks) > 1  # one chunk per record batch
+    exported = pd.read_csv(io.BytesIO(b"".join(chunks)))
+    assert list(exported.columns) == ["id", "name", "amount"]
+    assert len(exported) == ref["stored_rows"] == 150_000
+
+
+@pytest.mark.unit
+def test_iter_csv_writes_nested_columns_as_json(store):
+    store._config["max_rows"] = 0
+    n = 70_000
+    df = pd.DataFrame({
+        "id": list(range(n)),
+        "meta": [None if i == 1 else {"k": i, "tags": ["a"]} for i in range(n)],
+        "items": [[i, i + 1] for i in range(n)],
+    })
+    ref = store.put_dataframe(df)
+
+    chunks = list(store.iter_csv(ref))
+    assert len(chunks) > 1
+    exported = pd.read_csv(io.BytesIO(b"".join(chunks)))
+    assert len(exported) == n
+    assert json.loads(exported["meta"][0]) == {"k": 0, "tags": ["a"]}
+    assert pd.isna(exported["meta"][1])
+    assert json.loads(exported["items"][n - 1]) == [n - 1, n]
+
+
+@pytest.mark.unit
+def test_iter_csv_of_empty_result_has_header(store):
+    ref = store.put_dataframe(_frame(0))
+    assert b"".join(store.iter_csv(ref)).decode() == '"id","name","amount"\n'
+
+
+@pytest.mark.unit
+def test_step_helpers_fall_back_to_inline_rows(store):
+    data = {
+        "columns": [{"headerName": "Id", "field": "id"}, {"headerName": "Name", "field": "name"}],
+        "rows": [{"id": 2, "name": "b"}, {"id": 1, "name": "a"}, {"id": 3, "name": None}],
+        "result_ref": {"backend": "local", "key": "ab/missing.arrow"},
+    }
+    page = store_module.page_step_data(data, limit=2, sort_by="name")
+    assert page["total_rows"] == 3
+    assert [r["name"] for r in page["rows"]] == ["a", "b"]
+
+    csv = b"".join(store_module.iter_step_csv(data)).decode()
+    assert csv.splitlines() == ["Id,Name", "2,b", "1,a", "3,"]
+
+
+@pytest.mark.unit
+def test_step_helpers_prefer_the_stored_result(store):
+    ref = store.put_dataframe(_frame())
+    data = {"columns": [{"field": "id"}], "rows": [{"id": 0}], "result_ref": ref}
+
+    assert store_module.page_step_data(data, offset=240)["total_rows"] == 250
+    exported = pd.read_csv(io.BytesIO(b"".join(store_module.iter_step_csv(data))))
+    assert len(exported) == 250
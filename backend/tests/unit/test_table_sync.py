@@ -0,0 +1,65 @@
+"""
+Unit tests for DataSourceService.save_or_update_tables: counts of created,
+updated, unchanged and deactivated tables across repeated syncs.
+
+Uses only the datasource_tables table on its own SQLite file.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.services.data_source_service as data_source_service
+from app.models.datasource_table import DataSourceTable
+from app.services.data_source_service import DataSourceService
+
+
+def _table(name, *columns):
+    return {"name": name, "columns": [{"name": c, "dtype": "int"} for c in columns], "pks": [], "fks": []}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(data_source_service.schema_context_cache, "invalidate_tables", lambda *a, **k: None)
+    monkeypatch.setattr(data_source_service.schema_graph_analytics, "schedule", lambda *a, **k: None)
+    service = DataSourceService()
+    service.fresh = []
+
+    async def fresh_schema(**kwargs):
+        return service.fresh
+
+    monkeypatch.setattr(service, "get_data_source_fresh_schema", fresh_schema)
+    return service
+
+
+@pytest.mark.unit
+def test_sync_returns_counts(service, tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tables.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync: DataSourceTable.__table__.create(sync))
+        maker = async_sessionmaker(engine, expire_on_commit=False)
+        data_source = SimpleNamespace(id="ds-1")
+        counts = []
+        async with maker() as db:
+            async def sync(*tables):
+                service.fresh = list(tables)
+                counts.append(await service.save_or_update_tables(db, data_source, force_all_active=True))
+
+            await sync(_table("orders", "id"), _table("users", "id"), _table("events", "id"))
+            await sync(_table("orders", "id", "total"), _table("users", "id"), _table("payments", "id"))
+            await sync()
+            rows = (await db.execute(select(DataSourceTable.name, DataSourceTable.columns))).all()
+        await engine.dispose()
+        return counts, {row.name: len(row.columns) for row in rows}
+
+    counts, columns = asyncio.run(run())
+
+    assert counts == [
+        {"created": 3, "updated": 0, "unchanged": 0, "deactivated": 0},
+        {"created": 1, "updated": 1, "unchanged": 1, "deactivated": 1},
+        {"created": 0, "updated": 0, "unchanged": 0, "deactivated": 0},
+    ]
+    assert columns == {"orders": 2, "users": 1, "events": 1, "payments": 1}
@@ -0,0 +1,181 @@
+"""
+Unit tests for TableUsageAggregator: delta coalescing, bulk rollup writes,
+duplicate event skipping, and requeue/drop on failed flushes.
+
+Runs against the migrated test database; ids are not backed by real rows, so
+these only run on SQLite, which does not enforce foreign keys.
+"""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.models.table_stats import TableStats
+from app.models.table_usage_event import TableUsageEvent
+from app.services.table_usage_aggregator import TableUsageAggregator
+
+
+@pytest.fixture
+def sqlite_only(db_backend):
+    if db_backend != "sqlite":
+        pytest.skip("uses ids without parent rows; needs unenforced foreign keys")
+
+
+def _usage_row(org_id, data_source_id, table_fqn, step_id=None):
+    return {
+        "org_id": org_id,
+        "report_id": None,
+        "data_source_id": data_source_id,
+        "step_id": step_id or str(uuid.uuid4()),
+        "user_id": None,
+        "table_fqn": table_fqn,
+        "datasource_table_id": None,
+        "source_type": "sql",
+        "columns": [],
+        "success": True,
+        "user_role": None,
+        "role_weight": None,
+    }
+
+
+USAGE_DELTA = {"usage_count": 1, "success_count": 1, "weighted_usage_count": 1.0}
+
+
+async def _stats_by_fqn():
+    from app.dependencies import async_session_maker
+    async with async_session_maker() as db:
+        rows = (await db.execute(select(TableStats).where(TableStats.report_id.is_(None)))).scalars().all()
+        return {row.table_fqn: row for row in rows}
+
+
+async def _dispose():
+    from app.dependencies import engine
+    await engine.dispose()
+
+
+@pytest.mark.unit
+def test_deltas_coalesce_per_table():
+    aggregator = TableUsageAggregator()
+    # No running loop: nothing is scheduled, events stay buffered
+    aggregator.add_usage(_usage_row("o1", "d1", "sales"), USAGE_DELTA)
+    aggregator.add_usage(_usage_row("o1", "d1", "sales"), {"usage_count": 1, "failure_count": 1})
+    aggregator.add_usage(_usage_row("o1", "d1", "orders"), USAGE_DELTA)
+
+    stats = aggregator.stats()
+    assert stats["pending_usage_events"] == 3
+    assert stats["pending_stats_rows"] == 2
+    sales = aggregator._deltas[("o1", "d1", "sales")]
+    assert sales["usage_count"] == 2
+    assert sales["success_count"] == 1
+    assert sales["failure_count"] == 1
+
+
+@pytest.mark.unit
+def test_flush_increments_existing_rollups_and_inserts_missing(sqlite_only):
+    async def run():
+        from app.dependencies import async_session_maker
+        async with async_session_maker() as db:
+            db.add(TableStats(org_id="o1", report_id=None, data_source_id="d1", table_fqn="sales", usage_count=5, success_count=5))
+            await db.commit()
+
+        aggregator = TableUsageAggregator()
+        aggregator.add_usage(_usage_row("o1", "d1", "sales"), USAGE_DELTA)
+        aggregator.add_usage(_usage_row("o1", "d1", "sales"), USAGE_DELTA)
+        aggregator.add_usage(_usage_row("o1", "d1", "orders"), USAGE_DELTA)
+        result = await aggregator.flush()
+
+        assert result == {"usage_events": 3, "feedback_events": 0, "stats_rows": 2}
+        stats = await _stats_by_fqn()
+        assert stats["sales"].usage_count == 7
+        assert stats["sales"].success_count == 7
+        assert stats["orders"].usage_count == 1
+        assert aggregator.stats()["pending_stats_rows"] == 0
+        await _dispose()
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_duplicate_step_table_events_are_skipped(sqlite_only):
+    async def run():
+        from app.dependencies import async_session_maker
+        step_id = str(uuid.uuid4())
+        async with async_session_maker() as db:
+            db.add(TableUsageEvent(**_usage_row("o1", "d1", "already", step_id=step_id)))
+            await db.commit()
+
+        aggregator = TableUsageAggregator()
+        aggregator.add_usage(_usage_row("o1", "d1", "already", step_id=step_id), USAGE_DELTA)
+        aggregator.add_usage(_usage_row("o1", "d1", "twice", step_id=step_id), USAGE_DELTA)
+        aggregator.add_usage(_usage_row("o1", "d1", "twice", step_id=step_id), USAGE_DELTA)
+        result = await aggregator.flush()
+
+        assert result["usage_events"] == 1
+        assert aggregator.stats()["duplicate_usage_events"] == 2
+        async with async_session_maker() as db:
+            fqns = (await db.execute(
+                select(TableUsageEvent.table_fqn).where(TableUsageEvent.step_id == step_id)
+            )).scalars().all()
+        assert sorted(fqns) == ["already", "twice"]
+        await _dispose()
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_rejected_delta_is_dropped_instead_of_poisoning_the_buffer(sqlite_only):
+    async def run():
+        aggregator = TableUsageAggregator()
+        aggregator.add_usage(_usage_row("o1", "d1", "good"), USAGE_DELTA)
+        # NOT NULL org_id: both the event and the rollup insert are rejected by the database
+        aggregator.add_usage(_usage_row(None, "d1", "poison"), USAGE_DELTA)
+        result = await aggregator.flush()
+
+        assert result["stats_rows"] == 1
+        stats = aggregator.stats()
+        assert stats["dropped_stats_rows"] == 1
+        assert stats["pending_stats_rows"] == 0
+        assert stats["pending_usage_events"] == 0
+
+        # Later flushes are unaffected
+        aggregator.add_usage(_usage_row("o1", "d1", "good"), USAGE_DELTA)
+        assert (await aggregator.flush())["stats_rows"] == 1
+        assert (await _stats_by_fqn())["good"].usage_count == 2
+        await _dispose()
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_failed_flush_requeues_deltas_up_to_the_cap(sqlite_only):
+    async def run():
+        aggregator = TableUsageAggregator()
+        aggregator._config = {
+            "flush_interval_seconds": 60,
+            "max_pending_events": 1000,
+            "max_backlog_events": 1000,
+            "max_backlog_stats_rows": 1,
+        }
+        aggregator.add_usage(_usage_row("o1", "d1", "first"), USAGE_DELTA)
+        aggregator.add_usage(_usage_row("o1", "d1", "second"), USAGE_DELTA)
+
+        apply_deltas = aggregator._apply_deltas
+
+        async def unavailable(db, deltas):
+            raise RuntimeError("database unavailable")
+
+        aggregator._apply_deltas = unavailable
+        result = await aggregator.flush()
+        assert result["stats_rows"] == 0
+        stats = aggregator.stats()
+        assert stats["failed_flushes"] == 1
+        assert stats["pending_stats_rows"] == 1
+        assert stats["dropped_stats_rows"] == 1
+
+        aggregator._apply_deltas = apply_deltas
+        assert (await aggregator.flush())["stats_rows"] == 1
+        assert (await _stats_by_fqn())["first"].usage_count == 1
+        await _dispose()
+
+    asyncio.run(run())
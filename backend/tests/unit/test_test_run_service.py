@@ -0,0 +1,108 @@
+"""
+Unit tests for background test runs: launched tasks stay referenced until
+done, and cases still queued when the run is stopped don't start.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.test_run_service as run_service
+from app.models.eval import TestRun
+from app.services.eval_scheduler import EvalScheduler
+
+
+class _Session:
+    def __init__(self, runs):
+        self.runs = runs
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, model, key):
+        if model is TestRun:
+            return self.runs.get(key)
+        return SimpleNamespace(id=key, data_sources=[], files=[])
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = EvalScheduler()
+    scheduler._config = {"max_concurrency_per_run": 1, "max_concurrency_per_org": 8}
+    monkeypatch.setattr(run_service, "eval_scheduler", scheduler)
+    return scheduler
+
+
+def _service(monkeypatch, runs, on_run):
+    started = []
+
+    class _Agent:
+        def __init__(self, report, **kwargs):
+            self.report_id = report.id
+
+        async def main_execution(self):
+            started.append(self.report_id)
+            await on_run(self.report_id)
+
+    monkeypatch.setattr(run_service, "AgentV2", _Agent)
+    monkeypatch.setattr(run_service, "create_async_session_factory", lambda: lambda: _Session(runs))
+    service = run_service.TestRunService.__new__(run_service.TestRunService)
+    service.completions = SimpleNamespace(data_source_service=SimpleNamespace(construct_client=None))
+    return service, started
+
+
+def _jobs(*report_ids):
+    return [(report_id, f"head-{report_id}", f"system-{report_id}", None, None) for report_id in report_ids]
+
+
+@pytest.mark.unit
+def test_queued_cases_do_not_start_after_stop(monkeypatch, scheduler):
+    async def stop_after_first(report_id):
+        scheduler.stop_run("run-1")
+
+    service, started = _service(monkeypatch, {}, stop_after_first)
+
+    async def run():
+        ctx = scheduler.run_context("run-1", "org-1", owner="owner")
+        await service._run_background_cases(ctx, "owner", None, None, None, None, None, _jobs("r1", "r2", "r3"))
+
+    asyncio.run(run())
+
+    assert started == ["r1"]
+    assert scheduler.stats()["active_runs"] == 0
+
+
+@pytest.mark.unit
+def test_run_stopped_elsewhere_is_read_from_the_database(monkeypatch, scheduler):
+    runs = {"run-1": SimpleNamespace(status="in_progress")}
+
+    async def stop_in_database(report_id):
+        runs["run-1"].status = "stopped"
+
+    service, started = _service(monkeypatch, runs, stop_in_database)
+
+    async def run():
+        ctx = scheduler.run_context("run-1", "org-1", owner="owner")
+        await service._run_background_cases(ctx, "owner", None, None, None, None, None, _jobs("r1", "r2"))
+
+    asyncio.run(run())
+
+    assert started == ["r1"]
+
+
+@pytest.mark.unit
+def test_spawned_tasks_are_referenced_until_done():
+    async def run():
+        release = asyncio.Event()
+        task = run_service._spawn(release.wait())
+        assert task in run_service._background_tasks
+        release.set()
+        await task
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(run())
+    assert task not in run_service._background_tasks
@@ -0,0 +1,183 @@
+"""
+Unit tests for TraceJournal batching, timed flushes and commit-failure recovery.
+
+Uses a throwaway model on its own SQLite file so no app tables are involved.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, String, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.services.agent.trace_journal import TraceJournal
+
+Base = declarative_base()
+
+
+class TraceRow(Base):
+    __tablename__ = "trace_rows"
+
+    id = Column(String, primary_key=True)
+    name = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+async def _session_maker(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'journal.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def _committed_names(maker):
+    async with maker() as session:
+        return {r.id: r.name for r in (await session.execute(select(TraceRow))).scalars().all()}
+
+
+@pytest.mark.unit
+def test_rows_are_batched_and_restaged_rows_coalesce(tmp_path):
+    async def run():
+        engine, maker = await _session_maker(tmp_path)
+        async with maker() as db:
+            journal = TraceJournal(db, max_batch=3, max_delay_seconds=60)
+            first = TraceRow(name="a")
+            await journal.record(first)
+            first.name = "a2"
+            await journal.record(first)  # same object: still one pending row
+            assert journal.pending_count == 1
+            await journal.record(TraceRow(name="b"))
+            assert await _committed_names(maker) == {}
+            await journal.record(TraceRow(name="c"))  # third distinct row hits max_batch
+            assert journal.pending_count == 0
+            assert journal.stats["commits"] == 1
+            assert journal.stats["staged"] == 3
+            assert sorted((await _committed_names(maker)).values()) == ["a2", "b", "c"]
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_pending_rows_flush_on_timer_during_idle_window(tmp_path):
+    async def run():
+        engine, maker = await _session_maker(tmp_path)
+        async with maker() as db:
+            journal = TraceJournal(db, max_batch=100, max_delay_seconds=0.05)
+            row = await journal.record(TraceRow(name="tool-finished"))
+            assert await _committed_names(maker) == {}
+
+            # Waiting on something that doesn't use the session (the LLM): the timer commits
+            await journal.while_idle(asyncio.sleep(0.3))
+            assert journal.stats["timed_commits"] == 1
+            assert await _committed_names(maker) == {row.id: "tool-finished"}
+
+            # Outside an idle window nothing commits behind the caller's back
+            await journal.record(TraceRow(name="late"))
+            await asyncio.sleep(0.2)
+            assert journal.pending_count == 1
+            await journal.close()
+            assert journal.pending_count == 0
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_autoflushed_writes_are_committed_before_an_idle_window(tmp_path):
+    async def run():
+        engine, maker = await _session_maker(tmp_path)
+        # Another writer (a tool, a request) that won't wait long for SQLite's write lock
+        other_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'journal.db'}", connect_args={"timeout": 0.2}
+        )
+        other_maker = async_sessionmaker(other_engine, expire_on_commit=False)
+
+        async def other_writer():
+            async with other_maker() as other:
+                other.add(TraceRow(id="from-elsewhere", name="other"))
+                await other.commit()
+            return await _committed_names(other_maker)
+
+        async with maker() as db:
+            journal = TraceJournal(db, max_batch=100, max_delay_seconds=60)
+            row = await journal.record(TraceRow(name="decision"))
+            # A read on the run's session autoflushes the staged INSERT, opening a write transaction
+            await db.execute(select(TraceRow))
+
+            committed = await journal.while_idle(other_writer())
+            assert committed == {row.id: "decision", "from-elsewhere": "other"}
+            assert journal.pending_count == 0
+            assert journal.stats["commits"] == 1
+
+            # Nothing written since: the next window doesn't commit again
+            await db.execute(select(TraceRow))
+            await journal.while_idle(asyncio.sleep(0))
+            assert journal.stats["commits"] == 1
+            await journal.close()
+        await other_engine.dispose()
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_idle_iter_yields_items_and_flushes_between_them(tmp_path):
+    async def run():
+        engine, maker = await _session_maker(tmp_path)
+
+        async def slow_events():
+            for i in range(3):
+                await asyncio.sleep(0.1)
+                yield i
+
+        async with maker() as db:
+            journal = TraceJournal(db, max_batch=100, max_delay_seconds=0.02)
+            seen = []
+            async for item in journal.idle_iter(slow_events()):
+                seen.append(item)
+                await journal.record(TraceRow(name=f"event-{item}"))
+            assert seen == [0, 1, 2]
+            # Rows recorded after items 0 and 1 were committed while waiting for the next item
+            assert journal.stats["timed_commits"] == 2
+            await journal.close()
+            assert len(await _committed_names(maker)) == 3
+        await engine.dispose()
+
+    asyncio.run(run())
+
+
+@pytest.mark.unit
+def test_failed_commit_is_recovered_and_session_stays_usable(tmp_path):
+    async def run():
+        engine, maker = await _session_maker(tmp_path)
+        async with maker() as setup:
+            setup.add_all([TraceRow(id="existing", name="old"), TraceRow(id="other", name="kept")])
+            await setup.commit()
+
+        async with maker() as db:
+            other = await db.get(TraceRow, "other")
+            journal = TraceJournal(db, max_batch=100, max_delay_seconds=60, recovery_session_factory=maker)
+            fresh = await journal.record(TraceRow(name="fresh"))
+            # Same primary key as a committed row: the INSERT fails and the batch is recovered
+            clash = await journal.record(TraceRow(id="existing", name="new"))
+            await journal.flush()
+
+            assert journal.stats["recovered"] == 2
+            assert journal.stats["lost"] == 0
+            assert await _committed_names(maker) == {"existing": "new", "other": "kept", fresh.id: "fresh"}
+            # Objects expired by the rollback were reloaded: plain attribute access does no IO
+            assert other.name == "kept"
+            assert not sa_inspect(other).expired_attributes
+            # Recovered new rows are persistent again and can keep being updated
+            assert sa_inspect(fresh).persistent
+            fresh.name = "fresh2"
+            await journal.record(fresh, flush=True)
+            assert (await _committed_names(maker))[fresh.id] == "fresh2"
+            assert clash.name == "new"
+        await engine.dispose()
+
+    asyncio.run(run())
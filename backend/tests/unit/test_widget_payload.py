@@ -0,0 +1,115 @@
+"""
+Unit tests for widget payload serialization: dates, NaN/NaT and numpy
+scalars keep the format of the previous to_json based rows.
+"""
+import datetime
+import decimal
+import json
+import uuid
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ai.code_execution import widget_payload
+from app.ai.code_execution.widget_payload import columnar, encode_payload, payload_from_step_data, records
+
+
+def _frame():
+    utc_plus_one = datetime.timezone(datetime.timedelta(hours=1))
+    return pd.DataFrame({
+        "day": [datetime.date(2024, 1, 5), None, datetime.date(2024, 2, 29)],
+        "ts": pd.to_datetime(["2024-01-05 10:11:12.123456", None, "2024-01-01 00:00:00.000000"]),
+        "ts_tz": pd.to_datetime(["2024-01-05 10:11:12", None, "2024-01-01 00:00:00"]).tz_localize("Europe/Paris"),
+        "clock": [datetime.time(10, 11, 12), None, datetime.time(1, 2, 3, 400000)],
+        "elapsed": pd.to_timedelta(["1 days 2 hours", None, "3ms"]),
+        "ratio": [1.5, np.nan, np.inf],
+        "n": np.array([1, 2, 3], dtype=np.int64),
+        "flag": [True, False, True],
+        "maybe_flag": pd.array([True, None, False], dtype="boolean"),
+        "maybe_n": pd.array([1, None, 3], dtype="Int64"),
+        "mixed": [datetime.datetime(2024, 1, 5, 10, 11, 12, 345678), "x", datetime.datetime(2024, 1, 5, 10, 0, tzinfo=utc_plus_one)],
+        "scalars": pd.Series([np.int64(3), np.bool_(True), np.float64("nan")], dtype=object),
+        "odd": [uuid.UUID(int=1), decimal.Decimal("1.10"), pd.NaT],
+        "nested": [{"a": 1}, [1, 2], None],
+        "label": ["a", None, "c"],
+        "kind": pd.Categorical(["x", None, "y"]),
+    })
+
+
+def _rows(df):
+    return records([str(c) for c in df.columns], columnar(df)["values"])
+
+
+@pytest.mark.unit
+def test_rows_match_previous_to_json_serialization():
+    df = _frame()
+    expected = json.loads(df.to_json(orient="records", date_format="iso", default_handler=str))
+    rows = _rows(df)
+    assert rows == expected
+    # Same types too (e.g. 3 stays an int, 1.5 a float)
+    assert [[type(v) for v in row.values()] for row in rows] == [[type(v) for v in row.values()] for row in expected]
+
+
+@pytest.mark.unit
+def test_dates_nulls_and_numpy_scalars():
+    first, second, third = _rows(_frame())
+
+    assert first["day"] == "2024-01-05T00:00:00.000"
+    assert third["day"] == "2024-02-29T00:00:00.000"
+    assert first["ts"] == "2024-01-05T10:11:12.123"
+    assert first["ts_tz"] == "2024-01-05T09:11:12.000Z"
+    assert first["mixed"] == "2024-01-05T10:11:12.345"
+    assert third["mixed"] == "2024-01-05T09:00:00.000Z"
+    assert first["clock"] == "10:11:12"
+    assert first["elapsed"] == "P1DT2H0M0S"
+
+    # NaN, NaT, inf and pd.NA all become null
+    for column in ("day", "ts", "ts_tz", "clock", "elapsed", "ratio", "maybe_flag", "maybe_n", "label", "kind"):
+        assert second[column] is None, column
+    assert third["ratio"] is None
+    assert third["scalars"] is None
+    assert third["odd"] is None
+
+    assert first["scalars"] == 3 and type(first["scalars"]) is int
+    assert second["scalars"] is True
+    assert first["n"] == 1 and type(first["n"]) is int
+    assert first["maybe_n"] == 1 and type(first["maybe_n"]) is int
+    assert first["odd"] == "00000000-0000-0000-0000-000000000001"
+    assert second["odd"] == 1.1
+    assert first["nested"] == {"a": 1} and second["nested"] == [1, 2]
+
+
+@pytest.mark.unit
+def test_columnar_payload_encodes_to_plain_json():
+    df = _frame()
+    payload = columnar(df)
+    assert [c["dtype"] for c in payload["columns"][:3]] == ["object", "datetime64[ns]", "datetime64[ns, Europe/Paris]"]
+
+    decoded = json.loads(encode_payload({"format": "columnar", **payload}))
+    assert decoded["values"][0] == ["2024-01-05T00:00:00.000", None, "2024-02-29T00:00:00.000"]
+    assert decoded["values"][5] == [1.5, None, None]
+
+
+@pytest.mark.unit
+def test_encode_payload_without_orjson(monkeypatch):
+    monkeypatch.setattr(widget_payload, "orjson", None)
+    assert json.loads(encode_payload({"values": [[np.int64(1), None]]})) == {"values": [[1, None]]}
+
+
+@pytest.mark.unit
+def test_payload_from_step_data_reads_stored_rows():
+    df = _frame()[["day", "n"]]
+    data = {
+        "columns": [{"field": "day", "headerName": "Day"}, {"field": "n", "headerName": "n"}],
+        "rows": _rows(df),
+        "info": {"total_rows": 10, "column_info": {"n": {"dtype": "int64"}}},
+    }
+    payload = payload_from_step_data(data)
+    assert payload["columns"] == [
+        {"field": "day", "headerName": "Day", "dtype": None},
+        {"field": "n", "headerName": "n", "dtype": "int64"},
+    ]
+    assert payload["values"] == [["2024-01-05T00:00:00.000", None, "2024-02-29T00:00:00.000"], [1, 2, 3]]
+    assert (payload["row_count"], payload["total_rows"]) == (3, 10)
+    assert payload_from_step_data(None)["values"] == []